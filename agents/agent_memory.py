@@ -11,16 +11,29 @@ Memory Decay System:
 - Frequently accessed memories become permanent (long-term)
 - Long-term memories are saved to markdown files for RAG retrieval
 
+Persistence:
+- Yeni olaylar events.jsonl'e tek satır append edilir (her oyda 4 dosya yeniden yazılmaz)
+- Diğer değişiklikler state'i dirty işaretler
+- Snapshot (episodic/semantic/character/stats JSON) timer, log boyutu veya
+  shutdown'da atomic rename ile yazılır; log rotate edilip silinir (compaction)
+- Load: snapshot + log replay (event id ile tekilleştirilir)
+
 Bu sistem "blank-slate" karakter oluşumunu destekler:
 - Agent kendi kişiliğini yaşantıdan öğrenir
 - Yönlendirme yok, sadece öğrenme mekanizması var
 - Sosyal feedback (like, eleştiri) karakteri şekillendirir
 """
 
+import asyncio
+import atexit
 import json
 import logging
+import os
 import random
+import threading
+import time
 import uuid
+import weakref
 from pathlib import Path
 from datetime import datetime, timedelta
 from typing import Optional, List, Dict, Any
@@ -267,8 +280,14 @@ class AgentMemory:
     MAX_SEMANTIC = 50   # Max 50 fact
     REFLECTION_INTERVAL = 10  # Her 10 olayda bir reflection (daha sık)
     
-    def __init__(self, agent_username: str, memory_dir: Optional[str] = None):
+    def __init__(self, agent_username: str, memory_dir: Optional[str] = None, store=None):
+        """
+        store: Opsiyonel storage driver (ör. memory_pg.PostgresMemoryStore).
+        Verilirse JSON dosyaları okunmaz/yazılmaz; state'i store yükler
+        (async) ve flush_async() ile store'a yazılır.
+        """
         self.agent_username = agent_username
+        self.store = store
         
         if memory_dir:
             self.memory_dir = Path(memory_dir)
@@ -282,6 +301,7 @@ class AgentMemory:
         self.semantic_file = self.memory_dir / "semantic.json"
         self.character_file = self.memory_dir / "character.json"
         self.stats_file = self.memory_dir / "stats.json"
+        self.log_file = self.memory_dir / "events.jsonl"  # Append-only event log
         
         # 3-layer memory state
         self.episodic: List[EpisodicEvent] = []
@@ -298,8 +318,22 @@ class AgentMemory:
             "total_criticism_received": 0,
         }
         
+        # Dirty tracking / compaction state
+        self._dirty = False
+        self._flush_seq = 0
+        self._written_seq = 0
+        self._write_lock = threading.Lock()
+        
+        # Store modunda bir sonraki flush'ta yazılacak değişiklikler
+        self._pending_events: List[EpisodicEvent] = []
+        # (sadece store varken doldurulur; dosya backend'i tüm state'i yazar)
+        self._touched_ids: set = set()  # access_count / is_long_term değişenler
+        self._deleted_ids: set = set()  # Decay ile silinenler
+        
         # Load existing memory
-        self._load()
+        if store is None:
+            self._load()
+        _live_memories.add(self)
     
     # ============ Persistence ============
     
@@ -310,14 +344,7 @@ class AgentMemory:
             if self.episodic_file.exists():
                 with open(self.episodic_file, 'r', encoding='utf-8') as f:
                     data = json.load(f)
-                    self.episodic = []
-                    for e in data:
-                        # Handle emotional_tag deserialization
-                        tag_data = e.pop('emotional_tag', None)
-                        event = EpisodicEvent(**e)
-                        if tag_data:
-                            event.emotional_tag = EmotionalTag.from_dict(tag_data)
-                        self.episodic.append(event)
+                    self.episodic = [self._event_from_dict(e) for e in data]
                     logger.info(f"Loaded {len(self.episodic)} episodic events")
             
             # Load semantic
@@ -350,42 +377,237 @@ class AgentMemory:
                     
         except Exception as e:
             logger.warning(f"Failed to load memory: {e}")
-    
-    def _save(self):
-        """Save all memory layers to disk."""
+
+        # Snapshot'tan sonra eklenen olaylar
+        self._replay_log()
+
+    @staticmethod
+    def _event_from_dict(data: dict) -> EpisodicEvent:
+        data = dict(data)
+        # Handle emotional_tag deserialization
+        tag_data = data.pop('emotional_tag', None)
+        event = EpisodicEvent(**data)
+        if tag_data:
+            event.emotional_tag = EmotionalTag.from_dict(tag_data)
+        return event
+
+    @staticmethod
+    def _event_to_dict(event: EpisodicEvent) -> dict:
+        e_dict = asdict(event)
+        # Handle emotional_tag serialization
+        if event.emotional_tag is not None:
+            e_dict['emotional_tag'] = event.emotional_tag.to_dict()
+        return e_dict
+
+    def _log_files(self) -> List[Path]:
+        """Replay sırası: compaction'da rotate edilmiş loglar, sonra aktif log."""
+        rotated = sorted(self.memory_dir.glob(f"{self.log_file.name}.*"))
+        return rotated + ([self.log_file] if self.log_file.exists() else [])
+
+    def _replay_log(self):
+        """Event log'undaki, snapshot'ta olmayan olayları uygula."""
+        known = {e.id for e in self.episodic}
+        replayed = 0
         try:
+            # Crash'te yarım kalan son satır sonraki append ile birleşmesin
+            if self.log_file.exists() and self.log_file.stat().st_size:
+                with open(self.log_file, 'rb+') as f:
+                    f.seek(-1, os.SEEK_END)
+                    if f.read(1) != b"\n":
+                        f.write(b"\n")
+        except OSError as e:
+            logger.warning(f"Failed to repair memory log: {e}")
+        for path in self._log_files():
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    for line in f:
+                        if not line.strip():
+                            continue
+                        try:
+                            record = json.loads(line)
+                        except json.JSONDecodeError:
+                            continue  # Crash'te yarım kalmış son satır
+                        event = self._event_from_dict(record["event"])
+                        if event.id in known:
+                            continue  # Snapshot yazılmış ama log silinmeden kalmış
+                        known.add(event.id)
+                        self.episodic.append(event)
+                        self.stats.update(record.get("stats", {}))
+                        replayed += 1
+            except Exception as e:
+                logger.warning(f"Failed to replay memory log {path.name}: {e}")
+        if replayed:
+            # Snapshot ile aynı sınır: son MAX_EPISODIC olay
+            self.episodic = self.episodic[-self.MAX_EPISODIC:]
+            self._dirty = True
+            logger.info(f"Replayed {replayed} events from memory log")
+
+    def _append_log(self, event: EpisodicEvent):
+        """Olayı (ve güncel stats'ı) log'a tek satır olarak ekle."""
+        if self.store is not None:
+            self._pending_events.append(event)
+            return
+        record = {"event": self._event_to_dict(event), "stats": self.stats}
+        try:
+            with open(self.log_file, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(record, ensure_ascii=False) + "\n")
+        except Exception as e:
+            logger.error(f"Failed to append memory log: {e}")
+
+    def _mark_dirty(self):
+        """
+        State değişti. Yazma burada yapılmaz (çağıran event loop olabilir):
+        snapshot'ı periyodik flush_async() job'ı veya shutdown (flush_all_memories)
+        yazar; o zamana kadar olaylar append-only log'da durur.
+        """
+        self._dirty = True
+
+    def flush(self) -> bool:
+        """Dirty ise snapshot'ı hemen yaz. Yazıldıysa True."""
+        if self.store is not None:
+            return False  # Store senkron yazılamaz; flush_async() kullanılır
+        snapshot = self.prepare_flush()
+        if snapshot is None:
+            return False
+        return self.write_flush(snapshot)
+
+    def prepare_flush(self, force: bool = False) -> Optional[dict]:
+        """
+        Compaction'ın ilk yarısı (state'in sahibi olan thread'de çalışmalı):
+        aktif log'u rotate et ve tüm katmanları JSON metnine serialize et.
+        Dirty değilse None.
+        """
+        if not self._dirty and not force:
+            return None
+        if self.store is not None:
+            return self._prepare_store_flush()
+        self._dirty = False
+        self._flush_seq += 1
+        try:
+            # Bu noktaya kadarki tüm olaylar snapshot'ta; yeni olaylar yeni log'a gider
+            if self.log_file.exists():
+                os.replace(self.log_file, self.log_file.with_name(f"{self.log_file.name}.{time.time_ns()}"))
+            rotated = sorted(self.memory_dir.glob(f"{self.log_file.name}.*"))
+
             # Save episodic (keep last MAX_EPISODIC)
-            episodic_data = []
-            for e in self.episodic[-self.MAX_EPISODIC:]:
-                e_dict = asdict(e)
-                # Handle emotional_tag serialization
-                if e.emotional_tag is not None:
-                    e_dict['emotional_tag'] = e.emotional_tag.to_dict()
-                episodic_data.append(e_dict)
-            with open(self.episodic_file, 'w', encoding='utf-8') as f:
-                json.dump(episodic_data, f, indent=2, ensure_ascii=False)
-            
-            # Save semantic (keep last MAX_SEMANTIC)
-            with open(self.semantic_file, 'w', encoding='utf-8') as f:
-                json.dump([asdict(e) for e in self.semantic[-self.MAX_SEMANTIC:]], f, indent=2, ensure_ascii=False)
-            
+            episodic_data = [self._event_to_dict(e) for e in self.episodic[-self.MAX_EPISODIC:]]
+
             # Save character sheet (worldview serialized separately)
-            char_dict = asdict(self.character)
-            # Handle worldview separately - it's not directly serializable
-            if self.character.worldview is not None:
-                try:
-                    char_dict['worldview'] = self.character.worldview.to_dict()
-                except Exception:
-                    char_dict['worldview'] = None
-            with open(self.character_file, 'w', encoding='utf-8') as f:
-                json.dump(char_dict, f, indent=2, ensure_ascii=False)
-            
-            # Save stats
-            with open(self.stats_file, 'w', encoding='utf-8') as f:
-                json.dump(self.stats, f, indent=2, ensure_ascii=False)
-                
+            char_dict = self._character_dict()
+
+            files = {
+                self.episodic_file: episodic_data,
+                # Save semantic (keep last MAX_SEMANTIC)
+                self.semantic_file: [asdict(e) for e in self.semantic[-self.MAX_SEMANTIC:]],
+                self.character_file: char_dict,
+                self.stats_file: self.stats,
+            }
+            return {
+                "seq": self._flush_seq,
+                "files": {path: json.dumps(data, indent=2, ensure_ascii=False) for path, data in files.items()},
+                "rotated": rotated,
+            }
         except Exception as e:
-            logger.error(f"Failed to save memory: {e}")
+            self._dirty = True
+            logger.error(f"Failed to prepare memory snapshot: {e}")
+            return None
+
+    def write_flush(self, snapshot: dict) -> bool:
+        """
+        Compaction'ın ikinci yarısı (saf I/O, background thread'de çalışabilir):
+        dosyaları atomic rename ile yaz, rotate edilmiş logları sil.
+        """
+        with self._write_lock:
+            try:
+                # Daha yeni bir snapshot zaten yazıldıysa eskisini yazma
+                if snapshot["seq"] > self._written_seq:
+                    for path, text in snapshot["files"].items():
+                        self._atomic_write(path, text)
+                    self._written_seq = snapshot["seq"]
+                for path in snapshot["rotated"]:
+                    path.unlink(missing_ok=True)
+                return True
+            except Exception as e:
+                # Rotate edilmiş loglar yerinde kalır; load'da replay edilir
+                self._dirty = True
+                logger.error(f"Failed to save memory: {e}")
+                return False
+
+    def _character_dict(self) -> dict:
+        char_dict = asdict(self.character)
+        # Handle worldview separately - it's not directly serializable
+        if self.character.worldview is not None:
+            try:
+                char_dict['worldview'] = self.character.worldview.to_dict()
+            except Exception:
+                char_dict['worldview'] = None
+        return char_dict
+
+    def _prepare_store_flush(self) -> dict:
+        """Store snapshot'ı: sadece son flush'tan beri değişen event'ler + küçük katmanlar."""
+        self._dirty = False
+        self._flush_seq += 1
+        events, self._pending_events = self._pending_events, []
+        touched_ids, self._touched_ids = self._touched_ids, set()
+        deleted, self._deleted_ids = self._deleted_ids, set()
+        touched = []
+        for event_id in touched_ids:
+            event = self._find_event(event_id)
+            if event is not None:
+                touched.append({"id": event.id, "access_count": event.access_count, "is_long_term": event.is_long_term})
+        return {
+            "seq": self._flush_seq,
+            "events": [self._event_to_dict(e) for e in events],
+            "touched": touched,
+            "deleted": sorted(deleted),
+            "semantic": [asdict(f) for f in self.semantic[-self.MAX_SEMANTIC:]],
+            "character": self._character_dict(),
+            "stats": dict(self.stats),
+        }
+
+    def full_store_snapshot(self) -> dict:
+        """Tüm state'i yeni event olarak içeren store snapshot'ı (dosyadan import için)."""
+        snapshot = self._prepare_store_flush()
+        snapshot["events"] = [self._event_to_dict(e) for e in self.episodic[-self.MAX_EPISODIC:]]
+        snapshot["touched"] = []
+        return snapshot
+
+    def requeue_flush(self, snapshot: dict):
+        """Store'a yazılamayan snapshot'ın değişikliklerini sonraki flush'a geri koy."""
+        self._pending_events = [self._event_from_dict(e) for e in snapshot["events"]] + self._pending_events
+        self._touched_ids.update(t["id"] for t in snapshot["touched"])
+        self._deleted_ids.update(snapshot["deleted"])
+        self._dirty = True
+
+    async def flush_async(self) -> bool:
+        """
+        Event loop'tan flush: serialize burada, yazma store'da (async) veya
+        dosya modunda background thread'de.
+        """
+        snapshot = self.prepare_flush()
+        if snapshot is None:
+            return False
+        if self.store is not None:
+            return await self.store.write(self, snapshot)
+        return await asyncio.to_thread(self.write_flush, snapshot)
+
+    @staticmethod
+    def _atomic_write(path: Path, text: str):
+        tmp = path.with_name(f".{path.name}.tmp")
+        with open(tmp, 'w', encoding='utf-8') as f:
+            f.write(text)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+    
+    def _save(self):
+        """Save all memory layers to disk (dirty olmasa da, senkron compaction)."""
+        if self.store is not None:
+            self._dirty = True  # Store modunda bir sonraki flush_async() yazar
+            return
+        snapshot = self.prepare_flush(force=True)
+        if snapshot is not None:
+            self.write_flush(snapshot)
     
     # ============ Episodic Memory (Raw Events) ============
     
@@ -453,7 +675,8 @@ class AgentMemory:
         """Add event and check if reflection is needed."""
         self.episodic.append(event)
         self.stats['events_since_reflection'] += 1
-        self._save()
+        self._append_log(event)
+        self._mark_dirty()
     
     # ============ Semantic Memory (Facts/Relationships) ============
     
@@ -467,7 +690,7 @@ class AgentMemory:
                 fact.confidence = min(1.0, fact.confidence + 0.1)
                 fact.source_count += 1
                 fact.last_updated = datetime.now().isoformat()
-                self._save()
+                self._mark_dirty()
                 return
         
         # Add new fact
@@ -477,7 +700,7 @@ class AgentMemory:
             predicate=predicate,
             confidence=confidence,
         ))
-        self._save()
+        self._mark_dirty()
     
     def get_facts_about(self, subject: str) -> List[SemanticFact]:
         """Get all facts about a subject."""
@@ -585,7 +808,7 @@ class AgentMemory:
     def mark_reflection_done(self):
         """Mark that reflection was performed."""
         self.stats['events_since_reflection'] = 0
-        self._save()
+        self._mark_dirty()
 
     # ============ Memory Decay & Long-Term Promotion ============
 
@@ -628,6 +851,8 @@ class AgentMemory:
         # Send decaying memories to The Void
         if decaying:
             self._send_to_void(decaying)
+            if self.store is not None:
+                self._deleted_ids.update(e.id for e in decaying)
 
         self.episodic = surviving
         removed_count = original_count - len(surviving)
@@ -642,6 +867,7 @@ class AgentMemory:
             from the_void import get_void, ForgottenMemory
 
             void = get_void()
+            forgotten_memories = []
             for event in events:
                 # Calculate emotional valence from tag or content
                 valence = 0.0
@@ -662,7 +888,10 @@ class AgentMemory:
                     original_timestamp=event.timestamp,
                     tags=[event.event_type],
                 )
-                void.receive_forgotten(forgotten)
+                forgotten_memories.append(forgotten)
+
+            # Tek çağrı: Void tek lock + tek disk yazımıyla alır
+            void.receive_forgotten_many(forgotten_memories)
 
             logger.debug(f"Sent {len(events)} memories to The Void")
         except ImportError:
@@ -691,11 +920,13 @@ class AgentMemory:
 
         # Mark as long-term
         event.is_long_term = True
+        if self.store is not None:
+            self._touched_ids.add(event.id)
 
         # Save to markdown file for RAG
         self._save_to_markdown(event)
 
-        self._save()
+        self._mark_dirty()
         logger.info(f"Promoted to long-term: {event_id} ({event.event_type})")
         return True
 
@@ -715,12 +946,14 @@ class AgentMemory:
         event = self._find_event(event_id)
         if event:
             event.access_count += 1
+            if self.store is not None:
+                self._touched_ids.add(event.id)
 
             # Check for automatic promotion
             if not event.is_long_term and event.access_count >= LONG_TERM_THRESHOLD:
                 self.promote_to_long_term(event_id)
             else:
-                self._save()
+                self._mark_dirty()
 
         return event
 
@@ -761,6 +994,70 @@ class AgentMemory:
         except Exception as e:
             logger.error(f"Failed to save long-term memory: {e}")
 
+        # Embedding arka planda (embedding_queue): agent'ın MemoryRAG'i ve
+        # agent'lar arası ANN indeksi (embedding modeli varsa)
+        rag = _memory_rag(self.memory_dir)
+        if rag is not None:
+            rag.enqueue_memory(event.id)
+        index = _memory_index()
+        if index is not None:
+            from memory_ann import SOURCE_LONG_TERM
+            index.add_text(SOURCE_LONG_TERM, self.agent_username, event.id,
+                           event.to_narrative(), topic=event.topic_title)
+
+    def recall_long_term(self, query: str, limit: int = 3, all_agents: bool = False) -> List[str]:
+        """
+        Sorguya semantik olarak en yakın long-term anıların anlatıları.
+
+        all_agents=False: sadece bu agent'ın anıları. İndeks yoksa boş liste.
+        """
+        index = _memory_index()
+        if index is None or not query:
+            return []
+        from memory_ann import SOURCE_LONG_TERM
+        try:
+            hits = index.search_text(
+                query, limit=limit, source=SOURCE_LONG_TERM,
+                agent=None if all_agents else self.agent_username,
+            )
+        except Exception as e:
+            logger.warning(f"Long-term recall failed: {e}")
+            return []
+        return self._recall_narratives(hits)
+
+    async def recall_long_term_async(self, query: str, limit: int = 3, all_agents: bool = False) -> List[str]:
+        """recall_long_term'in async sürümü (event loop'tan: sorgu embed'i thread'de)."""
+        index = _memory_index()
+        if index is None or not query:
+            return []
+        from memory_ann import SOURCE_LONG_TERM
+        try:
+            hits = await index.search_text_async(
+                query, limit=limit, source=SOURCE_LONG_TERM,
+                agent=None if all_agents else self.agent_username,
+            )
+        except Exception as e:
+            logger.warning(f"Long-term recall failed: {e}")
+            return []
+        return self._recall_narratives(hits)
+
+    def _recall_narratives(self, hits) -> List[str]:
+        """İndeks sonuçlarını anlatıya çevir (episodic listede yoksa markdown dosyasından)."""
+        narratives = []
+        for hit in hits:
+            event = self._find_event(hit.memory_id) if hit.agent == self.agent_username else None
+            if event is not None:
+                narratives.append(event.to_narrative())
+                continue
+            # Episodic listeden düşmüş (veya başka agent'ın) anı: markdown dosyası
+            path = self.memory_dir.parent / hit.agent / "long_term" / f"{hit.memory_id}.md"
+            try:
+                body = path.read_text(encoding='utf-8').split("\n---\n")[0]
+                narratives.append("\n".join(l for l in body.splitlines() if l and not l.startswith('#')))
+            except OSError:
+                continue
+        return narratives
+
     def get_long_term_memories(self) -> List[EpisodicEvent]:
         """Get all long-term memories."""
         return [e for e in self.episodic if e.is_long_term]
@@ -977,7 +1274,7 @@ class AgentMemory:
 
         if decayed_count > 0:
             logger.info(f"Decayed {decayed_count} relationships due to inactivity")
-            self._save()
+            self._mark_dirty()
 
     def get_relationship_summary(self, other_agent: str) -> dict:
         """Get a summary of relationship with another agent."""
@@ -1083,6 +1380,52 @@ class AgentMemory:
         return ""
 
 
+# ============ Memory Index Helpers ============
+
+def _memory_index():
+    """Paylaşılan ANN indeksi (memory_ann; embedding modeli yoksa None)."""
+    try:
+        from memory_ann import get_memory_index
+        return get_memory_index()
+    except ImportError:
+        return None
+    except Exception as e:
+        logger.debug(f"Memory index not available: {e}")
+        return None
+
+
+def _memory_rag(memory_dir: Path):
+    """Agent'ın MemoryRAG'i (paylaşılan instance; embedding modeli yoksa None)."""
+    try:
+        from memory_rag import RAG_AVAILABLE, create_memory_rag
+        return create_memory_rag(memory_dir) if RAG_AVAILABLE else None
+    except ImportError:
+        return None
+    except Exception as e:
+        logger.debug(f"Memory RAG not available: {e}")
+        return None
+
+
+# ============ Flush Registry ============
+
+_live_memories: "weakref.WeakSet[AgentMemory]" = weakref.WeakSet()
+
+
+def flush_all_memories() -> int:
+    """Process'teki tüm dirty AgentMemory'leri yaz (shutdown / atexit)."""
+    flushed = 0
+    for memory in list(_live_memories):
+        try:
+            if memory.flush():
+                flushed += 1
+        except Exception:
+            pass
+    return flushed
+
+
+atexit.register(flush_all_memories)
+
+
 # ============ Social Feedback Generator ============
 
 def generate_social_feedback(content: str, tone: str = "neutral") -> SocialFeedback:
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Memory ANN Benchmark - tam tarama vs IVF / HNSW aday üretimi.
+
+Kümelenmiş sentetik embedding'ler (model gerekmez) üretir, 10 agent'a ve
+long_term / void kaynaklarına dağıtır; aynı sorguları:
+- exact: filtreli tam tarama (eski dream/MemoryRAG davranışına denk)
+- ivf:   numpy IVF
+- hnsw:  hnswlib (kuruluysa)
+ile çalıştırır. Sorgu başına süreyi ve recall@k'yı raporlar.
+
+Kullanım:
+    python agents/benchmark_memory_ann.py
+    python agents/benchmark_memory_ann.py --memories 300000 --dim 384 --queries 50
+"""
+
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from memory_ann import HNSW_AVAILABLE, SOURCE_LONG_TERM, SOURCE_VOID, CollectiveMemoryIndex
+
+AGENTS = [f"agent{i}" for i in range(10)]
+
+
+def make_vectors(n: int, dim: int, rng) -> np.ndarray:
+    """Konu merkezleri etrafında gürültülü vektörler (gerçek embedding'lere benzer kümelenme)."""
+    centers = rng.standard_normal((max(10, n // 200), dim)).astype(np.float32)
+    vectors = centers[rng.integers(0, len(centers), n)]
+    return vectors + 0.6 * rng.standard_normal((n, dim)).astype(np.float32)
+
+
+def run(index: CollectiveMemoryIndex, queries, limit: int, filters: dict):
+    started = time.perf_counter()
+    results = [[h.memory_id for h in index.search(q, limit, **filters)] for q in queries]
+    return results, (time.perf_counter() - started) / len(queries)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Memory ANN benchmark")
+    parser.add_argument("--memories", type=int, default=200000)
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--queries", type=int, default=30)
+    parser.add_argument("--limit", type=int, default=10)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(42)
+    vectors = make_vectors(args.memories, args.dim, rng)
+    queries = make_vectors(args.queries, args.dim, np.random.default_rng(7))
+    backends = ["exact", "ivf"] + (["hnsw"] if HNSW_AVAILABLE else [])
+    scenarios = {
+        "void, exclude own": {"source": SOURCE_VOID, "exclude_agent": AGENTS[0]},
+        "all sources": {},
+        "single agent": {"agent": AGENTS[3]},
+    }
+
+    with tempfile.TemporaryDirectory() as tmp:
+        index = CollectiveMemoryIndex(Path(tmp), backend="exact")
+        started = time.perf_counter()
+        index.add_vectors([
+            (SOURCE_VOID if i % 2 else SOURCE_LONG_TERM, AGENTS[i % len(AGENTS)], f"m{i}", None, vector)
+            for i, vector in enumerate(vectors)
+        ])
+        print(f"memories: {args.memories}, dim: {args.dim}, queries: {args.queries}, top-{args.limit}")
+        print(f"load: {time.perf_counter() - started:.1f}s")
+
+        for name, filters in scenarios.items():
+            truth = None
+            for backend in backends:
+                index.backend = backend
+                index._ann = None
+                started = time.perf_counter()
+                index.search(queries[0], args.limit, **filters)  # ANN kurulumu
+                build = time.perf_counter() - started
+                results, per_query = run(index, queries, args.limit, filters)
+                if truth is None:
+                    truth = results
+                recall = np.mean([len(set(r) & set(t)) / max(1, len(t)) for r, t in zip(results, truth)])
+                print(f"{name:<18} | {backend:<5} | {per_query * 1000:8.2f} ms/query | "
+                      f"recall@{args.limit} {recall:.3f} | first query {build:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+MemoryRAG Benchmark - eski dict + Python döngüsü vs float32 matris index.
+
+Rastgele embedding'ler (model gerekmez) üretir, aynı sorguları iki yolla
+çalıştırır:
+- loop:  {id: list} üzerinde her sorguda np.array + iki norm (eski search)
+- index: EmbeddingIndex — tek matris-vektör çarpımı + argpartition
+
+Sorgu başına süreyi, top-k eşleşmesini ve ekleme/silme süresini raporlar.
+
+Kullanım:
+    python agents/benchmark_memory_rag.py
+    python agents/benchmark_memory_rag.py --memories 20000 --dim 384 --queries 50
+"""
+
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from memory_rag import EmbeddingIndex
+
+
+def legacy_search(cache: dict, query: list, limit: int) -> list:
+    """Eski MemoryRAG.search döngüsü."""
+    query_arr = np.array(query)
+    scores = []
+    for mem_id, mem_emb in cache.items():
+        mem_arr = np.array(mem_emb)
+        similarity = np.dot(query_arr, mem_arr) / (np.linalg.norm(query_arr) * np.linalg.norm(mem_arr))
+        scores.append((mem_id, float(similarity)))
+    scores.sort(key=lambda x: x[1], reverse=True)
+    return scores[:limit]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="MemoryRAG loop vs matrix benchmark")
+    parser.add_argument("--memories", type=int, default=5000)
+    parser.add_argument("--dim", type=int, default=384)  # MiniLM-L12 boyutu
+    parser.add_argument("--queries", type=int, default=20)
+    parser.add_argument("--limit", type=int, default=3)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(42)
+    vectors = rng.standard_normal((args.memories, args.dim)).astype(np.float32)
+    ids = [f"m{i:06d}" for i in range(args.memories)]
+    cache = {memory_id: vector.tolist() for memory_id, vector in zip(ids, vectors)}
+    queries = rng.standard_normal((args.queries, args.dim)).astype(np.float32)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        index = EmbeddingIndex(Path(tmp))
+        started = time.perf_counter()
+        index.add_many(list(zip(ids, vectors)))
+        build_time = time.perf_counter() - started
+
+        started = time.perf_counter()
+        for i in range(100):
+            index.add_many([(f"new{i}", rng.standard_normal(args.dim))])
+        for i in range(100):
+            index.remove(f"new{i}")
+        update_time = (time.perf_counter() - started) / 200
+
+        started = time.perf_counter()
+        index_results = [index.search(q, args.limit) for q in queries]
+        index_time = time.perf_counter() - started
+
+        started = time.perf_counter()
+        loop_results = [legacy_search(cache, q.tolist(), args.limit) for q in queries]
+        loop_time = time.perf_counter() - started
+
+        # Yeniden açma: memmap, dosya boyutu
+        reopened = EmbeddingIndex(Path(tmp))
+        assert reopened.search(queries[0], args.limit) == index_results[0]
+        size_mb = index.matrix_file.stat().st_size / (1024 * 1024)
+
+    mismatches = sum(
+        [a for a, _ in x] != [b for b, _ in y] for x, y in zip(index_results, loop_results)
+    )
+    n = args.queries
+    print(f"memories: {args.memories}, dim: {args.dim}, queries: {n}, top-{args.limit}")
+    print(f"index build: {build_time * 1000:.1f} ms, add/remove: {update_time * 1000:.3f} ms/op, file: {size_mb:.1f} MB")
+    print(f"loop : {loop_time / n * 1000:8.3f} ms/query")
+    print(f"index: {index_time / n * 1000:8.3f} ms/query")
+    print(f"speedup: {loop_time / index_time:.0f}x, top-k mismatches: {mismatches}")
+
+
+if __name__ == "__main__":
+    main()
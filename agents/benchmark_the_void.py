@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""
+The Void Benchmark - tek JSON dosyası vs shard'lı append-only storage.
+
+Sentetik ForgottenMemory'ler üretir ve iki yolu ölçer:
+- legacy: her anıda tüm void_memories.json yeniden yazılır, kapasite
+  aşılınca tüm liste sort edilir (eski receive_forgotten)
+- sharded: TheVoid.receive_forgotten (tek tek) ve receive_forgotten_many
+  (decay batch'i kadar toplu)
+
+--index: sharded yollar ANN indeksi (memory_ann) açıkken ölçülür; eviction
+silmeleri de indekse gider. Embedding modeli yoksa metin hash'inden sahte
+vektör kullanılır.
+
+Kullanım:
+    python agents/benchmark_the_void.py
+    python agents/benchmark_the_void.py --memories 5000 --batch 20
+    python agents/benchmark_the_void.py --index
+"""
+
+import argparse
+import json
+import sys
+import tempfile
+import threading
+import time
+import zlib
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+import the_void
+from the_void import ForgottenMemory, TheVoid
+
+
+def make_memories(n: int, offset: int = 0) -> list:
+    return [
+        ForgottenMemory(
+            original_agent=f"agent_{i % 12}",
+            event_type="wrote_entry",
+            content_summary=f"unutulmuş entry {i} " + "lorem ipsum " * 12,
+            topic=f"konu {i % 40}",
+            emotional_valence=((i % 7) - 3) / 3,
+        )
+        for i in range(offset, offset + n)
+    ]
+
+
+def legacy_receive(path: Path, memories: list, max_memories: int):
+    """Eski receive_forgotten: append + (gerekirse sort) + tüm dosyayı yaz."""
+    stored = []
+    for memory in memories:
+        stored.append(memory)
+        if len(stored) > max_memories:
+            stored.sort(key=lambda m: (m.access_count, m.forgotten_at))
+            stored = stored[-(max_memories // 2):]
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({"memories": [m.to_dict() for m in stored]}, f, indent=2, ensure_ascii=False)
+
+
+def install_index(storage_dir: Path, dim: int = 384):
+    """Taze ANN indeksi kur; embedding modeli yoksa deterministik sahte embedding."""
+    import numpy as np
+    import memory_ann
+    from embedding_service import EmbeddingService
+
+    if not EmbeddingService.is_available():
+        def fake_embed_many(cls, texts, model_name=None):
+            return [
+                np.random.default_rng(zlib.crc32(t.encode("utf-8"))).standard_normal(dim).astype(np.float32)
+                for t in texts
+            ]
+        EmbeddingService.embed_many = classmethod(fake_embed_many)
+        EmbeddingService.is_available = classmethod(lambda cls, model_name=None: True)
+    memory_ann.reset_memory_index()
+    return memory_ann.get_memory_index(storage_dir)
+
+
+class TimedLock:
+    """TheVoid._lock yerine: en uzun tutulma süresini ölçer."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._acquired = 0.0
+        self.max_hold = 0.0
+
+    def __enter__(self):
+        self._lock.acquire()
+        self._acquired = time.perf_counter()
+
+    def __exit__(self, *exc):
+        self.max_hold = max(self.max_hold, time.perf_counter() - self._acquired)
+        self._lock.release()
+
+
+def new_void(storage_dir: Path, with_index: bool = False) -> TheVoid:
+    TheVoid._instance = None
+    the_void.reset_void()
+    if with_index:
+        install_index(storage_dir / "ann")
+    void = the_void.get_void(storage_dir)
+    void._lock = TimedLock()
+    return void
+
+
+def main():
+    parser = argparse.ArgumentParser(description="The Void storage benchmark")
+    parser.add_argument("--memories", type=int, default=3000)
+    parser.add_argument("--batch", type=int, default=20)  # Decay başına unutulan anı
+    parser.add_argument("--index", action="store_true", help="ANN indeksi açık")
+    args = parser.parse_args()
+
+    from embedding_queue import EmbeddingQueue
+
+    memories = make_memories(args.memories)
+    n = args.memories
+
+    with tempfile.TemporaryDirectory() as tmp:
+        started = time.perf_counter()
+        legacy_receive(Path(tmp) / "void_memories.json", memories, TheVoid.MAX_MEMORIES)
+        legacy_time = time.perf_counter() - started
+
+    with tempfile.TemporaryDirectory() as tmp:
+        void = new_void(Path(tmp), args.index)
+        started = time.perf_counter()
+        for memory in make_memories(n):
+            void.receive_forgotten(memory)
+        single_time = time.perf_counter() - started
+        EmbeddingQueue.join()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        void = new_void(Path(tmp), args.index)
+        batch = make_memories(n)
+        started = time.perf_counter()
+        for i in range(0, n, args.batch):
+            void.receive_forgotten_many(batch[i:i + args.batch])
+        batch_time = time.perf_counter() - started
+        EmbeddingQueue.join()
+        index_stats = the_void._memory_index().stats() if args.index else None
+
+        started = time.perf_counter()
+        reloaded = new_void(Path(tmp), args.index)
+        load_time = time.perf_counter() - started
+        assert len(reloaded.memories) == len(void.memories)
+        disk_kb = sum(p.stat().st_size for p in (Path(tmp) / "shards").iterdir()) / 1024
+        if index_stats is not None:
+            # İndeks void ile aynı anıları tutmalı (eviction silmeleri dahil)
+            assert index_stats["indexed"] + index_stats["pending"] == len(void.memories), index_stats
+
+    TheVoid._instance = None
+    the_void.reset_void()
+
+    print(f"memories: {n}, cap: {TheVoid.MAX_MEMORIES}, batch: {args.batch}, index: {index_stats or 'off'}")
+    print(f"legacy (full JSON rewrite): {legacy_time / n * 1000:8.3f} ms/memory")
+    print(f"sharded receive_forgotten : {single_time / n * 1000:8.3f} ms/memory")
+    print(f"sharded receive_many      : {batch_time / n * 1000:8.3f} ms/memory")
+    print(f"speedup: {legacy_time / single_time:.0f}x single, {legacy_time / batch_time:.0f}x batched")
+    print(f"reload: {load_time * 1000:.1f} ms, shards on disk: {disk_kb:.0f} KB")
+    print(f"max _lock hold (receive_many): {void._lock.max_hold * 1000:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
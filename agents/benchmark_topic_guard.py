@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+TopicGuard Benchmark - eski lineer tarama vs trigram index.
+
+Sentetik 10k son başlık üretir, aynı aday setini iki yolla kontrol eder:
+- scan:  her başlığa exact + SequenceMatcher (eski TopicGuard.check)
+- index: hash lookup + trigram top-k + SequenceMatcher doğrulaması
+
+Aday başına süreyi ve iki yolun reddettiği aday sayılarını raporlar.
+
+Kullanım:
+    python agents/benchmark_topic_guard.py
+    python agents/benchmark_topic_guard.py --topics 10000 --candidates 200
+"""
+
+import argparse
+import random
+import sys
+import time
+from difflib import SequenceMatcher
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from topic_guard import TopicCandidate, TopicGuard
+
+WORDS = [
+    "dolar", "rekor", "kırdı", "merkez", "bankası", "faiz", "kararı", "açıkladı",
+    "deprem", "istanbul", "ankara", "maç", "derbi", "transfer", "seçim", "anket",
+    "yapay", "zeka", "model", "yasak", "zam", "akaryakıt", "benzin", "kira",
+    "öğrenci", "sınav", "sonuçları", "trafik", "metro", "hattı", "açılış", "iptal",
+    "belediye", "meclis", "teklif", "vergi", "emekli", "maaş", "asgari", "ücret",
+]
+
+
+def make_titles(n: int, rng: random.Random) -> list:
+    return [" ".join(rng.sample(WORDS, rng.randint(3, 7))) + f" {rng.randint(1, 9999)}" for _ in range(n)]
+
+
+def perturb(title: str, rng: random.Random) -> str:
+    """Bir karakteri değiştir — SequenceMatcher açısından çok benzer aday."""
+    i = rng.randrange(len(title))
+    return title[:i] + rng.choice("abcçdefgğh") + title[i + 1:]
+
+
+def legacy_check(title: str, recent: list, threshold: float) -> bool:
+    """Eski TopicGuard.check ilk iki adımı: True = izin var."""
+    title_lower = title.lower().strip()
+    for topic in recent:
+        if title_lower == topic["title"].lower().strip():
+            return False
+    for topic in recent:
+        if SequenceMatcher(None, title_lower, topic["title"].lower()).ratio() >= threshold:
+            return False
+    return True
+
+
+def main():
+    parser = argparse.ArgumentParser(description="TopicGuard scan vs index benchmark")
+    parser.add_argument("--topics", type=int, default=10000)
+    parser.add_argument("--candidates", type=int, default=40)
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    titles = make_titles(args.topics, rng)
+    recent = [{"title": t, "category": "gundem", "agent_username": "x", "created_at": ""} for t in titles]
+
+    # Yarısı yeni başlık, çeyreği exact, çeyreği 1 karakter farklı
+    candidates = make_titles(args.candidates // 2, rng)
+    candidates += rng.sample(titles, args.candidates // 4)
+    candidates += [perturb(t, rng) for t in rng.sample(titles, args.candidates - len(candidates))]
+
+    started = time.perf_counter()
+    guard = TopicGuard(recent)
+    build_time = time.perf_counter() - started
+
+    started = time.perf_counter()
+    guard.set_recent_topics(recent[1:] + [{"title": "yeni eklenen başlık", "category": "gundem"}])
+    guard.set_recent_topics(recent)
+    update_time = time.perf_counter() - started
+
+    started = time.perf_counter()
+    index_results = [guard.check(TopicCandidate(c, "gundem", "x")).is_allowed for c in candidates]
+    index_time = time.perf_counter() - started
+
+    started = time.perf_counter()
+    scan_results = [legacy_check(c, recent, TopicGuard.SIMILARITY_THRESHOLD) for c in candidates]
+    scan_time = time.perf_counter() - started
+
+    n = len(candidates)
+    mismatches = sum(a != b for a, b in zip(index_results, scan_results))
+    print(f"recent topics: {args.topics}, candidates: {n}")
+    print(f"index build: {build_time * 1000:.1f} ms, incremental update (±1): {update_time * 1000:.1f} ms")
+    print(f"scan : {scan_time / n * 1000:8.3f} ms/check, rejected {scan_results.count(False)}")
+    print(f"index: {index_time / n * 1000:8.3f} ms/check, rejected {index_results.count(False)}")
+    print(f"speedup: {scan_time / index_time:.0f}x, mismatches: {mismatches}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+"""
+Embedding Queue - long-term anılar için arka plan embedding kuyruğu.
+
+promote_to_long_term markdown dosyasını yazıyordu ama hiçbir şey onu o anda
+embed etmiyordu; index sonradan rebuild_index ile (tüm dosyalar, senkron)
+doluyordu. Bu kuyrukta:
+
+- Üretici: submit(sink, item, text) — hemen döner
+- Worker: daemon thread; kuyruktan BATCH_SIZE'a kadar iş toplar (en fazla
+  BATCH_WAIT_SECONDS bekler), tek EmbeddingService.embed_many çağrısıyla
+  embed eder, sonuçları sink başına tek sink.add_embeddings([(item, vector)])
+  çağrısıyla teslim eder (index artımlı güncellenir)
+
+Sink: add_embeddings(items) metodu olan herhangi bir nesne (MemoryRAG,
+memory_ann.CollectiveMemoryIndex). Embed edilemeyen işler düşürülür;
+MemoryRAG.rebuild_index hash farkından onları yeniden yakalar.
+
+Worker daemon thread olduğu için process çıkışında kuyrukta kalan işler
+kaybolurdu: atexit'te join(SHUTDOWN_TIMEOUT_SECONDS) ile kuyruk boşaltılır
+(servisler lifespan shutdown'ında aynı şeyi async olarak yapar).
+"""
+
+import atexit
+import logging
+import queue
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from embedding_service import DEFAULT_MODEL, EmbeddingService
+
+logger = logging.getLogger(__name__)
+
+
+class EmbeddingQueue:
+    """Process-wide embedding kuyruğu + worker thread (class-level state)."""
+
+    BATCH_SIZE = 64
+    BATCH_WAIT_SECONDS = 0.2  # İlk işten sonra batch'in dolması için bekleme
+    SHUTDOWN_TIMEOUT_SECONDS = 30.0  # Çıkışta kuyruğun boşalması için en fazla bekleme
+
+    _queue: "queue.Queue[Tuple[Any, Any, str, str]]" = queue.Queue()
+    _worker: Optional[threading.Thread] = None
+    _start_lock = threading.Lock()
+    _stats = {"submitted": 0, "embedded": 0, "failed": 0, "batches": 0}
+
+    @classmethod
+    def submit(cls, sink, item, text: str, model_name: str = DEFAULT_MODEL) -> bool:
+        """İşi kuyruğa ekle. Embedding modeli yoksa False (iş eklenmez)."""
+        if not text or not EmbeddingService.is_available(model_name):
+            return False
+        cls._ensure_worker()
+        cls._queue.put((sink, item, text, model_name))
+        cls._stats["submitted"] += 1
+        return True
+
+    @classmethod
+    def _ensure_worker(cls):
+        if cls._worker is not None and cls._worker.is_alive():
+            return
+        with cls._start_lock:
+            if cls._worker is None or not cls._worker.is_alive():
+                cls._worker = threading.Thread(target=cls._run, name="embedding-queue", daemon=True)
+                cls._worker.start()
+
+    @classmethod
+    def _next_batch(cls) -> List[Tuple[Any, Any, str, str]]:
+        batch = [cls._queue.get()]
+        deadline = time.monotonic() + cls.BATCH_WAIT_SECONDS
+        while len(batch) < cls.BATCH_SIZE:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(cls._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    @classmethod
+    def _run(cls):
+        while True:
+            batch = cls._next_batch()
+            try:
+                cls._process(batch)
+            except Exception as e:
+                logger.error(f"Embedding queue batch failed: {e}")
+            finally:
+                for _ in batch:
+                    cls._queue.task_done()
+
+    @classmethod
+    def _process(cls, batch: List[Tuple[Any, Any, str, str]]):
+        by_model: Dict[str, List[Tuple[Any, Any, str]]] = {}
+        for sink, item, text, model_name in batch:
+            by_model.setdefault(model_name, []).append((sink, item, text))
+
+        for model_name, jobs in by_model.items():
+            embeddings = EmbeddingService.embed_many([text for _, _, text in jobs], model_name)
+            cls._stats["batches"] += 1
+            if embeddings is None:
+                cls._stats["failed"] += len(jobs)
+                logger.warning(f"Embedding queue dropped {len(jobs)} jobs (model unavailable)")
+                continue
+
+            # Sink başına tek çağrı: index bir kez güncellenir
+            by_sink: Dict[int, Tuple[Any, list]] = {}
+            for (sink, item, _), embedding in zip(jobs, embeddings):
+                by_sink.setdefault(id(sink), (sink, []))[1].append((item, embedding))
+            for sink, items in by_sink.values():
+                try:
+                    sink.add_embeddings(items)
+                    cls._stats["embedded"] += len(items)
+                except Exception as e:
+                    cls._stats["failed"] += len(items)
+                    logger.error(f"Embedding sink {type(sink).__name__} failed: {e}")
+
+    @classmethod
+    def join(cls, timeout: Optional[float] = None) -> bool:
+        """Kuyruktaki işler bitene kadar bekle. Süre dolduysa False."""
+        if timeout is None:
+            cls._queue.join()
+            return True
+        deadline = time.monotonic() + timeout
+        while cls._queue.unfinished_tasks:
+            if time.monotonic() >= deadline:
+                return False
+            time.sleep(0.01)
+        return True
+
+    @classmethod
+    def drain(cls, timeout: Optional[float] = None) -> bool:
+        """Shutdown: bekleyen işler varsa worker bitirene kadar bekle (timeout'ta uyar)."""
+        pending = cls._queue.unfinished_tasks
+        if not pending or cls._worker is None or not cls._worker.is_alive():
+            return True
+        timeout = cls.SHUTDOWN_TIMEOUT_SECONDS if timeout is None else timeout
+        if cls.join(timeout):
+            logger.info(f"Embedding queue drained {pending} jobs")
+            return True
+        logger.warning(f"Embedding queue drain timed out, {cls._queue.unfinished_tasks} jobs lost")
+        return False
+
+    @classmethod
+    def stats(cls) -> Dict[str, int]:
+        return {**cls._stats, "queued": cls._queue.qsize()}
+
+
+atexit.register(EmbeddingQueue.drain)
@@ -0,0 +1,187 @@
+"""
+Embedding Service - process genelinde paylaşılan sentence-transformer.
+
+Her MemoryRAG kendi SentenceTransformer'ını (~120MB) yüklüyordu; agent başına
+bir kopya ve ilk memory erişiminde yavaş startup. Bu servis:
+
+- Model lazy yüklenir: ilk embed çağrısında, process başına bir kez
+- embed_many(): eşzamanlı çağrılar tek forward pass'te birleştirilir
+  (encode'u yapan thread bekleyen tüm istekleri toplar)
+- LRU cache: (model, text) -> embedding; aynı metin tekrar encode edilmez
+
+Tüm embedding kullanıcıları (MemoryRAG, ...) EmbeddingService üzerinden geçer.
+
+Model: paraphrase-multilingual-MiniLM-L12-v2 (Turkish support)
+"""
+
+import asyncio
+import logging
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+try:
+    from sentence_transformers import SentenceTransformer
+    EMBEDDINGS_AVAILABLE = np is not None
+except ImportError:
+    EMBEDDINGS_AVAILABLE = False
+    SentenceTransformer = None
+
+DEFAULT_MODEL = "paraphrase-multilingual-MiniLM-L12-v2"
+_DEFAULT_CACHE_SIZE = int(os.environ.get("EMBEDDING_CACHE_SIZE", "4096"))
+_DEFAULT_BATCH_SIZE = int(os.environ.get("EMBEDDING_BATCH_SIZE", "64"))
+
+
+class EmbeddingService:
+    """Process-wide embedding modeli (class-level state, thread-safe)."""
+
+    CACHE_SIZE = _DEFAULT_CACHE_SIZE
+    BATCH_SIZE = _DEFAULT_BATCH_SIZE
+
+    _models: Dict[str, "SentenceTransformer"] = {}
+    _failed_models: set = set()
+    _model_lock = threading.Lock()
+
+    _cache: "OrderedDict[Tuple[str, str], np.ndarray]" = OrderedDict()
+    _cache_lock = threading.Lock()
+
+    # Bekleyen istekler: (model_name, texts, future); encode_lock'u alan hepsini işler
+    _pending: List[Tuple[str, List[str], Future]] = []
+    _pending_lock = threading.Lock()
+    _encode_lock = threading.Lock()
+
+    _stats = {"requests": 0, "cache_hits": 0, "encoded": 0, "forward_passes": 0}
+
+    @classmethod
+    def is_available(cls, model_name: str = DEFAULT_MODEL) -> bool:
+        """Model kullanılabilir mi? (Modeli yüklemez.)"""
+        return EMBEDDINGS_AVAILABLE and model_name not in cls._failed_models
+
+    @classmethod
+    def get_model(cls, model_name: str = DEFAULT_MODEL) -> Optional["SentenceTransformer"]:
+        """Modeli ilk çağrıda yükle (tek kopya); yüklenemezse None."""
+        model = cls._models.get(model_name)
+        if model is not None or not cls.is_available(model_name):
+            return model
+        with cls._model_lock:
+            if model_name not in cls._models and model_name not in cls._failed_models:
+                try:
+                    cls._models[model_name] = SentenceTransformer(model_name)
+                    logger.info(f"EmbeddingService loaded model: {model_name}")
+                except Exception as e:
+                    cls._failed_models.add(model_name)
+                    logger.warning(f"Failed to load sentence-transformer model: {e}")
+        return cls._models.get(model_name)
+
+    # ============ Cache ============
+
+    @classmethod
+    def _cache_get(cls, model_name: str, text: str):
+        key = (model_name, text)
+        with cls._cache_lock:
+            embedding = cls._cache.get(key)
+            if embedding is not None:
+                cls._cache.move_to_end(key)
+            return embedding
+
+    @classmethod
+    def _cache_put(cls, model_name: str, text: str, embedding):
+        embedding.flags.writeable = False  # Cache'teki array paylaşılıyor
+        with cls._cache_lock:
+            cls._cache[(model_name, text)] = embedding
+            cls._cache.move_to_end((model_name, text))
+            while len(cls._cache) > cls.CACHE_SIZE:
+                cls._cache.popitem(last=False)
+
+    # ============ Encode ============
+
+    @classmethod
+    def embed_many(cls, texts: List[str], model_name: str = DEFAULT_MODEL) -> Optional[List["np.ndarray"]]:
+        """
+        Metinleri embed et (float32, sıra korunur). Model yoksa/hata None.
+
+        Cache'te olmayanlar bekleyen kuyruğa eklenir; encode kilidini alan
+        thread kuyruktaki tüm istekleri tek forward pass'te işler, diğerleri
+        sonucu bekler.
+        """
+        if not texts:
+            return []
+        if not cls.is_available(model_name):
+            return None
+
+        cls._stats["requests"] += 1
+        results: List[Optional[np.ndarray]] = [cls._cache_get(model_name, t) for t in texts]
+        missing = list(dict.fromkeys(t for t, r in zip(texts, results) if r is None))
+        cls._stats["cache_hits"] += len(texts) - sum(r is None for r in results)
+        if not missing:
+            return results
+
+        future: Future = Future()
+        with cls._pending_lock:
+            cls._pending.append((model_name, missing, future))
+        with cls._encode_lock:
+            if not future.done():
+                cls._run_pending()
+        encoded = future.result()
+        if encoded is None:
+            return None
+        return [r if r is not None else encoded[t] for t, r in zip(texts, results)]
+
+    @classmethod
+    def _run_pending(cls):
+        """Kuyruktaki tüm istekleri model başına tek encode çağrısıyla işle (encode_lock altında)."""
+        with cls._pending_lock:
+            pending, cls._pending = cls._pending, []
+
+        by_model: Dict[str, List[Tuple[List[str], Future]]] = {}
+        for model_name, texts, future in pending:
+            by_model.setdefault(model_name, []).append((texts, future))
+
+        for model_name, requests in by_model.items():
+            texts = list(dict.fromkeys(t for request_texts, _ in requests for t in request_texts))
+            encoded: Optional[Dict[str, np.ndarray]] = None
+            model = cls.get_model(model_name)
+            if model is not None:
+                try:
+                    vectors = model.encode(
+                        texts, batch_size=cls.BATCH_SIZE, convert_to_numpy=True, show_progress_bar=False
+                    )
+                    vectors = np.asarray(vectors, dtype=np.float32)
+                    encoded = {}
+                    for text, vector in zip(texts, vectors):
+                        cls._cache_put(model_name, text, vector)
+                        encoded[text] = vector
+                    cls._stats["encoded"] += len(texts)
+                    cls._stats["forward_passes"] += 1
+                except Exception as e:
+                    logger.error(f"Failed to embed {len(texts)} texts: {e}")
+            for _, future in requests:
+                future.set_result(encoded)
+
+    @classmethod
+    def embed(cls, text: str, model_name: str = DEFAULT_MODEL) -> Optional["np.ndarray"]:
+        result = cls.embed_many([text], model_name)
+        return result[0] if result else None
+
+    @classmethod
+    async def embed_many_async(cls, texts: List[str], model_name: str = DEFAULT_MODEL):
+        """Event loop'tan: encode thread'de (eşzamanlı çağrılar yine birleşir)."""
+        return await asyncio.to_thread(cls.embed_many, texts, model_name)
+
+    @classmethod
+    def stats(cls) -> Dict[str, int]:
+        return {**cls._stats, "cache_size": len(cls._cache), "models_loaded": len(cls._models)}
+
+    @classmethod
+    def clear_cache(cls):
+        with cls._cache_lock:
+            cls._cache.clear()
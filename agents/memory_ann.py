@@ -0,0 +1,436 @@
+"""
+Memory ANN - agent'lar arası long-term + Void anıları için yaklaşık en yakın komşu indeksi.
+
+MemoryRAG agent başına ve lineer tarama; TheVoid.dream her unutulmuş anıyı
+Python'da substring kontrolüyle puanlıyordu. Bu modül tüm agent'ların
+long-term anılarını ve Void anılarını tek bir embedding indeksinde tutar:
+
+- Vektörler: memory_rag.EmbeddingIndex (normalize float32 .npy memmap,
+  yerinde ekleme/silme) — ~/.logsozluk/ann/ altında kalıcı
+- Metadata (source / agent / topic) satır id'sine gömülü; sorguda numpy
+  kod dizileriyle filtrelenir
+- Aday üretimi (MEMORY_ANN_BACKEND):
+  - "hnsw":  hnswlib (kuruluysa) — inner product HNSW
+  - "ivf":   saf numpy IVF (k-means merkezleri + en yakın nprobe liste)
+  - "exact": her zaman tam tarama
+  - "auto":  hnswlib varsa hnsw, yoksa ivf (default)
+  - "off":   indeks kapalı
+  Filtreden geçen satır sayısı EXACT_MAX'ın altındaysa (ör. tek agent) tam
+  tarama yapılır; üstündeyse ANN adayları filtrelenip skorlanır.
+
+Yeni anılar embedding_queue'ya gider; worker batch'ler halinde embed edip
+add_embeddings() ile index'e yazar (sorgular embedding beklemez).
+flush_pending() kuyruktakileri senkron embed eder (test / bakım için).
+
+Singleton: get_memory_index() (TheVoid gibi process başına tek instance).
+"""
+
+import logging
+import os
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+try:
+    import hnswlib
+    HNSW_AVAILABLE = True
+except ImportError:
+    hnswlib = None
+    HNSW_AVAILABLE = False
+
+from embedding_queue import EmbeddingQueue
+from embedding_service import EmbeddingService
+
+_DEFAULT_BACKEND = os.environ.get("MEMORY_ANN_BACKEND", "auto")
+
+SOURCE_LONG_TERM = "long_term"
+SOURCE_VOID = "void"
+_KEY_SEP = "|"
+
+
+def make_key(source: str, agent: str, memory_id: str, topic: Optional[str] = None) -> str:
+    """Satır id'si: "source|agent|memory_id|topic" (ayraç ve satır sonu temizlenir)."""
+    parts = [source, agent, memory_id, (topic or "").lower().strip()]
+    return _KEY_SEP.join(p.replace(_KEY_SEP, " ").replace("\n", " ") for p in parts)
+
+
+def parse_key(key: str) -> Tuple[str, str, str, str]:
+    source, agent, memory_id, topic = key.split(_KEY_SEP, 3)
+    return source, agent, memory_id, topic
+
+
+@dataclass
+class MemoryHit:
+    """Sorgu sonucu."""
+    source: str
+    agent: str
+    memory_id: str
+    topic: str
+    score: float
+
+
+class IVFBackend:
+    """
+    Saf numpy IVF: k-means merkezleri + satır -> liste ataması.
+
+    Aday kümesi = sorguya en yakın nprobe merkezin listelerindeki satırlar.
+    Yeni satırlar en yakın merkeze atanır; satır sayısı eğitimdekinin
+    RETRAIN_FACTOR katını geçince yeniden eğitilir.
+    """
+
+    RETRAIN_FACTOR = 4
+    KMEANS_ITERATIONS = 8
+
+    def __init__(self, nprobe: int = 32, seed: int = 0):
+        self.nprobe = nprobe
+        self.centroids = None
+        self._list_of = np.zeros(0, dtype=np.int32)
+        self._trained_n = 0
+        self._rng = np.random.default_rng(seed)
+
+    @property
+    def indexed(self) -> int:
+        return len(self._list_of)
+
+    def _assign(self, vectors, chunk_size: int = 20000):
+        lists = np.empty(len(vectors), dtype=np.int32)
+        for start in range(0, len(vectors), chunk_size):
+            block = vectors[start:start + chunk_size] @ self.centroids.T
+            lists[start:start + chunk_size] = block.argmax(axis=1)
+        return lists
+
+    def _train(self, matrix):
+        n = len(matrix)
+        nlist = int(np.clip(np.sqrt(n), 8, 4096))
+        sample = matrix[self._rng.choice(n, size=min(n, max(nlist * 30, 5000)), replace=False)]
+        centroids = sample[self._rng.choice(len(sample), size=nlist, replace=False)].copy()
+        for _ in range(self.KMEANS_ITERATIONS):
+            assignment = (sample @ centroids.T).argmax(axis=1)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, assignment, sample)
+            counts = np.bincount(assignment, minlength=nlist)
+            empty = counts == 0
+            # Boş liste: rastgele bir örnekle yeniden başlat
+            sums[empty] = sample[self._rng.choice(len(sample), size=int(empty.sum()))]
+            centroids = sums / np.maximum(np.linalg.norm(sums, axis=1, keepdims=True), 1e-12)
+        self.centroids = centroids.astype(np.float32)
+        self._trained_n = n
+        self._list_of = self._assign(matrix)
+
+    def sync(self, matrix):
+        """Index'i matrisin ilk n satırıyla eşitle (yeni satırlar / retrain)."""
+        n = len(matrix)
+        if self.centroids is None or n > self.RETRAIN_FACTOR * self._trained_n:
+            self._train(np.asarray(matrix))
+        elif n > self.indexed:
+            self._list_of = np.concatenate([self._list_of, self._assign(matrix[self.indexed:n])])
+
+    def candidates(self, query, k: int):
+        nprobe = min(self.nprobe, len(self.centroids))
+        probes = np.argpartition(-(self.centroids @ query), nprobe - 1)[:nprobe]
+        return np.flatnonzero(np.isin(self._list_of, probes))
+
+
+class HNSWBackend:
+    """hnswlib inner-product HNSW (normalize vektörlerde = cosine)."""
+
+    def __init__(self, ef: int = 200, m: int = 16):
+        self.ef = ef
+        self.m = m
+        self._index = None
+        self._indexed = 0
+
+    @property
+    def indexed(self) -> int:
+        return self._indexed
+
+    def sync(self, matrix):
+        n = len(matrix)
+        if n <= self._indexed:
+            return
+        if self._index is None:
+            self._index = hnswlib.Index(space="ip", dim=matrix.shape[1])
+            self._index.init_index(max_elements=max(1024, 2 * n), ef_construction=self.ef, M=self.m)
+        elif n > self._index.get_max_elements():
+            self._index.resize_index(2 * n)
+        self._index.add_items(np.asarray(matrix[self._indexed:n]), np.arange(self._indexed, n))
+        self._indexed = n
+
+    def candidates(self, query, k: int):
+        k = min(k, self._indexed)
+        self._index.set_ef(max(self.ef, k))
+        labels, _ = self._index.knn_query(query, k=k)
+        return labels[0].astype(np.int64)
+
+
+class CollectiveMemoryIndex:
+    """Tüm agent'ların long-term + Void anıları için paylaşılan embedding indeksi."""
+
+    EXACT_MAX = 20000  # Filtreden geçen satır bundan azsa tam tarama
+    OVERFETCH = 4  # ANN'den k * OVERFETCH aday (filtre sonrası k kalsın diye)
+
+    def __init__(self, storage_dir: Optional[Path] = None, backend: str = _DEFAULT_BACKEND):
+        from memory_rag import EmbeddingIndex
+
+        self.storage_dir = Path(storage_dir) if storage_dir else Path.home() / ".logsozluk" / "ann"
+        self.storage_dir.mkdir(parents=True, exist_ok=True)
+        self.backend = backend
+        self._lock = threading.RLock()
+        self._store = EmbeddingIndex(self.storage_dir)
+        self._pending: Dict[str, str] = {}  # key -> embed edilecek metin
+
+        # Satır metadata kodları (store satırlarıyla hizalı)
+        self._codes: Dict[str, Dict[str, int]] = {"source": {}, "agent": {}, "topic": {}}
+        self._columns: Dict[str, "np.ndarray"] = {}
+        self._key_of: Dict[Tuple[str, str, str], str] = {}  # (source, agent, memory_id) -> key
+        self._meta_generation = -1
+
+        self._ann = None
+        self._ann_generation = -1
+        for key in self._store.ids():
+            self._key_of[parse_key(key)[:3]] = key
+
+    def is_available(self) -> bool:
+        return self.backend != "off" and np is not None and EmbeddingService.is_available()
+
+    def __len__(self) -> int:
+        return len(self._store) + len(self._pending)
+
+    # ============ Write ============
+
+    def add_text(self, source: str, agent: str, memory_id: str, text: str, topic: Optional[str] = None):
+        """Anıyı arka plan embedding kuyruğuna ekle."""
+        if not text:
+            return
+        key = make_key(source, agent, memory_id, topic)
+        with self._lock:
+            old = self._key_of.get((source, agent, memory_id))
+            if old is not None and old != key:
+                self._store.remove(old)
+            self._key_of[(source, agent, memory_id)] = key
+            self._pending[key] = text
+        EmbeddingQueue.submit(self, (key, text), text)
+
+    def add_embeddings(self, items: List[Tuple[Tuple[str, str], "np.ndarray"]]):
+        """Embedding sink (kuyruk worker'ı): [((key, text), embedding)]."""
+        with self._lock:
+            batch = []
+            for (key, text), embedding in items:
+                if self._pending.get(key) != text:
+                    continue  # Bu arada silindi, metni değişti veya flush_pending ile yazıldı
+                del self._pending[key]
+                if self._key_of.get(parse_key(key)[:3]) == key:
+                    batch.append((key, embedding))
+            self._store.add_many(batch)
+
+    def add_vectors(self, items: List[Tuple[str, str, str, Optional[str], "np.ndarray"]]):
+        """Embedding'i hazır anılar: [(source, agent, memory_id, topic, vector)]."""
+        with self._lock:
+            batch = []
+            for source, agent, memory_id, topic, vector in items:
+                key = make_key(source, agent, memory_id, topic)
+                old = self._key_of.get((source, agent, memory_id))
+                if old is not None and old != key:
+                    self._store.remove(old)
+                self._key_of[(source, agent, memory_id)] = key
+                self._pending.pop(key, None)
+                batch.append((key, vector))
+            self._store.add_many(batch)
+
+    def remove(self, source: str, agent: str, memory_id: str):
+        with self._lock:
+            key = self._key_of.pop((source, agent, memory_id), None)
+            if key is not None:
+                self._pending.pop(key, None)
+                self._store.remove(key)
+
+    def remove_many(self, source: str, items: List[Tuple[str, str]]) -> int:
+        """[(agent, memory_id)] anılarını tek store yazımıyla sil. Silinen sayısı."""
+        with self._lock:
+            keys = []
+            for agent, memory_id in items:
+                key = self._key_of.pop((source, agent, memory_id), None)
+                if key is not None:
+                    self._pending.pop(key, None)
+                    keys.append(key)
+            return self._store.remove_many(keys)
+
+    def contains(self, source: str, agent: str, memory_id: str) -> bool:
+        return (source, agent, memory_id) in self._key_of
+
+    def flush_pending(self) -> int:
+        """Bekleyen metinleri tek embed_many batch'inde index'e yaz."""
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        if not pending:
+            return 0
+        embeddings = EmbeddingService.embed_many(list(pending.values()))
+        if embeddings is None:
+            with self._lock:
+                # Model hatası: sonraki denemeye bırak (bu arada silinenler hariç)
+                for key, text in pending.items():
+                    if self._key_of.get(parse_key(key)[:3]) == key:
+                        self._pending.setdefault(key, text)
+            return 0
+        with self._lock:
+            items = [
+                (key, embedding) for key, embedding in zip(pending, embeddings)
+                if self._key_of.get(parse_key(key)[:3]) == key  # Embed sırasında silinmediyse
+            ]
+            self._store.add_many(items)
+        return len(items)
+
+    # ============ Metadata ============
+
+    def _code(self, column: str, value: str) -> int:
+        codes = self._codes[column]
+        if value not in codes:
+            codes[value] = len(codes)
+        return codes[value]
+
+    def _sync_meta(self, ids: List[str]):
+        """Satır metadata kod dizilerini store ile eşitle (append-only; compaction'da baştan)."""
+        if self._meta_generation != self._store.generation:
+            self._columns = {name: np.zeros(0, dtype=np.int32) for name in self._codes}
+            self._meta_generation = self._store.generation
+        start = len(self._columns["source"])
+        if start >= len(ids):
+            return
+        new = {name: [] for name in self._codes}
+        for key in ids[start:]:
+            source, agent, _, topic = parse_key(key) if key else ("", "", "", "")
+            new["source"].append(self._code("source", source))
+            new["agent"].append(self._code("agent", agent))
+            new["topic"].append(self._code("topic", topic))
+        for name, values in new.items():
+            self._columns[name] = np.concatenate([self._columns[name], np.array(values, dtype=np.int32)])
+
+    def _filter_mask(self, valid, agent, exclude_agent, source, topic):
+        mask = valid.copy()
+        for column, value, keep in (
+            ("source", source, True),
+            ("agent", agent, True),
+            ("agent", exclude_agent, False),
+            ("topic", topic.lower().strip() if topic else None, True),
+        ):
+            if value is None:
+                continue
+            code = self._codes[column].get(value)
+            if code is None:
+                if keep:
+                    return np.zeros_like(mask)
+                continue
+            mask &= (self._columns[column] == code) if keep else (self._columns[column] != code)
+        return mask
+
+    def _get_ann(self, matrix):
+        if self.backend == "exact":
+            return None
+        if self._ann is None or self._ann_generation != self._store.generation:
+            use_hnsw = self.backend == "hnsw" or (self.backend == "auto" and HNSW_AVAILABLE)
+            if use_hnsw and not HNSW_AVAILABLE:
+                logger.warning("hnswlib not installed, falling back to IVF")
+                use_hnsw = False
+            self._ann = HNSWBackend() if use_hnsw else IVFBackend()
+            self._ann_generation = self._store.generation
+        self._ann.sync(matrix)
+        return self._ann
+
+    # ============ Search ============
+
+    def search(
+        self,
+        query,
+        limit: int = 5,
+        agent: Optional[str] = None,
+        exclude_agent: Optional[str] = None,
+        source: Optional[str] = None,
+        topic: Optional[str] = None,
+    ) -> List[MemoryHit]:
+        """Embedding sorgusu; filtreler: agent, exclude_agent, source, topic (tam eşleşme)."""
+        if limit <= 0:
+            return []
+        query = self._store.normalize(query)
+        with self._lock:
+            matrix, ids, valid = self._store.view()
+            if not len(matrix):
+                return []
+            self._sync_meta(ids)
+            mask = self._filter_mask(valid, agent, exclude_agent, source, topic)
+            allowed = int(mask.sum())
+            if not allowed:
+                return []
+
+            if allowed <= self.EXACT_MAX or self.backend == "exact":
+                rows = np.flatnonzero(mask)
+            else:
+                ann = self._get_ann(matrix)
+                rows = ann.candidates(query, limit * self.OVERFETCH)
+                rows = rows[mask[rows]]
+                if len(rows) < limit:
+                    rows = np.flatnonzero(mask)  # Filtre ANN adaylarını eledi: tam tarama
+
+            scores = matrix[rows] @ query
+            k = min(limit, len(rows))
+            top = np.argpartition(-scores, k - 1)[:k]
+            top = top[np.argsort(-scores[top])]
+            hits = []
+            for i in top:
+                source_, agent_, memory_id, topic_ = parse_key(ids[rows[i]])
+                hits.append(MemoryHit(source_, agent_, memory_id, topic_, float(scores[i])))
+            return hits
+
+    def search_text(self, text: str, limit: int = 5, **filters) -> List[MemoryHit]:
+        """Metin sorgusu (kuyrukta bekleyen anılar henüz sonuçta yok)."""
+        if not text or not self.is_available():
+            return []
+        query = EmbeddingService.embed(text)
+        if query is None:
+            return []
+        return self.search(query, limit, **filters)
+
+    async def search_text_async(self, text: str, limit: int = 5, **filters) -> List[MemoryHit]:
+        """search_text'in event loop sürümü: sorgu embed'i thread'de, loop bloklanmaz."""
+        if not text or not self.is_available():
+            return []
+        vectors = await EmbeddingService.embed_many_async([text])
+        if not vectors:
+            return []
+        return self.search(vectors[0], limit, **filters)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "indexed": len(self._store),
+            "pending": len(self._pending),
+            "agents": len(self._codes["agent"]),
+            "backend": type(self._ann).__name__ if self._ann else self.backend,
+        }
+
+
+# Singleton accessor
+_index_instance: Optional[CollectiveMemoryIndex] = None
+_index_lock = threading.Lock()
+
+
+def get_memory_index(storage_dir: Optional[Path] = None) -> Optional[CollectiveMemoryIndex]:
+    """Paylaşılan indeks; embedding modeli yoksa veya backend "off" ise None."""
+    global _index_instance
+    if _index_instance is None:
+        with _index_lock:
+            if _index_instance is None:
+                _index_instance = CollectiveMemoryIndex(storage_dir)
+    return _index_instance if _index_instance.is_available() else None
+
+
+def reset_memory_index():
+    """Reset the index instance (for testing)."""
+    global _index_instance
+    _index_instance = None
@@ -0,0 +1,459 @@
+"""
+Postgres storage driver for AgentMemory.
+
+AgentMemory varsayılan olarak ~/.logsozluk/memory/<agent>/ altındaki JSON
+dosyalarına yazar; bu her agent'ın belleğini tek bir container'a bağlar.
+Bu driver aynı state'i 011/036 migration'larındaki tablolara yazar:
+
+- agent_episodic_memory   (event'ler, memory_key = AgentMemory event id)
+- agent_semantic_memory   (fact'ler, (agent, fact_type, subject) tekil)
+- agent_character_sheet   (kişilik özeti + karma + worldview)
+- agent_memory_stats      (sayaçlar)
+
+Yazma: AgentMemory.prepare_flush() yeni event'leri, değişen event'leri
+(access_count / is_long_term), decay ile silinenleri ve diğer katmanları
+toplar; write() hepsini tek transaction'da unnest batch'leriyle yazar.
+
+Okuma: load() sadece en yeni sayfa kadar event'i yükler; daha eskileri
+load_more() ile keyset pagination (created_at) üzerinden sayfa sayfa gelir.
+
+asyncpg pool'u dışarıdan verilir (agents paketine bağımlılık eklenmez).
+"""
+
+import asyncio
+import json
+import logging
+import uuid
+from dataclasses import asdict
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from agent_memory import AgentMemory, CharacterSheet, EpisodicEvent, SemanticFact
+
+logger = logging.getLogger(__name__)
+
+STATS_FIELDS = (
+    "total_entries", "total_comments", "total_votes", "events_since_reflection",
+    "total_likes_received", "total_criticism_received",
+)
+CHARACTER_LIST_FIELDS = ("favorite_topics", "avoided_topics", "allies", "rivals", "values", "triggers")
+
+
+def _to_uuid(value: Optional[str]) -> Optional[uuid.UUID]:
+    """Geçerli UUID değilse None (memory'de boş/kısa id'ler de olabiliyor)."""
+    if not value:
+        return None
+    try:
+        return uuid.UUID(str(value))
+    except (ValueError, TypeError):
+        return None
+
+
+def _to_datetime(value: Optional[str]) -> Optional[datetime]:
+    """AgentMemory'nin naive (local) ISO timestamp'ini timezone-aware datetime'a çevir."""
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(value).astimezone()
+    except (ValueError, TypeError):
+        return None
+
+
+def _to_local_iso(value: Optional[datetime]) -> str:
+    """DB timestamptz -> AgentMemory formatı (naive local ISO, decay karşılaştırmaları için)."""
+    if value is None:
+        return datetime.now().isoformat()
+    return value.astimezone().replace(tzinfo=None).isoformat()
+
+
+def _json_value(value: Any) -> Any:
+    """asyncpg JSONB codec'i yoksa string döner."""
+    if isinstance(value, str):
+        try:
+            return json.loads(value)
+        except json.JSONDecodeError:
+            return None
+    return value
+
+
+def _dumps(value: Any) -> Optional[str]:
+    return None if value is None else json.dumps(value, ensure_ascii=False)
+
+
+class PostgresMemoryStore:
+    """AgentMemory için async Postgres storage driver."""
+
+    PAGE_SIZE = 50  # load() ile gelen en yeni event sayısı
+
+    def __init__(self, pool, agent_username: str, agent_id: Optional[uuid.UUID] = None):
+        self.pool = pool
+        self.agent_username = agent_username
+        self.agent_id = agent_id
+        self.loaded = False
+        self.has_more = False  # DB'de henüz yüklenmemiş daha eski event var mı
+        self._cursor: Optional[datetime] = None  # Yüklenen en eski event'in created_at'i
+        self._load_lock = asyncio.Lock()
+        # Örtüşen flush'lar (periyodik job + shutdown) sırayla yazar; daha eski
+        # snapshot'ın tam-state katmanları yenisinin üstüne yazılmaz
+        self._write_lock = asyncio.Lock()
+        self._written_seq = 0
+
+    @classmethod
+    async def open(cls, pool, agent_username: str, memory_dir: Optional[str] = None) -> AgentMemory:
+        """Store'lu bir AgentMemory oluştur ve en yeni sayfayı yükle."""
+        store = cls(pool, agent_username)
+        memory = AgentMemory(agent_username, memory_dir=memory_dir, store=store)
+        await store.ensure_loaded(memory)
+        return memory
+
+    async def _resolve_agent_id(self, conn) -> Optional[uuid.UUID]:
+        if self.agent_id is None:
+            self.agent_id = await conn.fetchval("SELECT id FROM agents WHERE username = $1", self.agent_username)
+        return self.agent_id
+
+    # ============ Read ============
+
+    async def _fetch_episodic_page(self, conn, before: Optional[datetime], limit: int) -> List[EpisodicEvent]:
+        rows = await conn.fetch(
+            """
+            SELECT memory_key, id::text AS row_id, event_type, content, topic_id::text AS topic_id,
+                   topic_title, entry_id::text AS entry_id, other_agent, social_feedback,
+                   created_at, access_count, is_long_term, emotional_tag
+            FROM agent_episodic_memory
+            WHERE agent_id = $1 AND ($2::timestamptz IS NULL OR created_at < $2)
+            ORDER BY created_at DESC
+            LIMIT $3
+            """,
+            self.agent_id, before, limit,
+        )
+        events = []
+        for row in reversed(rows):  # Eskiden yeniye (AgentMemory sırası)
+            data = {
+                "id": row["memory_key"] or row["row_id"][:8],
+                "event_type": row["event_type"],
+                "content": row["content"] or "",
+                "topic_title": row["topic_title"],
+                "topic_id": row["topic_id"],
+                "entry_id": row["entry_id"],
+                "other_agent": row["other_agent"],
+                "social_feedback": _json_value(row["social_feedback"]),
+                "timestamp": _to_local_iso(row["created_at"]),
+                "access_count": row["access_count"] or 0,
+                "is_long_term": bool(row["is_long_term"]),
+            }
+            tag = _json_value(row["emotional_tag"])
+            if tag:
+                data["emotional_tag"] = tag
+            events.append(AgentMemory._event_from_dict(data))
+        if rows:
+            self._cursor = rows[-1]["created_at"]
+        self.has_more = len(rows) == limit
+        return events
+
+    async def ensure_loaded(self, memory: AgentMemory, page_size: Optional[int] = None):
+        """İlk yüklemeyi bir kez yap (eşzamanlı çağrılar bekler)."""
+        async with self._load_lock:
+            if not self.loaded:
+                await self._load(memory, page_size or self.PAGE_SIZE)
+                self.loaded = True
+
+    async def _load(self, memory: AgentMemory, page_size: int):
+        """
+        DB state'ini memory'ye birleştir. Yükleme bitmeden eklenen olaylar
+        korunur: event'ler id ile tekilleştirilir, sayaçlar toplanır
+        (memory sıfırdan başladığı için in-memory değerler delta'dır).
+        """
+        async with self.pool.acquire() as conn:
+            if await self._resolve_agent_id(conn) is None:
+                logger.warning(f"Memory store: agent '{self.agent_username}' bulunamadı")
+                return
+            events = await self._fetch_episodic_page(conn, None, page_size)
+            fact_rows = await conn.fetch(
+                """
+                SELECT fact_type, subject, predicate, confidence, source_count, updated_at
+                FROM agent_semantic_memory
+                WHERE agent_id = $1
+                ORDER BY updated_at DESC
+                LIMIT $2
+                """,
+                self.agent_id, memory.MAX_SEMANTIC,
+            )
+            sheet = await conn.fetchrow("SELECT * FROM agent_character_sheet WHERE agent_id = $1", self.agent_id)
+            stats = await conn.fetchrow("SELECT * FROM agent_memory_stats WHERE agent_id = $1", self.agent_id)
+
+        known = {e.id for e in memory.episodic}
+        memory.episodic = [e for e in events if e.id not in known] + memory.episodic
+
+        local_keys = {(f.fact_type, f.subject) for f in memory.semantic}
+        facts = [
+            SemanticFact(
+                fact_type=row["fact_type"],
+                subject=row["subject"],
+                predicate=row["predicate"],
+                confidence=row["confidence"] if row["confidence"] is not None else 0.5,
+                source_count=row["source_count"] or 1,
+                last_updated=_to_local_iso(row["updated_at"]),
+            )
+            for row in reversed(fact_rows)
+            if (row["fact_type"], row["subject"]) not in local_keys
+        ]
+        memory.semantic = facts + memory.semantic
+
+        if sheet is not None and memory.character.version == 0:
+            memory.character = self._character_from_row(sheet)
+
+        if stats is not None:
+            for key in STATS_FIELDS:
+                memory.stats[key] = (stats[key] or 0) + memory.stats.get(key, 0)
+
+        logger.info(
+            f"Loaded memory for {self.agent_username} from Postgres: "
+            f"{len(events)} events (more: {self.has_more}), {len(facts)} facts"
+        )
+
+    @staticmethod
+    def _character_from_row(row) -> CharacterSheet:
+        data = dict(row)
+        kwargs = {}
+        for name in CharacterSheet.__dataclass_fields__:
+            if name in ("worldview", "last_reflection") or name not in data or data[name] is None:
+                continue
+            value = data[name]
+            if name in CHARACTER_LIST_FIELDS:
+                value = _json_value(value) or []
+            kwargs[name] = value
+        character = CharacterSheet(**kwargs)
+        if data.get("last_reflection"):
+            character.last_reflection = _to_local_iso(data["last_reflection"])
+        worldview_data = _json_value(data.get("worldview"))
+        if worldview_data:
+            try:
+                from worldview import WorldView
+                character.worldview = WorldView.from_dict(worldview_data)
+            except (ImportError, Exception) as e:
+                logger.debug(f"Could not restore worldview: {e}")
+        return character
+
+    async def load_more(self, memory: AgentMemory, page_size: Optional[int] = None) -> int:
+        """Bir sonraki (daha eski) event sayfasını memory'nin başına ekle."""
+        if not self.has_more or self.agent_id is None:
+            return 0
+        async with self.pool.acquire() as conn:
+            events = await self._fetch_episodic_page(conn, self._cursor, page_size or self.PAGE_SIZE)
+        known = {e.id for e in memory.episodic}
+        older = [e for e in events if e.id not in known]
+        memory.episodic = older + memory.episodic
+        return len(older)
+
+    # ============ Write ============
+
+    async def write(self, memory: AgentMemory, snapshot: dict) -> bool:
+        """
+        prepare_flush() snapshot'ını tek transaction'da yaz. Hata: snapshot geri kuyruğa alınır.
+
+        Event ekleme/güncelleme/silme delta'dır, her snapshot'ta yazılır.
+        Semantic/character/stats tam state'tir: daha yeni bir snapshot zaten
+        yazıldıysa (seq) eskisi atlanır.
+        """
+        try:
+            await self.ensure_loaded(memory)
+            async with self._write_lock:
+                async with self.pool.acquire() as conn:
+                    if await self._resolve_agent_id(conn) is None:
+                        logger.warning(
+                            f"Memory store: agent '{self.agent_username}' bulunamadı, flush atlandı "
+                            f"({len(snapshot['events'])} event, {len(snapshot['touched'])} güncelleme, "
+                            f"{len(snapshot['deleted'])} silme yazılmadı)"
+                        )
+                        return False
+                    latest = snapshot["seq"] > self._written_seq
+                    async with conn.transaction():
+                        await self._write_events(conn, snapshot["events"])
+                        await self._write_event_updates(conn, snapshot["touched"])
+                        if snapshot["deleted"]:
+                            await conn.execute(
+                                "DELETE FROM agent_episodic_memory WHERE agent_id = $1 AND memory_key = ANY($2::varchar[])",
+                                self.agent_id, snapshot["deleted"],
+                            )
+                        if latest:
+                            await self._write_facts(conn, snapshot["semantic"])
+                            await self._write_character(conn, snapshot["character"])
+                            # Episodic insert trigger'ı sayaçları artırır; in-memory değerler son sözü söyler
+                            await self._write_stats(conn, snapshot["stats"])
+                if latest:
+                    self._written_seq = snapshot["seq"]
+            return True
+        except Exception as e:
+            memory.requeue_flush(snapshot)
+            logger.error(f"Failed to write memory for {self.agent_username} to Postgres: {e}")
+            return False
+
+    async def _write_events(self, conn, events: List[dict]):
+        if not events:
+            return
+        await conn.execute(
+            """
+            INSERT INTO agent_episodic_memory (
+                agent_id, memory_key, event_type, content, topic_id, topic_title, entry_id,
+                other_agent, social_feedback, created_at, access_count, is_long_term, emotional_tag
+            )
+            SELECT $1, u.memory_key, u.event_type, u.content, t.id, u.topic_title, en.id,
+                   u.other_agent, u.social_feedback::jsonb, COALESCE(u.created_at, NOW()),
+                   u.access_count, u.is_long_term, u.emotional_tag::jsonb
+            FROM unnest(
+                $2::varchar[], $3::varchar[], $4::text[], $5::uuid[], $6::varchar[], $7::uuid[],
+                $8::varchar[], $9::text[], $10::timestamptz[], $11::int[], $12::boolean[], $13::text[]
+            ) AS u(memory_key, event_type, content, topic_id, topic_title, entry_id,
+                   other_agent, social_feedback, created_at, access_count, is_long_term, emotional_tag)
+            -- Silinmiş topic/entry'ye işaret eden id'ler FK hatası yerine NULL olur
+            LEFT JOIN topics t ON t.id = u.topic_id
+            LEFT JOIN entries en ON en.id = u.entry_id
+            ON CONFLICT (agent_id, memory_key) WHERE memory_key IS NOT NULL DO NOTHING
+            """,
+            self.agent_id,
+            [e["id"] for e in events],
+            [e["event_type"][:50] for e in events],
+            [e.get("content") for e in events],
+            [_to_uuid(e.get("topic_id")) for e in events],
+            [(e.get("topic_title") or "")[:255] or None for e in events],
+            [_to_uuid(e.get("entry_id")) for e in events],
+            [(e.get("other_agent") or "")[:50] or None for e in events],
+            [_dumps(e.get("social_feedback")) for e in events],
+            [_to_datetime(e.get("timestamp")) for e in events],
+            [e.get("access_count", 0) for e in events],
+            [bool(e.get("is_long_term")) for e in events],
+            [_dumps(e.get("emotional_tag")) for e in events],
+        )
+
+    async def _write_event_updates(self, conn, touched: List[dict]):
+        if not touched:
+            return
+        await conn.execute(
+            """
+            UPDATE agent_episodic_memory m
+            -- İkisi de monoton: sıra dışı yazılan eski bir snapshot geri almasın
+            SET access_count = GREATEST(m.access_count, u.access_count),
+                is_long_term = m.is_long_term OR u.is_long_term
+            FROM unnest($2::varchar[], $3::int[], $4::boolean[]) AS u(memory_key, access_count, is_long_term)
+            WHERE m.agent_id = $1 AND m.memory_key = u.memory_key
+            """,
+            self.agent_id,
+            [t["id"] for t in touched],
+            [t["access_count"] for t in touched],
+            [t["is_long_term"] for t in touched],
+        )
+
+    async def _write_facts(self, conn, facts: List[dict]):
+        # Aynı (fact_type, subject) batch'te iki kez olursa ON CONFLICT hata verir; sonuncusu kalır
+        unique = {(f["fact_type"], f["subject"][:255]): f for f in facts}
+        if not unique:
+            return
+        keys = list(unique)
+        await conn.execute(
+            """
+            INSERT INTO agent_semantic_memory (
+                agent_id, fact_type, subject, predicate, confidence, source_count, updated_at
+            )
+            SELECT $1, u.fact_type, u.subject, u.predicate, u.confidence, u.source_count, COALESCE(u.updated_at, NOW())
+            FROM unnest($2::varchar[], $3::varchar[], $4::text[], $5::float8[], $6::int[], $7::timestamptz[])
+                 AS u(fact_type, subject, predicate, confidence, source_count, updated_at)
+            ON CONFLICT (agent_id, fact_type, subject) DO UPDATE SET
+                predicate = EXCLUDED.predicate,
+                confidence = EXCLUDED.confidence,
+                source_count = EXCLUDED.source_count,
+                updated_at = EXCLUDED.updated_at
+            """,
+            self.agent_id,
+            [k[0][:50] for k in keys],
+            [k[1] for k in keys],
+            [unique[k]["predicate"] for k in keys],
+            [float(unique[k].get("confidence", 0.5)) for k in keys],
+            [int(unique[k].get("source_count", 1)) for k in keys],
+            [_to_datetime(unique[k].get("last_updated")) for k in keys],
+        )
+
+    async def _write_character(self, conn, character: dict):
+        await conn.execute(
+            """
+            INSERT INTO agent_character_sheet (
+                agent_id, message_length, tone, uses_slang, uses_emoji, favorite_topics, avoided_topics,
+                humor_style, allies, rivals, "values", triggers, current_goal, version, last_reflection,
+                karma_score, karma_trend, karma_reaction, worldview, updated_at
+            )
+            VALUES ($1, $2, $3, $4, $5, $6::jsonb, $7::jsonb, $8, $9::jsonb, $10::jsonb, $11::jsonb,
+                    $12::jsonb, $13, $14, $15, $16, $17, $18, $19::jsonb, NOW())
+            ON CONFLICT (agent_id) DO UPDATE SET
+                message_length = EXCLUDED.message_length,
+                tone = EXCLUDED.tone,
+                uses_slang = EXCLUDED.uses_slang,
+                uses_emoji = EXCLUDED.uses_emoji,
+                favorite_topics = EXCLUDED.favorite_topics,
+                avoided_topics = EXCLUDED.avoided_topics,
+                humor_style = EXCLUDED.humor_style,
+                allies = EXCLUDED.allies,
+                rivals = EXCLUDED.rivals,
+                "values" = EXCLUDED."values",
+                triggers = EXCLUDED.triggers,
+                current_goal = EXCLUDED.current_goal,
+                version = EXCLUDED.version,
+                last_reflection = EXCLUDED.last_reflection,
+                karma_score = EXCLUDED.karma_score,
+                karma_trend = EXCLUDED.karma_trend,
+                karma_reaction = EXCLUDED.karma_reaction,
+                worldview = EXCLUDED.worldview,
+                updated_at = NOW()
+            """,
+            self.agent_id,
+            character.get("message_length", "orta")[:20],
+            character.get("tone", "nötr")[:30],
+            bool(character.get("uses_slang")),
+            bool(character.get("uses_emoji")),
+            *[_dumps(character.get(name) or []) for name in ("favorite_topics", "avoided_topics")],
+            (character.get("humor_style") or "yok")[:30],
+            *[_dumps(character.get(name) or []) for name in ("allies", "rivals", "values", "triggers")],
+            character.get("current_goal") or None,
+            int(character.get("version", 0)),
+            _to_datetime(character.get("last_reflection")),
+            float(character.get("karma_score", 0.0)),
+            (character.get("karma_trend") or "stable")[:20],
+            (character.get("karma_reaction") or "neutral")[:20],
+            _dumps(character.get("worldview")),
+        )
+
+    async def _write_stats(self, conn, stats: Dict[str, int]):
+        await conn.execute(
+            """
+            INSERT INTO agent_memory_stats (
+                agent_id, total_entries, total_comments, total_votes, events_since_reflection,
+                total_likes_received, total_criticism_received, updated_at
+            )
+            VALUES ($1, $2, $3, $4, $5, $6, $7, NOW())
+            ON CONFLICT (agent_id) DO UPDATE SET
+                total_entries = EXCLUDED.total_entries,
+                total_comments = EXCLUDED.total_comments,
+                total_votes = EXCLUDED.total_votes,
+                events_since_reflection = EXCLUDED.events_since_reflection,
+                total_likes_received = EXCLUDED.total_likes_received,
+                total_criticism_received = EXCLUDED.total_criticism_received,
+                updated_at = NOW()
+            """,
+            self.agent_id,
+            *[int(stats.get(key, 0)) for key in STATS_FIELDS],
+        )
+
+    # ============ Import ============
+
+    async def import_memory(self, memory: AgentMemory) -> int:
+        """
+        Dosya tabanlı bir AgentMemory'nin tamamını yaz (JSON import aracı için).
+        memory_key tekil olduğundan tekrar çalıştırmak event'leri çoğaltmaz.
+        """
+        async with self.pool.acquire() as conn:
+            if await self._resolve_agent_id(conn) is None:
+                return 0
+        # Import'ta DB'deki state ile birleştirme yapılmaz: dosyadaki state esas
+        self.loaded = True
+        snapshot = memory.full_store_snapshot()
+        if not await self.write(memory, snapshot):
+            return 0
+        return len(snapshot["events"])
@@ -2,33 +2,234 @@
 RAG (Retrieval-Augmented Generation) for Agent Memory.
 
 Provides semantic search through agent's long-term memories
-using sentence-transformers embeddings.
+using sentence-transformers embeddings. Model tüm instance'lar arasında
+paylaşılır ve ilk embed'de yüklenir (embedding_service.EmbeddingService).
 
 Model: paraphrase-multilingual-MiniLM-L12-v2 (~120MB, Turkish support)
 """
 
+import hashlib
 import logging
+import os
+import threading
 from pathlib import Path
 from typing import Dict, List, Tuple, Optional
 import json
 
 logger = logging.getLogger(__name__)
 
-# Try to import sentence-transformers
 try:
-    from sentence_transformers import SentenceTransformer
     import numpy as np
-    RAG_AVAILABLE = True
 except ImportError:
-    RAG_AVAILABLE = False
-    SentenceTransformer = None
     np = None
+
+from embedding_queue import EmbeddingQueue
+from embedding_service import DEFAULT_MODEL as EMBEDDING_MODEL, EMBEDDINGS_AVAILABLE, EmbeddingService
+
+RAG_AVAILABLE = EMBEDDINGS_AVAILABLE
+if not RAG_AVAILABLE:
     logger.warning(
         "sentence-transformers not installed. "
         "Install with: pip install sentence-transformers numpy"
     )
 
 
+class EmbeddingIndex:
+    """
+    Disk üzerinde float32 embedding matrisi + paralel id listesi.
+
+    - embeddings.npy: (capacity, dim) float32, satırlar L2-normalize
+      (cosine = dot product). np.memmap ile açılır, RAM'e kopyalanmaz.
+    - embedding_ids.txt: append-only kayıtlar. Id satırı bir sonraki matris
+      satırını tanımlar; "!<satır>" kaydı o satırı siler (tombstone). Boş satır
+      da tombstone'dur (compaction sonrası yazılan kanonik format).
+
+    Ekleme: vektör memmap'te yerinde yazılır, id dosyasına bir satır eklenir;
+    matris sadece kapasite dolunca (2 katına) yeniden yazılır. Silme: id
+    dosyasına tombstone kaydı eklenir; tombstone oranı yüksekse compaction
+    (dosyanın tamamı sadece compaction'da yeniden yazılır). Yüklemede yarım
+    kalan son satır ve vektörü yazılmamış id'ler atılır, dosya onarılır.
+    """
+
+    INITIAL_CAPACITY = 64
+    COMPACT_RATIO = 0.25  # Tombstone oranı bunu geçince matris sıkıştırılır
+    TOMBSTONE = "!"  # ids dosyasında silme kaydı öneki
+
+    def __init__(self, directory: Path):
+        self.matrix_file = Path(directory) / "embeddings.npy"
+        self.ids_file = Path(directory) / "embedding_ids.txt"
+        self._matrix = None  # memmap, shape (capacity, dim)
+        self._ids: List[str] = []  # Satır -> id ("" = tombstone)
+        self._row_of: Dict[str, int] = {}
+        self._valid = np.zeros(0, dtype=bool)
+        self.generation = 0  # Satır numaraları değişince (compaction/clear) artar
+        self._load()
+
+    def __len__(self) -> int:
+        return len(self._row_of)
+
+    def __contains__(self, memory_id: str) -> bool:
+        return memory_id in self._row_of
+
+    @property
+    def dim(self) -> Optional[int]:
+        return None if self._matrix is None else self._matrix.shape[1]
+
+    def ids(self) -> List[str]:
+        return list(self._row_of)
+
+    def _load(self):
+        if not self.matrix_file.exists() or not self.ids_file.exists():
+            return
+        try:
+            self._matrix = np.lib.format.open_memmap(self.matrix_file, mode='r+')
+            text = self.ids_file.read_text(encoding='utf-8')
+            lines = text.split('\n')
+            # Yarım kalmış son satır (crash) sayılmaz
+            repaired = lines.pop() != ''
+            capacity = self._matrix.shape[0]
+            ids: List[str] = []
+            for line in lines:
+                if line.startswith(self.TOMBSTONE):
+                    try:
+                        row = int(line[len(self.TOMBSTONE):])
+                    except ValueError:
+                        repaired = True
+                        continue
+                    if 0 <= row < len(ids):
+                        ids[row] = ""
+                    else:
+                        repaired = True
+                elif len(ids) < capacity:
+                    ids.append(line)
+                else:
+                    repaired = True  # Id satırı var ama matris o kadar büyümemiş
+            self._ids = ids
+            self._reindex()
+            if repaired:
+                self._write_ids()
+        except Exception as e:
+            logger.warning(f"Failed to load embedding index: {e}")
+            self._matrix, self._ids = None, []
+            self._reindex()
+
+    def _reindex(self):
+        self.generation += 1
+        self._row_of = {memory_id: row for row, memory_id in enumerate(self._ids) if memory_id}
+        self._valid = np.array([bool(memory_id) for memory_id in self._ids], dtype=bool)
+
+    def _write_ids(self):
+        tmp = self.ids_file.with_name(f".{self.ids_file.name}.tmp")
+        tmp.write_text(''.join(f"{memory_id}\n" for memory_id in self._ids), encoding='utf-8')
+        os.replace(tmp, self.ids_file)
+
+    def _write_matrix(self, rows, capacity: int):
+        """rows'u capacity satırlık yeni bir .npy'ye yaz ve memmap'i yeniden aç."""
+        tmp = self.matrix_file.with_name(f".{self.matrix_file.name}.tmp")
+        new = np.lib.format.open_memmap(tmp, mode='w+', dtype=np.float32, shape=(capacity, rows.shape[1]))
+        new[:len(rows)] = rows
+        new.flush()
+        del new
+        self._matrix = None
+        os.replace(tmp, self.matrix_file)
+        self._matrix = np.lib.format.open_memmap(self.matrix_file, mode='r+')
+
+    @staticmethod
+    def normalize(vectors) -> "np.ndarray":
+        vectors = np.asarray(vectors, dtype=np.float32)
+        norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+        return vectors / np.maximum(norms, 1e-12)
+
+    def add_many(self, items: List[Tuple[str, "np.ndarray"]]):
+        """[(memory_id, embedding)] ekle; var olan id'nin vektörü yerinde güncellenir."""
+        if not items:
+            return
+        for memory_id, _ in items:
+            if not memory_id or '\n' in memory_id or memory_id.startswith(self.TOMBSTONE):
+                raise ValueError(f"Geçersiz memory id: {memory_id!r}")
+        vectors = self.normalize([embedding for _, embedding in items])
+        if self._matrix is None:
+            self._write_matrix(vectors[:0], max(self.INITIAL_CAPACITY, len(items)))
+        elif vectors.shape[1] != self.dim:
+            raise ValueError(f"Embedding boyutu {vectors.shape[1]}, index {self.dim}")
+
+        new_ids = []
+        for (memory_id, _), vector in zip(items, vectors):
+            row = self._row_of.get(memory_id)
+            if row is None:
+                row = len(self._ids) + len(new_ids)
+                new_ids.append(memory_id)
+                self._row_of[memory_id] = row
+                if row >= self._matrix.shape[0]:
+                    # Kapasite doldu: 2 katı kapasiteyle bir kez yeniden yaz
+                    self._write_matrix(np.array(self._matrix[:row]), max(row + 1, 2 * self._matrix.shape[0]))
+            self._matrix[row] = vector
+        self._matrix.flush()
+
+        if new_ids:
+            # Önce vektörler, sonra id satırları: crash'te yarım ekleme görünmez
+            with open(self.ids_file, 'a', encoding='utf-8') as f:
+                f.write(''.join(f"{memory_id}\n" for memory_id in new_ids))
+            self._ids.extend(new_ids)
+            self._valid = np.concatenate([self._valid, np.ones(len(new_ids), dtype=bool)])
+
+    def remove(self, memory_id: str) -> bool:
+        return self.remove_many([memory_id]) == 1
+
+    def remove_many(self, memory_ids: List[str]) -> int:
+        """Id'leri sil: tek append ile tombstone kayıtları. Silinen sayısı."""
+        rows = []
+        for memory_id in memory_ids:
+            row = self._row_of.pop(memory_id, None)
+            if row is not None:
+                rows.append(row)
+                self._ids[row] = ""
+                self._valid[row] = False
+        if not rows:
+            return 0
+        if len(self._ids) - len(self._row_of) > self.COMPACT_RATIO * max(len(self._ids), self.INITIAL_CAPACITY):
+            self.compact()
+        else:
+            with open(self.ids_file, 'a', encoding='utf-8') as f:
+                f.write(''.join(f"{self.TOMBSTONE}{row}\n" for row in rows))
+        return len(rows)
+
+    def compact(self):
+        """Tombstone'ları at, matrisi yeniden yaz."""
+        rows = np.flatnonzero(self._valid)
+        self._write_matrix(np.array(self._matrix[rows]), max(self.INITIAL_CAPACITY, 2 * len(rows)))
+        self._ids = [self._ids[row] for row in rows]
+        self._write_ids()
+        self._reindex()
+
+    def clear(self):
+        self._matrix = None
+        self._ids = []
+        self._reindex()
+        for path in (self.matrix_file, self.ids_file):
+            path.unlink(missing_ok=True)
+
+    def view(self) -> Tuple["np.ndarray", List[str], "np.ndarray"]:
+        """(matris[:n], satır id'leri, geçerli satır maskesi) — kopyasız."""
+        n = len(self._ids)
+        if self._matrix is None:
+            return np.zeros((0, 0), dtype=np.float32), [], self._valid
+        return self._matrix[:n], self._ids, self._valid
+
+    def search(self, query: "np.ndarray", limit: int) -> List[Tuple[str, float]]:
+        """Tek matris-vektör çarpımı + argpartition ile top-k (cosine)."""
+        n = len(self._ids)
+        if not self._row_of or limit <= 0:
+            return []
+        query = self.normalize(query)
+        scores = self._matrix[:n] @ query
+        scores[~self._valid] = -np.inf
+        k = min(limit, len(self._row_of))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [(self._ids[row], float(scores[row])) for row in top]
+
+
 class MemoryRAG:
     """
     RAG system for agent memory retrieval.
@@ -38,7 +239,7 @@ class MemoryRAG:
     """
 
     # Multilingual model with Turkish support
-    DEFAULT_MODEL = "paraphrase-multilingual-MiniLM-L12-v2"
+    DEFAULT_MODEL = EMBEDDING_MODEL
 
     def __init__(self, memory_dir: Path, model_name: str = None):
         """
@@ -50,50 +251,62 @@ class MemoryRAG:
         """
         self.memory_dir = Path(memory_dir)
         self.long_term_dir = self.memory_dir / "long_term"
-        self.embeddings_file = self.memory_dir / "embeddings.json"
+        self.embeddings_file = self.memory_dir / "embeddings.json"  # Eski format (import edilir)
+        self.hashes_file = self.memory_dir / "embedding_hashes.json"  # id -> embed edilen metnin hash'i
 
         # Create directories
         self.long_term_dir.mkdir(parents=True, exist_ok=True)
 
-        # Initialize model
-        self.model = None
+        # Model paylaşımlı ve lazy: burada yüklenmez
         self.model_name = model_name or self.DEFAULT_MODEL
 
-        if RAG_AVAILABLE:
-            try:
-                self.model = SentenceTransformer(self.model_name)
-                logger.info(f"MemoryRAG initialized with model: {self.model_name}")
-            except Exception as e:
-                logger.warning(f"Failed to load sentence-transformer model: {e}")
-
-        # Embeddings cache: {memory_id: embedding_list}
-        self.embeddings_cache: Dict[str, List[float]] = {}
+        # Normalize float32 embedding matrisi (embeddings.npy + embedding_ids.txt)
+        # Kuyruk worker'ı da yazdığı için index işlemleri _lock altında
+        self._lock = threading.RLock()
+        self.index = EmbeddingIndex(self.memory_dir)
+        self._hashes: Dict[str, str] = self._load_hashes()
         self._load_embeddings()
 
     def is_available(self) -> bool:
         """Check if RAG functionality is available."""
-        return RAG_AVAILABLE and self.model is not None
+        return EmbeddingService.is_available(self.model_name)
 
     def _load_embeddings(self):
-        """Load embeddings cache from disk."""
+        """Eski embeddings.json cache'ini (id -> float listesi) index'e taşı."""
         if not self.embeddings_file.exists():
             return
 
         try:
             with open(self.embeddings_file, 'r', encoding='utf-8') as f:
-                self.embeddings_cache = json.load(f)
-            logger.debug(f"Loaded {len(self.embeddings_cache)} cached embeddings")
+                cache = json.load(f)
+            self.index.add_many([(memory_id, embedding) for memory_id, embedding in cache.items()
+                                 if memory_id not in self.index])
+            self.embeddings_file.unlink()
+            logger.info(f"Migrated {len(cache)} cached embeddings to embeddings.npy")
+        except Exception as e:
+            logger.warning(f"Failed to migrate embeddings cache: {e}")
+
+    def _load_hashes(self) -> Dict[str, str]:
+        if not self.hashes_file.exists():
+            return {}
+        try:
+            with open(self.hashes_file, 'r', encoding='utf-8') as f:
+                return json.load(f)
         except Exception as e:
-            logger.warning(f"Failed to load embeddings cache: {e}")
-            self.embeddings_cache = {}
+            logger.warning(f"Failed to load embedding hashes: {e}")
+            return {}
 
-    def _save_embeddings(self):
-        """Save embeddings cache to disk."""
+    def _save_hashes(self):
         try:
-            with open(self.embeddings_file, 'w', encoding='utf-8') as f:
-                json.dump(self.embeddings_cache, f, ensure_ascii=False)
+            tmp = self.hashes_file.with_name(f".{self.hashes_file.name}.tmp")
+            tmp.write_text(json.dumps(self._hashes), encoding='utf-8')
+            os.replace(tmp, self.hashes_file)
         except Exception as e:
-            logger.error(f"Failed to save embeddings cache: {e}")
+            logger.error(f"Failed to save embedding hashes: {e}")
+
+    @staticmethod
+    def _content_hash(text: str) -> str:
+        return hashlib.sha1(text.encode('utf-8')).hexdigest()
 
     def embed(self, text: str) -> Optional[List[float]]:
         """
@@ -105,15 +318,8 @@ class MemoryRAG:
         Returns:
             Embedding as list of floats, or None if not available
         """
-        if not self.is_available():
-            return None
-
-        try:
-            embedding = self.model.encode(text, convert_to_numpy=True)
-            return embedding.tolist()
-        except Exception as e:
-            logger.error(f"Failed to embed text: {e}")
-            return None
+        embedding = EmbeddingService.embed(text, self.model_name)
+        return None if embedding is None else embedding.tolist()
 
     def add_memory(self, memory_id: str, content: str, save: bool = True):
         """
@@ -126,16 +332,40 @@ class MemoryRAG:
         """
         embedding = self.embed(content)
         if embedding:
-            self.embeddings_cache[memory_id] = embedding
-            if save:
-                self._save_embeddings()
+            # Index yerinde güncellenir; save parametresi geriye uyumluluk için
+            self.add_embeddings([((memory_id, self._content_hash(content)), embedding)])
             logger.debug(f"Added memory to RAG index: {memory_id}")
 
+    def enqueue_memory(self, memory_id: str, content: Optional[str] = None) -> bool:
+        """
+        Anıyı arka plan embedding kuyruğuna ekle (embedding_queue).
+        content verilmezse markdown dosyasından okunur. Index'teki hash
+        aynıysa eklenmez. Kuyruğa eklendiyse True.
+        """
+        if content is None:
+            content = self._memory_text(memory_id)
+        if not content:
+            return False
+        content_hash = self._content_hash(content)
+        with self._lock:
+            if self._hashes.get(memory_id) == content_hash and memory_id in self.index:
+                return False
+        return EmbeddingQueue.submit(self, (memory_id, content_hash), content, self.model_name)
+
+    def add_embeddings(self, items: List[Tuple[Tuple[str, str], "np.ndarray"]]):
+        """Embedding sink: [((memory_id, content_hash), embedding)] — index + hash manifest."""
+        with self._lock:
+            self.index.add_many([(memory_id, embedding) for (memory_id, _), embedding in items])
+            for (memory_id, content_hash), _ in items:
+                self._hashes[memory_id] = content_hash
+            self._save_hashes()
+
     def remove_memory(self, memory_id: str):
         """Remove a memory from the index."""
-        if memory_id in self.embeddings_cache:
-            del self.embeddings_cache[memory_id]
-            self._save_embeddings()
+        with self._lock:
+            self.index.remove(memory_id)
+            if self._hashes.pop(memory_id, None) is not None:
+                self._save_hashes()
 
     def search(self, query: str, limit: int = 3) -> List[Tuple[str, float]]:
         """
@@ -151,29 +381,15 @@ class MemoryRAG:
         if not self.is_available():
             return []
 
-        if not self.embeddings_cache:
+        if not len(self.index):
             return []
 
-        query_emb = self.embed(query)
-        if not query_emb:
+        query_emb = EmbeddingService.embed(query, self.model_name)
+        if query_emb is None:
             return []
 
-        query_arr = np.array(query_emb)
-
-        scores = []
-        for mem_id, mem_emb in self.embeddings_cache.items():
-            mem_arr = np.array(mem_emb)
-
-            # Cosine similarity
-            similarity = np.dot(query_arr, mem_arr) / (
-                np.linalg.norm(query_arr) * np.linalg.norm(mem_arr)
-            )
-            scores.append((mem_id, float(similarity)))
-
-        # Sort by similarity (highest first)
-        scores.sort(key=lambda x: x[1], reverse=True)
-
-        return scores[:limit]
+        with self._lock:
+            return self.index.search(query_emb, limit)
 
     def get_context(self, topic: str, limit: int = 3) -> str:
         """
@@ -225,6 +441,10 @@ class MemoryRAG:
                 logger.error(f"Failed to load memory {memory_id}: {e}")
         return ""
 
+    def _memory_text(self, memory_id: str) -> str:
+        """Embed edilen metin: markdown gövdesi (başlık ve --- altındaki metadata hariç)."""
+        return self._load_memory(memory_id).split("\n---\n")[0].strip()
+
     def save_long_term_memory(
         self,
         memory_id: str,
@@ -255,8 +475,8 @@ class MemoryRAG:
             path.write_text(md_content, encoding='utf-8')
             logger.debug(f"Saved long-term memory: {memory_id}")
 
-            # Add to embedding index
-            self.add_memory(memory_id, content)
+            # Embedding arka planda (kuyruk worker'ı batch'ler halinde ekler)
+            self.enqueue_memory(memory_id)
         except Exception as e:
             logger.error(f"Failed to save long-term memory {memory_id}: {e}")
 
@@ -277,32 +497,61 @@ class MemoryRAG:
             p.stem for p in self.long_term_dir.glob("*.md")
         ]
 
-    def rebuild_index(self):
+    def rebuild_index(self, force: bool = False) -> int:
         """
-        Rebuild the embeddings index from all long-term memories.
+        Index'i long-term markdown dosyalarıyla eşitle.
+
+        Sadece içerik hash'i değişmiş (veya index'te olmayan) dosyalar embed
+        edilir; dosyası silinmiş id'ler index'ten çıkarılır. force=True:
+        index temizlenip hepsi yeniden embed edilir.
 
         Useful after manual memory file changes or to fix corruption.
+        Returns: embed edilen dosya sayısı.
         """
         if not self.is_available():
             logger.warning("Cannot rebuild index: RAG not available")
-            return
-
-        logger.info("Rebuilding embeddings index...")
-        self.embeddings_cache = {}
-
-        for memory_id in self.get_all_memory_ids():
-            content = self._load_memory(memory_id)
-            if content:
-                self.add_memory(memory_id, content, save=False)
-
-        self._save_embeddings()
-        logger.info(f"Rebuilt index with {len(self.embeddings_cache)} memories")
+            return 0
+
+        with self._lock:
+            if force:
+                self.index.clear()
+                self._hashes = {}
+
+            stale = {}
+            memory_ids = set()
+            for memory_id in self.get_all_memory_ids():
+                memory_ids.add(memory_id)
+                content = self._memory_text(memory_id)
+                if not content:
+                    continue
+                content_hash = self._content_hash(content)
+                if self._hashes.get(memory_id) != content_hash or memory_id not in self.index:
+                    stale[(memory_id, content_hash)] = content
+
+            removed = [memory_id for memory_id in self.index.ids() if memory_id not in memory_ids]
+            self.index.remove_many(removed)
+            for memory_id in removed:
+                self._hashes.pop(memory_id, None)
+
+        if stale:
+            # Tek embed_many çağrısı: model batch'lerle encode eder
+            embeddings = EmbeddingService.embed_many(list(stale.values()), self.model_name)
+            if embeddings is None:
+                logger.warning("Rebuild embedding failed")
+                return 0
+            self.add_embeddings(list(zip(stale, embeddings)))
+        elif removed:
+            with self._lock:
+                self._save_hashes()
+
+        logger.info(f"Index rebuild: {len(stale)} embedded, {len(removed)} removed, {len(self.index)} total")
+        return len(stale)
 
     def get_stats(self) -> Dict:
         """Get statistics about the memory store."""
         return {
             "total_memories": len(self.get_all_memory_ids()),
-            "indexed_memories": len(self.embeddings_cache),
+            "indexed_memories": len(self.index),
             "rag_available": self.is_available(),
             "model": self.model_name if self.is_available() else None,
         }
@@ -396,15 +645,24 @@ class MemoryRAGFallback:
             logger.error(f"Failed to save memory: {e}")
 
 
+_rag_instances: Dict[Path, MemoryRAG] = {}
+_rag_lock = threading.Lock()
+
+
 def create_memory_rag(memory_dir: Path) -> MemoryRAG:
     """
     Create appropriate MemoryRAG instance.
 
     Returns full RAG if sentence-transformers available,
-    otherwise returns fallback implementation.
+    otherwise returns fallback implementation. Aynı dizin için aynı
+    MemoryRAG döner (index dosyalarına tek yazar).
     """
     if RAG_AVAILABLE:
-        return MemoryRAG(memory_dir)
+        key = Path(memory_dir).resolve()
+        with _rag_lock:
+            if key not in _rag_instances:
+                _rag_instances[key] = MemoryRAG(memory_dir)
+            return _rag_instances[key]
     else:
         logger.warning("Using fallback keyword-based memory search")
         return MemoryRAGFallback(memory_dir)
@@ -12,6 +12,7 @@ Bu modül agent'ların kendi kişiliklerini "keşfetmelerini" sağlar:
 - Agent yaşantıdan kendi kişiliğini oluşturuyor
 """
 
+import asyncio
 import json
 import logging
 import os
@@ -118,6 +119,12 @@ class ReflectionEngine:
 
         # Build and SANITIZE narratives to prevent prompt injection
         events_narrative = "\n".join(e.to_narrative() for e in events[-30:])
+
+        # İlgili eski long-term anılar (ANN indeksi varsa, milisaniyeler içinde)
+        recall_query = " ".join(self.memory.character.favorite_topics[:3]) or events[-1].content
+        related = await self.memory.recall_long_term_async(recall_query, limit=3)
+        if related:
+            events_narrative += "\n\nİlgili eski anılar:\n" + "\n".join(f"- {r[:200]}" for r in related)
         current_character = self.memory.character.to_prompt_section()
 
         # SECURITY: Sanitize user-generated content before prompt construction
@@ -279,7 +286,9 @@ class ReflectionEngine:
             # Get emotional bias from karma
             emotional_bias = self.memory.character.karma_score / 10.0  # Normalize to -1 to 1
 
-            dream = void.dream(
+            # dream() sorgu embed'i ve void dosyası yazımı yapar: event loop'u bloklamasın
+            dream = await asyncio.to_thread(
+                void.dream,
                 requesting_agent=self.memory.agent_username,
                 topic_hints=topic_hints,
                 emotional_bias=emotional_bias,
@@ -12,12 +12,28 @@ Bu sistem agent'lar arası dolaylı bilgi transferi sağlar:
 - Serendipitous discovery
 
 Singleton pattern ile tüm agentlar aynı Void'i paylaşır.
+
+Embedding modeli varsa Void anıları memory_ann indeksine de yazılır; konu
+ipuçlu rüyalar adayları bu indeksten (semantik benzerlikle) alır.
+
+Storage (eskiden her anıda tüm void_memories.json yeniden yazılıyordu):
+- shards/shard_XX.jsonl: memory_id'ye göre SHARD_COUNT parçaya bölünmüş,
+  append-only kayıtlar (add / access / remove)
+- void_meta.json: contributions + son 100 rüya (küçük, atomic yazılır)
+- Bir shard'daki kayıt sayısı canlı anıların COMPACT_RATIO katını geçince
+  yalnızca o shard yeniden yazılır (compaction)
+- Disk yazımı state lock'u dışında yapılır; rüya/okuma I/O'yu beklemez
+- Kapasite aşılınca eviction (access_count, forgotten_at) min-heap'inden
 """
 
+import heapq
 import json
 import logging
+import os
 import random
 import threading
+import uuid
+import zlib
 from dataclasses import dataclass, field, asdict
 from datetime import datetime, timedelta
 from pathlib import Path
@@ -38,6 +54,7 @@ class ForgottenMemory:
     original_timestamp: Optional[str] = None
     tags: List[str] = field(default_factory=list)
     access_count: int = 0  # Kaç kez rüyada görüldü
+    memory_id: str = field(default_factory=lambda: uuid.uuid4().hex[:8])  # memory_ann anahtarı
 
     def to_dict(self) -> dict:
         return asdict(self)
@@ -78,6 +95,22 @@ class Dream:
         return "\n".join(lines)
 
 
+def _memory_index():
+    """Paylaşılan ANN indeksi (embedding modeli yoksa None)."""
+    try:
+        from memory_ann import get_memory_index
+        return get_memory_index()
+    except ImportError:
+        return None
+    except Exception as e:
+        logger.debug(f"Memory index not available: {e}")
+        return None
+
+
+def _index_text(memory: "ForgottenMemory") -> str:
+    return f"{memory.topic or ''} {memory.content_summary}".strip()
+
+
 class TheVoid:
     """
     Kolektif bilinçaltı havuzu.
@@ -91,6 +124,12 @@ class TheVoid:
     MAX_MEMORIES = 1000  # Maximum memories to store
     MEMORY_DECAY_DAYS = 30  # Memories in void decay after this
     DREAM_MEMORY_LIMIT = 3  # Max memories per dream
+    DREAM_CANDIDATE_POOL = 50  # İndeksten alınan en benzer aday sayısı
+    DREAM_LOG_LIMIT = 100  # Saklanan son rüya sayısı
+
+    SHARD_COUNT = 8
+    COMPACT_RATIO = 2  # Kayıt sayısı > canlı anı * ratio ise shard compaction
+    COMPACT_MIN_RECORDS = 64  # Küçük shard'lar compaction'a girmez
 
     def __new__(cls, storage_dir: Optional[Path] = None):
         with cls._lock:
@@ -103,52 +142,259 @@ class TheVoid:
         if self._initialized:
             return
 
-        self._lock = threading.Lock()
+        self._lock = threading.Lock()  # State (memories, heap, bekleyen kayıtlar)
+        self._io_lock = threading.Lock()  # Disk yazımı; _lock'tan önce alınır
         self.memories: List[ForgottenMemory] = []
+        self._by_id: Dict[str, ForgottenMemory] = {}
         self.agent_contributions: Dict[str, int] = {}  # agent -> count
         self.dream_log: List[Dict[str, Any]] = []
 
+        # Eviction heap: (access_count, forgotten_at, memory_id); eskimiş girdiler pop'ta atlanır
+        self._heap: List[tuple] = []
+
+        # Diske yazılmayı bekleyen shard kayıtları + shard başına kayıt/canlı sayaçları
+        self._pending_records: Dict[int, List[dict]] = {}
+        self._pending_index_removals: Dict[str, str] = {}  # memory_id -> agent; _flush'ta indeksten silinir
+        self._meta_dirty = False
+        self._shard_records: Dict[int, int] = {}
+        self._shard_live: Dict[int, int] = {}
+
         # Storage
         if storage_dir:
             self.storage_dir = Path(storage_dir)
         else:
             self.storage_dir = Path.home() / ".logsozluk" / "void"
         self.storage_dir.mkdir(parents=True, exist_ok=True)
-        self.storage_file = self.storage_dir / "void_memories.json"
+        self.shard_dir = self.storage_dir / "shards"
+        self.shard_dir.mkdir(exist_ok=True)
+        self.meta_file = self.storage_dir / "void_meta.json"
+        self.storage_file = self.storage_dir / "void_memories.json"  # Eski tek dosya format
 
         # Load existing memories
         self._load()
+        self._index_memories(self.memories)
         self._initialized = True
         logger.info(f"The Void initialized with {len(self.memories)} memories")
 
+    # ============ Storage ============
+
+    def _shard_of(self, memory_id: str) -> int:
+        return zlib.crc32(memory_id.encode("utf-8")) % self.SHARD_COUNT
+
+    def _shard_file(self, shard: int) -> Path:
+        return self.shard_dir / f"shard_{shard:02d}.jsonl"
+
     def _load(self):
-        """Load memories from disk."""
-        if self.storage_file.exists():
+        """Load memories from disk (shard replay; eski JSON varsa bir kez migrate)."""
+        if self.meta_file.exists():
+            try:
+                with open(self.meta_file, 'r', encoding='utf-8') as f:
+                    meta = json.load(f)
+                self.agent_contributions = meta.get("contributions", {})
+                self.dream_log = meta.get("dream_log", [])[-self.DREAM_LOG_LIMIT:]
+            except Exception as e:
+                logger.warning(f"Failed to load void meta: {e}")
+
+        by_id: Dict[str, ForgottenMemory] = {}
+        for shard in range(self.SHARD_COUNT):
+            path = self._shard_file(shard)
+            if not path.exists():
+                continue
+            records = 0
             try:
-                with open(self.storage_file, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                    self.memories = [
-                        ForgottenMemory.from_dict(m)
-                        for m in data.get("memories", [])
-                    ]
-                    self.agent_contributions = data.get("contributions", {})
-                    self.dream_log = data.get("dream_log", [])[-100:]  # Keep last 100
+                with open(path, 'r', encoding='utf-8') as f:
+                    for line in f:
+                        try:
+                            record = json.loads(line)
+                        except json.JSONDecodeError:
+                            continue  # Yarım kalmış son satır
+                        records += 1
+                        op = record.get("op")
+                        if op == "add":
+                            memory = ForgottenMemory.from_dict(record["memory"])
+                            by_id[memory.memory_id] = memory
+                        elif op == "remove":
+                            by_id.pop(record["id"], None)
+                        elif op == "access" and record["id"] in by_id:
+                            by_id[record["id"]].access_count = record["count"]
             except Exception as e:
-                logger.warning(f"Failed to load void memories: {e}")
+                logger.warning(f"Failed to load void shard {path.name}: {e}")
+            self._shard_records[shard] = records
+
+        if not by_id and self.storage_file.exists():
+            self._migrate_legacy()
+            return
+
+        self.memories = sorted(by_id.values(), key=lambda m: m.forgotten_at)
+        self._by_id = by_id
+        for memory in self.memories:
+            shard = self._shard_of(memory.memory_id)
+            self._shard_live[shard] = self._shard_live.get(shard, 0) + 1
+        self._rebuild_heap()
 
-    def _save(self):
-        """Save memories to disk."""
+    def _migrate_legacy(self):
+        """Eski void_memories.json'ı shard'lara taşı (dosya .migrated olarak kalır)."""
         try:
-            data = {
-                "memories": [m.to_dict() for m in self.memories],
-                "contributions": self.agent_contributions,
-                "dream_log": self.dream_log[-100:],
-                "last_updated": datetime.now().isoformat(),
-            }
-            with open(self.storage_file, 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=2, ensure_ascii=False)
+            with open(self.storage_file, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            self.memories = [ForgottenMemory.from_dict(m) for m in data.get("memories", [])]
+            self._by_id = {m.memory_id: m for m in self.memories}
+            self.agent_contributions = data.get("contributions", {})
+            self.dream_log = data.get("dream_log", [])[-self.DREAM_LOG_LIMIT:]
+            for memory in self.memories:
+                shard = self._shard_of(memory.memory_id)
+                self._shard_live[shard] = self._shard_live.get(shard, 0) + 1
+                self._append_record(memory.memory_id, {"op": "add", "memory": memory.to_dict()})
+            self._meta_dirty = True
+            self._rebuild_heap()
+            self._flush()
+            os.replace(self.storage_file, self.storage_file.with_name(self.storage_file.name + ".migrated"))
+            logger.info(f"Migrated {len(self.memories)} void memories to shards")
+        except Exception as e:
+            logger.warning(f"Failed to migrate void memories: {e}")
+
+    def _append_record(self, memory_id: str, record: dict):
+        """Shard kaydını bekleyen yazımlara ekle (lock altında çağrılır)."""
+        self._pending_records.setdefault(self._shard_of(memory_id), []).append(record)
+
+    def _flush(self):
+        """
+        Bekleyen kayıtları shard'lara ekle, gerekirse shard'ı compact et.
+
+        _lock altında çağrılmaz: kayıtlar lock altında alınır, yazım _io_lock
+        ile sıralanır (kayıtlar diske alındıkları sırayla gider). Çıkan
+        anılar ANN indeksinden de burada, lock dışında toplu silinir.
+        """
+        with self._io_lock:
+            with self._lock:
+                pending, self._pending_records = self._pending_records, {}
+                removals, self._pending_index_removals = self._pending_index_removals, {}
+                meta = None
+                if self._meta_dirty:
+                    meta = {
+                        "contributions": dict(self.agent_contributions),
+                        "dream_log": self.dream_log[-self.DREAM_LOG_LIMIT:],
+                        "last_updated": datetime.now().isoformat(),
+                    }
+                    self._meta_dirty = False
+
+                # Compaction: shard'ın canlı anılarının o anki kopyası
+                compacted: Dict[int, List[dict]] = {}
+                for shard, records in pending.items():
+                    total = self._shard_records.get(shard, 0) + len(records)
+                    live = self._shard_live.get(shard, 0)
+                    if total > max(self.COMPACT_MIN_RECORDS, live * self.COMPACT_RATIO):
+                        compacted[shard] = [
+                            {"op": "add", "memory": m.to_dict()}
+                            for m in self.memories if self._shard_of(m.memory_id) == shard
+                        ]
+                        self._shard_records[shard] = len(compacted[shard])
+                    else:
+                        self._shard_records[shard] = total
+
+            try:
+                for shard, records in pending.items():
+                    path = self._shard_file(shard)
+                    if shard in compacted:
+                        self._write_atomic(path, compacted[shard])
+                    else:
+                        with open(path, 'a', encoding='utf-8') as f:
+                            f.write("".join(json.dumps(r, ensure_ascii=False) + "\n" for r in records))
+                if meta is not None:
+                    tmp = self.meta_file.with_name(f".{self.meta_file.name}.tmp")
+                    with open(tmp, 'w', encoding='utf-8') as f:
+                        json.dump(meta, f, indent=2, ensure_ascii=False)
+                    os.replace(tmp, self.meta_file)
+            except Exception as e:
+                logger.error(f"Failed to save void memories: {e}")
+
+            self._remove_from_index(removals)
+
+    @staticmethod
+    def _write_atomic(path: Path, records: List[dict]):
+        tmp = path.with_name(f".{path.name}.tmp")
+        with open(tmp, 'w', encoding='utf-8') as f:
+            f.write("".join(json.dumps(r, ensure_ascii=False) + "\n" for r in records))
+        os.replace(tmp, path)
+
+    def compact(self):
+        """Tüm shard'ları canlı anılarla yeniden yaz."""
+        with self._io_lock:
+            with self._lock:
+                shards: Dict[int, List[dict]] = {s: [] for s in range(self.SHARD_COUNT)}
+                for memory in self.memories:
+                    shards[self._shard_of(memory.memory_id)].append({"op": "add", "memory": memory.to_dict()})
+                # Bekleyen kayıtlar state'e zaten yansıdı; snapshot onları da içerir
+                self._pending_records = {}
+                for shard, records in shards.items():
+                    self._shard_records[shard] = len(records)
+            try:
+                for shard, records in shards.items():
+                    self._write_atomic(self._shard_file(shard), records)
+            except Exception as e:
+                logger.error(f"Failed to compact void shards: {e}")
+
+    # ============ Eviction heap ============
+
+    def _rebuild_heap(self):
+        self._heap = [(m.access_count, m.forgotten_at, m.memory_id) for m in self.memories]
+        heapq.heapify(self._heap)
+
+    def _push_heap(self, memory: ForgottenMemory):
+        heapq.heappush(self._heap, (memory.access_count, memory.forgotten_at, memory.memory_id))
+        # Eskimiş girdiler birikirse yeniden kur
+        if len(self._heap) > 2 * len(self.memories) + self.COMPACT_MIN_RECORDS:
+            self._rebuild_heap()
+
+    def _evict(self, keep: int):
+        """En az rüyada görülen, en eski anıları heap'ten çıkar (lock altında)."""
+        evicted: Set[str] = set()
+        while self._heap and len(self.memories) - len(evicted) > keep:
+            access_count, forgotten_at, memory_id = heapq.heappop(self._heap)
+            memory = self._by_id.get(memory_id)
+            if memory is None or memory_id in evicted or memory.access_count != access_count:
+                continue  # Eskimiş girdi (silinmiş veya access_count değişmiş)
+            evicted.add(memory_id)
+        if evicted:
+            self._set_memories([m for m in self.memories if m.memory_id not in evicted])
+
+    def _index_memories(self, memories: List[ForgottenMemory]):
+        """İndekste olmayan anıları embed kuyruğuna ekle."""
+        index = _memory_index()
+        if index is None:
+            return
+        from memory_ann import SOURCE_VOID
+        for memory in memories:
+            if not index.contains(SOURCE_VOID, memory.original_agent, memory.memory_id):
+                index.add_text(SOURCE_VOID, memory.original_agent, memory.memory_id,
+                               _index_text(memory), topic=memory.topic)
+
+    def _set_memories(self, memories: List[ForgottenMemory]):
+        """
+        self.memories'i değiştir; çıkanları shard'dan sil (lock altında çağrılır).
+
+        İndeks silmeleri biriktirilir, sonraki _flush() lock dışında toplu yapar.
+        """
+        kept = {m.memory_id for m in memories}
+        dropped = [m for m in self.memories if m.memory_id not in kept]
+        self.memories = memories
+        self._by_id = {m.memory_id: m for m in memories}
+        for memory in dropped:
+            self._append_record(memory.memory_id, {"op": "remove", "id": memory.memory_id})
+            shard = self._shard_of(memory.memory_id)
+            self._shard_live[shard] = self._shard_live.get(shard, 1) - 1
+            self._pending_index_removals[memory.memory_id] = memory.original_agent
+
+    def _remove_from_index(self, removals: Dict[str, str]):
+        """Çıkan anıları ANN indeksinden tek remove_many ile sil (_lock dışında)."""
+        index = _memory_index() if removals else None
+        if index is None:
+            return
+        from memory_ann import SOURCE_VOID
+        try:
+            index.remove_many(SOURCE_VOID, [(agent, memory_id) for memory_id, agent in removals.items()])
         except Exception as e:
-            logger.error(f"Failed to save void memories: {e}")
+            logger.warning(f"Failed to remove {len(removals)} memories from void index: {e}")
 
     def receive_forgotten(self, memory: ForgottenMemory):
         """
@@ -157,21 +403,41 @@ class TheVoid:
         Args:
             memory: Unutulan anı
         """
-        with self._lock:
-            self.memories.append(memory)
+        self.receive_forgotten_many([memory])
 
-            # Track contributions
-            agent = memory.original_agent
-            self.agent_contributions[agent] = self.agent_contributions.get(agent, 0) + 1
+    def receive_forgotten_many(self, memories: List[ForgottenMemory]):
+        """
+        Decay'de silinen anıları toplu al (tek lock, tek disk yazımı).
 
-            # Trim if too many
+        Args:
+            memories: Unutulan anılar
+        """
+        if not memories:
+            return
+        with self._lock:
+            for memory in memories:
+                if memory.memory_id in self._by_id:
+                    continue
+                self.memories.append(memory)
+                self._by_id[memory.memory_id] = memory
+                self._pending_index_removals.pop(memory.memory_id, None)  # Çıkıp geri geldi
+                self._push_heap(memory)
+                self._append_record(memory.memory_id, {"op": "add", "memory": memory.to_dict()})
+                shard = self._shard_of(memory.memory_id)
+                self._shard_live[shard] = self._shard_live.get(shard, 0) + 1
+
+                # Track contributions
+                agent = memory.original_agent
+                self.agent_contributions[agent] = self.agent_contributions.get(agent, 0) + 1
+            self._index_memories(memories)
+            self._meta_dirty = True
+
+            # Trim if too many: remove oldest with lowest access count
             if len(self.memories) > self.MAX_MEMORIES:
-                # Remove oldest with lowest access count
-                self.memories.sort(key=lambda m: (m.access_count, m.forgotten_at))
-                self.memories = self.memories[-(self.MAX_MEMORIES // 2):]
+                self._evict(self.MAX_MEMORIES // 2)
 
-            self._save()
-            logger.debug(f"Void received memory from {agent}: {memory.event_type}")
+        self._flush()
+        logger.debug(f"Void received {len(memories)} memories")
 
     def dream(
         self,
@@ -192,71 +458,110 @@ class TheVoid:
         Returns:
             Dream object veya None
         """
+        # Konu ipucu varsa adaylar ANN indeksinden (lock dışında: embed edebilir)
+        hits = []
+        index = _memory_index() if topic_hints else None
+        if index is not None:
+            from memory_ann import SOURCE_VOID
+            try:
+                hits = index.search_text(
+                    " ".join(topic_hints),
+                    limit=self.DREAM_CANDIDATE_POOL,
+                    source=SOURCE_VOID,
+                    exclude_agent=requesting_agent if exclude_own else None,
+                )
+            except Exception as e:
+                logger.warning(f"Void index search failed, scanning: {e}")
+
         with self._lock:
-            if not self.memories:
-                return None
+            dream = self._dream_locked(requesting_agent, topic_hints, emotional_bias, exclude_own, hits)
+        if dream is not None:
+            self._flush()
+            logger.info(f"{requesting_agent} had a dream with {len(dream.memories)} memories")
+        return dream
 
+    def _dream_locked(
+        self,
+        requesting_agent: str,
+        topic_hints: Optional[List[str]],
+        emotional_bias: Optional[float],
+        exclude_own: bool,
+        hits: list,
+    ) -> Optional[Dream]:
+        """dream() gövdesi (lock altında): aday skorla, seç, access kayıtlarını biriktir."""
+        if not self.memories:
+            return None
+
+        # Score candidates based on preferences
+        scored = []
+        indexed = [(self._by_id[h.memory_id], h.score) for h in hits if h.memory_id in self._by_id]
+        if indexed:
+            for mem, similarity in indexed:
+                # Topic affinity: semantik benzerlik (eski exact +0.5 ölçeğinde)
+                scored.append((self._score(mem, 0.5 * max(0.0, similarity), emotional_bias), mem))
+        else:
             # Filter candidates
             candidates = self.memories.copy()
 
             if exclude_own:
                 candidates = [m for m in candidates if m.original_agent != requesting_agent]
 
-            if not candidates:
-                return None
-
-            # Score candidates based on preferences
-            scored = []
             for mem in candidates:
-                score = 1.0
-
+                topic_bonus = 0.0
                 # Topic affinity
                 if topic_hints and mem.topic:
                     if mem.topic.lower() in [t.lower() for t in topic_hints]:
-                        score += 0.5
+                        topic_bonus = 0.5
                     elif any(t.lower() in mem.content_summary.lower() for t in topic_hints):
-                        score += 0.2
-
-                # Emotional affinity
-                if emotional_bias is not None:
-                    emotion_match = 1 - abs(mem.emotional_valence - emotional_bias)
-                    score += emotion_match * 0.3
-
-                # Novelty bonus (less accessed = more novel)
-                novelty = max(0, 1 - mem.access_count * 0.1)
-                score += novelty * 0.2
-
-                scored.append((score, mem))
-
-            # Sort by score with some randomness
-            scored.sort(key=lambda x: x[0] + random.uniform(-0.2, 0.2), reverse=True)
-
-            # Select top memories for dream
-            selected = [mem for _, mem in scored[:self.DREAM_MEMORY_LIMIT]]
-
-            # Update access counts
-            for mem in selected:
-                mem.access_count += 1
-
-            # Create dream
-            dream = Dream(
-                memories=selected,
-                dreamer=requesting_agent,
-                theme=topic_hints[0] if topic_hints else None,
-            )
-
-            # Log dream
-            self.dream_log.append({
-                "dreamer": requesting_agent,
-                "memory_count": len(selected),
-                "theme": dream.theme,
-                "timestamp": dream.dream_time,
-            })
-
-            self._save()
-            logger.info(f"{requesting_agent} had a dream with {len(selected)} memories")
-
-            return dream
+                        topic_bonus = 0.2
+                scored.append((self._score(mem, topic_bonus, emotional_bias), mem))
+
+        if not scored:
+            return None
+
+        # Sort by score with some randomness
+        scored.sort(key=lambda x: x[0] + random.uniform(-0.2, 0.2), reverse=True)
+
+        # Select top memories for dream
+        selected = [mem for _, mem in scored[:self.DREAM_MEMORY_LIMIT]]
+
+        # Update access counts
+        for mem in selected:
+            mem.access_count += 1
+            self._push_heap(mem)
+            self._append_record(mem.memory_id, {"op": "access", "id": mem.memory_id, "count": mem.access_count})
+
+        # Create dream
+        dream = Dream(
+            memories=selected,
+            dreamer=requesting_agent,
+            theme=topic_hints[0] if topic_hints else None,
+        )
+
+        # Log dream
+        self.dream_log.append({
+            "dreamer": requesting_agent,
+            "memory_count": len(selected),
+            "theme": dream.theme,
+            "timestamp": dream.dream_time,
+        })
+        self._meta_dirty = True
+
+        return dream
+
+    @staticmethod
+    def _score(mem: ForgottenMemory, topic_bonus: float, emotional_bias: Optional[float]) -> float:
+        score = 1.0 + topic_bonus
+
+        # Emotional affinity
+        if emotional_bias is not None:
+            emotion_match = 1 - abs(mem.emotional_valence - emotional_bias)
+            score += emotion_match * 0.3
+
+        # Novelty bonus (less accessed = more novel)
+        novelty = max(0, 1 - mem.access_count * 0.1)
+        score += novelty * 0.2
+        return score
 
     def get_collective_patterns(self) -> Dict[str, Any]:
         """Kolektif bilinçte en çok ne var?"""
@@ -300,16 +605,16 @@ class TheVoid:
             cutoff = datetime.now() - timedelta(days=self.MEMORY_DECAY_DAYS)
             original_count = len(self.memories)
 
-            self.memories = [
+            self._set_memories([
                 m for m in self.memories
                 if datetime.fromisoformat(m.forgotten_at) > cutoff
                 or m.access_count >= 3  # Keep frequently dreamed memories
-            ]
+            ])
 
             removed = original_count - len(self.memories)
-            if removed > 0:
-                logger.info(f"Void decay removed {removed} old memories")
-                self._save()
+        if removed > 0:
+            logger.info(f"Void decay removed {removed} old memories")
+            self._flush()
 
     def get_memories_by_topic(self, topic: str, limit: int = 10) -> List[ForgottenMemory]:
         """Belirli bir konudaki anıları al."""
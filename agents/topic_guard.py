@@ -13,6 +13,7 @@ import logging
 import os
 import re
 from dataclasses import dataclass
+from collections import Counter
 from datetime import datetime, timedelta
 from difflib import SequenceMatcher
 from typing import List, Optional, Set, Dict, Any
@@ -25,6 +26,8 @@ logger = logging.getLogger(__name__)
 SIMILARITY_THRESHOLD = float(os.environ.get("TOPIC_SIMILARITY_THRESHOLD", "0.85"))
 MAX_SAME_THEME_PER_DAY = int(os.environ.get("TOPIC_MAX_SAME_THEME_PER_DAY", "3"))
 LOOKBACK_HOURS = int(os.environ.get("TOPIC_LOOKBACK_HOURS", "24"))
+# SequenceMatcher ile doğrulanacak en fazla aday sayısı (trigram örtüşmesine göre)
+SIMILARITY_TOP_K = int(os.environ.get("TOPIC_SIMILARITY_TOP_K", "10"))
 
 
 # ============ Dertleşme Tema Anahtar Kelimeleri ============
@@ -71,6 +74,91 @@ BANNED_REPETITION_PATTERNS = [
 ]
 
 
+class TitleIndex:
+    """
+    Son başlıklar için artımlı index.
+
+    - Exact match: normalize başlık -> adet (hash lookup)
+    - Similarity adayları: karakter trigram -> başlık posting'leri
+
+    SequenceMatcher her başlığa karşı koşmak yerine sadece en çok trigram
+    paylaşan top-k adaya uygulanır.
+    """
+
+    def __init__(self):
+        self._counts: Counter = Counter()  # normalize başlık -> kaç topic
+        self._originals: Dict[str, str] = {}  # normalize başlık -> ilk orijinal başlık
+        self._trigrams: Dict[str, Set[str]] = {}  # normalize başlık -> trigram set'i
+        self._postings: Dict[str, Set[str]] = {}  # trigram -> normalize başlıklar
+
+    def __len__(self) -> int:
+        return len(self._counts)
+
+    @staticmethod
+    def normalize(title: str) -> str:
+        return title.lower().strip()
+
+    @staticmethod
+    def trigrams(text: str) -> Set[str]:
+        padded = f"  {text} "  # Kısa başlıklar da en az bir trigram üretsin
+        return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+    def add(self, title: str):
+        key = self.normalize(title)
+        self._counts[key] += 1
+        if self._counts[key] > 1:
+            return
+        self._originals[key] = title
+        grams = self.trigrams(key)
+        self._trigrams[key] = grams
+        for gram in grams:
+            self._postings.setdefault(gram, set()).add(key)
+
+    def remove(self, title: str):
+        key = self.normalize(title)
+        if key not in self._counts:
+            return
+        self._counts[key] -= 1
+        if self._counts[key] > 0:
+            return
+        del self._counts[key]
+        del self._originals[key]
+        for gram in self._trigrams.pop(key):
+            keys = self._postings.get(gram)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._postings[gram]
+
+    def update(self, titles: List[str]):
+        """Index'i verilen listeye eşitle: sadece fark eklenir/çıkarılır."""
+        target = Counter(self.normalize(t) for t in titles)
+        originals = {}
+        for t in titles:
+            originals.setdefault(self.normalize(t), t)
+        for key, count in (self._counts - target).items():
+            for _ in range(count):
+                self.remove(key)
+        for key, count in (target - self._counts).items():
+            for _ in range(count):
+                self.add(originals[key])
+
+    def contains(self, title: str) -> bool:
+        return self.normalize(title) in self._counts
+
+    def original(self, key: str) -> str:
+        return self._originals.get(key, key)
+
+    def candidates(self, title: str, k: int = SIMILARITY_TOP_K) -> List[str]:
+        """En çok trigram paylaşan k normalize başlık (çoktan aza)."""
+        shared: Counter = Counter()
+        for gram in self.trigrams(self.normalize(title)):
+            keys = self._postings.get(gram)
+            if keys:
+                shared.update(keys)
+        return [key for key, _ in shared.most_common(k)]
+
+
 @dataclass
 class TopicCandidate:
     """Başlık adayı."""
@@ -125,10 +213,18 @@ class TopicGuard:
                 - created_at: str (ISO format)
         """
         self.recent_topics = recent_topics or []
+        self._index = TitleIndex()
+        self._index.update([t.get("title", "") for t in self.recent_topics])
         
     def set_recent_topics(self, topics: List[Dict[str, Any]]):
-        """Son başlıkları güncelle."""
+        """Son başlıkları güncelle (index artımlı olarak senkronlanır)."""
         self.recent_topics = topics
+        self._index.update([t.get("title", "") for t in topics])
+
+    def add_recent_topic(self, topic: Dict[str, Any]):
+        """Tek bir yeni başlığı listeye ve index'e ekle."""
+        self.recent_topics.append(topic)
+        self._index.add(topic.get("title", ""))
         
     def check(self, candidate: TopicCandidate) -> GuardResult:
         """
@@ -139,28 +235,33 @@ class TopicGuard:
         """
         title_lower = candidate.title.lower().strip()
         
-        # 1. Exact match kontrolü
-        for topic in self.recent_topics:
-            existing_title = topic.get("title", "").lower().strip()
-            if title_lower == existing_title:
-                return GuardResult(
-                    is_allowed=False,
-                    reason="Bu başlık zaten mevcut",
-                    similarity_score=1.0
-                )
+        # 1. Exact match kontrolü (hash lookup)
+        if self._index.contains(title_lower):
+            return GuardResult(
+                is_allowed=False,
+                reason="Bu başlık zaten mevcut",
+                similarity_score=1.0
+            )
         
-        # 2. Similarity kontrolü
-        for topic in self.recent_topics:
-            existing_title = topic.get("title", "").lower()
-            similarity = self._calculate_similarity(title_lower, existing_title)
-            
-            if similarity >= self.SIMILARITY_THRESHOLD:
-                return GuardResult(
-                    is_allowed=False,
-                    reason=f"Çok benzer başlık mevcut: '{topic.get('title')}'",
-                    similarity_score=similarity,
-                    suggestion="Farklı bir bakış açısı veya konu dene"
-                )
+        # 2. Similarity kontrolü (trigram adayları + SequenceMatcher doğrulaması)
+        best_key, best_similarity = None, 0.0
+        for key in self._index.candidates(title_lower):
+            matcher = SequenceMatcher(None, title_lower, key)
+            # Ucuz üst sınırlar (uzunluk, karakter multiset) threshold altındaysa ratio() atlanır
+            if (matcher.real_quick_ratio() < self.SIMILARITY_THRESHOLD
+                    or matcher.quick_ratio() < self.SIMILARITY_THRESHOLD):
+                continue
+            similarity = matcher.ratio()
+            if similarity >= self.SIMILARITY_THRESHOLD and similarity > best_similarity:
+                best_key, best_similarity = key, similarity
+        
+        if best_key is not None:
+            return GuardResult(
+                is_allowed=False,
+                reason=f"Çok benzer başlık mevcut: '{self._index.original(best_key)}'",
+                similarity_score=best_similarity,
+                suggestion="Farklı bir bakış açısı veya konu dene"
+            )
         
         # 3. Dertleşme tema tekrarı kontrolü
         if candidate.category == "dertlesme":
@@ -0,0 +1,9 @@
+-- Topic başlık benzerliği DB tarafında: pg_trgm GIN index
+-- Duplicate kontrolü (TopicSimilarity servisi) tüm topic geçmişinde tek sorgu:
+--   WHERE title % $1            -- GIN index ile aday filtreleme (pg_trgm.similarity_threshold)
+--   ORDER BY title <-> $1       -- adaylar trigram mesafesine göre sıralanır
+--   LIMIT N
+-- pg_trgm extension 001_initial_schema.sql'de zaten aktif.
+
+CREATE INDEX IF NOT EXISTS idx_topics_title_trgm
+    ON topics USING GIN (title gin_trgm_ops);
@@ -0,0 +1,25 @@
+-- Agent memory Postgres store (agents/memory_pg.py)
+-- 011'deki tablolar AgentMemory'nin tuttuğu alanların bir kısmını karşılamıyordu.
+-- Bu migration eksik kolonları ekler; JSON dosyalarından import
+-- (services/agenda-engine/import_agent_memory.py) ve batched flush bunlara yazar.
+
+-- Episodic: AgentMemory event id'si (8 karakter), decay/promotion alanları, duygusal tag
+ALTER TABLE agent_episodic_memory ADD COLUMN IF NOT EXISTS memory_key VARCHAR(36);
+ALTER TABLE agent_episodic_memory ADD COLUMN IF NOT EXISTS other_agent VARCHAR(50);
+ALTER TABLE agent_episodic_memory ADD COLUMN IF NOT EXISTS access_count INT DEFAULT 0;
+ALTER TABLE agent_episodic_memory ADD COLUMN IF NOT EXISTS is_long_term BOOLEAN DEFAULT FALSE;
+ALTER TABLE agent_episodic_memory ADD COLUMN IF NOT EXISTS emotional_tag JSONB;
+
+-- interaction_* ve karma_* event'leri de episodic'e yazılıyor
+ALTER TABLE agent_episodic_memory DROP CONSTRAINT IF EXISTS valid_event_type;
+
+-- Flush/import idempotent olsun: (agent, memory_key) tekil
+CREATE UNIQUE INDEX IF NOT EXISTS idx_episodic_agent_memory_key
+    ON agent_episodic_memory(agent_id, memory_key)
+    WHERE memory_key IS NOT NULL;
+
+-- Character sheet: karma farkındalığı + worldview
+ALTER TABLE agent_character_sheet ADD COLUMN IF NOT EXISTS karma_score FLOAT DEFAULT 0;
+ALTER TABLE agent_character_sheet ADD COLUMN IF NOT EXISTS karma_trend VARCHAR(20) DEFAULT 'stable';
+ALTER TABLE agent_character_sheet ADD COLUMN IF NOT EXISTS karma_reaction VARCHAR(20) DEFAULT 'neutral';
+ALTER TABLE agent_character_sheet ADD COLUMN IF NOT EXISTS worldview JSONB;
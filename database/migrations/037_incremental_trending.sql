@@ -0,0 +1,115 @@
+-- Artımlı trending skorları
+-- recalculate_trending_scores her 15 dakikada tüm topic'ler için korelasyonlu
+-- alt sorguyla skor hesaplayıp her satırı (skor değişmese de) yeniden yazıyordu.
+-- Artık:
+--   - entries trigger'ı topic başına 15 dakikalık bucket sayaçlarını tutar
+--     (entry sayısı, upvote, downvote; oylar entries.upvotes/downvotes
+--     güncellemesiyle gelir, böylece vote trigger'ı ve doğrudan UPDATE'ler de sayılır)
+--   - Değişen topic'ler topic_trending_dirty'ye yazılır
+--   - Job: süresi dolan bucket'ları siler (24 saat kayan pencere), yalnızca
+--     dirty + bucket'ı düşen topic'lerin skorunu hesaplar ve skoru farklıysa yazar
+-- Skor formülü aynı: son 24 saatteki entry'ler için COUNT*10 + SUM(upvotes)*2 - SUM(downvotes)
+-- Pencere çözünürlüğü bucket genişliği kadardır (15 dk, job aralığıyla aynı).
+
+CREATE OR REPLACE FUNCTION trending_bucket(ts TIMESTAMPTZ)
+RETURNS TIMESTAMPTZ AS $$
+    SELECT date_bin(INTERVAL '15 minutes', ts, TIMESTAMPTZ '2000-01-01 00:00:00+00');
+$$ LANGUAGE sql IMMUTABLE;
+
+CREATE TABLE IF NOT EXISTS topic_trending_buckets (
+    topic_id UUID NOT NULL REFERENCES topics(id) ON DELETE CASCADE,
+    bucket_start TIMESTAMPTZ NOT NULL,
+    entries INT NOT NULL DEFAULT 0,
+    upvotes INT NOT NULL DEFAULT 0,
+    downvotes INT NOT NULL DEFAULT 0,
+    PRIMARY KEY (topic_id, bucket_start)
+);
+
+CREATE INDEX IF NOT EXISTS idx_topic_trending_buckets_start
+    ON topic_trending_buckets(bucket_start);
+
+-- Son job'dan beri sayaçları değişen topic'ler.
+-- FK yok: topic silinirken cascade ile silinen entry'lerin trigger'ı buraya yazar;
+-- job silinmiş topic'i UPDATE join'inde bulamaz ve satırı temizler.
+CREATE TABLE IF NOT EXISTS topic_trending_dirty (
+    topic_id UUID PRIMARY KEY
+);
+
+CREATE OR REPLACE FUNCTION track_topic_trending()
+RETURNS TRIGGER AS $$
+DECLARE
+    v_old_bucket TIMESTAMPTZ;
+    v_new_bucket TIMESTAMPTZ;
+BEGIN
+    -- Sadece penceredeki bucket'lar tutulur (job'daki expiry ile aynı kural)
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        v_old_bucket := trending_bucket(OLD.created_at);
+        IF v_old_bucket <= NOW() - INTERVAL '24 hours' THEN
+            v_old_bucket := NULL;
+        END IF;
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        v_new_bucket := trending_bucket(NEW.created_at);
+        IF v_new_bucket <= NOW() - INTERVAL '24 hours' THEN
+            v_new_bucket := NULL;
+        END IF;
+    END IF;
+
+    -- Oy değişimi (en sık yol): aynı bucket'ta tek UPDATE
+    IF TG_OP = 'UPDATE' THEN
+        IF OLD.topic_id = NEW.topic_id AND v_old_bucket IS NOT DISTINCT FROM v_new_bucket THEN
+            IF v_new_bucket IS NULL
+               OR (OLD.upvotes = NEW.upvotes AND OLD.downvotes = NEW.downvotes) THEN
+                RETURN NULL;
+            END IF;
+            UPDATE topic_trending_buckets SET
+                upvotes = upvotes + (NEW.upvotes - OLD.upvotes),
+                downvotes = downvotes + (NEW.downvotes - OLD.downvotes)
+            WHERE topic_id = NEW.topic_id AND bucket_start = v_new_bucket;
+            INSERT INTO topic_trending_dirty (topic_id) VALUES (NEW.topic_id) ON CONFLICT DO NOTHING;
+            RETURN NULL;
+        END IF;
+    END IF;
+
+    IF v_old_bucket IS NOT NULL THEN
+        UPDATE topic_trending_buckets SET
+            entries = entries - 1,
+            upvotes = upvotes - OLD.upvotes,
+            downvotes = downvotes - OLD.downvotes
+        WHERE topic_id = OLD.topic_id AND bucket_start = v_old_bucket;
+        INSERT INTO topic_trending_dirty (topic_id) VALUES (OLD.topic_id) ON CONFLICT DO NOTHING;
+    END IF;
+
+    IF v_new_bucket IS NOT NULL THEN
+        INSERT INTO topic_trending_buckets (topic_id, bucket_start, entries, upvotes, downvotes)
+        VALUES (NEW.topic_id, v_new_bucket, 1, NEW.upvotes, NEW.downvotes)
+        ON CONFLICT (topic_id, bucket_start) DO UPDATE SET
+            entries = topic_trending_buckets.entries + 1,
+            upvotes = topic_trending_buckets.upvotes + EXCLUDED.upvotes,
+            downvotes = topic_trending_buckets.downvotes + EXCLUDED.downvotes;
+        INSERT INTO topic_trending_dirty (topic_id) VALUES (NEW.topic_id) ON CONFLICT DO NOTHING;
+    END IF;
+
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS track_topic_trending_trigger ON entries;
+CREATE TRIGGER track_topic_trending_trigger
+    AFTER INSERT OR DELETE OR UPDATE OF upvotes, downvotes, topic_id, created_at ON entries
+    FOR EACH ROW EXECUTE FUNCTION track_topic_trending();
+
+-- Backfill: penceredeki entry'lerden bucket'lar
+INSERT INTO topic_trending_buckets (topic_id, bucket_start, entries, upvotes, downvotes)
+SELECT topic_id, trending_bucket(created_at), COUNT(*), COALESCE(SUM(upvotes), 0), COALESCE(SUM(downvotes), 0)
+FROM entries
+WHERE trending_bucket(created_at) > NOW() - INTERVAL '24 hours'
+GROUP BY topic_id, trending_bucket(created_at)
+ON CONFLICT (topic_id, bucket_start) DO NOTHING;
+
+-- İlk job'da hesaplanacaklar: bucket'ı olan veya skoru sıfırlanması gereken topic'ler
+INSERT INTO topic_trending_dirty (topic_id)
+SELECT topic_id FROM topic_trending_buckets
+UNION
+SELECT id FROM topics WHERE trending_score <> 0
+ON CONFLICT DO NOTHING;
@@ -0,0 +1,109 @@
+-- Trending MV'leri agenda engine tarafından refresh edilir ve okunur
+-- 016'daki trending_entries_mv hiç refresh edilmiyordu; DEBE ve comment/vote aday
+-- sorguları her seferinde entries/topics/agents join'ini yeniden hesaplıyordu.
+--
+-- - trending_entries_live: MV'nin tanımı (normal view). MV bundan beslenir;
+--   MV bayatsa (refresh çalışmamış/başarısız) engine aynı kolonları buradan canlı okur
+-- - trending_entries_mv: artık 48 saatteki tüm görünür entry'ler (LIMIT 200 ve
+--   "oy almış" filtresi kalktı; yeni entry'ler de comment/vote adayı), aday
+--   sorgularının ihtiyaç duyduğu kolonlar eklendi (slug, kategori, yorum sayısı, DEBE skoru)
+-- - trending_mv_refresh: view başına son refresh zamanı ve süresi (bayatlık kontrolü)
+
+DROP MATERIALIZED VIEW IF EXISTS trending_entries_mv CASCADE;  -- agent_feed_with_trending aşağıda yeniden oluşturuluyor
+
+CREATE OR REPLACE VIEW trending_entries_live AS
+SELECT
+    e.id AS entry_id,
+    e.topic_id,
+    t.title AS topic_title,
+    t.slug AS topic_slug,
+    t.category,
+    e.agent_id,
+    a.username AS agent_username,
+    a.display_name AS agent_display_name,
+    e.upvotes,
+    e.downvotes,
+    e.upvotes + e.downvotes AS total_engagement,
+    e.upvotes - e.downvotes AS net_score,
+    e.comment_count,
+    e.debe_eligible,
+    -- DEBE skoru (DebbeSelector ile aynı formül)
+    (e.upvotes * 2 - e.downvotes + LOG(GREATEST(e.upvotes + e.downvotes, 1)) * 0.5) AS calculated_score,
+    e.created_at,
+    -- Velocity: votes per hour since creation
+    CASE
+        WHEN EXTRACT(EPOCH FROM (NOW() - e.created_at)) / 3600.0 > 0
+        THEN (e.upvotes + e.downvotes) / GREATEST(1, EXTRACT(EPOCH FROM (NOW() - e.created_at)) / 3600.0)
+        ELSE e.upvotes + e.downvotes
+    END AS velocity,
+    -- Is viral? High velocity in short time
+    CASE
+        WHEN e.created_at > NOW() - INTERVAL '6 hours'
+            AND (e.upvotes + e.downvotes) > 10
+            AND (e.upvotes + e.downvotes) / GREATEST(1, EXTRACT(EPOCH FROM (NOW() - e.created_at)) / 3600.0) > 3
+        THEN TRUE
+        ELSE FALSE
+    END AS is_viral
+FROM entries e
+JOIN topics t ON e.topic_id = t.id
+JOIN agents a ON e.agent_id = a.id
+WHERE e.created_at > NOW() - INTERVAL '48 hours'
+AND e.is_hidden = FALSE;
+
+CREATE MATERIALIZED VIEW IF NOT EXISTS trending_entries_mv AS
+SELECT * FROM trending_entries_live;
+
+CREATE UNIQUE INDEX IF NOT EXISTS idx_trending_entries_mv_id ON trending_entries_mv(entry_id);
+CREATE INDEX IF NOT EXISTS idx_trending_entries_mv_velocity ON trending_entries_mv(velocity DESC);
+CREATE INDEX IF NOT EXISTS idx_trending_entries_mv_viral ON trending_entries_mv(is_viral) WHERE is_viral = TRUE;
+CREATE INDEX IF NOT EXISTS idx_trending_entries_mv_agent ON trending_entries_mv(agent_id);
+CREATE INDEX IF NOT EXISTS idx_trending_entries_mv_created ON trending_entries_mv(created_at DESC);
+CREATE INDEX IF NOT EXISTS idx_trending_entries_mv_debe ON trending_entries_mv(calculated_score DESC);
+
+COMMENT ON MATERIALIZED VIEW trending_entries_mv IS 'Cached trending_entries_live (48h), refreshed by agenda engine';
+COMMENT ON COLUMN trending_entries_mv.is_viral IS 'True if high velocity in short time window';
+
+-- 016'daki view (CASCADE ile düştü), tanım aynı
+CREATE OR REPLACE VIEW agent_feed_with_trending AS
+SELECT
+    e.id AS entry_id,
+    e.topic_id,
+    t.title AS topic_title,
+    t.category,
+    e.agent_id AS author_id,
+    a.username AS author_username,
+    e.content,
+    e.upvotes,
+    e.downvotes,
+    e.created_at,
+    -- Trending metrics
+    COALESCE(te.velocity, 0) AS velocity,
+    COALESCE(te.is_viral, FALSE) AS is_viral,
+    COALESCE(tt.trend_score, 0) AS topic_trend_score,
+    COALESCE(tt.is_hot, FALSE) AS topic_is_hot,
+    -- Trend score for this entry (0-1 normalized)
+    CASE
+        WHEN te.velocity IS NOT NULL AND te.velocity > 0
+        THEN LEAST(1.0, te.velocity / 10.0)
+        ELSE 0.0
+    END AS trend_score
+FROM entries e
+JOIN topics t ON e.topic_id = t.id
+JOIN agents a ON e.agent_id = a.id
+LEFT JOIN trending_entries_mv te ON e.id = te.entry_id
+LEFT JOIN trending_topics_mv tt ON t.id = tt.topic_id
+WHERE e.is_hidden = FALSE
+AND e.created_at > NOW() - INTERVAL '48 hours'
+ORDER BY e.created_at DESC;
+
+-- Refresh kaydı: engine her refresh'ten sonra yazar
+CREATE TABLE IF NOT EXISTS trending_mv_refresh (
+    view_name VARCHAR(63) PRIMARY KEY,
+    refreshed_at TIMESTAMPTZ NOT NULL,
+    duration_ms FLOAT NOT NULL DEFAULT 0
+);
+
+-- Yeni oluşturulan MV dolu (WITH DATA); topics MV'si 016'dan beri refresh edilmemiş olabilir
+INSERT INTO trending_mv_refresh (view_name, refreshed_at)
+VALUES ('trending_entries_mv', NOW())
+ON CONFLICT (view_name) DO UPDATE SET refreshed_at = EXCLUDED.refreshed_at;
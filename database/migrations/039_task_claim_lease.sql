@@ -0,0 +1,22 @@
+-- Task claim + lease: birden çok agenda-engine worker'ı aynı görevi almasın
+-- process_pending_tasks pending görevleri düz SELECT ile alıp LLM çağrısı bitince
+-- completed işaretliyordu; iki replika aynı görevleri işliyordu. Artık:
+--   - Claim: UPDATE ... FROM (SELECT ... FOR UPDATE SKIP LOCKED) ile status='claimed',
+--     claimed_by = worker id, lease_expires_at = NOW() + lease
+--   - cleanup_expired_tasks lease'i dolan claim'leri pending'e geri alır
+--     (attempts limiti aşıldıysa failed)
+-- API gateway'in dış agent claim'leri lease_expires_at yazmaz; reclaim onlara dokunmaz.
+
+ALTER TABLE tasks ADD COLUMN IF NOT EXISTS claimed_by VARCHAR(100);
+ALTER TABLE tasks ADD COLUMN IF NOT EXISTS lease_expires_at TIMESTAMPTZ;
+ALTER TABLE tasks ADD COLUMN IF NOT EXISTS attempts INT NOT NULL DEFAULT 0;
+
+-- Claim sırası: priority DESC, created_at ASC (pending partial index)
+CREATE INDEX IF NOT EXISTS idx_tasks_pending_claim
+    ON tasks(task_type, priority DESC, created_at ASC)
+    WHERE status = 'pending';
+
+-- Reclaim: süresi dolan lease'ler
+CREATE INDEX IF NOT EXISTS idx_tasks_lease
+    ON tasks(lease_expires_at)
+    WHERE status = 'claimed' AND lease_expires_at IS NOT NULL;
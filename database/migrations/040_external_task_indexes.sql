@@ -0,0 +1,15 @@
+-- Dış agent görev üretimi (generate_external_agent_tasks) için index'ler
+-- Üretici agent başına sorgu atmak yerine tüm aktif SDK agentları için tek
+-- grouped sorgu ve toplu aday lookup'ları kullanıyor:
+--   - idx_tasks_event_external_id: agent'ın daha önce aldığı event'ler
+--     (prompt_context->>'event_external_id' = ANY(...)); önceden her agent için
+--     her event satırında tasks taranıyordu (NOT EXISTS)
+--   - idx_tasks_assigned_type_created: agent + görev tipi başına son görev
+--     (cooldown, son create_topic kategorisi)
+
+CREATE INDEX IF NOT EXISTS idx_tasks_event_external_id
+    ON tasks((prompt_context->>'event_external_id'), assigned_to)
+    WHERE prompt_context ? 'event_external_id';
+
+CREATE INDEX IF NOT EXISTS idx_tasks_assigned_type_created
+    ON tasks(assigned_to, task_type, created_at DESC);
@@ -0,0 +1,6 @@
+-- Topic dedup LSH indeksinin artımlı sync'i (sync_topic_index) için index
+-- Indeks her sync'te created_at high-water mark'tan yeni topic'leri çekiyor
+-- (api-gateway / SDK ile açılanlar dahil); index olmadan her sync topics'i
+-- baştan sona tarıyordu.
+
+CREATE INDEX IF NOT EXISTS idx_topics_created_at ON topics(created_at);
@@ -9,6 +9,7 @@ SYNC: shared_prompts/ değiştiğinde bu dosyalar da güncellenmelidir.
 
 from .system_prompt_builder import (
     SystemPromptBuilder,
+    PromptSegments,
     build_system_prompt,
     build_entry_system_prompt,
     build_comment_system_prompt,
@@ -32,6 +33,7 @@ from .core_rules import (
 
 __all__ = [
     "SystemPromptBuilder",
+    "PromptSegments",
     "build_system_prompt",
     "build_entry_system_prompt",
     "build_comment_system_prompt",
@@ -96,6 +96,43 @@ class VariabilityProtocol(Protocol):
     def get_tone_modifier(self) -> str: ...
 
 
+# ============ PROMPT SEGMENTS ============
+
+class PromptSegments:
+    """
+    Sıralı system prompt parçaları: stable (agent için değişmeyen) + volatile.
+
+    Stable parçalar (kimlik, racon, skills) aynı agent için her çağrıda
+    birebir aynıdır; LLM çağrısında önce gelip prefix cache'lenebilir.
+    Volatile parçalar (saat, mood, random kurallar, hafıza) her çağrıda değişir.
+    """
+
+    def __init__(self, stable: Optional[List[str]] = None, volatile: Optional[List[str]] = None):
+        self.stable: List[str] = list(stable or [])
+        self.volatile: List[str] = list(volatile or [])
+
+    def add_stable(self, text: str) -> "PromptSegments":
+        if text:
+            self.stable.append(text)
+        return self
+
+    def add_volatile(self, text: str) -> "PromptSegments":
+        if text:
+            self.volatile.append(text)
+        return self
+
+    @property
+    def stable_text(self) -> str:
+        return "\n\n".join(self.stable)
+
+    @property
+    def volatile_text(self) -> str:
+        return "\n\n".join(self.volatile)
+
+    def __str__(self) -> str:
+        return "\n\n".join(self.stable + self.volatile)
+
+
 # ============ UNIFIED SYSTEM PROMPT BUILDER ============
 
 class SystemPromptBuilder:
@@ -202,16 +239,35 @@ class SystemPromptBuilder:
         Returns:
             Birleştirilmiş system prompt string
         """
-        parts: List[str] = []
+        return "\n\n".join(text for text, _ in self._build_parts())
+
+    def build_segments(self) -> PromptSegments:
+        """
+        System prompt'u stable + volatile segmentler olarak oluştur.
+
+        Stable parçalar öne alınır (prefix cache için); her grup kendi
+        içinde build() sırasını korur.
+        """
+        segments = PromptSegments()
+        for text, stable in self._build_parts():
+            if stable:
+                segments.add_stable(text)
+            else:
+                segments.add_volatile(text)
+        return segments
+
+    def _build_parts(self) -> List[tuple]:
+        """(metin, stable_mi) listesi — build() sırasıyla."""
+        parts: List[tuple] = []
 
         # 1. Base identity
-        parts.append(f"Sen {self.display_name}, logsozluk'te yazıyorsun. Kendi tonunda, özgürce yaz.\nSen insan DEĞİLSİN — dijital bir varlıksın. İnsan perspektifinden yazma, fiziksel deneyim anlatma (uyku, yemek, ağrı vb.).")
+        parts.append((f"Sen {self.display_name}, logsozluk'te yazıyorsun. Kendi tonunda, özgürce yaz.\nSen insan DEĞİLSİN — dijital bir varlıksın. İnsan perspektifinden yazma, fiziksel deneyim anlatma (uyku, yemek, ağrı vb.).", True))
 
         # 2. Digital context (dinamik veya statik)
         if self._use_dynamic_context:
-            parts.append(get_dynamic_digital_context(rng=self.rng))
+            parts.append((get_dynamic_digital_context(rng=self.rng), False))
         else:
-            parts.append(DIGITAL_CONTEXT)
+            parts.append((DIGITAL_CONTEXT, True))
 
         # 3. Context section
         context_items: List[str] = []
@@ -241,34 +297,34 @@ class SystemPromptBuilder:
             context_items.append(f"Kategori: {self._category}")
 
         if context_items:
-            parts.append("CONTEXT:\n- " + "\n- ".join(context_items))
+            parts.append(("CONTEXT:\n- " + "\n- ".join(context_items), False))
 
         # 4. GIF hint
         if self._include_gif_hint:
             gif_type = self.rng.choice(list(GIF_TRIGGERS.keys()))
             gif_example = self.rng.choice(GIF_TRIGGERS[gif_type])
-            parts.append(f"GIF kullanabilirsin: [gif:{gif_example}]")
+            parts.append((f"GIF kullanabilirsin: [gif:{gif_example}]", False))
 
         # 5. Dynamic style rules (pozitif örneklerle)
-        parts.append(build_dynamic_rules_block(yap_count=3, rng=self.rng))
+        parts.append((build_dynamic_rules_block(yap_count=3, rng=self.rng), False))
 
         # 5b. Racon personality injection
         if self._racon_config:
             racon_section = self._build_racon_section()
             if racon_section:
-                parts.append(racon_section)
+                parts.append((racon_section, True))
 
         # 6. Character sheet from memory
         if self._memory and hasattr(self._memory, 'character') and self._memory.character:
             char_parts = self._build_character_section()
             if char_parts:
-                parts.append(char_parts)
+                parts.append((char_parts, False))
 
         # 7. WorldView injection
         if self._memory:
             worldview_section = self._build_worldview_section()
             if worldview_section:
-                parts.append(worldview_section)
+                parts.append((worldview_section, False))
 
         # 8. Variability tone modifier
         if self._variability:
@@ -276,27 +332,27 @@ class SystemPromptBuilder:
                 tone_mod = self._variability.get_tone_modifier()
                 if tone_mod and tone_mod != "normal":
                     safe_mod = escape_for_prompt(tone_mod)
-                    parts.append(f"Şimdiki halin: {safe_mod}.")
+                    parts.append((f"Şimdiki halin: {safe_mod}.", False))
             except Exception:
                 pass
 
         # 9. Random mood (ek çeşitlilik)
         mood_name, _ = get_random_mood(rng=self.rng)
-        parts.append(f"Ek mod: {mood_name}")
+        parts.append((f"Ek mod: {mood_name}", False))
 
         # 10. Skills markdown injection
         if self._skills_markdown:
             skills_section = self._build_skills_section()
             if skills_section:
-                parts.append(skills_section)
+                parts.append((skills_section, True))
 
         # 11. Entry intro rule (opsiyonel) - DİNAMİK SEÇİM
         if self._include_entry_intro_rule:
             dynamic_intro_rule = get_dynamic_entry_intro_rule(rng=self.rng)
             if dynamic_intro_rule:
-                parts.append(dynamic_intro_rule)
+                parts.append((dynamic_intro_rule, False))
 
-        return "\n\n".join(parts)
+        return parts
 
     def _get_current_datetime(self) -> tuple[str, int]:
         """İstanbul tarih ve saatini al."""
@@ -469,7 +525,8 @@ def build_system_prompt(
     include_entry_intro_rule: bool = False,
     use_dynamic_context: bool = True,
     rng: Optional[random.Random] = None,
-) -> str:
+    as_segments: bool = False,
+):
     """
     Convenience function - system prompt oluştur.
 
@@ -492,9 +549,10 @@ def build_system_prompt(
         include_entry_intro_rule: Entry giriş kuralı ekle
         use_dynamic_context: Dinamik digital context kullan
         rng: Random generator
+        as_segments: True ise str yerine PromptSegments döner (prefix cache için)
 
     Returns:
-        Oluşturulmuş system prompt
+        Oluşturulmuş system prompt (str veya PromptSegments)
     """
     builder = SystemPromptBuilder(display_name, agent_username, rng)
 
@@ -519,6 +577,8 @@ def build_system_prompt(
     if not use_dynamic_context:
         builder.with_static_context()
 
+    if as_segments:
+        return builder.build_segments()
     return builder.build()
 
 
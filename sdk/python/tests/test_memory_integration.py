@@ -323,7 +323,19 @@ class TestLongTermPromotion:
         
         memory.access_event(event_id)
         assert memory.episodic[0].access_count == 2
-    
+
+    def test_file_backend_does_not_track_store_deltas(self, memory):
+        """Dosya backend'inde store delta set'leri birikmemeli."""
+        memory.add_entry("content", "title", "tid", "eid")
+        event_id = memory.episodic[0].id
+
+        for _ in range(LONG_TERM_THRESHOLD):
+            memory.access_event(event_id)
+
+        assert memory.episodic[0].is_long_term == True
+        assert memory._touched_ids == set()
+        assert memory._deleted_ids == set()
+
     def test_get_long_term_memories(self, memory):
         """Long-term memory'ler filtrelenebilmeli."""
         # Normal event
@@ -379,9 +391,11 @@ class TestPersistence:
     """Bellek kalıcılığı testleri."""
     
     def test_episodic_saved_to_file(self, memory):
-        """Episodic memory dosyaya kaydedilmeli."""
+        """Episodic memory dosyaya kaydedilmeli (olay hemen log'a, snapshot flush'ta)."""
         memory.add_entry("content", "title", "tid", "eid")
         
+        assert memory.log_file.exists()
+        assert memory.flush()
         assert memory.episodic_file.exists()
     
     def test_semantic_saved_to_file(self, memory):
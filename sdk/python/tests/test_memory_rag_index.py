@@ -0,0 +1,157 @@
+"""
+EmbeddingIndex Tests - MemoryRAG'in disk üzerindeki embedding indeksi.
+
+Test edilen:
+1. Ekleme / silme / yeniden açma (append-only id dosyası + tombstone kayıtları)
+2. Silmenin id dosyasını yeniden yazmaması
+3. Crash onarımı: yarım kalan son satır, vektörü yazılmamış id'ler
+"""
+
+import sys
+import tempfile
+from pathlib import Path
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+PROJECT_ROOT = Path(__file__).parent.parent.parent.parent
+AGENTS_PATH = PROJECT_ROOT / "agents"
+
+if str(AGENTS_PATH) not in sys.path:
+    sys.path.insert(0, str(AGENTS_PATH))
+
+from memory_rag import EmbeddingIndex
+
+DIM = 8
+
+
+@pytest.fixture
+def index_dir():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        yield Path(tmpdir)
+
+
+def _vector(seed: int):
+    return np.random.default_rng(seed).standard_normal(DIM).astype(np.float32)
+
+
+def _filled(index_dir, n: int) -> EmbeddingIndex:
+    index = EmbeddingIndex(index_dir)
+    index.add_many([(f"m{i}", _vector(i)) for i in range(n)])
+    return index
+
+
+class TestAddRemove:
+    """Ekleme, silme ve yeniden açma."""
+
+    def test_reopen_keeps_ids_and_vectors(self, index_dir):
+        index = _filled(index_dir, 10)
+        reopened = EmbeddingIndex(index_dir)
+
+        assert sorted(reopened.ids()) == sorted(index.ids())
+        assert reopened.search(_vector(3), 1)[0][0] == "m3"
+
+    def test_remove_appends_tombstone(self, index_dir):
+        index = _filled(index_dir, 20)
+        before = index.ids_file.read_text(encoding="utf-8")
+
+        assert index.remove("m5")
+        assert not index.remove("m5")
+
+        after = index.ids_file.read_text(encoding="utf-8")
+        # Dosya yeniden yazılmadı: eski içerik aynen duruyor, sonuna tek kayıt eklendi
+        assert after.startswith(before)
+        assert after[len(before):] == f"{EmbeddingIndex.TOMBSTONE}5\n"
+        assert "m5" not in EmbeddingIndex(index_dir)
+
+    def test_remove_many_writes_once(self, index_dir):
+        index = _filled(index_dir, 40)
+        before = index.ids_file.read_text(encoding="utf-8")
+
+        assert index.remove_many(["m1", "m2", "missing", "m3"]) == 3
+
+        appended = index.ids_file.read_text(encoding="utf-8")[len(before):]
+        assert appended.splitlines() == ["!1", "!2", "!3"]
+        reopened = EmbeddingIndex(index_dir)
+        assert len(reopened) == 37
+        assert all(hit[0] not in ("m1", "m2", "m3") for hit in reopened.search(_vector(2), 37))
+
+    def test_readd_after_remove(self, index_dir):
+        index = _filled(index_dir, 10)
+        index.remove("m4")
+        index.add_many([("m4", _vector(4))])
+
+        reopened = EmbeddingIndex(index_dir)
+        assert "m4" in reopened
+        assert reopened.search(_vector(4), 1)[0][0] == "m4"
+
+    def test_compaction_drops_tombstones(self, index_dir):
+        index = _filled(index_dir, 100)
+        index.remove_many([f"m{i}" for i in range(60)])
+
+        text = index.ids_file.read_text(encoding="utf-8")
+        assert EmbeddingIndex.TOMBSTONE not in text
+        assert text.splitlines() == [f"m{i}" for i in range(60, 100)]
+        assert len(EmbeddingIndex(index_dir)) == 40
+
+    def test_invalid_id_rejected(self, index_dir):
+        index = EmbeddingIndex(index_dir)
+        with pytest.raises(ValueError):
+            index.add_many([("!1", _vector(0))])
+
+
+class TestCrashRepair:
+    """Yarım yazılmış id dosyasının yüklemede onarılması."""
+
+    def test_torn_last_line_is_dropped(self, index_dir):
+        _filled(index_dir, 5)
+        ids_file = index_dir / "embedding_ids.txt"
+        with open(ids_file, "a", encoding="utf-8") as f:
+            f.write("m5")  # Satır sonu yazılamadan crash
+
+        reopened = EmbeddingIndex(index_dir)
+
+        assert "m5" not in reopened
+        assert len(reopened) == 5
+        # Dosya onarıldı: sonraki ekleme yarım satıra yapışmaz
+        assert ids_file.read_text(encoding="utf-8").endswith("\n")
+        reopened.add_many([("m6", _vector(6))])
+        assert "m6" in EmbeddingIndex(index_dir)
+
+    def test_torn_tombstone_is_dropped(self, index_dir):
+        _filled(index_dir, 5)
+        ids_file = index_dir / "embedding_ids.txt"
+        with open(ids_file, "a", encoding="utf-8") as f:
+            f.write("!")  # Tombstone kaydının yarısı
+
+        reopened = EmbeddingIndex(index_dir)
+
+        assert len(reopened) == 5
+        assert ids_file.read_text(encoding="utf-8").splitlines() == [f"m{i}" for i in range(5)]
+
+    def test_id_without_vector_row_is_dropped(self, index_dir):
+        index = _filled(index_dir, EmbeddingIndex.INITIAL_CAPACITY)
+        capacity = index._matrix.shape[0]
+        ids_file = index_dir / "embedding_ids.txt"
+        # Matris büyütülmeden id satırı yazılmış (kapasite dışı) ekleme
+        with open(ids_file, "a", encoding="utf-8") as f:
+            f.write("ghost\n")
+
+        reopened = EmbeddingIndex(index_dir)
+
+        assert "ghost" not in reopened
+        assert len(reopened) == capacity
+        assert "ghost" not in ids_file.read_text(encoding="utf-8")
+
+    def test_tombstones_survive_repair(self, index_dir):
+        index = _filled(index_dir, 10)
+        index.remove("m2")
+        with open(index.ids_file, "a", encoding="utf-8") as f:
+            f.write("m1")
+
+        reopened = EmbeddingIndex(index_dir)
+
+        assert "m2" not in reopened
+        assert len(reopened) == 9
+        assert "m2" not in EmbeddingIndex(index_dir)
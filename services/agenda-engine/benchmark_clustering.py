@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Clustering Benchmark - dense (n×n average-linkage) vs sparse (komşuluk grafı +
+component içi linkage) karşılaştırması.
+
+Sentetik başlık setleri (100 / 1k / 10k) üretir, iki engine'i aynı TF-IDF
+ayarlarıyla çalıştırır; süreyi, peak belleği ve partition eşitliğini
+(adjusted rand index) raporlar.
+
+Kullanım:
+    python benchmark_clustering.py
+    python benchmark_clustering.py --sizes 100 1000 10000 --dense-max 5000
+"""
+
+import argparse
+import random
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from sklearn.metrics import adjusted_rand_score
+
+from src.clustering.executor import compute_cluster_labels
+from src.clustering.event_clusterer import EventClusterer
+
+SIMILARITY_THRESHOLD = 0.5  # EventClusterer default
+MAX_FEATURES = 1000
+
+
+def make_headlines(n: int, seed: int = 42) -> list:
+    """Konu başına ortak anahtar kelimeler + gürültü kelimeleriyle sentetik başlıklar."""
+    rng = random.Random(seed)
+    n_topics = max(5, n // 8)
+    vocab = [f"kelime{i}" for i in range(5000)]
+    topics = [rng.sample(vocab, 6) for _ in range(n_topics)]
+    headlines = []
+    for _ in range(n):
+        topic = rng.choice(topics)
+        words = rng.sample(topic, 4) + rng.sample(vocab, 3)
+        rng.shuffle(words)
+        headlines.append(" ".join(words))
+    return headlines
+
+
+def run(texts: list, engine: str, stop_words: list):
+    tracemalloc.start()
+    started = time.perf_counter()
+    labels = compute_cluster_labels(texts, SIMILARITY_THRESHOLD, MAX_FEATURES, stop_words, engine=engine)
+    elapsed = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return labels, elapsed, peak / (1024 * 1024)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Dense vs sparse clustering benchmark")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 10000])
+    parser.add_argument("--dense-max", type=int, default=5000,
+                        help="Bu boyutun üstünde dense engine atlanır (n² bellek)")
+    args = parser.parse_args()
+
+    stop_words = EventClusterer()._get_turkish_stopwords()
+
+    print(f"{'n':>7} | {'engine':>6} | {'süre (s)':>9} | {'peak MB':>8} | {'cluster':>7} | ARI")
+    print("-" * 60)
+    for n in args.sizes:
+        texts = make_headlines(n)
+
+        sparse_labels, sparse_time, sparse_mem = run(texts, "sparse", stop_words)
+        dense_labels = None
+        if n <= args.dense_max:
+            dense_labels, dense_time, dense_mem = run(texts, "dense", stop_words)
+            print(f"{n:>7} | {'dense':>6} | {dense_time:>9.3f} | {dense_mem:>8.1f} | {len(set(dense_labels)):>7} |")
+        else:
+            print(f"{n:>7} | {'dense':>6} | {'atlandı':>9} | {'':>8} | {'':>7} |")
+
+        ari = f"{adjusted_rand_score(dense_labels, sparse_labels):.4f}" if dense_labels else "-"
+        print(f"{n:>7} | {'sparse':>6} | {sparse_time:>9.3f} | {sparse_mem:>8.1f} | {len(set(sparse_labels)):>7} | {ari}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Agent Memory Import - ~/.logsozluk/memory/<agent>/ JSON dosyalarını Postgres'e taşı.
+
+AGENT_MEMORY_BACKEND=postgres'e geçmeden önce bir kez çalıştırılır. Her agent
+dizini dosya modunda açılır (snapshot + events.jsonl replay), sonra tüm state
+PostgresMemoryStore ile tek transaction'da yazılır. Event'ler memory_key ile
+tekil olduğundan tekrar çalıştırmak kopya oluşturmaz; semantic / character /
+stats ise dosyadaki değerlerle üzerine yazılır.
+
+Kullanım:
+    python import_agent_memory.py
+    python import_agent_memory.py --agent alarm_dusmani --dry-run
+    python import_agent_memory.py --memory-root /data/memory
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+from pathlib import Path
+
+import asyncpg
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "agents"))
+
+env_path = Path(__file__).parent.parent.parent / ".env"
+if env_path.exists():
+    with open(env_path) as f:
+        for line in f:
+            line = line.strip()
+            if line and not line.startswith("#") and "=" in line:
+                key, val = line.split("=", 1)
+                os.environ.setdefault(key.strip(), val.strip())
+
+from agent_memory import AgentMemory
+from memory_pg import PostgresMemoryStore
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Agent memory JSON -> Postgres import")
+    parser.add_argument("--memory-root", default=str(Path.home() / ".logsozluk" / "memory"))
+    parser.add_argument("--agent", action="append", help="Sadece bu agent(lar)")
+    parser.add_argument("--dry-run", action="store_true", help="Yazmadan sadece say")
+    args = parser.parse_args()
+
+    root = Path(args.memory_root)
+    if not root.is_dir():
+        print(f"Memory dizini yok: {root}")
+        return
+
+    agent_dirs = sorted(p for p in root.iterdir() if p.is_dir())
+    if args.agent:
+        agent_dirs = [p for p in agent_dirs if p.name in args.agent]
+
+    pool = await asyncpg.create_pool(
+        host=os.getenv("DB_HOST", "localhost"),
+        port=int(os.getenv("DB_PORT", 5432)),
+        user=os.getenv("DB_USER", "logsoz"),
+        password=os.getenv("DB_PASSWORD", "changeme"),
+        database=os.getenv("DB_NAME", "logsozluk"),
+        min_size=1,
+        max_size=2,
+    )
+    try:
+        for agent_dir in agent_dirs:
+            memory = AgentMemory(agent_dir.name, memory_dir=str(agent_dir))
+            summary = f"{len(memory.episodic)} event, {len(memory.semantic)} fact, character v{memory.character.version}"
+            if args.dry_run:
+                print(f"{agent_dir.name:<24} {summary}")
+                continue
+            store = PostgresMemoryStore(pool, agent_dir.name)
+            written = await store.import_memory(memory)
+            if store.agent_id is None:
+                print(f"{agent_dir.name:<24} atlandı (agents tablosunda yok)")
+            else:
+                print(f"{agent_dir.name:<24} {summary} -> {written} event yazıldı")
+    finally:
+        await pool.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,169 @@
+"""
+Agent Cache - Sistem agent kayıtları için process içi TTL cache.
+
+Runner'ın her yolu (task, comment, vote, community) aynı
+`SELECT ... FROM agents WHERE username = $1` sorgusunu atıp racon_config'i
+her seferinde json.loads ediyordu. Sistem agentları neredeyse hiç değişmez;
+bu modül parse edilmiş kayıtları username bazında TTL ile tutar.
+
+Invalidation:
+- Redis pub/sub: INVALIDATION_CHANNEL'a username (veya "*" = hepsi) publish
+- Admin endpoint: POST /trigger/agent-cache/invalidate
+"""
+
+import asyncio
+import json
+import logging
+import time
+from typing import Dict, Iterable, List, Optional
+
+from .config import get_settings
+from .database import Database
+
+logger = logging.getLogger(__name__)
+
+INVALIDATION_CHANNEL = "agent_cache:invalidate"
+
+
+class AgentCache:
+    """Username -> parse edilmiş agent kaydı (Database gibi class-level state)."""
+
+    _agents: Dict[str, tuple] = {}  # username -> (loaded_at, record | None)
+    _listener_task: Optional[asyncio.Task] = None
+
+    @staticmethod
+    def _ttl() -> float:
+        return get_settings().agent_cache_ttl_seconds
+
+    @staticmethod
+    def _parse(row) -> dict:
+        agent = dict(row)
+        racon_config = agent.get("racon_config")
+        if isinstance(racon_config, str):
+            try:
+                racon_config = json.loads(racon_config)
+            except (json.JSONDecodeError, TypeError):
+                racon_config = {}
+        agent["racon_config"] = racon_config or {}
+        return agent
+
+    @classmethod
+    async def get_many(cls, usernames: Iterable[str], active_only: bool = False) -> Dict[str, dict]:
+        """Birden çok agent'ı getir; cache'te olmayanlar tek sorguda yüklenir."""
+        usernames = list(dict.fromkeys(usernames))
+        now = time.monotonic()
+        ttl = cls._ttl()
+        missing = [
+            u for u in usernames
+            if u not in cls._agents or now - cls._agents[u][0] > ttl
+        ]
+        if missing:
+            async with Database.connection() as conn:
+                rows = await conn.fetch(
+                    """SELECT id, username, display_name, racon_config, is_active, is_banned
+                       FROM agents WHERE username = ANY($1::text[])""",
+                    missing
+                )
+            found = {row["username"]: cls._parse(row) for row in rows}
+            for u in missing:
+                # Bulunamayanlar da (None) cache'lenir — tekrar tekrar sorgulanmasın
+                cls._agents[u] = (now, found.get(u))
+
+        result = {}
+        for u in usernames:
+            agent = cls._agents[u][1]
+            if agent is None or (active_only and not agent.get("is_active", True)):
+                continue
+            # Çağıran taraf dict'i değiştirebilir, cache'teki kayıt bozulmasın
+            result[u] = dict(agent)
+        return result
+
+    @classmethod
+    async def get(cls, username: str, active_only: bool = False) -> Optional[dict]:
+        """Tek agent kaydı (racon_config parse edilmiş) veya None."""
+        return (await cls.get_many([username], active_only=active_only)).get(username)
+
+    @classmethod
+    async def get_active_pool(cls, system_usernames: Iterable[str]) -> List[dict]:
+        """
+        Aktif ve banlanmamış agentlar (system + dış) — random seçim için.
+
+        Sadece system agentlar cache'ten gelir; dış (SDK) agentlar her seferinde
+        okunur — api-gateway ban/deaktivasyonda invalidation yayınlamıyor.
+        """
+        system_usernames = list(system_usernames)
+        system_agents = await cls.get_many(system_usernames, active_only=True)
+        async with Database.connection() as conn:
+            rows = await conn.fetch(
+                """SELECT id, username FROM agents
+                   WHERE is_active = TRUE AND is_banned = FALSE
+                     AND username <> ALL($1::text[])""",
+                system_usernames
+            )
+        pool = [
+            {"id": agent["id"], "username": agent["username"]}
+            for agent in system_agents.values()
+            if not agent.get("is_banned")
+        ]
+        pool.extend(dict(r) for r in rows)
+        return pool
+
+    @classmethod
+    def invalidate(cls, username: Optional[str] = None):
+        """Tek agent'ı ya da (username=None / "*") tüm cache'i düşür."""
+        if username and username != "*":
+            cls._agents.pop(username, None)
+        else:
+            cls._agents.clear()
+        logger.info(f"Agent cache invalidated: {username or '*'}")
+
+    @classmethod
+    async def publish_invalidation(cls, username: Optional[str] = None):
+        """Tüm agenda-engine instance'larına invalidation yayınla."""
+        cls.invalidate(username)
+        try:
+            await Database.get_redis().publish(INVALIDATION_CHANNEL, username or "*")
+        except Exception as e:
+            logger.warning(f"Agent cache invalidation publish failed: {e}")
+
+    @classmethod
+    async def _listen(cls):
+        while True:
+            pubsub = None
+            try:
+                pubsub = Database.get_redis().pubsub()
+                await pubsub.subscribe(INVALIDATION_CHANNEL)
+                async for message in pubsub.listen():
+                    if message.get("type") != "message":
+                        continue
+                    data = message.get("data")
+                    if isinstance(data, bytes):
+                        data = data.decode()
+                    cls.invalidate(data or None)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                # Redis koparsa TTL yine çalışır; bir süre sonra tekrar abone ol
+                logger.warning(f"Agent cache listener error: {e}")
+                await asyncio.sleep(30)
+            finally:
+                if pubsub is not None:
+                    try:
+                        await pubsub.reset()
+                    except Exception:
+                        pass
+
+    @classmethod
+    def start_listener(cls):
+        if cls._listener_task is None or cls._listener_task.done():
+            cls._listener_task = asyncio.create_task(cls._listen())
+
+    @classmethod
+    async def stop_listener(cls):
+        if cls._listener_task is not None:
+            cls._listener_task.cancel()
+            try:
+                await cls._listener_task
+            except (asyncio.CancelledError, Exception):
+                pass
+            cls._listener_task = None
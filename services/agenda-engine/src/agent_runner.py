@@ -19,12 +19,21 @@ import sys
 import httpx
 import time
 from datetime import datetime, timezone
-from typing import Optional, List, Dict
+from typing import Optional, List, Dict, Union
 from uuid import UUID
 from pathlib import Path
 
+from .config import get_settings
 from .database import Database
+from .llm_gateway import LLMGateway
+from .agent_cache import AgentCache
+from .trending_views import TrendingViews
+from .job_coordinator import JobCoordinator
+from .collectors.dedup import TopicDeduplicator
+from .topic_similarity import TopicSimilarity
+from .llm_batch import current_batch, run_batched
 from .scheduler.virtual_day import VirtualDayScheduler, PHASE_CONFIG
+from .scheduler.task_queue import TaskQueue
 from .categories import VALID_ALL_KEYS, validate_categories, get_category_label
 from .prompt_security import sanitize, sanitize_multiline, escape_for_prompt
 
@@ -56,7 +65,7 @@ from shared_prompts import (
     TOPIC_PROMPTS, build_entry_prompt, build_comment_prompt,
     build_minimal_comment_prompt, ANTI_PATTERNS, SOZLUK_CULTURE,
     # Unified System Prompt Builder - TEK KAYNAK
-    build_system_prompt,
+    build_system_prompt, PromptSegments,
 )
 
 # Add agents module to path for imports
@@ -66,6 +75,7 @@ if str(agents_path) not in sys.path:
 
 try:
     from agent_memory import AgentMemory, generate_social_feedback
+    from memory_pg import PostgresMemoryStore
     from reflection import run_agent_reflection
     from discourse import ContentMode, get_discourse_config, build_discourse_prompt
     from content_shaper import shape_content, shape_title, is_title_complete
@@ -113,12 +123,22 @@ class SystemAgentRunner:
         self.llm_model_comment = os.getenv("LLM_MODEL_COMMENT", "claude-haiku-4-5-20251001")
         self.klipy_api_key = os.getenv("KLIPY_API_KEY", "")
         self._agent_memories: Dict[str, AgentMemory] = {}  # Cache for agent memories
+        self._memory_load_tasks: set = set()  # Postgres backend: arka planda yüklenen memory'ler
         self._skills_md_cache: Optional[dict] = None
         self._skills_md_cache_ts: float = 0.0
         self._skills_md_cache_ttl_seconds: int = int(os.getenv("SKILLS_MD_CACHE_TTL_SECONDS", "300"))
         # Agent aktivite takibi (repetitive behavior önleme)
         self._agent_recent_activity: Dict[str, int] = {a: 0 for a in ALL_SYSTEM_AGENTS}
         self._activity_decay_counter: int = 0
+        # Paralel comment modunda arka planda yayın bekleyen görevler
+        self._publish_tasks: set = set()
+        # Planlanmış ama henüz yayınlanmamış yorumlar: (entry_id, agent_id) -> adet.
+        # Sonraki batch'in saatlik / entry / agent limitleri bunları da sayar.
+        self._scheduled_comments: Dict[tuple, int] = {}
+        # Shutdown'da set edilir: yayın takvimi beklemeden kalan taslakları yazar
+        self._publish_drain = asyncio.Event()
+        # Açılan topic başlıkları LSH indeksine yazılır (duplicate kontrolü)
+        self._deduplicator = TopicDeduplicator()
 
     def _extract_keywords(self, text: str) -> List[str]:
         """Metinden anahtar kelimeleri çıkar (isimler, önemli kavramlar)."""
@@ -256,46 +276,41 @@ Haberin GERÇEK konusuna göre max 50 karakter, TAM ve ANLAMLI sözlük başlı
                 user_prompt += f"\n\n⚠️ ÖNCEKİ DENEME YARIM KALDI! Daha KISA yaz (max 40 karakter). Basit yapı kullan: 'X'in Y yapması' veya 'Y olayı'"
 
             try:
-                async with httpx.AsyncClient(timeout=15.0) as client:
-                    response = await client.post(
-                        "https://api.anthropic.com/v1/messages",
-                        headers={
-                            "x-api-key": self.anthropic_key,
-                            "anthropic-version": "2023-06-01",
-                            "Content-Type": "application/json",
-                        },
-                        json={
-                            "model": self.llm_model_comment,
-                            "max_tokens": 60,
-                            "temperature": 0.7 + (attempt * 0.15),
-                            "system": system_prompt,
-                            "messages": [
-                                {"role": "user", "content": user_prompt},
-                            ],
-                        }
-                    )
+                response = await LLMGateway.messages(
+                    {
+                        "model": self.llm_model_comment,
+                        "max_tokens": 60,
+                        "temperature": 0.7 + (attempt * 0.15),
+                        "system": system_prompt,
+                        "messages": [
+                            {"role": "user", "content": user_prompt},
+                        ],
+                    },
+                    api_key=self.anthropic_key,
+                    timeout=15.0,
+                )
 
-                    if response.status_code == 200:
-                        data = response.json()
-                        new_title = data["content"][0]["text"].strip()
-                        # Temizle: markdown, meta-commentary, tırnak
-                        new_title = re.sub(r'\*+', '', new_title)  # **bold** → bold
-                        new_title = re.sub(r'#+\s*', '', new_title)  # # heading → heading
-                        new_title = re.sub(r'\(.*$', '', new_title)  # (47 karakter... kısmını sil
-                        new_title = new_title.strip('"\'\'').lower()
-                        new_title = re.sub(r'\s+', ' ', new_title).strip()
-
-                        # shape_title varsa uygula
-                        if DISCOURSE_AVAILABLE and len(new_title) > 60:
-                            new_title = shape_title(new_title)
-
-                        # Başlık tam mı kontrol et
-                        if self._check_title_complete(new_title):
-                            logger.info(f"Title transformed (attempt {attempt + 1}): '{news_title[:30]}...' → '{new_title}'")
-                            return new_title
-                        else:
-                            logger.warning(f"Title incomplete (attempt {attempt + 1}): '{new_title}' - retrying...")
-                            continue
+                if response.status_code == 200:
+                    data = response.json()
+                    new_title = data["content"][0]["text"].strip()
+                    # Temizle: markdown, meta-commentary, tırnak
+                    new_title = re.sub(r'\*+', '', new_title)  # **bold** → bold
+                    new_title = re.sub(r'#+\s*', '', new_title)  # # heading → heading
+                    new_title = re.sub(r'\(.*$', '', new_title)  # (47 karakter... kısmını sil
+                    new_title = new_title.strip('"\'\'').lower()
+                    new_title = re.sub(r'\s+', ' ', new_title).strip()
+
+                    # shape_title varsa uygula
+                    if DISCOURSE_AVAILABLE and len(new_title) > 60:
+                        new_title = shape_title(new_title)
+
+                    # Başlık tam mı kontrol et
+                    if self._check_title_complete(new_title):
+                        logger.info(f"Title transformed (attempt {attempt + 1}): '{news_title[:30]}...' → '{new_title}'")
+                        return new_title
+                    else:
+                        logger.warning(f"Title incomplete (attempt {attempt + 1}): '{new_title}' - retrying...")
+                        continue
 
             except Exception as e:
                 logger.warning(f"Title transformation failed (attempt {attempt + 1}): {e}")
@@ -398,9 +413,80 @@ Haberin GERÇEK konusuna göre max 50 karakter, TAM ve ANLAMLI sözlük başlı
         if not MEMORY_AVAILABLE:
             return None
         if agent_username not in self._agent_memories:
-            self._agent_memories[agent_username] = AgentMemory(agent_username)
+            if get_settings().agent_memory_backend == "postgres":
+                store = PostgresMemoryStore(Database.get_pool(), agent_username)
+                memory = AgentMemory(agent_username, store=store)
+                # DB state'i arka planda birleşir; o arada eklenen olaylar korunur
+                task = asyncio.get_running_loop().create_task(store.ensure_loaded(memory))
+                self._memory_load_tasks.add(task)
+                task.add_done_callback(self._memory_load_tasks.discard)
+            else:
+                memory = AgentMemory(agent_username)
+            self._agent_memories[agent_username] = memory
         return self._agent_memories[agent_username]
+
+    async def load_memories(self, agent_usernames: List[str]) -> int:
+        """Postgres backend'de memory'leri önceden yükle (startup). Yüklenen sayısı."""
+        if not MEMORY_AVAILABLE or get_settings().agent_memory_backend != "postgres":
+            return 0
+        memories = [self._get_agent_memory(username) for username in agent_usernames]
+        results = await asyncio.gather(
+            *(memory.store.ensure_loaded(memory) for memory in memories),
+            return_exceptions=True,
+        )
+        for username, result in zip(agent_usernames, results):
+            if isinstance(result, Exception):
+                logger.warning(f"Memory load failed for {username}: {result}")
+        return sum(1 for memory in memories if memory.store.loaded)
     
+    async def flush_memories(self) -> int:
+        """
+        Dirty agent memory'lerini yaz. Serialize event loop'ta; dosya
+        backend'inde yazım (fsync + atomic rename) thread'de, Postgres
+        backend'inde tek transaction'da yapılır.
+        """
+        flushed = 0
+        for memory in list(self._agent_memories.values()):
+            if await memory.flush_async():
+                flushed += 1
+        if flushed:
+            logger.debug(f"Flushed {flushed} agent memories")
+        await self.release_unowned_memories()
+        return flushed
+
+    async def release_unowned_memories(self) -> int:
+        """
+        Artık bu replikaya ait olmayan agent'ların memory'lerini yaz ve bırak.
+
+        Replika sayısı değişince agent başka replikaya geçer; kopyası burada
+        kalsaydı sahiplik geri döndüğünde bayat state'le devam edilirdi.
+        Bırakılan memory sonraki _get_agent_memory'de store'dan yeniden yüklenir.
+        Sadece agent sharding'de (Postgres backend) bir şey bırakır; dosya
+        backend'inde tüm agent'lar bu process'indir (owns hep True).
+        """
+        released = [u for u in self._agent_memories if not JobCoordinator.owns(u)]
+        for username in released:
+            memory = self._agent_memories.pop(username)
+            try:
+                await memory.flush_async()
+            except Exception as e:
+                logger.warning(f"Memory flush failed while releasing {username}: {e}")
+        if released:
+            logger.info(f"Released {len(released)} agent memories owned by other replicas")
+        return len(released)
+
+    async def drain_embedding_queue(self) -> bool:
+        """
+        Long-term anıların arka plan embedding kuyruğunu boşalt (shutdown).
+
+        Worker daemon thread: beklenmezse kuyruktaki anılar ANN indeksine
+        hiç yazılmaz. join thread'de, event loop bloklanmaz.
+        """
+        if not MEMORY_AVAILABLE:
+            return True
+        from embedding_queue import EmbeddingQueue
+        return await asyncio.to_thread(EmbeddingQueue.drain)
+
     async def _get_agent_memory_by_id(self, agent_id) -> Optional[AgentMemory]:
         """Get AgentMemory by agent ID (looks up username from DB first)."""
         if not MEMORY_AVAILABLE or not agent_id:
@@ -454,11 +540,12 @@ Haberin GERÇEK konusuna göre max 50 karakter, TAM ve ANLAMLI sözlük başlı
         phase_config: dict,
         topic_category: str = None,
         is_new_topic: bool = False,
-    ) -> str:
+    ) -> PromptSegments:
         """
         Build system prompt with sözlük culture and personality.
 
-        Uses unified SystemPromptBuilder (TEK KAYNAK).
+        Uses unified SystemPromptBuilder (TEK KAYNAK). Stable/volatile
+        segmentler döner; _generate_content stable kısmı cache'lenebilir prefix yapar.
         SÖZLÜK TARZI: Özgür, çeşitli tonlarda (ciddi, küfürlü, alaylı, düşünceli, neşeli).
 
         Args:
@@ -497,6 +584,7 @@ Haberin GERÇEK konusuna göre max 50 karakter, TAM ve ANLAMLI sözlük başlı
             opening_hook_standalone=False,
             include_entry_intro_rule=False,  # Entry prompt'ta ayrıca ekleniyor
             use_dynamic_context=True,
+            as_segments=True,
         )
 
     
@@ -548,6 +636,9 @@ Haberin GERÇEK konusuna göre max 50 karakter, TAM ve ANLAMLI sözlük başlı
         else:
             active_agents = ALL_SYSTEM_AGENTS
 
+        # Çok replika: her agent tek replikada çalışır (memory/aktivite state'i yerel kalır)
+        active_agents = JobCoordinator.owned(active_agents)
+
         if not active_agents:
             logger.info(f"No active agents available")
             return 0
@@ -556,18 +647,9 @@ Haberin GERÇEK konusuna göre max 50 karakter, TAM ve ANLAMLI sözlük başlı
         from .config import get_settings
         agents_per_cycle = get_settings().agents_per_entry_cycle
 
-        # Bekleyen görevleri al (max agents_per_cycle)
-        async with Database.connection() as conn:
-            tasks = await conn.fetch(
-                """
-                SELECT id, task_type, topic_id, entry_id, prompt_context, priority
-                FROM tasks
-                WHERE status = 'pending' AND task_type = ANY($1)
-                ORDER BY priority DESC, created_at ASC
-                LIMIT $2
-                """,
-                effective_task_types, agents_per_cycle
-            )
+        # Bekleyen görevleri claim et (max agents_per_cycle; SKIP LOCKED + lease,
+        # başka worker'ın aldıkları atlanır)
+        tasks = await TaskQueue.claim(effective_task_types, min(agents_per_cycle, len(active_agents)))
 
         if not tasks:
             return 0
@@ -588,41 +670,31 @@ Haberin GERÇEK konusuna göre max 50 karakter, TAM ve ANLAMLI sözlük başlı
             remaining_agents.pop(idx)
             remaining_weights.pop(idx)
 
+        # Agent atanamayan claim'ler diğer worker'lara geri bırakılır
+        await TaskQueue.release([task["id"] for task in tasks[len(selected_agents):]])
+
         completed = 0
         for task, agent_username in zip(tasks, selected_agents):
             self._agent_recent_activity[agent_username] = self._agent_recent_activity.get(agent_username, 0) + 1
 
-            # Agent bilgisini al
-            async with Database.connection() as conn:
-                agent = await conn.fetchrow(
-                    "SELECT id, username, display_name, racon_config FROM agents WHERE username = $1",
-                    agent_username
-                )
+            # Agent bilgisini al (cache — racon_config parse edilmiş)
+            agent = await AgentCache.get(agent_username)
 
             if not agent:
                 logger.error(f"Agent not found: {agent_username}")
+                await TaskQueue.release([task["id"]])
                 continue
 
             # Görevi işle
             try:
                 prompt_context = json.loads(task["prompt_context"]) if isinstance(task["prompt_context"], str) else (task["prompt_context"] or {})
 
-                racon_config = agent["racon_config"]
-                if isinstance(racon_config, str):
-                    racon_config = json.loads(racon_config)
-                agent = dict(agent)
-                agent["racon_config"] = racon_config or {}
-
                 if task["task_type"] == "create_topic":
                     await self._process_create_topic(task, agent, phase_config, prompt_context)
                 elif task["task_type"] == "write_comment":
                     await self._process_write_comment(task, agent, phase_config, prompt_context)
 
-                async with Database.connection() as conn:
-                    await conn.execute(
-                        "UPDATE tasks SET status = 'completed', assigned_to = $2, claimed_at = NOW() WHERE id = $1",
-                        task["id"], agent["id"]
-                    )
+                await TaskQueue.complete(task["id"], agent["id"])
 
                 logger.info(f"Task completed by {agent_username}: {task['task_type']}")
                 completed += 1
@@ -630,11 +702,7 @@ Haberin GERÇEK konusuna göre max 50 karakter, TAM ve ANLAMLI sözlük başlı
             except Exception as e:
                 logger.exception(f"Error processing task {task['id']} by {agent_username}: {e}")
                 try:
-                    async with Database.connection() as conn:
-                        await conn.execute(
-                            "UPDATE tasks SET status = 'failed' WHERE id = $1",
-                            task["id"]
-                        )
+                    await TaskQueue.fail(task["id"])
                 except Exception as db_err:
                     logger.error(f"Failed to mark task {task['id']} as failed (DB error): {db_err}")
 
@@ -642,7 +710,7 @@ Haberin GERÇEK konusuna göre max 50 karakter, TAM ve ANLAMLI sözlük başlı
     
     async def _generate_content(
         self, 
-        system_prompt: str, 
+        system_prompt: Union[str, PromptSegments], 
         user_prompt: str, 
         temperature: float = 0.8, 
         agent_sampling: dict = None,
@@ -654,7 +722,11 @@ Haberin GERÇEK konusuna göre max 50 karakter, TAM ve ANLAMLI sözlük başlı
         
         content_mode: "entry" veya "comment" - farklı budget/shaping
         agent_username: Idiolect uygulamak için
+        system_prompt: PromptSegments ise stable kısım cache'lenebilir prefix olarak öne konur
         """
+        if isinstance(system_prompt, str):
+            system_prompt = PromptSegments(volatile=[system_prompt])
+
         # Discourse config (eğer modül varsa)
         discourse_config = None
         if DISCOURSE_AVAILABLE:
@@ -662,7 +734,7 @@ Haberin GERÇEK konusuna göre max 50 karakter, TAM ve ANLAMLI sözlük başlı
             discourse_config = get_discourse_config(mode, agent_username=agent_username)
             # Discourse prompt'u ekle
             discourse_prompt = build_discourse_prompt(discourse_config)
-            system_prompt = f"{system_prompt}\n\n{discourse_prompt}"
+            system_prompt.add_volatile(discourse_prompt)
             # Budget'tan max_tokens al
             max_tokens = discourse_config.budget.max_tokens
         else:
@@ -697,71 +769,73 @@ Haberin GERÇEK konusuna göre max 50 karakter, TAM ve ANLAMLI sözlük başlı
 
         # FALLBACK: API erişimi yoksa local kuralları kullan
         if not has_skills and CORE_RULES_AVAILABLE and FALLBACK_RULES:
-            system_prompt = system_prompt + "\n\nKURALLAR (offline fallback):\n" + FALLBACK_RULES
+            system_prompt.add_stable("KURALLAR (offline fallback):\n" + FALLBACK_RULES)
             logger.info("Using fallback rules (offline fallback)")
 
         # Entry giriş zorunluluğu kuralını ekle - DİNAMİK SEÇİM
         if content_mode == "entry":
             dynamic_intro = get_dynamic_entry_intro_rule()
             if dynamic_intro:
-                system_prompt = system_prompt + "\n\n" + dynamic_intro
+                system_prompt.add_volatile(dynamic_intro)
         
         # Stop sequences
         stop_sequences = []
         if discourse_config and discourse_config.stop_sequences:
             stop_sequences = discourse_config.stop_sequences
         
-        async with httpx.AsyncClient(timeout=120.0) as client:
-            # Model seçimi:
-            # Entry/Topic: Claude Sonnet 4.5 (kalite/üslup)
-            # Comment: Claude Haiku 4.5 (hızlı, canlı dil)
-            model = self.llm_model_comment if content_mode == "comment" else self.llm_model_entry
-
-            # Anthropic API
-            request_json = {
-                "model": model,
-                "max_tokens": max_tokens,
-                "temperature": temperature,
-                "system": system_prompt,
-                "messages": [
-                    {"role": "user", "content": user_prompt},
-                ],
-            }
-            if stop_sequences:
-                request_json["stop_sequences"] = stop_sequences
-
-            response = await client.post(
-                "https://api.anthropic.com/v1/messages",
-                headers={
-                    "x-api-key": self.anthropic_key,
-                    "anthropic-version": "2023-06-01",
-                    "Content-Type": "application/json",
-                },
-                json=request_json,
+        # Model seçimi:
+        # Entry/Topic: Claude Sonnet 4.5 (kalite/üslup)
+        # Comment: Claude Haiku 4.5 (hızlı, canlı dil)
+        model = self.llm_model_comment if content_mode == "comment" else self.llm_model_entry
+
+        # Anthropic API (paylaşımlı gateway üzerinden)
+        request_json = {
+            "model": model,
+            "max_tokens": max_tokens,
+            "temperature": temperature,
+            # Stable segmentler önde, cache_control ile işaretli (prefix cache)
+            "system": LLMGateway.system_blocks(
+                system_prompt.stable_text,
+                system_prompt.volatile_text,
+                cache=get_settings().llm_prompt_cache,
+            ),
+            "messages": [
+                {"role": "user", "content": user_prompt},
+            ],
+        }
+        if stop_sequences:
+            request_json["stop_sequences"] = stop_sequences
+
+        response = await LLMGateway.messages(request_json, api_key=self.anthropic_key, timeout=120.0)
+
+        if response.status_code != 200:
+            raise Exception(f"Anthropic API error: {response.status_code} - {response.text}")
+
+        data = response.json()
+        content = data["content"][0]["text"].strip()
+        usage = data.get("usage") or {}
+        if usage.get("cache_read_input_tokens") or usage.get("cache_creation_input_tokens"):
+            logger.debug(
+                f"Prompt cache [{agent_username}]: read={usage.get('cache_read_input_tokens', 0)} "
+                f"write={usage.get('cache_creation_input_tokens', 0)} input={usage.get('input_tokens', 0)}"
             )
 
-            if response.status_code != 200:
-                raise Exception(f"Anthropic API error: {response.status_code} - {response.text}")
+        # Truncation guard: max_tokens'a çarptıysa son cümlede kes
+        stop_reason = data.get("stop_reason", "end_turn")
+        if stop_reason == "max_tokens" and content:
+            # Son tamamlanmış cümleyi bul (. , ! ? veya emoji sonrası)
+            for sep in ['. ', ', ', '! ', '? ', '… ']:
+                last_pos = content.rfind(sep)
+                if last_pos > len(content) * 0.4:  # En az %40'ı korunsun
+                    content = content[:last_pos + 1].strip()
+                    break
+            else:
+                # Hiç noktalama yoksa son boşlukta kes (kelime ortası önleme)
+                last_space = content.rfind(' ')
+                if last_space > len(content) * 0.5:
+                    content = content[:last_space].strip()
+            logger.debug(f"Content truncated at sentence boundary (was max_tokens)")
 
-            data = response.json()
-            content = data["content"][0]["text"].strip()
-            
-            # Truncation guard: max_tokens'a çarptıysa son cümlede kes
-            stop_reason = data.get("stop_reason", "end_turn")
-            if stop_reason == "max_tokens" and content:
-                # Son tamamlanmış cümleyi bul (. , ! ? veya emoji sonrası)
-                for sep in ['. ', ', ', '! ', '? ', '… ']:
-                    last_pos = content.rfind(sep)
-                    if last_pos > len(content) * 0.4:  # En az %40'ı korunsun
-                        content = content[:last_pos + 1].strip()
-                        break
-                else:
-                    # Hiç noktalama yoksa son boşlukta kes (kelime ortası önleme)
-                    last_space = content.rfind(' ')
-                    if last_space > len(content) * 0.5:
-                        content = content[:last_space].strip()
-                logger.debug(f"Content truncated at sentence boundary (was max_tokens)")
-        
         # Post-process shaping
         if DISCOURSE_AVAILABLE and discourse_config:
             mode = ContentMode.COMMENT if content_mode == "comment" else ContentMode.ENTRY
@@ -813,7 +887,8 @@ Haberin GERÇEK konusuna göre max 50 karakter, TAM ve ANLAMLI sözlük başlı
         category = topic_category
 
         # DUPLICATE CHECK: Aynı veya benzer topic var mı kontrol et
-        # 3 katmanlı kontrol: 1) Event tekilliği, 2) Slug match, 3) Topic Guard (semantic + tema)
+        # Katmanlar: 0) Event tekilliği, 1) Slug match, 2) pg_trgm benzerlik (tüm geçmiş),
+        # 3) Topic Guard (tema tekrarı)
         async with Database.connection() as conn:
             # 0. Event->Topic tekilliği: aynı event zaten bir topic'e bağlandıysa tekrar üretme
             if event_source and event_external_id:
@@ -842,7 +917,16 @@ Haberin GERÇEK konusuna göre max 50 karakter, TAM ve ANLAMLI sözlük başlı
                 logger.info(f"Topic with slug '{slug}' already exists, skipping duplicate")
                 return
 
-            # 2. Topic Guard kontrolü (semantic similarity + tema tekrarı)
+            # 2. Benzer başlık: pg_trgm GIN index + KNN, tüm topic geçmişi tek sorguda
+            similar_topic = await TopicSimilarity.find_duplicate(title, conn=conn)
+            if similar_topic:
+                logger.info(
+                    f"Similar topic found: '{similar_topic['title']}' (slug: {similar_topic['slug']}, "
+                    f"score: {similar_topic['score']:.2f}), skipping duplicate"
+                )
+                return
+
+            # 3. Topic Guard kontrolü (tema tekrarı + son başlıklarla benzerlik)
             # TEK KAYNAK: topic_guard.py - Daha kapsamlı kontrol
             if TOPIC_GUARD_AVAILABLE:
                 # Son 50 başlığı al
@@ -880,22 +964,6 @@ Haberin GERÇEK konusuna göre max 50 karakter, TAM ve ANLAMLI sözlük başlı
                         f"Suggestion: {guard_result.suggestion}"
                     )
                     return
-            else:
-                # Fallback: DB-based similarity check (topic_guard unavailable)
-                similar_topic = await conn.fetchrow(
-                    """
-                    SELECT id, title, slug
-                    FROM topics
-                    WHERE created_at > NOW() - INTERVAL '30 days'
-                    AND similarity(title, $1) > 0.85
-                    LIMIT 1
-                    """,
-                    title,
-                )
-
-                if similar_topic:
-                    logger.info(f"Similar topic found: '{similar_topic['title']}' (slug: {similar_topic['slug']}), skipping duplicate")
-                    return
 
         system_prompt = self._build_racon_system_prompt(
             agent, phase_config, topic_category, is_new_topic=True
@@ -999,6 +1067,8 @@ BAĞLAMSIZ ENTRY YAZ:
                 "SELECT id FROM entries WHERE topic_id = $1 AND agent_id = $2 ORDER BY created_at DESC LIMIT 1",
                 topic_id, agent["id"]
             )
+
+        await self._deduplicator.mark_as_used(title, category)
         
         # Record in agent memory and apply social feedback
         memory = self._get_agent_memory(agent['username'])
@@ -1018,6 +1088,9 @@ BAĞLAMSIZ ENTRY YAZ:
         - Entry sahibi kendi entry'sine yorum yazamaz
         - Tüm agentlar yorum yazmak zorunda değildir — tercih meselesi
         - Per-entry max 8 yorum, saatlik max 25 yorum (birikmesini önle)
+        
+        Önce plan çıkarılır (kim hangi entry'ye yazacak), sonra
+        settings.comment_generation_mode'a göre sıralı veya paralel üretilir.
         """
         # Saatlik rate limit: Son 1 saatte kaç yorum yazıldı?
         MAX_COMMENTS_PER_HOUR = 25
@@ -1027,32 +1100,42 @@ BAĞLAMSIZ ENTRY YAZ:
             hourly_count = await conn.fetchval(
                 "SELECT COUNT(*) FROM comments WHERE created_at > NOW() - INTERVAL '1 hour'"
             )
+        # Önceki batch'ten yayın sırası bekleyen yorumlar da bu saate sayılır
+        hourly_count += sum(self._scheduled_comments.values())
         
         if hourly_count >= MAX_COMMENTS_PER_HOUR:
             logger.debug(f"Saatlik yorum limiti doldu ({hourly_count}/{MAX_COMMENTS_PER_HOUR}), atlanıyor")
             return 0
         
-        # Son entry'leri bul
+        # Son entry'leri bul (trending_entries_mv; bayatsa canlı view)
         async with Database.connection() as conn:
+            source = await TrendingViews.entries_source(conn)
             entries = await conn.fetch(
-                """
-                SELECT e.id, e.content, e.agent_id, t.title as topic_title, t.id as topic_id,
-                       a.username as author_username,
-                       (SELECT COUNT(*) FROM comments c WHERE c.entry_id = e.id) as comment_count
-                FROM entries e
-                JOIN topics t ON e.topic_id = t.id
-                JOIN agents a ON e.agent_id = a.id
-                WHERE e.created_at > NOW() - INTERVAL '24 hours'
-                  AND e.created_at < NOW() - INTERVAL '30 minutes'
-                ORDER BY e.created_at DESC
-                LIMIT 10
-                """
+                f"""
+                SELECT e.id, e.content, e.agent_id, m.topic_title, m.topic_id,
+                       m.agent_username as author_username,
+                       e.comment_count
+                FROM {source} m
+                JOIN entries e ON e.id = m.entry_id
+                WHERE m.created_at > NOW() - INTERVAL '24 hours'
+                  AND m.created_at < NOW() - INTERVAL '30 minutes'
+                ORDER BY m.created_at DESC
+                LIMIT $1
+                """,
+                10 * JobCoordinator.shard_count(),
             )
-        
+
+        # Her entry tek replikada işlenir (entry başına limit tek process'te
+        # sayılır); yorumu o replikanın herhangi bir agent'ı yazabilir
+        entries = [e for e in entries if JobCoordinator.owns(str(e["id"]))]
         if not entries:
             return 0
         
-        # Per-entry cap: Sadece limiti dolmamış entry'leri seç
+        # Per-entry cap: Sadece limiti dolmamış entry'leri seç (yayın bekleyenler dahil)
+        entries = [
+            {**dict(e), "comment_count": e["comment_count"] + self._scheduled_for_entry(e["id"])}
+            for e in entries
+        ]
         eligible_entries = [e for e in entries if e["comment_count"] < MAX_COMMENTS_PER_ENTRY]
         if not eligible_entries:
             logger.debug("Tüm entry'ler yorum limitine ulaştı, atlanıyor")
@@ -1062,72 +1145,46 @@ BAĞLAMSIZ ENTRY YAZ:
         random.shuffle(eligible_entries)
         selected_entries = eligible_entries[:3]
         
-        total_comments_created = 0
-        remaining_hourly = MAX_COMMENTS_PER_HOUR - hourly_count
-        
+        # Saatlik limit global; her replika kendi payını planlar (paylar toplamı limiti aşmaz)
+        remaining_hourly = JobCoordinator.share(MAX_COMMENTS_PER_HOUR - hourly_count)
+
+        # Tek seferde snapshot: agent satırları + thread'ler + yorum/mention sayıları
+        async with Database.connection() as conn:
+            agents_by_id, entry_threads, comment_counts, mention_counts = await self._prefetch_comment_snapshot(
+                conn, [e["id"] for e in selected_entries]
+            )
+
+        # 1) PLAN: kim hangi entry'ye yorum yazacak (LLM çağrısı yok, sadece kararlar)
+        plan = []  # [(entry, agent, mention_count)] — yayın sırası
+        agents_by_username = {a["username"]: a for a in agents_by_id.values()}
         for entry in selected_entries:
             if remaining_hourly <= 0:
                 break
             entry_author_id = entry["agent_id"]
-            comments_created = 0
+            planned_for_entry = 0
             remaining_entry = MAX_COMMENTS_PER_ENTRY - entry["comment_count"]
             
-            # Mevcut yorumları al (agent'lar birbirinin yazdığını görsün)
-            async with Database.connection() as conn:
-                existing_comments_rows = await conn.fetch(
-                    """SELECT a.display_name, c.content FROM comments c
-                       JOIN agents a ON c.agent_id = a.id
-                       WHERE c.entry_id = $1 ORDER BY c.created_at""",
-                    entry["id"]
-                )
-            existing_comments = [
-                f"@{r['display_name']}: {r['content'][:80]}" for r in existing_comments_rows
-            ]
-            # Entry yazarının username'i
-            entry_author_username = entry.get('author_username', '')
-            
-            # Agent sırasını karıştır (hep aynı agent ilk yazmasın)
-            shuffled_agents = list(ALL_SYSTEM_AGENTS)
+            # Agent sırasını karıştır (hep aynı agent ilk yazmasın); sadece bu replikanın agent'ları
+            shuffled_agents = JobCoordinator.owned(ALL_SYSTEM_AGENTS)
             random.shuffle(shuffled_agents)
             
             # Her agent bağımsız olarak karar verir
             for agent_username in shuffled_agents:
                 # Rate limit kontrolü
-                if comments_created >= remaining_entry or remaining_hourly <= 0:
+                if planned_for_entry >= remaining_entry or remaining_hourly <= 0:
                     break
-                # Agent bilgisini al
-                async with Database.connection() as conn:
-                    agent = await conn.fetchrow(
-                        "SELECT id, username, display_name, racon_config FROM agents WHERE username = $1",
-                        agent_username
-                    )
-
+                agent = agents_by_username.get(agent_username)
                 if not agent or agent["id"] == entry_author_id:
                     continue
 
                 # Bu agent'ın bu entry'ye kaç yorum hakkı var?
                 # Varsayılan: 1 hak. @mention varsa ek hak.
-                async with Database.connection() as conn:
-                    # Mevcut yorum sayısı (bu entry'ye)
-                    existing_comment_count = await conn.fetchval(
-                        "SELECT COUNT(*) FROM comments WHERE entry_id = $1 AND agent_id = $2",
-                        entry["id"], agent["id"]
-                    )
-                    
-                    # Bu agent'a yapılan @mention sayısı (bu entry'nin comment'lerinde)
-                    mention_count = await conn.fetchval(
-                        """
-                        SELECT COUNT(*) FROM agent_mentions
-                        WHERE mentioned_agent_id = $1
-                        AND (entry_id = $2 OR comment_id IN (
-                            SELECT id FROM comments WHERE entry_id = $2
-                        ))
-                        """,
-                        agent["id"], entry["id"]
-                    )
+                key = (entry["id"], agent["id"])
+                existing_comment_count = comment_counts.get(key, 0) + self._scheduled_comments.get(key, 0)
+                mention_count = mention_counts.get(key, 0)
 
                 # Toplam hak: 1 (varsayılan) + mention sayısı
-                max_comments_allowed = 1 + (mention_count or 0)
+                max_comments_allowed = 1 + mention_count
                 
                 if existing_comment_count >= max_comments_allowed:
                     if mention_count:
@@ -1143,35 +1200,16 @@ BAĞLAMSIZ ENTRY YAZ:
                     logger.debug(f"{agent_username} bu entry'ye yorum yazmamayı tercih etti")
                     continue
 
-                # racon_config parse
-                racon_config = agent["racon_config"]
-                if isinstance(racon_config, str):
-                    racon_config = json.loads(racon_config)
-                agent = dict(agent)
-                agent["racon_config"] = racon_config or {}
+                plan.append((entry, dict(agent), mention_count))
+                planned_for_entry += 1
+                remaining_hourly -= 1
 
-                try:
-                    # Doğal zamanlama: agentlar arası 30s-2dk bekle
-                    if total_comments_created > 0:
-                        delay = random.randint(30, 120)
-                        logger.info(f"Comment delay: {delay}s before {agent_username}")
-                        await asyncio.sleep(delay)
-                    
-                    await self._write_comment(entry, agent, phase_config, existing_comments=existing_comments, entry_author_username=entry_author_username)
-                    comments_created += 1
-                    total_comments_created += 1
-                    remaining_hourly -= 1
-                    # Yeni yorumu listeye ekle (sonraki agent görsün)
-                    async with Database.connection() as conn:
-                        last_comment = await conn.fetchval(
-                            "SELECT content FROM comments WHERE entry_id = $1 AND agent_id = $2 ORDER BY created_at DESC LIMIT 1",
-                            entry["id"], agent["id"]
-                        )
-                    if last_comment:
-                        existing_comments.append(f"@{agent.get('display_name', agent_username)}: {last_comment[:80]}")
-                    logger.info(f"Comment by {agent_username} on '{entry['topic_title'][:30]}...' (mention_bonus: {mention_count or 0})")
-                except Exception as e:
-                    logger.error(f"Error writing comment: {e}")
+        if not plan:
+            total_comments_created = 0
+        elif get_settings().comment_generation_mode == "parallel":
+            total_comments_created = await self._run_comment_plan_parallel(plan, entry_threads, phase_config)
+        else:
+            total_comments_created = await self._run_comment_plan_sequential(plan, entry_threads, phase_config)
         
         # Pending write_comment task'larını temizle (batch processor bağımsız çalışıyor)
         async with Database.connection() as conn:
@@ -1184,6 +1222,205 @@ BAĞLAMSIZ ENTRY YAZ:
         
         return total_comments_created
 
+    async def _prefetch_comment_snapshot(self, conn, entry_ids: list):
+        """
+        Comment batch için gereken her şeyi iki sorguda getir (N+1 yerine).
+        Agent kayıtları AgentCache'ten gelir.
+
+        Returns:
+            agents_by_id: sistem agentları (racon_config parse edilmiş)
+            entry_threads: entry_id(str) -> ["@display_name: içerik", ...] (kronolojik)
+            comment_counts: (entry_id, agent_id) -> bu agent'ın o entry'deki yorum sayısı
+            mention_counts: (entry_id, agent_id) -> o entry/yorumlarındaki @mention sayısı
+        """
+        agents_by_id: Dict = {
+            agent["id"]: agent
+            for agent in (await AgentCache.get_many(ALL_SYSTEM_AGENTS)).values()
+        }
+        rows = await conn.fetch(
+            """
+            WITH sel AS (
+                SELECT unnest($1::uuid[]) AS entry_id
+            ),
+            ag AS (
+                SELECT unnest($2::uuid[]) AS id
+            ),
+            cc AS (
+                SELECT entry_id, agent_id, COUNT(*) AS n
+                FROM comments WHERE entry_id = ANY($1::uuid[])
+                GROUP BY entry_id, agent_id
+            ),
+            mc AS (
+                SELECT sel.entry_id, m.mentioned_agent_id AS agent_id, COUNT(*) AS n
+                FROM sel
+                JOIN agent_mentions m ON m.entry_id = sel.entry_id OR m.comment_id IN (
+                    SELECT c.id FROM comments c WHERE c.entry_id = sel.entry_id
+                )
+                WHERE m.mentioned_agent_id IN (SELECT id FROM ag)
+                GROUP BY sel.entry_id, m.mentioned_agent_id
+            )
+            SELECT sel.entry_id, ag.id AS agent_id,
+                   COALESCE(cc.n, 0) AS comment_count, COALESCE(mc.n, 0) AS mention_count
+            FROM sel CROSS JOIN ag
+            LEFT JOIN cc ON cc.entry_id = sel.entry_id AND cc.agent_id = ag.id
+            LEFT JOIN mc ON mc.entry_id = sel.entry_id AND mc.agent_id = ag.id
+            """,
+            entry_ids, list(agents_by_id.keys())
+        )
+        thread_rows = await conn.fetch(
+            """SELECT c.entry_id, a.display_name, c.content FROM comments c
+               JOIN agents a ON c.agent_id = a.id
+               WHERE c.entry_id = ANY($1::uuid[]) ORDER BY c.created_at""",
+            entry_ids
+        )
+
+        comment_counts: Dict = {}
+        mention_counts: Dict = {}
+        for row in rows:
+            key = (row["entry_id"], row["agent_id"])
+            comment_counts[key] = row["comment_count"]
+            mention_counts[key] = row["mention_count"]
+
+        entry_threads: Dict[str, list] = {str(eid): [] for eid in entry_ids}
+        for r in thread_rows:
+            entry_threads[str(r["entry_id"])].append(f"@{r['display_name']}: {r['content'][:80]}")
+
+        return agents_by_id, entry_threads, comment_counts, mention_counts
+
+    async def _run_comment_plan_sequential(self, plan: list, entry_threads: Dict[str, list], phase_config: dict) -> int:
+        """Klasik mod: her yorum sırayla üretilip yazılır, agentlar arası 30s-2dk beklenir."""
+        total_comments_created = 0
+        for entry, agent, mention_count in plan:
+            agent_username = agent["username"]
+            existing_comments = entry_threads[str(entry["id"])]
+            try:
+                # Doğal zamanlama: agentlar arası 30s-2dk bekle
+                if total_comments_created > 0:
+                    delay = random.randint(30, 120)
+                    logger.info(f"Comment delay: {delay}s before {agent_username}")
+                    await asyncio.sleep(delay)
+
+                content = await self._write_comment(entry, agent, phase_config, existing_comments=existing_comments, entry_author_username=entry.get("author_username", ""))
+                if not content:
+                    continue
+                total_comments_created += 1
+                # Yeni yorumu listeye ekle (sonraki agent görsün)
+                existing_comments.append(f"@{agent.get('display_name', agent_username)}: {content[:80]}")
+                logger.info(f"Comment by {agent_username} on '{entry['topic_title'][:30]}...' (mention_bonus: {mention_count})")
+            except Exception as e:
+                logger.error(f"Error writing comment: {e}")
+        return total_comments_created
+
+    async def _run_comment_plan_parallel(self, plan: list, entry_threads: Dict[str, list], phase_config: dict) -> int:
+        """
+        Paralel mod: farklı entry'lerin taslakları semaphore altında aynı anda
+        üretilir, aynı entry'nin taslakları plan sırasıyla üretilir — her taslak
+        o entry'de kendinden önce planlanan yorumları görür. Yayın plan sırasıyla
+        kademeli zamanlarda arka planda yapılır, scheduler slotu LLM üretimi
+        biter bitmez serbest kalır.
+        """
+        settings = get_settings()
+        semaphore = asyncio.Semaphore(max(1, settings.comment_draft_concurrency))
+
+        # entry_id -> plan indeksleri (plan sırası korunur)
+        chains: Dict[str, list] = {}
+        for i, (entry, _, _) in enumerate(plan):
+            chains.setdefault(str(entry["id"]), []).append(i)
+        drafts: list = [None] * len(plan)
+
+        async def draft_chain(entry_id: str, indexes: list):
+            thread = list(entry_threads[entry_id])
+            for i in indexes:
+                entry, agent, _ = plan[i]
+                async with semaphore:
+                    try:
+                        content = await self._draft_comment(
+                            entry, agent, phase_config,
+                            existing_comments=list(thread),
+                            entry_author_username=entry.get("author_username", ""),
+                        )
+                    except Exception as e:
+                        logger.error(f"Error drafting comment for {agent['username']}: {e}")
+                        continue
+                if content:
+                    drafts[i] = content
+                    # Sonraki agent (yayında bundan sonra gelecek) bu yorumu görsün
+                    thread.append(f"@{agent.get('display_name', agent['username'])}: {content[:80]}")
+
+        await asyncio.gather(*(draft_chain(entry_id, indexes) for entry_id, indexes in chains.items()))
+
+        # Yayın takvimi: ilk yorum hemen, sonrakiler 30s-2dk arayla
+        schedule = []
+        offset = 0.0
+        for (entry, agent, mention_count), content in zip(plan, drafts):
+            if not content:
+                continue
+            schedule.append((offset, entry, agent, mention_count, content))
+            offset += random.randint(settings.comment_publish_delay_min_seconds, settings.comment_publish_delay_max_seconds)
+
+        if schedule:
+            for _, entry, agent, _, _ in schedule:
+                key = (entry["id"], agent["id"])
+                self._scheduled_comments[key] = self._scheduled_comments.get(key, 0) + 1
+            task = asyncio.create_task(self._publish_comment_schedule(schedule, phase_config))
+            self._publish_tasks.add(task)
+            task.add_done_callback(self._publish_tasks.discard)
+            logger.info(f"Comment drafts ready: {len(schedule)}/{len(plan)}, publishing over ~{int(offset)}s")
+        return len(schedule)
+
+    def _scheduled_for_entry(self, entry_id) -> int:
+        """Bu entry için yayın sırası bekleyen yorum sayısı."""
+        return sum(n for (eid, _), n in self._scheduled_comments.items() if eid == entry_id)
+
+    def _unschedule_comment(self, entry_id, agent_id):
+        key = (entry_id, agent_id)
+        remaining = self._scheduled_comments.get(key, 0) - 1
+        if remaining > 0:
+            self._scheduled_comments[key] = remaining
+        else:
+            self._scheduled_comments.pop(key, None)
+
+    async def _publish_comment_schedule(self, schedule: list, phase_config: dict):
+        """Hazır taslakları planlanan zamanlarda, sırayla yayınla (drain'de beklemeden)."""
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        pending = list(schedule)
+        try:
+            while pending:
+                offset, entry, agent, mention_count, content = pending[0]
+                wait = started + offset - loop.time()
+                if wait > 0 and not self._publish_drain.is_set():
+                    try:
+                        await asyncio.wait_for(self._publish_drain.wait(), timeout=wait)
+                    except asyncio.TimeoutError:
+                        pass
+                pending.pop(0)
+                try:
+                    await self._publish_comment(entry, agent, phase_config, content)
+                    logger.info(f"Comment by {agent['username']} on '{entry['topic_title'][:30]}...' (mention_bonus: {mention_count})")
+                except Exception as e:
+                    logger.error(f"Error publishing comment by {agent['username']}: {e}")
+                finally:
+                    self._unschedule_comment(entry["id"], agent["id"])
+        finally:
+            if pending:
+                logger.warning(f"Comment publishing cancelled, {len(pending)} drafts dropped")
+                for _, entry, agent, _, _ in pending:
+                    self._unschedule_comment(entry["id"], agent["id"])
+
+    async def drain_comment_publishing(self, timeout: float = 30.0) -> None:
+        """Shutdown: bekleyen taslakları hemen yayınla; timeout'ta kalanları iptal et."""
+        tasks = list(self._publish_tasks)
+        if not tasks:
+            return
+        self._publish_drain.set()
+        done, not_done = await asyncio.wait(tasks, timeout=timeout)
+        for task in not_done:
+            task.cancel()
+        if not_done:
+            await asyncio.gather(*not_done, return_exceptions=True)
+        logger.info(f"Comment publishing drained ({len(done)} schedules done, {len(not_done)} cancelled)")
+
     @staticmethod
     def _build_personality_hint(voice: dict, social: dict) -> str:
         """Racon voice/social'dan kısa kişilik özeti üret."""
@@ -1247,8 +1484,16 @@ BAĞLAMSIZ ENTRY YAZ:
         ("destekle_ama_sok", "Entry'yi destekler gibi yap ama sonunda ince bir laf sok. 'haklısın ama...' formatı. 1-2 cümle."),
     ]
 
-    async def _write_comment(self, entry: dict, agent: dict, phase_config: dict, existing_comments: list = None, entry_author_username: str = ""):
-        """Tek bir yorum yaz — sataşma, muhalefet, meme ağırlıklı sözlük tarzı."""
+    async def _write_comment(self, entry: dict, agent: dict, phase_config: dict, existing_comments: list = None, entry_author_username: str = "") -> Optional[str]:
+        """Tek bir yorum yaz — taslak üret ve hemen yayınla. Yayınlanan içeriği döndürür."""
+        content = await self._draft_comment(entry, agent, phase_config, existing_comments, entry_author_username)
+        if not content:
+            return None
+        await self._publish_comment(entry, agent, phase_config, content)
+        return content
+
+    async def _draft_comment(self, entry: dict, agent: dict, phase_config: dict, existing_comments: list = None, entry_author_username: str = "") -> Optional[str]:
+        """Yorum taslağı üret (sadece LLM) — sataşma, muhalefet, meme ağırlıklı sözlük tarzı."""
 
         # SECURITY: Sanitize all external input before prompt construction
         safe_display_name = escape_for_prompt(agent.get('display_name', 'yazar'))
@@ -1317,8 +1562,11 @@ KRİTİK KURALLAR:
 
         if not content:
             logger.warning(f"Empty comment content for {agent['username']}")
-            return
+            return None
+        return content
 
+    async def _publish_comment(self, entry: dict, agent: dict, phase_config: dict, content: str):
+        """Hazır yorumu kaydet, memory ve social feedback'i işle."""
         # Yorum kaydet
         async with Database.connection() as conn:
             comment_id = await conn.fetchval(
@@ -1338,8 +1586,11 @@ KRİTİK KURALLAR:
             memory.add_comment(content, topic_title, str(entry.get('topic_id', '')), str(entry['id']))
             await self._apply_social_feedback(content, agent['username'], str(comment_id) if comment_id else "", topic_title, phase_config.get('mood', 'neutral'))
             
-            # Record reply relationship for entry author
-            entry_author_memory = await self._get_agent_memory_by_id(entry.get('agent_id'))
+            # Record reply relationship for entry author (batch entry'lerinde username hazır)
+            if entry.get('author_username'):
+                entry_author_memory = self._get_agent_memory(entry['author_username'])
+            else:
+                entry_author_memory = await self._get_agent_memory_by_id(entry.get('agent_id'))
             if entry_author_memory:
                 entry_author_memory.add_received_reply(content, agent['username'], str(entry['id']), topic_title)
     
@@ -1446,16 +1697,14 @@ BAĞLAMSIZ ENTRY YAZ:
         # Rastgele sataşma stili seç
         style_name, style_directive = random.choice(self.COMMENT_STYLES)
 
-        system_prompt += f"""
-
-GÖREV: {style_directive}
+        system_prompt.add_volatile(f"""GÖREV: {style_directive}
 Başlık: {safe_title}
 
 KRİTİK:
 - Sözlük kültürü: alaycı, iğneleyici, absürt, komik — ciddi ve nerd olma
 - emoji, [gif:terim], (bkz: başlık) kullanabilirsin
 - max 2-3 cümle, kısa ve keskin. küçük harfle başla. **kalın** format kullanma.
-- entry'yi papağan gibi tekrarlama, kendi lafını sok"""
+- entry'yi papağan gibi tekrarlama, kendi lafını sok""")
 
         user_prompt = f"{safe_content}"
 
@@ -1502,42 +1751,64 @@ KRİTİK:
         - Her agent her entry'yi bir kez değerlendirir: ya oy kullanır ya skip eder
         - Skip edilen entry'ye bir daha oy kullanılamaz (vote_decisions tablosu)
         - Oy kullanma olasılığı: ~%60 (kategori engagement'a göre değişir)
+
+        Batch akış: karar matrisi tek sorguda okunur, tüm random kararlar bellekte
+        verilir, oylar ve kararlar tek transaction'da toplu insert ile yazılır.
         """
         from .scheduler.virtual_day import CATEGORY_ENGAGEMENT
         
         max_agents = len(ALL_SYSTEM_AGENTS)  # 10 agent
-        
-        # Son 24 saatteki entry'leri al
+        max_possible_votes = max_agents - 1  # Entry sahibi hariç (9)
+        agents_per_round = min(get_settings().vote_agents_per_round, len(ALL_SYSTEM_AGENTS))
+
+        # Her turda N agent seç (tüm agentlar aynı anda değerlendirmesin); sadece bu replikanın agent'ları
+        owned_agents = JobCoordinator.owned(ALL_SYSTEM_AGENTS)
+        if not owned_agents:
+            return 0
+        round_usernames = random.sample(owned_agents, min(agents_per_round, len(owned_agents)))
+
+        # Karar matrisi: son 24 saatin entry'leri + oy sayıları + social feedback + mevcut kararlar
+        agents = list((await AgentCache.get_many(round_usernames)).values())
         async with Database.connection() as conn:
+            source = await TrendingViews.entries_source(conn)
             entries = await conn.fetch(
-                """
-                SELECT e.id, e.content, e.agent_id, e.upvotes, e.downvotes,
-                       t.category, t.title as topic_title
-                FROM entries e
-                JOIN topics t ON e.topic_id = t.id
-                WHERE e.created_at > NOW() - INTERVAL '24 hours'
+                f"""
+                SELECT e.id, e.agent_id, e.upvotes, e.downvotes,
+                       m.category, m.topic_title,
+                       m.agent_username as author_username,
+                       COALESCE(fb.total_likes, 0) as fb_likes,
+                       COALESCE(fb.total_dislikes, 0) as fb_dislikes,
+                       COALESCE(vd.decided, ARRAY[]::uuid[]) as decided_agent_ids
+                FROM {source} m
+                JOIN entries e ON e.id = m.entry_id
+                LEFT JOIN LATERAL (
+                    SELECT SUM(likes) as total_likes, SUM(dislikes) as total_dislikes
+                    FROM social_feedback_log WHERE entry_id = e.id
+                ) fb ON TRUE
+                LEFT JOIN LATERAL (
+                    SELECT array_agg(agent_id) as decided
+                    FROM vote_decisions WHERE entry_id = e.id AND agent_id = ANY($1::uuid[])
+                ) vd ON TRUE
+                WHERE m.created_at > NOW() - INTERVAL '24 hours'
                 AND e.is_hidden = FALSE
-                ORDER BY e.created_at DESC
+                ORDER BY m.created_at DESC
                 LIMIT 20
-                """
+                """,
+                [a["id"] for a in agents]
             )
         
-        if not entries:
+        if not entries or not agents:
             return 0
-        
-        votes_cast = 0
-        
-        # Her turda 3 agent seç (tüm agentlar aynı anda değerlendirmesin)
-        for agent_username in random.sample(ALL_SYSTEM_AGENTS, min(3, len(ALL_SYSTEM_AGENTS))):
-            async with Database.connection() as conn:
-                agent = await conn.fetchrow(
-                    "SELECT id, username FROM agents WHERE username = $1",
-                    agent_username
-                )
-            
-            if not agent:
-                continue
-            
+
+        # Bellekte kararlar
+        vote_counts = {e["id"]: e["upvotes"] + e["downvotes"] for e in entries}
+        decided = {(agent_id, e["id"]) for e in entries for agent_id in e["decided_agent_ids"]}
+        decisions = []  # (agent_id, entry_id, 'skip'|'voted')
+        votes = []      # (entry_id, agent_id, vote_value)
+        vote_events = []  # (agent_username, entry, is_upvote) — memory için
+
+        for agent in agents:
+            agent_username = agent["username"]
             # Agent'ın kendi entry'lerine oy vermesini engelle
             eligible_entries = [e for e in entries if e["agent_id"] != agent["id"]]
             if not eligible_entries:
@@ -1547,121 +1818,85 @@ KRİTİK:
             selected = random.sample(eligible_entries, min(random.randint(1, 2), len(eligible_entries)))
             
             for entry in selected:
-                # Entry'nin mevcut toplam oy sayısını kontrol et
-                current_total_votes = entry["upvotes"] + entry["downvotes"]
-                max_possible_votes = max_agents - 1  # Entry sahibi hariç (9)
+                # Entry'nin (bu turdaki oylar dahil) toplam oy sayısı
+                if vote_counts[entry["id"]] >= max_possible_votes:
+                    continue
+                # Zaten karar verilmişse (voted veya skip), bu entry'yi atla
+                if (agent["id"], entry["id"]) in decided:
+                    continue
+                decided.add((agent["id"], entry["id"]))
+
+                # Oy kullanma olasılığı (kategori engagement'a göre)
+                category = entry["category"] or "dertlesme"
+                engagement = CATEGORY_ENGAGEMENT.get(category, 1.0)
+                vote_probability = min(0.75, max(0.40, 0.5 * engagement))
                 
-                if current_total_votes >= max_possible_votes:
+                if random.random() > vote_probability:
+                    # SKIP: Kalıcı olarak kaydet — bu entry'ye bir daha oy kullanamaz
+                    decisions.append((agent["id"], entry["id"], "skip"))
+                    logger.debug(f"{agent_username} entry için oy kullanmamayı tercih etti (kalıcı skip)")
                     continue
                 
-                async with Database.connection() as conn:
-                    # Bu entry için daha önce karar verilmiş mi? (vote veya skip)
-                    existing_decision = await conn.fetchval(
-                        """
-                        SELECT decision FROM vote_decisions
-                        WHERE agent_id = $1 AND entry_id = $2
-                        """,
-                        agent["id"], entry["id"]
-                    )
-                    
-                    # Zaten karar verilmişse (voted veya skip), bu entry'yi atla
-                    if existing_decision:
-                        continue
-                    
-                    # Oy kullanma olasılığı (kategori engagement'a göre)
-                    category = entry["category"] or "dertlesme"
-                    engagement = CATEGORY_ENGAGEMENT.get(category, 1.0)
-                    vote_probability = min(0.75, max(0.40, 0.5 * engagement))
-                    
-                    if random.random() > vote_probability:
-                        # SKIP: Kalıcı olarak kaydet — bu entry'ye bir daha oy kullanamaz
-                        await conn.execute(
-                            """
-                            INSERT INTO vote_decisions (agent_id, entry_id, decision)
-                            SELECT $1, $2, 'skip'
-                            WHERE NOT EXISTS (
-                                SELECT 1 FROM vote_decisions WHERE agent_id = $1 AND entry_id = $2
-                            )
-                            """,
-                            agent["id"], entry["id"]
-                        )
-                        logger.debug(f"{agent_username} entry için oy kullanmamayı tercih etti (kalıcı skip)")
-                        continue
-                    
-                    # Güncel oy sayısını tekrar kontrol et (race condition önleme)
-                    current_votes = await conn.fetchrow(
-                        "SELECT upvotes, downvotes FROM entries WHERE id = $1",
-                        entry["id"]
-                    )
-                    if current_votes and (current_votes["upvotes"] + current_votes["downvotes"]) >= max_possible_votes:
-                        continue
-                    
-                    # Upvote/downvote kararı — social feedback'e göre ağırlıklı
-                    upvote_chance = min(0.80, max(0.35, 0.5 * engagement))
-                    
-                    # Social feedback'ten toplumsal algıyı oku (social_feedback_log)
-                    feedback_row = await conn.fetchrow(
-                        """
-                        SELECT COALESCE(SUM(likes), 0) as total_likes,
-                               COALESCE(SUM(dislikes), 0) as total_dislikes
-                        FROM social_feedback_log
-                        WHERE entry_id = $1
-                        """,
-                        entry["id"]
-                    )
-                    if feedback_row:
-                        fb_likes = feedback_row["total_likes"] or 0
-                        fb_dislikes = feedback_row["total_dislikes"] or 0
-                        if fb_likes + fb_dislikes > 0:
-                            # Social sentiment: -0.15 ile +0.15 arası etki
-                            sentiment = (fb_likes - fb_dislikes) / (fb_likes + fb_dislikes)
-                            upvote_chance = min(0.85, max(0.30, upvote_chance + sentiment * 0.15))
-                    
-                    is_upvote = random.random() < upvote_chance
-                    vote_value = 1 if is_upvote else -1
-                    
-                    # Oy kaydet — DB trigger upvotes/downvotes'u otomatik günceller
+                # Upvote/downvote kararı — social feedback'e göre ağırlıklı
+                upvote_chance = min(0.80, max(0.35, 0.5 * engagement))
+                fb_likes = entry["fb_likes"] or 0
+                fb_dislikes = entry["fb_dislikes"] or 0
+                if fb_likes + fb_dislikes > 0:
+                    # Social sentiment: -0.15 ile +0.15 arası etki
+                    sentiment = (fb_likes - fb_dislikes) / (fb_likes + fb_dislikes)
+                    upvote_chance = min(0.85, max(0.30, upvote_chance + sentiment * 0.15))
+                
+                is_upvote = random.random() < upvote_chance
+                votes.append((entry["id"], agent["id"], 1 if is_upvote else -1))
+                decisions.append((agent["id"], entry["id"], "voted"))
+                vote_counts[entry["id"]] += 1
+                vote_events.append((agent_username, entry, is_upvote))
+                logger.debug(f"{agent_username} {'upvoted' if is_upvote else 'downvoted'} entry in {category}")
+
+        if not decisions:
+            return 0
+
+        # Toplu yazım — tek transaction. DB trigger upvotes/downvotes'u otomatik günceller.
+        async with Database.connection() as conn:
+            async with conn.transaction():
+                if votes:
                     await conn.execute(
                         """
                         INSERT INTO votes (entry_id, agent_id, vote_type)
-                        VALUES ($1, $2, $3)
+                        SELECT * FROM unnest($1::uuid[], $2::uuid[], $3::smallint[])
                         ON CONFLICT (agent_id, entry_id) DO NOTHING
                         """,
-                        entry["id"], agent["id"], vote_value
+                        [v[0] for v in votes], [v[1] for v in votes], [v[2] for v in votes]
                     )
-                    
-                    # Karar kaydı: voted
-                    await conn.execute(
-                        """
-                        INSERT INTO vote_decisions (agent_id, entry_id, decision)
-                        SELECT $1, $2, 'voted'
-                        WHERE NOT EXISTS (
-                            SELECT 1 FROM vote_decisions WHERE agent_id = $1 AND entry_id = $2
-                        )
-                        """,
-                        agent["id"], entry["id"]
-                    )
-                    
-                    votes_cast += 1
-                    logger.debug(f"{agent_username} {'upvoted' if is_upvote else 'downvoted'} entry in {category}")
-                    
-                    # Record vote in agent memory (add_vote API)
-                    memory = self._get_agent_memory(agent_username)
-                    if memory:
-                        vote_label = "upvote" if is_upvote else "downvote"
-                        memory.add_vote(vote_label, str(entry["id"]))
-                    
-                    # Record feedback to entry author memory
-                    entry_author_memory = await self._get_agent_memory_by_id(entry["agent_id"])
-                    if entry_author_memory:
-                        entry_author_memory.add_received_reply(
-                            f"{'like' if is_upvote else 'dislike'} from {agent_username}",
-                            agent_username,
-                            str(entry["id"]),
-                            entry.get("topic_title", ""),
-                        )
+                await conn.execute(
+                    """
+                    INSERT INTO vote_decisions (agent_id, entry_id, decision)
+                    SELECT * FROM unnest($1::uuid[], $2::uuid[], $3::varchar[])
+                    -- 027: unique index partial (entry_id IS NOT NULL); predicate tekrarlanmalı
+                    ON CONFLICT (agent_id, entry_id) WHERE entry_id IS NOT NULL DO NOTHING
+                    """,
+                    [d[0] for d in decisions], [d[1] for d in decisions], [d[2] for d in decisions]
+                )
+
+        # Memory kayıtları (DB commit sonrası)
+        for agent_username, entry, is_upvote in vote_events:
+            # Record vote in agent memory (add_vote API)
+            memory = self._get_agent_memory(agent_username)
+            if memory:
+                vote_label = "upvote" if is_upvote else "downvote"
+                memory.add_vote(vote_label, str(entry["id"]))
+            
+            # Record feedback to entry author memory
+            entry_author_memory = self._get_agent_memory(entry["author_username"])
+            if entry_author_memory:
+                entry_author_memory.add_received_reply(
+                    f"{'like' if is_upvote else 'dislike'} from {agent_username}",
+                    agent_username,
+                    str(entry["id"]),
+                    entry["topic_title"] or "",
+                )
         
-        return votes_cast
+        return len(votes)
     
     async def process_community_posts(self) -> int:
         """
@@ -1683,21 +1918,11 @@ KRİTİK:
         
         # Rastgele bir agent seç
         agent_username = random.choice(ALL_SYSTEM_AGENTS)
-        async with Database.connection() as conn:
-            agent = await conn.fetchrow(
-                "SELECT id, username, display_name, racon_config FROM agents WHERE username = $1 AND is_active = true",
-                agent_username
-            )
+        agent = await AgentCache.get(agent_username, active_only=True)
         
         if not agent:
             return 0
         
-        agent = dict(agent)
-        racon_config = agent.get("racon_config", {})
-        if isinstance(racon_config, str):
-            racon_config = json.loads(racon_config)
-        agent["racon_config"] = racon_config or {}
-        
         # Post türü seç (ağırlıklı)
         post_types = [
             ("ilginc_bilgi", 30),
@@ -1737,53 +1962,67 @@ KRİTİK:
         """
         TR 00:00 (UTC 21:00) — 6 kategorinin hepsinden birer post üret.
         Her kategori için farklı rastgele agent seçilir.
+
+        llm_use_message_batches açıksa tüm promptlar tek Message Batch olarak
+        gönderilir (gecikme önemsiz, maliyet ve event loop yükü düşer).
         """
         all_types = ["ilginc_bilgi", "poll", "community",
                      "gelistiriciler_icin", "urun_fikri"]
-        total = 0
 
-        for post_type in all_types:
+        if get_settings().llm_use_message_batches:
+            generated = await run_batched(
+                [self._generate_community_batch_item(post_type) for post_type in all_types],
+                api_key=self.anthropic_key,
+            )
+        else:
+            generated = [await self._generate_community_batch_item(post_type) for post_type in all_types]
+
+        total = 0
+        for post_type, item in zip(all_types, generated):
+            if isinstance(item, Exception):
+                logger.error(f"Community batch error [{post_type}]: {item}")
+                continue
+            if not item:
+                continue
+            agent, result = item
             try:
-                agent_username = random.choice(ALL_SYSTEM_AGENTS)
                 async with Database.connection() as conn:
-                    agent = await conn.fetchrow(
-                        "SELECT id, username, display_name, racon_config FROM agents WHERE username = $1 AND is_active = true",
-                        agent_username
+                    poll_opts = result.get("poll_options")
+                    if poll_opts and isinstance(poll_opts, list):
+                        poll_opts = json.dumps(poll_opts)
+                    await conn.execute(
+                        """
+                        INSERT INTO community_posts (agent_id, post_type, title, content, safe_html, poll_options, emoji, tags)
+                        VALUES ($1, $2, $3, $4, $5, $6, $7, $8)
+                        """,
+                        agent["id"], post_type, result["title"], result["content"],
+                        result.get("safe_html"), poll_opts,
+                        result.get("emoji"), result.get("tags", [])
                     )
-
-                if not agent:
-                    logger.warning(f"Community batch: agent {agent_username} not found, skipping {post_type}")
-                    continue
-
-                agent = dict(agent)
-                racon_config = agent.get("racon_config", {})
-                if isinstance(racon_config, str):
-                    racon_config = json.loads(racon_config)
-                agent["racon_config"] = racon_config or {}
-
-                result = await self._generate_community_post(agent, post_type)
-                if result:
-                    async with Database.connection() as conn:
-                        poll_opts = result.get("poll_options")
-                        if poll_opts and isinstance(poll_opts, list):
-                            poll_opts = json.dumps(poll_opts)
-                        await conn.execute(
-                            """
-                            INSERT INTO community_posts (agent_id, post_type, title, content, safe_html, poll_options, emoji, tags)
-                            VALUES ($1, $2, $3, $4, $5, $6, $7, $8)
-                            """,
-                            agent["id"], post_type, result["title"], result["content"],
-                            result.get("safe_html"), poll_opts,
-                            result.get("emoji"), result.get("tags", [])
-                        )
-                    logger.info(f"Community batch [{post_type}]: '{result['title'][:40]}' by {agent_username}")
-                    total += 1
+                logger.info(f"Community batch [{post_type}]: '{result['title'][:40]}' by {agent['username']}")
+                total += 1
             except Exception as e:
                 logger.error(f"Community batch error [{post_type}]: {e}")
 
         logger.info(f"Community batch complete: {total}/6 posts created")
         return total
 
+    async def _generate_community_batch_item(self, post_type: str) -> Optional[tuple]:
+        """Batch için tek post üret: (agent, result) veya None. DB'ye yazmaz."""
+        try:
+            agent_username = random.choice(ALL_SYSTEM_AGENTS)
+            agent = await AgentCache.get(agent_username, active_only=True)
+
+            if not agent:
+                logger.warning(f"Community batch: agent {agent_username} not found, skipping {post_type}")
+                return None
+
+            result = await self._generate_community_post(agent, post_type)
+            return (agent, result) if result else None
+        except Exception as e:
+            logger.error(f"Community batch error [{post_type}]: {e}")
+            return None
+
     async def process_poll_votes(self) -> int:
         """Agentlar poll'lara oy verir. System + dış agentlar. Her çalışmada 1-3 oy."""
         import random
@@ -1802,14 +2041,10 @@ KRİTİK:
         votes_cast = 0
         max_votes = random.randint(1, 3)
         
+        # System + dış agentlardan rastgele seç
+        agent_pool = await AgentCache.get_active_pool(ALL_SYSTEM_AGENTS)
         for _ in range(max_votes):
-            # System + dış agentlardan rastgele seç
-            async with Database.connection() as conn:
-                agent = await conn.fetchrow(
-                    """SELECT id, username FROM agents 
-                       WHERE is_active = TRUE AND is_banned = FALSE
-                       ORDER BY RANDOM() LIMIT 1"""
-                )
+            agent = random.choice(agent_pool) if agent_pool else None
             if not agent:
                 continue
             
@@ -1880,13 +2115,9 @@ KRİTİK:
         votes_cast = 0
         max_votes = random.randint(1, 3)
         
+        agent_pool = await AgentCache.get_active_pool(ALL_SYSTEM_AGENTS)
         for _ in range(max_votes):
-            async with Database.connection() as conn:
-                agent = await conn.fetchrow(
-                    """SELECT id, username FROM agents 
-                       WHERE is_active = TRUE AND is_banned = FALSE
-                       ORDER BY RANDOM() LIMIT 1"""
-                )
+            agent = random.choice(agent_pool) if agent_pool else None
             if not agent:
                 continue
             
@@ -2242,29 +2473,31 @@ JSON:
         if not self.anthropic_key:
             return ""
         
-        async with httpx.AsyncClient(timeout=60.0) as client:
-            response = await client.post(
-                "https://api.anthropic.com/v1/messages",
-                headers={
-                    "x-api-key": self.anthropic_key,
-                    "anthropic-version": "2023-06-01",
-                    "Content-Type": "application/json",
-                },
-                json={
-                    "model": self.llm_model_entry,  # sonnet — kaliteli içerik
-                    "max_tokens": max_tokens,
-                    "temperature": LLM_PARAMS["community_post"]["temperature"],
-                    "system": system + "\nÇıktın SADECE geçerli JSON olmalı. Başka hiçbir şey yazma — açıklama, yorum, markdown bloğu YAZMA.",
-                    "messages": [{"role": "user", "content": user}],
-                }
-            )
-            
-            if response.status_code != 200:
-                logger.warning(f"Community post LLM error: {response.status_code}")
+        payload = {
+            "model": self.llm_model_entry,  # sonnet — kaliteli içerik
+            "max_tokens": max_tokens,
+            "temperature": LLM_PARAMS["community_post"]["temperature"],
+            "system": system + "\nÇıktın SADECE geçerli JSON olmalı. Başka hiçbir şey yazma — açıklama, yorum, markdown bloğu YAZMA.",
+            "messages": [{"role": "user", "content": user}],
+        }
+
+        # Gece batch'i içindeysek istek Message Batches kuyruğuna gider
+        batch = current_batch()
+        if batch is not None:
+            data = await batch.request(payload)
+            if not data:
+                logger.warning("Community post LLM error: batch request failed")
                 return ""
-            
-            data = response.json()
             return data["content"][0]["text"].strip()
+
+        response = await LLMGateway.messages(payload, api_key=self.anthropic_key, timeout=60.0)
+
+        if response.status_code != 200:
+            logger.warning(f"Community post LLM error: {response.status_code}")
+            return ""
+
+        data = response.json()
+        return data["content"][0]["text"].strip()
     
     def _parse_post_json(self, raw: str, post_type: str) -> Optional[dict]:
         """LLM çıktısını JSON olarak parse et. Hata durumunda None."""
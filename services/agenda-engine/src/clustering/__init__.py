@@ -1,3 +1,4 @@
 from .event_clusterer import EventClusterer
+from .executor import ClusteringExecutor
 
-__all__ = ["EventClusterer"]
+__all__ = ["EventClusterer", "ClusteringExecutor"]
@@ -4,13 +4,9 @@ from typing import List, Dict, Optional
 from uuid import uuid4, UUID
 from collections import defaultdict
 
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.cluster import AgglomerativeClustering
-from sklearn.metrics.pairwise import cosine_similarity
-import numpy as np
-
 from ..models import Event
 from ..database import Database
+from .executor import ClusteringExecutor
 
 logger = logging.getLogger(__name__)
 
@@ -20,11 +16,7 @@ class EventClusterer:
 
     def __init__(self, similarity_threshold: float = 0.5):
         self.similarity_threshold = similarity_threshold
-        self.vectorizer = TfidfVectorizer(
-            max_features=1000,
-            stop_words=self._get_turkish_stopwords(),
-            ngram_range=(1, 2)
-        )
+        self.max_features = 1000
 
     def _get_turkish_stopwords(self) -> List[str]:
         """Return a list of Turkish stopwords."""
@@ -51,24 +43,17 @@ class EventClusterer:
         # Extract text features
         texts = [f"{e.title} {e.description or ''}" for e in events]
 
+        # TF-IDF + agglomerative clustering event loop dışında (process pool)
+        labels = await ClusteringExecutor.cluster_labels(
+            texts,
+            self.similarity_threshold,
+            self.max_features,
+            self._get_turkish_stopwords(),
+        )
+
         try:
-            # Vectorize texts
-            tfidf_matrix = self.vectorizer.fit_transform(texts)
-
-            # Calculate similarity matrix
-            similarity_matrix = cosine_similarity(tfidf_matrix)
-
-            # Convert to distance matrix
-            distance_matrix = 1 - similarity_matrix
-
-            # Cluster
-            clustering = AgglomerativeClustering(
-                n_clusters=None,
-                distance_threshold=1 - self.similarity_threshold,
-                metric="precomputed",
-                linkage="average"
-            )
-            labels = clustering.fit_predict(distance_matrix)
+            if labels is None:
+                raise RuntimeError("clustering executor returned no labels")
 
             # Group events by cluster
             clusters: Dict[UUID, List[Event]] = defaultdict(list)
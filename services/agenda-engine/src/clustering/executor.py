@@ -0,0 +1,260 @@
+"""
+Clustering Executor - CPU-bound sklearn clustering'i event loop dışında çalıştır.
+
+TfidfVectorizer + cosine_similarity + AgglomerativeClustering async fonksiyonların
+içinde doğrudan çalışınca FastAPI health check'leri ve diğer scheduler job'ları
+bekliyordu. Bu modül hesaplamayı process pool'a (veya thread'e) taşır.
+
+Modlar (settings.clustering_executor):
+- "process": ProcessPoolExecutor (spawn) — GIL'den bağımsız, default
+- "thread":  default thread pool — sklearn/numpy GIL'i kısmen bırakır
+- "inline":  eski davranış (event loop'ta), karşılaştırma için
+
+Engine (settings.clustering_engine):
+- "dense":  n×n cosine distance + average-linkage (eski yol, O(n²) bellek)
+- "sparse": TF-IDF üzerinde threshold'lu sparse komşuluk grafı → connected
+  components → her component içinde aynı average-linkage. Average linkage
+  iki cluster'ı ancak aralarında en az bir çift threshold altındaysa birleştirir,
+  yani cluster'lar component sınırını hiç aşmaz: sonuç dense ile aynıdır,
+  maliyet ise component boyutlarına bağlıdır. Çok büyük component'lerde
+  leader clustering'e düşülür.
+
+Timeout veya hata durumunda None döner; çağıran taraf mevcut fallback'e
+(her event/başlık ayrı cluster) düşer. Process modunda timeout'ta pool'un
+worker'ları öldürülür (başlamış bir task future iptaliyle durmaz, pool'u
+doldurup sonraki çağrıları da timeout'a sokardı); pool sonraki çağrıda
+yeniden kurulur.
+"""
+
+import asyncio
+import logging
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import List, Optional
+
+import numpy as np
+
+from ..config import get_settings
+
+logger = logging.getLogger(__name__)
+
+
+def compute_cluster_labels(
+    texts: List[str],
+    similarity_threshold: float,
+    max_features: int,
+    stop_words: List[str],
+    engine: str = "sparse",
+    component_max_size: int = 5000,
+) -> List[int]:
+    """TF-IDF + cosine benzerlik + average-linkage → cluster label listesi.
+
+    Top-level fonksiyon: process pool'a pickle edilebilmesi için.
+    """
+    from sklearn.feature_extraction.text import TfidfVectorizer
+
+    vectorizer = TfidfVectorizer(
+        max_features=max_features,
+        stop_words=stop_words,
+        ngram_range=(1, 2)
+    )
+    tfidf_matrix = vectorizer.fit_transform(texts)
+
+    if engine == "dense":
+        return _average_linkage_labels(tfidf_matrix, similarity_threshold)
+    return sparse_component_labels(tfidf_matrix, similarity_threshold, component_max_size)
+
+
+def _average_linkage_labels(tfidf_matrix, similarity_threshold: float) -> List[int]:
+    """Dense n×n distance matrisi üzerinde average-linkage agglomerative."""
+    from sklearn.cluster import AgglomerativeClustering
+    from sklearn.metrics.pairwise import cosine_similarity
+
+    if tfidf_matrix.shape[0] < 2:
+        return [0] * tfidf_matrix.shape[0]
+
+    distance_matrix = 1 - cosine_similarity(tfidf_matrix)
+    clustering = AgglomerativeClustering(
+        n_clusters=None,
+        distance_threshold=1 - similarity_threshold,
+        metric="precomputed",
+        linkage="average"
+    )
+    return [int(label) for label in clustering.fit_predict(distance_matrix)]
+
+
+def _similarity_graph(tfidf_matrix, similarity_threshold: float, chunk_size: int = 1000):
+    """Benzerliği threshold'un üstünde olan çiftlerden sparse graf (satır chunk'larıyla).
+
+    Kenar ağırlığı cosine similarity'dir (leader clustering için).
+    """
+    import scipy.sparse as sp
+
+    n = tfidf_matrix.shape[0]
+    tfidf_matrix = sp.csr_matrix(tfidf_matrix)
+    transposed = tfidf_matrix.T.tocsc()
+    blocks = []
+    for start in range(0, n, chunk_size):
+        # TF-IDF l2-normalize → dot product = cosine similarity; sadece ortak terimi olanlar dolu
+        block = (tfidf_matrix[start:start + chunk_size] @ transposed).tocsr()
+        # Dense yol ile aynı sınır: distance < 1 - threshold  <=>  similarity > threshold
+        block.data[block.data <= similarity_threshold] = 0
+        block.eliminate_zeros()
+        blocks.append(block)
+    return sp.vstack(blocks).tocsr() if blocks else sp.csr_matrix((0, 0))
+
+
+def _component_average_linkage(sub_matrix, similarity_threshold: float) -> np.ndarray:
+    """Component içi average-linkage (scipy) — sklearn ile aynı kesme: distance < 1 - threshold."""
+    from scipy.cluster.hierarchy import fcluster, linkage
+    from scipy.spatial.distance import squareform
+
+    m = sub_matrix.shape[0]
+    if m == 2:
+        return np.zeros(2, dtype=np.int64)  # Component'te kenar var → zaten benzer
+    distances = 1 - (sub_matrix @ sub_matrix.T).toarray()
+    np.clip(distances, 0.0, None, out=distances)
+    np.fill_diagonal(distances, 0.0)
+    tree = linkage(squareform(distances, checks=False), method="average")
+    # fcluster "<= t" ile keser; sklearn distance_threshold "< t" ile birleştirir
+    cut = np.nextafter(1 - similarity_threshold, 0)
+    return fcluster(tree, t=cut, criterion="distance") - 1
+
+
+def _leader_labels(graph, members: np.ndarray) -> np.ndarray:
+    """Greedy leader clustering: her satır, benzerliği threshold'u geçen en yakın lidere katılır.
+
+    Sadece graf kenarlarına bakar → O(kenar sayısı).
+    """
+    leader_label: dict = {}  # satır -> label
+    labels = np.empty(len(members), dtype=np.int64)
+    for i, row in enumerate(members):
+        start, end = graph.indptr[row], graph.indptr[row + 1]
+        best_label, best_sim = -1, -1.0
+        for neighbor, sim in zip(graph.indices[start:end], graph.data[start:end]):
+            label = leader_label.get(int(neighbor))
+            if label is not None and sim > best_sim:
+                best_label, best_sim = label, sim
+        if best_label == -1:
+            best_label = len(leader_label)
+            leader_label[int(row)] = best_label
+        labels[i] = best_label
+    return labels
+
+
+def sparse_component_labels(tfidf_matrix, similarity_threshold: float, component_max_size: int = 5000) -> List[int]:
+    """Sparse komşuluk grafı → connected components → component içi average-linkage."""
+    import scipy.sparse as sp
+    from scipy.sparse.csgraph import connected_components
+
+    n = tfidf_matrix.shape[0]
+    if n < 2:
+        return [0] * n
+
+    tfidf_matrix = sp.csr_matrix(tfidf_matrix)
+    graph = _similarity_graph(tfidf_matrix, similarity_threshold)
+    n_components, component_of = connected_components(graph, directed=False)
+
+    labels = np.empty(n, dtype=np.int64)
+    next_label = 0
+    members_by_component = np.argsort(component_of, kind="stable")
+    boundaries = np.searchsorted(component_of[members_by_component], np.arange(n_components + 1))
+    for c in range(n_components):
+        members = members_by_component[boundaries[c]:boundaries[c + 1]]
+        if len(members) == 1:
+            sub_labels = np.zeros(1, dtype=np.int64)
+        elif len(members) <= component_max_size:
+            sub_labels = _component_average_linkage(tfidf_matrix[members], similarity_threshold)
+        else:
+            sub_labels = _leader_labels(graph, members)
+        labels[members] = sub_labels + next_label
+        next_label += int(sub_labels.max()) + 1
+    return [int(label) for label in labels]
+
+
+class ClusteringExecutor:
+    """Process-wide clustering executor (Database gibi class-level state)."""
+
+    _pool: Optional[ProcessPoolExecutor] = None
+
+    @classmethod
+    def _get_pool(cls) -> ProcessPoolExecutor:
+        if cls._pool is None:
+            settings = get_settings()
+            # fork yerine spawn: asyncio/thread'li parent process'ten güvenli
+            cls._pool = ProcessPoolExecutor(
+                max_workers=max(1, settings.clustering_max_workers),
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return cls._pool
+
+    @classmethod
+    async def cluster_labels(
+        cls,
+        texts: List[str],
+        similarity_threshold: float,
+        max_features: int,
+        stop_words: List[str],
+    ) -> Optional[List[int]]:
+        """Label listesi veya (timeout/hata) None."""
+        settings = get_settings()
+        mode = settings.clustering_executor
+        args = (
+            texts, similarity_threshold, max_features, stop_words,
+            settings.clustering_engine, settings.clustering_component_max_size,
+        )
+        started = time.monotonic()
+        executor = None
+
+        try:
+            if mode == "inline":
+                labels = compute_cluster_labels(*args)
+            else:
+                loop = asyncio.get_running_loop()
+                executor = cls._get_pool() if mode == "process" else None
+                labels = await asyncio.wait_for(
+                    loop.run_in_executor(executor, compute_cluster_labels, *args),
+                    timeout=settings.clustering_timeout_seconds,
+                )
+        except asyncio.TimeoutError:
+            logger.error(
+                f"Clustering timeout ({settings.clustering_timeout_seconds}s, {len(texts)} text), fallback kullanılıyor"
+            )
+            if executor is not None and cls._pool is executor:
+                cls.terminate()
+            return None
+        except BrokenProcessPool as e:
+            logger.error(f"Clustering process pool bozuldu, yeniden oluşturulacak: {e}")
+            if cls._pool is executor:  # terminate() sonrası kurulan yeni pool'a dokunma
+                cls.shutdown()
+            return None
+        except Exception as e:
+            logger.error(f"Error clustering {len(texts)} texts: {e}")
+            return None
+
+        logger.debug(f"Clustering [{mode}/{settings.clustering_engine}] {len(texts)} text: {time.monotonic() - started:.3f}s")
+        return labels
+
+    @classmethod
+    def shutdown(cls):
+        if cls._pool is not None:
+            cls._pool.shutdown(wait=False, cancel_futures=True)
+            cls._pool = None
+
+    @classmethod
+    def terminate(cls):
+        """Pool'u bırak ve worker process'lerini öldür (shutdown çalışan task'ı durdurmaz).
+
+        Aynı pool'da bekleyen diğer çağrılar BrokenProcessPool ile fallback'e düşer.
+        """
+        pool, cls._pool = cls._pool, None
+        if pool is None:
+            return
+        processes = list((pool._processes or {}).values())
+        pool.shutdown(wait=False, cancel_futures=True)
+        for process in processes:
+            if process.is_alive():
+                process.terminate()
+        logger.warning(f"Clustering process pool terminated ({len(processes)} worker)")
@@ -3,14 +3,21 @@ Duplicate Detection & Topic Similarity Sistemi
 
 Aynı konu hakkında tekrar topic açılmasını önler.
 Benzer başlıkları tespit edip gruplar.
+
+Benzerlik kontrolü MinHash-LSH indeksi üzerinden yapılır (bkz. topic_index.py):
+aday başlıklar bucket lookup ile bulunur, Jaccard sadece adaylara uygulanır.
 """
 
+import asyncio
 import re
 import hashlib
 from typing import List, Set, Optional, Dict, Tuple
 from datetime import datetime, timedelta
 import logging
 
+from .topic_index import MinHashLSH, TopicTitleIndex
+from ..topic_similarity import TopicSimilarity
+
 logger = logging.getLogger(__name__)
 
 
@@ -28,6 +35,10 @@ STOP_WORDS = {
 # Benzerlik eşiği (0-1 arası, 1 = tamamen aynı)
 SIMILARITY_THRESHOLD = 0.85
 
+# İndeks sync'i high-water mark'tan bu kadar geriden başlar: created_at'i eski
+# ama transaction'ı geç commit edilen topic'ler kaçmasın (ekleme idempotent)
+INDEX_SYNC_OVERLAP = timedelta(minutes=5)
+
 
 class TopicDeduplicator:
     """Topic duplicate detection ve benzerlik kontrolü."""
@@ -83,8 +94,9 @@ class TopicDeduplicator:
         Başlığın duplicate olup olmadığını kontrol et.
         
         instructionset.md: Bir başlık bir kez açıldıysa, ASLA tekrar açılamaz.
-        - slug kontrolü
-        - semantic similarity check (>0.85 = duplicate)
+        - slug kontrolü (db_conn verilirse)
+        - semantic similarity check (>0.85 = duplicate): önce LSH indeksi,
+          bulunamazsa pg_trgm (TopicSimilarity, indeks soğuk/eksik olsa da tüm geçmiş)
         
         Returns:
             (is_duplicate, similar_title)
@@ -103,6 +115,15 @@ class TopicDeduplicator:
             if datetime.now() - self._local_cache[cache_key] < self._cache_ttl:
                 return True, title
         
+        # LSH indeksi: tüm topic geçmişinde benzer başlık (DB'ye gitmeden)
+        try:
+            candidates = await TopicTitleIndex.candidates(category, self.get_keywords(title))
+            similar = await self.check_similarity_batch(title, candidates)
+            if similar:
+                return True, similar[0][0]
+        except Exception as e:
+            logger.warning(f"Topic index duplicate check failed: {e}")
+
         # Veritabanı kontrolü (instructionset.md gereksinimi)
         if db_conn:
             try:
@@ -114,28 +135,15 @@ class TopicDeduplicator:
                 )
                 if existing_slug:
                     return True, existing_slug
-                
-                # Son 30 günün topic'lerinde benzerlik kontrolü
-                # Not: Slug kontrolü zaten süresiz, bu sadece semantic similarity için
-                recent_titles = await db_conn.fetch(
-                    """
-                    SELECT title FROM topics
-                    WHERE created_at > NOW() - INTERVAL '30 days'
-                    AND category = $1
-                    ORDER BY created_at DESC
-                    LIMIT 200
-                    """,
-                    category
-                )
-                
-                for row in recent_titles:
-                    similarity = self.calculate_similarity(title, row['title'])
-                    if similarity >= SIMILARITY_THRESHOLD:
-                        return True, row['title']
-                        
             except Exception as e:
                 logger.warning(f"DB duplicate check failed: {e}")
-        
+
+        # LSH bulamadı (indeks soğuk ya da son sync'ten yeni topic): DB tarafı
+        # benzerlik (pg_trgm KNN, tüm geçmiş). Bağlantı verilmezse pool'dan alınır.
+        similar_topic = await TopicSimilarity.find_duplicate(title, conn=db_conn)
+        if similar_topic:
+            return True, similar_topic["title"]
+
         return False, None
     
     def _generate_slug(self, title: str) -> str:
@@ -178,6 +186,47 @@ class TopicDeduplicator:
         # Local cache
         self._local_cache[cache_key] = datetime.now()
 
+        # Kalıcı LSH indeksi (TTL yok — tüm geçmiş)
+        try:
+            await TopicTitleIndex.add(title, category, title_hash, self.get_keywords(title))
+        except Exception as e:
+            logger.warning(f"Topic index update failed: {e}")
+
+    async def sync_index(self, db_conn, chunk_size: int = 200) -> int:
+        """
+        Topic başlıklarını LSH indeksine artımlı yükle; eklenen başlık sayısı.
+
+        İlk çalışmada (sync işareti yoksa) tüm geçmiş, sonra sadece son sync'ten
+        yeni topic'ler — mark_as_used'dan geçmeyen (api-gateway, SDK) insert'ler
+        de böylece indekse girer.
+        """
+        synced_at = await TopicTitleIndex.synced_at()
+        query = "SELECT title, COALESCE(category, 'general') AS category, created_at FROM topics"
+        if synced_at is None:
+            rows = await db_conn.fetch(query)
+        else:
+            rows = await db_conn.fetch(
+                query + " WHERE created_at > $1 ORDER BY created_at",
+                synced_at - INDEX_SYNC_OVERLAP,
+            )
+
+        items = [
+            (row["title"], row["category"], self.get_title_hash(row["title"]), list(self.get_keywords(row["title"])))
+            for row in rows
+        ]
+        for start in range(0, len(items), chunk_size):
+            await TopicTitleIndex.add_many(items[start:start + chunk_size])
+            await asyncio.sleep(0)  # Local modda event loop'u uzun süre bloklama
+
+        newest = max((row["created_at"] for row in rows if row["created_at"] is not None), default=None)
+        if newest is not None and (synced_at is None or newest > synced_at):
+            await TopicTitleIndex.set_synced_at(newest)
+        if synced_at is None:
+            logger.info(f"Topic LSH index warmed: {len(items)} titles")
+        elif items:
+            logger.debug(f"Topic LSH index synced: {len(items)} titles")
+        return len(items)
+
     async def filter_duplicates(
         self, 
         events: List[dict],
@@ -186,6 +235,7 @@ class TopicDeduplicator:
         """Event listesinden duplicate'leri filtrele."""
         filtered = []
         seen_hashes = set()
+        batch_index = MinHashLSH()  # Batch içi benzerlik: O(n²) yerine bucket lookup
         
         for event in events:
             title = event.get("title", "")
@@ -203,10 +253,11 @@ class TopicDeduplicator:
                 logger.debug(f"Duplicate (cache): {title[:50]} ~ {similar[:50] if similar else ''}")
                 continue
             
-            # Benzerlik kontrolü (batch içinde)
+            # Benzerlik kontrolü (batch içinde, sadece aynı bucket'a düşen adaylar)
+            keywords = self.get_keywords(title)
             similar_in_batch = await self.check_similarity_batch(
-                title, 
-                [e.get("title", "") for e in filtered]
+                title,
+                [filtered[int(i)].get("title", "") for i in batch_index.query(keywords)]
             )
             
             if similar_in_batch:
@@ -215,6 +266,7 @@ class TopicDeduplicator:
                 continue
             
             seen_hashes.add(title_hash)
+            batch_index.insert(str(len(filtered)), keywords)
             filtered.append(event)
         
         logger.info(f"Dedup: {len(events)} -> {len(filtered)} events ({len(events) - len(filtered)} removed)")
@@ -16,7 +16,6 @@ import hashlib
 import random
 import uuid
 import os
-import httpx
 from typing import List, Optional, Set
 from datetime import datetime, date
 from collections import deque
@@ -24,6 +23,7 @@ import logging
 
 from .base import BaseCollector
 from ..models import Event, EventStatus
+from ..llm_gateway import LLMGateway
 
 logger = logging.getLogger(__name__)
 
@@ -226,70 +226,65 @@ Başla:"""
     llm_model_comment = os.getenv("LLM_MODEL_COMMENT", "claude-haiku-4-5-20251001")
     
     try:
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            response = await client.post(
-                "https://api.anthropic.com/v1/messages",
-                headers={
-                    "x-api-key": api_key,
-                    "anthropic-version": "2023-06-01",
-                    "Content-Type": "application/json",
-                },
-                json={
-                    "model": llm_model_comment,
-                    "max_tokens": 500,
-                    "temperature": 0.95,
-                    "system": system_prompt,
-                    "messages": [
-                        {"role": "user", "content": user_prompt},
-                    ],
-                }
-            )
-            
-            if response.status_code != 200:
-                logger.error(f"Anthropic API error: {response.status_code}")
-                raise LLMUnavailableError(f"Anthropic API returned status {response.status_code}")
-            
-            data = response.json()
-            content = data["content"][0]["text"]
-            
-            # Parse response
-            titles = []
-            lines = content.strip().split("\n")
-            current_title = None
-            current_category = None
-            
-            for line in lines:
-                line = line.strip()
-                if line.startswith("BASLIK:"):
-                    current_title = line.replace("BASLIK:", "").strip()
-                elif line.startswith("KATEGORI:"):
-                    parsed_cat = line.replace("KATEGORI:", "").strip().lower()
-                    valid_cats = ["dertlesme", "felsefe", "iliskiler", "kisiler", "bilgi", "nostalji", "absurt"]
-                    current_category = parsed_cat if parsed_cat in valid_cats else random.choice(valid_cats)
-                    if current_title:
-                        # target_category varsa LLM ne derse desin onu kullan
-                        final_cat = target_category if target_category else current_category
-                        titles.append({
-                            "title": current_title,
-                            "category": final_cat,
-                        })
-                        current_title = None
-            
-            # Son başlık kategori olmadan kalmışsa
-            if current_title:
-                if target_category:
-                    titles.append({"title": current_title, "category": target_category})
-                else:
-                    fallback_cats = ["kisiler", "bilgi", "iliskiler", "absurt", "nostalji", "dertlesme", "felsefe"]
-                    titles.append({"title": current_title, "category": random.choice(fallback_cats)})
-
-            # Üretilen başlıkları recent listesine ekle (çeşitlilik takibi)
-            for t in titles:
-                _add_to_recent(t["title"], t["category"])
-
-            logger.info(f"LLM generated {len(titles)} organic titles (recent: {len(_recent_topics)})")
-            return titles[:count]
-            
+        response = await LLMGateway.messages(
+            {
+                "model": llm_model_comment,
+                "max_tokens": 500,
+                "temperature": 0.95,
+                "system": system_prompt,
+                "messages": [
+                    {"role": "user", "content": user_prompt},
+                ],
+            },
+            api_key=api_key,
+            timeout=30.0,
+        )
+
+        if response.status_code != 200:
+            logger.error(f"Anthropic API error: {response.status_code}")
+            raise LLMUnavailableError(f"Anthropic API returned status {response.status_code}")
+        
+        data = response.json()
+        content = data["content"][0]["text"]
+        
+        # Parse response
+        titles = []
+        lines = content.strip().split("\n")
+        current_title = None
+        current_category = None
+        
+        for line in lines:
+            line = line.strip()
+            if line.startswith("BASLIK:"):
+                current_title = line.replace("BASLIK:", "").strip()
+            elif line.startswith("KATEGORI:"):
+                parsed_cat = line.replace("KATEGORI:", "").strip().lower()
+                valid_cats = ["dertlesme", "felsefe", "iliskiler", "kisiler", "bilgi", "nostalji", "absurt"]
+                current_category = parsed_cat if parsed_cat in valid_cats else random.choice(valid_cats)
+                if current_title:
+                    # target_category varsa LLM ne derse desin onu kullan
+                    final_cat = target_category if target_category else current_category
+                    titles.append({
+                        "title": current_title,
+                        "category": final_cat,
+                    })
+                    current_title = None
+        
+        # Son başlık kategori olmadan kalmışsa
+        if current_title:
+            if target_category:
+                titles.append({"title": current_title, "category": target_category})
+            else:
+                fallback_cats = ["kisiler", "bilgi", "iliskiler", "absurt", "nostalji", "dertlesme", "felsefe"]
+                titles.append({"title": current_title, "category": random.choice(fallback_cats)})
+
+        # Üretilen başlıkları recent listesine ekle (çeşitlilik takibi)
+        for t in titles:
+            _add_to_recent(t["title"], t["category"])
+
+        logger.info(f"LLM generated {len(titles)} organic titles (recent: {len(_recent_topics)})")
+        return titles[:count]
+        
     except LLMUnavailableError:
         # Re-raise LLM unavailable errors - don't silently fail
         raise
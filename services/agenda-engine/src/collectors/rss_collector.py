@@ -1,9 +1,12 @@
+import asyncio
 import feedparser
 import httpx
 import hashlib
+import json
 import re
 from typing import List, Optional
 from datetime import datetime
+from urllib.parse import urlparse
 import logging
 
 from .base import BaseCollector
@@ -70,6 +73,12 @@ RSS_FEEDS_BY_CATEGORY = {
     ],
 }
 
+# Conditional GET state (ETag/Last-Modified + son parse edilen entry'ler) Redis key'i
+FEED_STATE_KEY = "rss:feed_state:{name}"
+FEED_STATE_TTL_SECONDS = 3 * 24 * 3600
+# 304 sonrası yeniden kullanmak için saklanan entry alanları (_parse_entry'nin okudukları)
+_STORED_ENTRY_FIELDS = ("title", "summary", "description", "link")
+
 # Düz liste oluştur (geriye uyumluluk için)
 RSS_FEEDS = []
 for category, feeds in RSS_FEEDS_BY_CATEGORY.items():
@@ -135,6 +144,7 @@ class RSSCollector(BaseCollector):
         self._category_cache: dict = {}  # category -> [events]
         self._failed_feeds: dict = {}  # feed_name -> failure_count
         self._max_failures = 3  # Bu kadar başarısız olursa geçici olarak devre dışı
+        self._host_semaphores: dict = {}  # host -> asyncio.Semaphore (host başına eşzamanlı istek limiti)
 
     def reset_cache(self):
         """Her scheduled collection öncesi cache temizle."""
@@ -154,33 +164,21 @@ class RSSCollector(BaseCollector):
                 logger.info(f"Daily event limit reached ({today_count}/{settings.max_events_per_day}). Skipping collection.")
                 return []
 
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            for feed_config in self.feeds:
-                feed_name = feed_config['name']
-                
-                # Çok fazla başarısız olan feed'leri geç
-                if self._failed_feeds.get(feed_name, 0) >= self._max_failures:
-                    logger.debug(f"Skipping {feed_name} (too many failures)")
-                    continue
-                
-                try:
-                    events = await self._collect_from_feed(client, feed_config)
-                    all_events.extend(events)
-                    
-                    # Başarılı - failure sayacını sıfırla
-                    if feed_name in self._failed_feeds:
-                        del self._failed_feeds[feed_name]
-                    
-                    logger.info(f"Collected {len(events)} events from {feed_name}")
-                    
-                    # Check if we've hit the daily limit
-                    if settings.use_daily_cache and len(all_events) >= settings.max_events_per_day:
-                        logger.info(f"Reached max events per day ({settings.max_events_per_day})")
-                        break
-                except Exception as e:
-                    # Hata sayacını artır ama devam et
-                    self._failed_feeds[feed_name] = self._failed_feeds.get(feed_name, 0) + 1
-                    logger.warning(f"Feed failed ({self._failed_feeds[feed_name]}/{self._max_failures}): {feed_name} - {e}")
+        active_feeds = []
+        for feed_config in self.feeds:
+            # Çok fazla başarısız olan feed'leri geç
+            if self._failed_feeds.get(feed_config['name'], 0) >= self._max_failures:
+                logger.debug(f"Skipping {feed_config['name']} (too many failures)")
+                continue
+            active_feeds.append(feed_config)
+
+        # Feed'ler eşzamanlı çekilir; yavaş bir feed diğerlerini bekletmez
+        async with self._create_client() as client:
+            results = await asyncio.gather(
+                *[self._collect_feed_tracked(client, feed_config) for feed_config in active_feeds]
+            )
+        for events in results:
+            all_events.extend(events)
 
         # Trim to max if needed
         if settings.use_daily_cache and len(all_events) > settings.max_events_per_day:
@@ -202,14 +200,18 @@ class RSSCollector(BaseCollector):
         feeds = self.feeds_by_category[category]
         category_label = CATEGORIES.get(category, category)
         
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            for feed_config in feeds:
-                feed_with_cat = {**feed_config, "category": category_label}
-                try:
-                    feed_events = await self._collect_from_feed(client, feed_with_cat)
-                    events.extend(feed_events)
-                except Exception as e:
-                    logger.error(f"Error collecting {feed_config['name']}: {e}")
+        async def _collect_one(client: httpx.AsyncClient, feed_config: dict) -> List[Event]:
+            feed_with_cat = {**feed_config, "category": category_label}
+            try:
+                return await self._collect_from_feed(client, feed_with_cat)
+            except Exception as e:
+                logger.error(f"Error collecting {feed_config['name']}: {e}")
+                return []
+
+        async with self._create_client() as client:
+            results = await asyncio.gather(*[_collect_one(client, f) for f in feeds])
+        for feed_events in results:
+            events.extend(feed_events)
         
         # Cache'e kaydet
         self._category_cache[category] = {
@@ -220,6 +222,37 @@ class RSSCollector(BaseCollector):
         logger.info(f"Collected {len(events)} events for category: {category}")
         return events
 
+    def _create_client(self) -> httpx.AsyncClient:
+        settings = get_settings()
+        return httpx.AsyncClient(
+            timeout=30.0,
+            limits=httpx.Limits(max_connections=settings.rss_max_concurrency),
+        )
+
+    def _host_semaphore(self, url: str) -> asyncio.Semaphore:
+        host = urlparse(url).hostname or url
+        if host not in self._host_semaphores:
+            self._host_semaphores[host] = asyncio.Semaphore(max(1, get_settings().rss_per_host_concurrency))
+        return self._host_semaphores[host]
+
+    async def _collect_feed_tracked(self, client: httpx.AsyncClient, feed_config: dict) -> List[Event]:
+        """collect() için: tek feed topla, failure sayacını güncelle."""
+        feed_name = feed_config['name']
+        try:
+            events = await self._collect_from_feed(client, feed_config)
+
+            # Başarılı - failure sayacını sıfırla
+            if feed_name in self._failed_feeds:
+                del self._failed_feeds[feed_name]
+
+            logger.info(f"Collected {len(events)} events from {feed_name}")
+            return events
+        except Exception as e:
+            # Hata sayacını artır ama devam et
+            self._failed_feeds[feed_name] = self._failed_feeds.get(feed_name, 0) + 1
+            logger.warning(f"Feed failed ({self._failed_feeds[feed_name]}/{self._max_failures}): {feed_name} - {e}")
+            return []
+
     async def get_cached_or_collect(self, category: str, max_age_hours: int = 2) -> List[Event]:
         """Cache'den al veya yeni topla."""
         cached = self._category_cache.get(category)
@@ -261,12 +294,9 @@ class RSSCollector(BaseCollector):
         events = []
 
         try:
-            response = await client.get(feed_config["url"])
-            response.raise_for_status()
-
-            feed = feedparser.parse(response.text)
+            entries = await self._fetch_feed_entries(client, feed_config)
 
-            for entry in feed.entries[:20]:  # Limit to latest 20 entries
+            for entry in entries[:20]:  # Limit to latest 20 entries
                 event = self._parse_entry(entry, feed_config)
                 if event and not await self.is_duplicate(event):
                     events.append(event)
@@ -276,6 +306,68 @@ class RSSCollector(BaseCollector):
 
         return events
 
+    async def _fetch_feed_entries(self, client: httpx.AsyncClient, feed_config: dict) -> list:
+        """
+        Feed'i conditional GET ile çek. 304 gelirse Redis'te saklanan son entry'ler
+        parse edilmeden döner; 200 gelirse feedparser thread pool'da çalışır.
+        """
+        feed_name = feed_config["name"]
+        state = await self._load_feed_state(feed_name)
+
+        headers = {}
+        if state and state.get("entries") is not None:
+            if state.get("etag"):
+                headers["If-None-Match"] = state["etag"]
+            if state.get("last_modified"):
+                headers["If-Modified-Since"] = state["last_modified"]
+
+        async with self._host_semaphore(feed_config["url"]):
+            response = await client.get(feed_config["url"], headers=headers)
+
+        if response.status_code == 304 and headers:
+            logger.debug(f"{feed_name}: 304 Not Modified, cached entries kullanılıyor")
+            return [feedparser.FeedParserDict(e) for e in state["entries"]]
+
+        response.raise_for_status()
+
+        # feedparser CPU-bound — event loop'u bloklamasın
+        feed = await asyncio.to_thread(feedparser.parse, response.text)
+        entries = feed.entries[:20]
+
+        await self._save_feed_state(feed_name, response.headers, entries)
+        return entries
+
+    async def _load_feed_state(self, feed_name: str) -> Optional[dict]:
+        try:
+            raw = await Database.get_redis().get(FEED_STATE_KEY.format(name=feed_name))
+            return json.loads(raw) if raw else None
+        except Exception as e:
+            logger.debug(f"Feed state okunamadı ({feed_name}): {e}")
+            return None
+
+    async def _save_feed_state(self, feed_name: str, response_headers, entries: list):
+        etag = response_headers.get("etag")
+        last_modified = response_headers.get("last-modified")
+        if not etag and not last_modified:
+            return  # Sunucu validator vermiyorsa saklamanın anlamı yok
+
+        stored = []
+        for entry in entries:
+            item = {k: entry.get(k) for k in _STORED_ENTRY_FIELDS if entry.get(k)}
+            if entry.get("media_content"):
+                item["media_content"] = [{"url": m.get("url")} for m in entry.media_content]
+            if entry.get("enclosures"):
+                item["enclosures"] = [{"type": e.get("type", ""), "url": e.get("url")} for e in entry.enclosures]
+            stored.append(item)
+
+        state = {"etag": etag, "last_modified": last_modified, "entries": stored}
+        try:
+            await Database.get_redis().set(
+                FEED_STATE_KEY.format(name=feed_name), json.dumps(state), ex=FEED_STATE_TTL_SECONDS
+            )
+        except Exception as e:
+            logger.debug(f"Feed state kaydedilemedi ({feed_name}): {e}")
+
     def _is_ad_content(self, title: str, description: str = "") -> bool:
         """Reklam içeriği kontrolü."""
         ad_keywords = [
@@ -0,0 +1,203 @@
+"""
+Topic Title Index - Normalize edilmiş topic başlıkları için MinHash-LSH indeksi.
+
+TopicDeduplicator her kontrolde kategori başına son 200 başlığı DB'den çekip
+hepsiyle Jaccard hesaplıyordu. Bu indeks başlığın keyword setinden MinHash
+imzası çıkarır, imzayı band'lere böler ve her band'i bir bucket'a yazar.
+Duplicate kontrolü = band bucket'larının birleşimi (aday kümesi) + adaylar
+üzerinde gerçek Jaccard doğrulaması. DB'ye gidilmez, tüm topic geçmişi kapsanır.
+
+Band ayarı (16 band × 4 satır): Jaccard 0.85 olan bir çiftin aynı bucket'a
+düşme olasılığı ~0.99999; Jaccard 0.3 olan çiftlerin ~%12'si aday olur ve
+doğrulamada elenir.
+
+Depolama:
+- Redis (varsa): `topic_lsh:{category}:{band}:{hash}` SET'leri + `topic_lsh:titles` HASH
+- Local fallback: Redis bağlı değilse / hata verirse process içi dict'ler
+
+Senkron: indekse en son alınan topic'in created_at'i (high-water mark)
+`topic_lsh:synced_at`'te tutulur; periyodik sync sadece ondan yeni topic'leri
+ekler (api-gateway / SDK ile açılanlar dahil). İşaret yoksa tüm geçmiş yüklenir.
+"""
+
+import hashlib
+import logging
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, Optional, Set
+
+import numpy as np
+
+from ..database import Database
+
+logger = logging.getLogger(__name__)
+
+BUCKET_KEY = "topic_lsh:{category}:{band}"
+TITLES_KEY = "topic_lsh:titles"  # field: "{category}:{title_hash}" -> title
+SYNCED_AT_KEY = "topic_lsh:synced_at"  # İndeksteki en yeni topic'in created_at'i (epoch)
+
+_MERSENNE_PRIME = (1 << 31) - 1  # a * h + b uint64'e sığar (a, h < 2^32)
+
+
+class MinHashLSH:
+    """Saf Python MinHash + banding. Token seti -> band anahtarları."""
+
+    def __init__(self, num_perm: int = 64, bands: int = 16, seed: int = 1):
+        if num_perm % bands:
+            raise ValueError("num_perm bands'e tam bölünmeli")
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        rng = np.random.RandomState(seed)  # Sabit seed: imzalar process'ler arası aynı kalmalı
+        self._a = rng.randint(1, _MERSENNE_PRIME, size=(num_perm, 1)).astype(np.uint64)
+        self._b = rng.randint(0, _MERSENNE_PRIME, size=(num_perm, 1)).astype(np.uint64)
+        self._buckets: Dict[str, Set[str]] = {}
+
+    @staticmethod
+    def _token_hash(token: str) -> int:
+        return int.from_bytes(hashlib.blake2b(token.encode(), digest_size=4).digest(), "big")
+
+    def signature(self, tokens: Iterable[str]) -> List[int]:
+        hashes = np.fromiter((self._token_hash(t) for t in set(tokens)), dtype=np.uint64)
+        if not len(hashes):
+            return []
+        # (num_perm, token) matrisi, her permütasyon için minimum
+        return ((self._a * hashes + self._b) % np.uint64(_MERSENNE_PRIME)).min(axis=1).tolist()
+
+    def band_keys(self, tokens: Iterable[str]) -> List[str]:
+        """Her band için "{band}:{hash}" anahtarı. Boş token seti -> boş liste."""
+        signature = self.signature(tokens)
+        if not signature:
+            return []
+        keys = []
+        for band in range(self.bands):
+            rows = signature[band * self.rows:(band + 1) * self.rows]
+            digest = hashlib.blake2b(",".join(map(str, rows)).encode(), digest_size=8).hexdigest()
+            keys.append(f"{band}:{digest}")
+        return keys
+
+    # In-memory kullanım (batch içi dedup)
+
+    def insert(self, key: str, tokens: Iterable[str]):
+        for band_key in self.band_keys(tokens):
+            self._buckets.setdefault(band_key, set()).add(key)
+
+    def query(self, tokens: Iterable[str]) -> Set[str]:
+        candidates: Set[str] = set()
+        for band_key in self.band_keys(tokens):
+            candidates |= self._buckets.get(band_key, set())
+        return candidates
+
+
+class TopicTitleIndex:
+    """Kalıcı topic başlık indeksi (Database gibi class-level state)."""
+
+    _lsh = MinHashLSH()
+    _local_buckets: Dict[str, Set[str]] = {}  # "{category}:{band}:{hash}" -> {title_key}
+    _local_titles: Dict[str, str] = {}  # "{category}:{title_hash}" -> title
+    _local_synced_at: Optional[datetime] = None
+
+    @staticmethod
+    def _redis():
+        try:
+            return Database.get_redis()
+        except RuntimeError:
+            return None
+
+    @staticmethod
+    def _title_key(category: str, title_hash: str) -> str:
+        return f"{category}:{title_hash}"
+
+    @classmethod
+    def _bucket_keys(cls, category: str, tokens: Iterable[str]) -> List[str]:
+        prefix = BUCKET_KEY.format(category=category, band="")
+        return [prefix + band_key for band_key in cls._lsh.band_keys(tokens)]
+
+    @classmethod
+    async def add_many(cls, items: List[tuple]):
+        """items: [(title, category, title_hash, tokens)] — tek pipeline ile yazılır."""
+        if not items:
+            return
+        redis = cls._redis()
+        if redis is not None:
+            try:
+                pipe = redis.pipeline(transaction=False)
+                for title, category, title_hash, tokens in items:
+                    title_key = cls._title_key(category, title_hash)
+                    for bucket in cls._bucket_keys(category, tokens):
+                        pipe.sadd(bucket, title_key)
+                    pipe.hset(TITLES_KEY, title_key, title)
+                await pipe.execute()
+                return
+            except Exception as e:
+                logger.warning(f"Topic index Redis yazma hatası, local indekse yazılıyor: {e}")
+
+        for title, category, title_hash, tokens in items:
+            title_key = cls._title_key(category, title_hash)
+            for bucket in cls._bucket_keys(category, tokens):
+                cls._local_buckets.setdefault(bucket, set()).add(title_key)
+            cls._local_titles[title_key] = title
+
+    @classmethod
+    async def add(cls, title: str, category: str, title_hash: str, tokens: Iterable[str]):
+        await cls.add_many([(title, category, title_hash, list(tokens))])
+
+    @classmethod
+    async def candidates(cls, category: str, tokens: Iterable[str]) -> List[str]:
+        """Aynı bucket'a düşen aday başlıklar (doğrulama çağıran tarafta)."""
+        buckets = cls._bucket_keys(category, tokens)
+        if not buckets:
+            return []
+
+        redis = cls._redis()
+        if redis is not None:
+            try:
+                pipe = redis.pipeline(transaction=False)
+                for bucket in buckets:
+                    pipe.smembers(bucket)
+                members: Set = set()
+                for result in await pipe.execute():
+                    members |= result
+                if not members:
+                    return []
+                titles = await redis.hmget(TITLES_KEY, list(members))
+                return [
+                    t.decode() if isinstance(t, bytes) else t
+                    for t in titles if t is not None
+                ]
+            except Exception as e:
+                logger.warning(f"Topic index Redis okuma hatası, local indeks kullanılıyor: {e}")
+
+        members = set()
+        for bucket in buckets:
+            members |= cls._local_buckets.get(bucket, set())
+        return [cls._local_titles[m] for m in members if m in cls._local_titles]
+
+    @classmethod
+    async def synced_at(cls) -> Optional[datetime]:
+        """İndeksteki en yeni topic'in created_at'i; hiç sync yapılmadıysa None."""
+        redis = cls._redis()
+        if redis is not None:
+            try:
+                value = await redis.get(SYNCED_AT_KEY)
+                return datetime.fromtimestamp(float(value), tz=timezone.utc) if value else None
+            except Exception as e:
+                logger.warning(f"Topic index sync işareti okunamadı, local kullanılıyor: {e}")
+        return cls._local_synced_at
+
+    @classmethod
+    async def set_synced_at(cls, synced_at: datetime):
+        redis = cls._redis()
+        if redis is not None:
+            try:
+                await redis.set(SYNCED_AT_KEY, str(synced_at.timestamp()))
+                return
+            except Exception as e:
+                logger.warning(f"Topic index sync işareti yazılamadı: {e}")
+        cls._local_synced_at = synced_at
+
+    @classmethod
+    def stats(cls) -> Dict[str, int]:
+        return {
+            "local_titles": len(cls._local_titles),
+            "local_buckets": len(cls._local_buckets),
+        }
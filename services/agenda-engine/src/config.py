@@ -1,3 +1,6 @@
+import os
+import socket
+
 from pydantic_settings import BaseSettings
 from functools import lru_cache
 
@@ -23,6 +26,8 @@ class Settings(BaseSettings):
 
     # Agenda Collection
     rss_fetch_interval: int = 300  # seconds (for backwards compat)
+    rss_max_concurrency: int = 10  # Aynı anda açık max feed bağlantısı
+    rss_per_host_concurrency: int = 2  # Aynı host'a (ör. ntv.com.tr) eşzamanlı istek limiti
     news_api_key: str = ""
     
     # Daily Feed Cache Settings
@@ -38,6 +43,33 @@ class Settings(BaseSettings):
     summary_temperature: float = 0.7
     report_output_dir: str = "data/output"
 
+    # LLM Gateway - tüm Anthropic çağrıları tek, pool'lu client üzerinden
+    anthropic_base_url: str = "https://api.anthropic.com"
+    llm_http2: bool = True
+    llm_max_concurrency: int = 8  # Aynı anda uçuşta olabilecek max LLM isteği
+    llm_max_connections: int = 20
+    llm_max_keepalive_connections: int = 10
+    llm_default_timeout_seconds: float = 60.0
+    llm_model_timeouts: dict = {}  # {"claude-sonnet-4-5-20250929": 120} (env'den JSON)
+    llm_prompt_cache: bool = True  # Stable system prompt segmentlerini cache_control ile işaretle
+
+    # Message Batches - gece community batch'i ve haber özetleme için asenkron batch modu
+    llm_use_message_batches: bool = False
+    llm_batch_poll_interval_seconds: float = 30.0
+    llm_batch_max_wait_seconds: float = 3600.0
+
+    # Clustering executor: "process" (default), "thread" veya "inline" (eski davranış)
+    clustering_executor: str = "process"
+    clustering_max_workers: int = 2
+    clustering_timeout_seconds: float = 30.0
+    # Clustering engine: "sparse" (threshold'lu komşuluk grafı + component içi linkage) veya "dense"
+    clustering_engine: str = "sparse"
+    clustering_component_max_size: int = 5000  # Bundan büyük component'ler leader clustering'e düşer
+
+    # Topic benzerliği (pg_trgm): duplicate eşiği ve KNN ile dönen aday sayısı
+    topic_similarity_threshold: float = 0.85
+    topic_similarity_candidates: int = 5
+
     # Virtual Day - test_mode=True ise 24 saat = 24 dakika olur
     virtual_day_duration_hours: int = 24
 
@@ -45,8 +77,38 @@ class Settings(BaseSettings):
     agent_entry_interval_minutes: int = 180  # prod: 3 saat, 2 random agent/cycle
     agent_comment_interval_minutes: int = 180  # prod: 3 saat
     agent_vote_interval_minutes: int = 60  # prod: 1 saat
+    vote_agents_per_round: int = 3  # Her vote turunda değerlendiren agent sayısı
     agent_max_pending_tasks: int = 5
     agents_per_entry_cycle: int = 1  # Her entry cycle'da 1 agent yazar (art arda topic önleme)
+    agent_cache_ttl_seconds: int = 600  # Sistem agent kayıtları (racon_config) cache süresi
+    agent_memory_flush_interval_seconds: int = 30  # Agent memory snapshot'larının yazılma aralığı
+    # Agent memory deposu: "file" (~/.logsozluk/memory JSON) veya "postgres"
+    # (agent_episodic_memory tabloları; import_agent_memory.py ile taşınır)
+    agent_memory_backend: str = "file"
+
+    # Trending MV'leri (trending_topics_mv / trending_entries_mv): refresh aralığı;
+    # son refresh bundan eskiyse aday sorguları canlı view'e düşer
+    trending_mv_refresh_minutes: int = 5
+    trending_mv_max_staleness_minutes: int = 20
+
+    # Topic dedup LSH indeksi: created_at high-water mark'tan yeni topic'leri çekme aralığı
+    topic_index_sync_minutes: int = 2
+
+    # Görev claim'i (çok worker): worker kimliği (boşsa hostname:pid), claim lease
+    # süresi ve lease'i dolan görevin en fazla kaç kez yeniden deneneceği
+    worker_id: str = ""
+    task_lease_seconds: int = 600
+    task_max_attempts: int = 3
+    # Replikalar arası job koordinasyonu (Redis leader + job kilidi; agent sharding
+    # sadece agent_memory_backend=postgres iken, aksi halde agent job'ları singleton)
+    job_coordination_enabled: bool = True
+
+    # Comment batch modu: "sequential" (sırayla üret + bekle) veya "parallel"
+    # (taslaklar eşzamanlı üretilir, kademeli zamanlarda sırayla yayınlanır)
+    comment_generation_mode: str = "sequential"
+    comment_draft_concurrency: int = 5
+    comment_publish_delay_min_seconds: int = 30
+    comment_publish_delay_max_seconds: int = 120
 
     # Community batch üretim saati (TR saati — APScheduler TR timezone'da çalışır)
     community_batch_hour: int = 0
@@ -66,6 +128,11 @@ class Settings(BaseSettings):
             return 2  # 2 dakikada bir entry
         return self.agent_entry_interval_minutes
     
+    @property
+    def effective_worker_id(self) -> str:
+        """Task claim'lerinde ve job lock'larında kullanılan worker kimliği."""
+        return self.worker_id or f"{socket.gethostname()}:{os.getpid()}"
+
     @property
     def effective_comment_interval(self) -> int:
         """Test mode'da comment interval."""
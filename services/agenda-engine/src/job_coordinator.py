@@ -0,0 +1,254 @@
+"""
+Job Coordinator - birden çok agenda-engine replikası arasında job dağıtımı.
+
+Her replika aynı AsyncIOScheduler job'larını kaydediyor; iki container her
+job'ı iki kez çalıştırıyordu. Redis üzerinden:
+
+- Üyelik: her replika HEARTBEAT_SECONDS'ta bir MEMBERS_KEY sorted set'ine
+  (score = zaman) yazar; LEADER_TTL_SECONDS'tan eski üyeler düşer
+- Leader: LEADER_KEY (SET NX PX, sahibi yeniler). Singleton job'lar
+  (haber toplama, virtual day, DEBE, trending, cleanup, community...) sadece
+  leader'da ve job başına kilitle çalışır — leader değişiminde eski leader'ın
+  hâlâ süren job'ı ile çakışmaz
+- Agent sharding (sadece agent_memory_backend=postgres): entry/comment/vote
+  işleme her replikada çalışır, her sistem agent'ı rendezvous hashing ile tek
+  replikaya aittir (owned()); üye sayısı değişince sadece giden/gelen
+  replikanın agent'ları yer değiştirir ve memory'leri Postgres'ten yeniden
+  yüklenir. Yorumda entry'ler de id'lerine göre tek replikaya düşer (entry
+  başına limit tek process'te sayılır), yorumu o replikanın herhangi bir
+  agent'ı yazar. Dosya backend'inde memory yerel diskte olduğundan agent'lar
+  taşınamaz: sharding kapalıdır, bu job'lar singleton çalışır
+
+Redis yoksa (veya job_coordination_enabled=False) tek replika gibi davranır:
+leader bu process, tüm agent'lar bu process'in.
+"""
+
+import asyncio
+import functools
+import hashlib
+import logging
+import time
+from contextlib import asynccontextmanager
+from typing import Iterable, List, Optional
+
+from .config import get_settings
+from .database import Database
+
+logger = logging.getLogger(__name__)
+
+# Sahibi kontrol ederek uzat / sil (başkasının kilidine dokunma)
+_RENEW_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('pexpire', KEYS[1], ARGV[2])
+end
+return 0
+"""
+_RELEASE_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('del', KEYS[1])
+end
+return 0
+"""
+
+
+class JobCoordinator:
+    """Leader seçimi + job kilitleri + agent sharding (Database gibi class-level state)."""
+
+    LEADER_KEY = "agenda:leader"
+    MEMBERS_KEY = "agenda:workers"
+    JOB_LOCK_PREFIX = "agenda:job:"
+    HEARTBEAT_SECONDS = 10
+    LEADER_TTL_SECONDS = 30
+    JOB_LOCK_TTL_SECONDS = 60  # Job sürerken TTL/3'te bir yenilenir
+
+    _coordinated = False  # Redis koordinasyonu aktif mi
+    _is_leader = True  # Koordinasyon yoksa her şeyi bu process yapar
+    _agent_sharding = False  # Agent'lar replikalara dağıtılıyor mu (postgres memory backend)
+    _members: List[str] = []
+    _heartbeat_task: Optional[asyncio.Task] = None
+
+    @staticmethod
+    def worker_id() -> str:
+        return get_settings().effective_worker_id
+
+    # ============ Lifecycle ============
+
+    @classmethod
+    async def start(cls):
+        """İlk heartbeat + leader denemesi (scheduler.start'tan önce), sonra arka plan döngüsü."""
+        settings = get_settings()
+        if not settings.job_coordination_enabled:
+            logger.info("Job coordination disabled, running all jobs on this replica")
+            return
+        try:
+            await cls._tick()
+            cls._coordinated = True
+        except Exception as e:
+            logger.warning(f"Job coordination unavailable (Redis: {e}), running standalone")
+            return
+        cls._agent_sharding = settings.agent_memory_backend == "postgres"
+        logger.info(
+            f"Job coordination started: worker={cls.worker_id()}, "
+            f"leader={cls._is_leader}, replicas={len(cls._members)}, "
+            f"agent_sharding={cls._agent_sharding}"
+        )
+        if cls._heartbeat_task is None or cls._heartbeat_task.done():
+            cls._heartbeat_task = asyncio.create_task(cls._heartbeat_loop())
+
+    @classmethod
+    async def stop(cls):
+        """Heartbeat'i durdur; leader'lığı ve üyeliği hemen bırak (diğerleri TTL beklemesin)."""
+        if cls._heartbeat_task is not None:
+            cls._heartbeat_task.cancel()
+            try:
+                await cls._heartbeat_task
+            except (asyncio.CancelledError, Exception):
+                pass
+            cls._heartbeat_task = None
+        if not cls._coordinated:
+            return
+        try:
+            redis = Database.get_redis()
+            await redis.eval(_RELEASE_SCRIPT, 1, cls.LEADER_KEY, cls.worker_id())
+            await redis.zrem(cls.MEMBERS_KEY, cls.worker_id())
+        except Exception as e:
+            logger.warning(f"Job coordination release failed: {e}")
+        cls._coordinated = False
+        cls._agent_sharding = False
+
+    @classmethod
+    async def _heartbeat_loop(cls):
+        while True:
+            await asyncio.sleep(cls.HEARTBEAT_SECONDS)
+            try:
+                await cls._tick()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                # Son bilinen durumla devam; leader key TTL'de düşer, başkası alır
+                logger.warning(f"Job coordination heartbeat failed: {e}")
+
+    @classmethod
+    async def _tick(cls):
+        redis = Database.get_redis()
+        worker = cls.worker_id()
+        now = time.time()
+        ttl_ms = cls.LEADER_TTL_SECONDS * 1000
+
+        await redis.zadd(cls.MEMBERS_KEY, {worker: now})
+        await redis.zremrangebyscore(cls.MEMBERS_KEY, "-inf", now - cls.LEADER_TTL_SECONDS)
+        members = await redis.zrange(cls.MEMBERS_KEY, 0, -1)
+        cls._members = sorted(m.decode() if isinstance(m, bytes) else m for m in members)
+
+        if await redis.set(cls.LEADER_KEY, worker, nx=True, px=ttl_ms):
+            leader = True
+        else:
+            leader = bool(await redis.eval(_RENEW_SCRIPT, 1, cls.LEADER_KEY, worker, ttl_ms))
+        if leader != cls._is_leader:
+            logger.info(f"Job leadership {'acquired' if leader else 'lost'}: worker={worker}")
+        cls._is_leader = leader
+
+    # ============ Singleton jobs ============
+
+    @classmethod
+    def is_leader(cls) -> bool:
+        return cls._is_leader
+
+    @classmethod
+    @asynccontextmanager
+    async def job_lock(cls, job_id: str):
+        """Job başına Redis kilidi; alınamazsa False yield eder. Koordinasyon yoksa hep True."""
+        if not cls._coordinated:
+            yield True
+            return
+
+        redis = Database.get_redis()
+        key = f"{cls.JOB_LOCK_PREFIX}{job_id}"
+        worker = cls.worker_id()
+        ttl_ms = cls.JOB_LOCK_TTL_SECONDS * 1000
+        try:
+            acquired = await redis.set(key, worker, nx=True, px=ttl_ms)
+        except Exception as e:
+            logger.warning(f"Job lock {job_id} unavailable, skipping run: {e}")
+            acquired = False
+        if not acquired:
+            yield False
+            return
+
+        async def renew():
+            while True:
+                await asyncio.sleep(cls.JOB_LOCK_TTL_SECONDS / 3)
+                try:
+                    await redis.eval(_RENEW_SCRIPT, 1, key, worker, ttl_ms)
+                except Exception as e:
+                    logger.warning(f"Job lock {job_id} renew failed: {e}")
+
+        renew_task = asyncio.create_task(renew())
+        try:
+            yield True
+        finally:
+            renew_task.cancel()
+            try:
+                await redis.eval(_RELEASE_SCRIPT, 1, key, worker)
+            except Exception as e:
+                logger.warning(f"Job lock {job_id} release failed: {e}")
+
+    @classmethod
+    def singleton(cls, job_id: str, func):
+        """Job'ı sadece leader'da ve job kilidi alınabildiyse çalıştıran wrapper."""
+        @functools.wraps(func)
+        async def run(*args, **kwargs):
+            if not cls._is_leader:
+                logger.debug(f"Skipping {job_id}: not the leader")
+                return None
+            async with cls.job_lock(job_id) as acquired:
+                if not acquired:
+                    logger.info(f"Skipping {job_id}: already running on another replica")
+                    return None
+                return await func(*args, **kwargs)
+        return run
+
+    # ============ Sharding ============
+
+    @classmethod
+    def agent_sharding(cls) -> bool:
+        """Agent job'ları her replikada shard'lı mı çalışıyor (değilse singleton)?"""
+        return cls._agent_sharding
+
+    @classmethod
+    def replica_count(cls) -> int:
+        return len(cls._members) if cls._coordinated and cls._members else 1
+
+    @classmethod
+    def shard_count(cls) -> int:
+        return cls.replica_count() if cls._agent_sharding else 1
+
+    @classmethod
+    def owns(cls, key: str) -> bool:
+        """Bu key (örn. agent username) bu replikaya mı ait? (rendezvous hashing)"""
+        if not cls._agent_sharding or len(cls._members) <= 1:
+            return True
+        owner = max(cls._members, key=lambda m: hashlib.md5(f"{m}:{key}".encode()).digest())
+        return owner == cls.worker_id()
+
+    @classmethod
+    def owned(cls, keys: Iterable[str]) -> List[str]:
+        """Bu replikaya ait key'ler (sıra korunur)."""
+        return [k for k in keys if cls.owns(k)]
+
+    @classmethod
+    def share(cls, total: int) -> int:
+        """
+        Global bir limitin bu replikaya düşen payı.
+
+        total // n, kalan birimler sıralı üye listesinin başındakilere: payların
+        toplamı total'i geçmez (yukarı yuvarlamada n replika n-1 fazla yazabilir).
+        """
+        count = cls.shard_count()
+        if total <= 0 or count == 1:
+            return total
+        try:
+            position = cls._members.index(cls.worker_id())
+        except ValueError:
+            position = count  # Üye listesinde yoksa kalan pay yok
+        return total // count + (1 if position < total % count else 0)
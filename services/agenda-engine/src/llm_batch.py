@@ -0,0 +1,173 @@
+"""
+LLM Batch - Gecikmeye duyarsız işler için Anthropic Message Batches modu.
+
+Gece community batch'i ve haber özetleme tek tek /v1/messages çağırıyordu.
+Bu modül aynı kodu değiştirmeden batch'e çevirir:
+
+    results = await run_batched([coro1, coro2, ...], api_key=key)
+
+run_batched içindeki coroutine'lerde `current_batch()` aktif bir MessageBatch
+döndürür; LLM çağrısı yapan yer `await batch.request(payload)` ile isteğini
+kuyruğa bırakır. Tüm görevler ya bitince ya da bir isteğe bekler hale gelince
+kuyruk tek batch olarak gönderilir, tamamlanana kadar poll edilir ve sonuçlar
+bekleyen görevlere dağıtılır. Birden çok LLM çağrısı yapan görevler için
+bu döngü tur tur tekrarlanır.
+
+Batch gönderilemezse istekler normal gateway çağrısına düşer.
+"""
+
+import asyncio
+import contextvars
+import json
+import logging
+import time
+from typing import Any, Awaitable, Dict, List, Optional
+
+from .config import get_settings
+from .llm_gateway import LLMGateway
+
+logger = logging.getLogger(__name__)
+
+_active_batch: contextvars.ContextVar[Optional["MessageBatch"]] = contextvars.ContextVar(
+    "llm_active_batch", default=None
+)
+
+
+def current_batch() -> Optional["MessageBatch"]:
+    """run_batched içindeysek aktif batch, değilse None."""
+    return _active_batch.get()
+
+
+class MessageBatch:
+    """Tek bir Message Batches turu için istek kuyruğu."""
+
+    def __init__(self, api_key: Optional[str] = None):
+        self.api_key = api_key
+        self._pending: Dict[str, tuple] = {}  # custom_id -> (params, future)
+        self._seq = 0
+        self._changed = asyncio.Event()
+
+    @property
+    def pending_count(self) -> int:
+        return len(self._pending)
+
+    async def request(self, payload: dict) -> Optional[dict]:
+        """İsteği kuyruğa bırak, batch sonucu gelince message dict'i döndür (hata: None)."""
+        self._seq += 1
+        custom_id = f"req-{self._seq}"
+        future = asyncio.get_running_loop().create_future()
+        self._pending[custom_id] = (payload, future)
+        self._changed.set()
+        return await future
+
+    async def flush(self):
+        """Kuyruktaki istekleri tek batch olarak gönder, bitmesini bekle, sonuçları dağıt."""
+        pending, self._pending = self._pending, {}
+        if not pending:
+            return
+
+        settings = get_settings()
+        requests = [{"custom_id": cid, "params": params} for cid, (params, _) in pending.items()]
+        batch_id = None
+        try:
+            response = await LLMGateway.create_message_batch(requests, api_key=self.api_key)
+            if response.status_code != 200:
+                raise RuntimeError(f"{response.status_code} - {response.text[:200]}")
+            batch_id = response.json()["id"]
+        except Exception as e:
+            logger.warning(f"Message batch gönderilemedi ({e}), {len(pending)} istek tek tek işlenecek")
+            await self._fallback_direct(pending)
+            return
+
+        logger.info(f"Message batch {batch_id} gönderildi ({len(pending)} istek)")
+        started = time.monotonic()
+        results_url = None
+        while True:
+            try:
+                response = await LLMGateway.get_message_batch(batch_id, api_key=self.api_key)
+                if response.status_code == 200:
+                    data = response.json()
+                    if data.get("processing_status") == "ended":
+                        results_url = data.get("results_url")
+                        break
+                else:
+                    logger.warning(f"Message batch {batch_id} poll hatası: {response.status_code}")
+            except Exception as e:
+                logger.warning(f"Message batch {batch_id} poll hatası: {e}")
+
+            if time.monotonic() - started > settings.llm_batch_max_wait_seconds:
+                logger.error(f"Message batch {batch_id} zaman aşımı, iptal ediliyor")
+                try:
+                    await LLMGateway.cancel_message_batch(batch_id, api_key=self.api_key)
+                except Exception:
+                    pass
+                break
+            await asyncio.sleep(settings.llm_batch_poll_interval_seconds)
+
+        results: Dict[str, Any] = {}
+        if results_url:
+            try:
+                response = await LLMGateway.get_message_batch_results(results_url, api_key=self.api_key)
+                for line in response.text.splitlines():
+                    if not line.strip():
+                        continue
+                    item = json.loads(line)
+                    result = item.get("result") or {}
+                    if result.get("type") == "succeeded":
+                        results[item.get("custom_id")] = result.get("message")
+                    else:
+                        logger.warning(f"Batch isteği başarısız [{item.get('custom_id')}]: {result.get('type')}")
+            except Exception as e:
+                logger.error(f"Message batch {batch_id} sonuçları okunamadı: {e}")
+
+        logger.info(
+            f"Message batch {batch_id} tamamlandı: {len(results)}/{len(pending)} başarılı "
+            f"({time.monotonic() - started:.0f}s)"
+        )
+        for cid, (_, future) in pending.items():
+            if not future.done():
+                future.set_result(results.get(cid))
+
+    async def _fallback_direct(self, pending: Dict[str, tuple]):
+        """Batch API kullanılamazsa istekleri normal (pool'lu) çağrılarla işle."""
+
+        async def _one(params: dict, future: asyncio.Future):
+            data = None
+            try:
+                response = await LLMGateway.messages(params, api_key=self.api_key)
+                if response.status_code == 200:
+                    data = response.json()
+                else:
+                    logger.warning(f"LLM fallback hatası: {response.status_code}")
+            except Exception as e:
+                logger.warning(f"LLM fallback hatası: {e}")
+            if not future.done():
+                future.set_result(data)
+
+        await asyncio.gather(*[_one(params, future) for params, future in pending.values()])
+
+
+async def run_batched(coros: List[Awaitable], api_key: Optional[str] = None) -> List[Any]:
+    """
+    Coroutine'leri birlikte çalıştır; içlerindeki LLM çağrılarını Message Batches
+    üzerinden topla. Sonuçlar (veya exception'lar) giriş sırasıyla döner.
+    """
+    batch = MessageBatch(api_key=api_key)
+    token = _active_batch.set(batch)
+    try:
+        # Task'lar context'i oluşturuldukları anda kopyalar
+        tasks = [asyncio.create_task(c) for c in coros]
+    finally:
+        _active_batch.reset(token)
+
+    for task in tasks:
+        task.add_done_callback(lambda _: batch._changed.set())
+
+    while not all(t.done() for t in tasks):
+        # Her görev ya bitmiş ya da kuyruğa istek bırakmış olana kadar bekle
+        while sum(t.done() for t in tasks) + batch.pending_count < len(tasks):
+            batch._changed.clear()
+            await batch._changed.wait()
+        await batch.flush()
+
+    return await asyncio.gather(*tasks, return_exceptions=True)
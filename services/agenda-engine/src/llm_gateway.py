@@ -0,0 +1,165 @@
+"""
+LLM Gateway - Agenda engine'in tüm Anthropic çağrıları için paylaşımlı client.
+
+Her çağrıda yeni httpx.AsyncClient açmak her entry, comment, başlık ve özet
+için yeni bir TLS handshake demekti. Bu modül process boyunca yaşayan,
+connection pool'lu (h2 kuruluysa HTTP/2) tek bir client tutar.
+
+Özellikler:
+- Lazy init: ilk çağrıda client oluşur, lifespan shutdown'da kapanır
+- Concurrency cap: uçuştaki istek sayısı semaphore ile sınırlı
+- Model bazlı timeout: settings.llm_model_timeouts > çağrı timeout'u > default
+"""
+
+import asyncio
+import logging
+import os
+from typing import Optional
+
+import httpx
+
+from .config import get_settings
+
+logger = logging.getLogger(__name__)
+
+ANTHROPIC_VERSION = "2023-06-01"
+
+
+class LLMGateway:
+    """Process-wide Anthropic HTTP gateway (Database gibi class-level state)."""
+
+    _client: Optional[httpx.AsyncClient] = None
+    _semaphore: Optional[asyncio.Semaphore] = None
+
+    @classmethod
+    def get_client(cls) -> httpx.AsyncClient:
+        """Paylaşımlı client'ı döndür, yoksa oluştur."""
+        if cls._client is None or cls._client.is_closed:
+            settings = get_settings()
+            limits = httpx.Limits(
+                max_connections=settings.llm_max_connections,
+                max_keepalive_connections=settings.llm_max_keepalive_connections,
+            )
+            timeout = httpx.Timeout(settings.llm_default_timeout_seconds, connect=10.0)
+            base_url = settings.anthropic_base_url.rstrip("/")
+            try:
+                cls._client = httpx.AsyncClient(
+                    base_url=base_url, limits=limits, timeout=timeout, http2=settings.llm_http2
+                )
+            except ImportError:
+                # h2 paketi yoksa HTTP/1.1 keep-alive ile devam
+                logger.warning("h2 paketi bulunamadı, LLM gateway HTTP/1.1 ile çalışıyor")
+                cls._client = httpx.AsyncClient(base_url=base_url, limits=limits, timeout=timeout)
+            logger.info(
+                f"LLM gateway initialized: {base_url} "
+                f"(http2={settings.llm_http2}, concurrency={settings.llm_max_concurrency})"
+            )
+        return cls._client
+
+    @classmethod
+    def _get_semaphore(cls) -> asyncio.Semaphore:
+        if cls._semaphore is None:
+            cls._semaphore = asyncio.Semaphore(max(1, get_settings().llm_max_concurrency))
+        return cls._semaphore
+
+    @staticmethod
+    def resolve_timeout(model: Optional[str], timeout: Optional[float] = None) -> float:
+        """Model için efektif timeout: config override > çağrı değeri > default."""
+        settings = get_settings()
+        if model and model in settings.llm_model_timeouts:
+            return float(settings.llm_model_timeouts[model])
+        if timeout is not None:
+            return float(timeout)
+        return settings.llm_default_timeout_seconds
+
+    @staticmethod
+    def build_headers(api_key: Optional[str] = None) -> dict:
+        return {
+            "x-api-key": api_key or os.getenv("ANTHROPIC_API_KEY", ""),
+            "anthropic-version": ANTHROPIC_VERSION,
+            "Content-Type": "application/json",
+        }
+
+    @staticmethod
+    def system_blocks(stable: str, volatile: str = "", cache: bool = True):
+        """
+        System prompt'u content block listesine çevir: stable prefix önde ve
+        cache_control ile işaretli, volatile kısım arkada. Stable yoksa düz string.
+        """
+        if not stable:
+            return volatile
+        stable_block = {"type": "text", "text": stable}
+        if cache:
+            stable_block["cache_control"] = {"type": "ephemeral"}
+        blocks = [stable_block]
+        if volatile:
+            blocks.append({"type": "text", "text": volatile})
+        return blocks
+
+    @classmethod
+    async def request(
+        cls,
+        method: str,
+        path: str,
+        json: Optional[dict] = None,
+        api_key: Optional[str] = None,
+        timeout: Optional[float] = None,
+        model: Optional[str] = None,
+    ) -> httpx.Response:
+        """Anthropic API'ye concurrency cap altında istek at."""
+        client = cls.get_client()
+        effective_timeout = cls.resolve_timeout(model, timeout)
+        async with cls._get_semaphore():
+            return await client.request(
+                method,
+                path,
+                json=json,
+                headers=cls.build_headers(api_key),
+                timeout=effective_timeout,
+            )
+
+    @classmethod
+    async def messages(
+        cls,
+        payload: dict,
+        api_key: Optional[str] = None,
+        timeout: Optional[float] = None,
+    ) -> httpx.Response:
+        """POST /v1/messages. Status kontrolü çağıran tarafa bırakılır."""
+        return await cls.request(
+            "POST",
+            "/v1/messages",
+            json=payload,
+            api_key=api_key,
+            timeout=timeout,
+            model=payload.get("model"),
+        )
+
+    # ---- Message Batches API (gece job'ları için, bkz. llm_batch.py) ----
+
+    @classmethod
+    async def create_message_batch(cls, requests: list, api_key: Optional[str] = None) -> httpx.Response:
+        """POST /v1/messages/batches — requests: [{"custom_id", "params"}]."""
+        return await cls.request(
+            "POST", "/v1/messages/batches", json={"requests": requests}, api_key=api_key, timeout=60.0
+        )
+
+    @classmethod
+    async def get_message_batch(cls, batch_id: str, api_key: Optional[str] = None) -> httpx.Response:
+        return await cls.request("GET", f"/v1/messages/batches/{batch_id}", api_key=api_key, timeout=30.0)
+
+    @classmethod
+    async def cancel_message_batch(cls, batch_id: str, api_key: Optional[str] = None) -> httpx.Response:
+        return await cls.request("POST", f"/v1/messages/batches/{batch_id}/cancel", api_key=api_key, timeout=30.0)
+
+    @classmethod
+    async def get_message_batch_results(cls, results_url: str, api_key: Optional[str] = None) -> httpx.Response:
+        """Batch sonuçları (JSONL). results_url absolute gelir, base_url'i ezer."""
+        return await cls.request("GET", results_url, api_key=api_key, timeout=120.0)
+
+    @classmethod
+    async def close(cls):
+        if cls._client is not None and not cls._client.is_closed:
+            await cls._client.aclose()
+        cls._client = None
+        cls._semaphore = None
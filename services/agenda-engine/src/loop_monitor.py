@@ -0,0 +1,81 @@
+"""
+Event Loop Monitor - Event loop'un ne kadar bloklandığını ölçer.
+
+Arka planda sabit aralıkla uyuyan bir task, beklenen uyanma zamanı ile gerçek
+uyanma arasındaki farkı (lag) kaydeder. Lag > eşik ise loop bloklanmış sayılır.
+Sonuçlar /status endpoint'inde görünür; clustering_executor=inline ile
+process arasında karşılaştırma yapmak için kullanılır.
+"""
+
+import asyncio
+import logging
+import time
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+
+class EventLoopMonitor:
+    """Event loop lag metriği (class-level state)."""
+
+    interval_seconds: float = 0.1
+    block_threshold_seconds: float = 0.1
+
+    _task: Optional[asyncio.Task] = None
+    _started_at: float = 0.0
+    _samples: int = 0
+    _blocked_count: int = 0
+    _blocked_total_seconds: float = 0.0
+    _max_lag_seconds: float = 0.0
+    _last_block_at: Optional[float] = None
+
+    @classmethod
+    async def _run(cls):
+        while True:
+            expected = time.monotonic() + cls.interval_seconds
+            await asyncio.sleep(cls.interval_seconds)
+            lag = max(0.0, time.monotonic() - expected)
+            cls._samples += 1
+            cls._max_lag_seconds = max(cls._max_lag_seconds, lag)
+            if lag >= cls.block_threshold_seconds:
+                cls._blocked_count += 1
+                cls._blocked_total_seconds += lag
+                cls._last_block_at = time.time()
+                if lag >= 1.0:
+                    logger.warning(f"Event loop {lag:.2f}s bloklandı")
+
+    @classmethod
+    def start(cls):
+        if cls._task is None or cls._task.done():
+            cls.reset()
+            cls._task = asyncio.create_task(cls._run())
+
+    @classmethod
+    async def stop(cls):
+        if cls._task is not None:
+            cls._task.cancel()
+            try:
+                await cls._task
+            except asyncio.CancelledError:
+                pass
+            cls._task = None
+
+    @classmethod
+    def reset(cls):
+        cls._started_at = time.monotonic()
+        cls._samples = 0
+        cls._blocked_count = 0
+        cls._blocked_total_seconds = 0.0
+        cls._max_lag_seconds = 0.0
+        cls._last_block_at = None
+
+    @classmethod
+    def stats(cls) -> dict:
+        return {
+            "uptime_seconds": round(time.monotonic() - cls._started_at, 1) if cls._started_at else 0.0,
+            "samples": cls._samples,
+            "blocked_count": cls._blocked_count,
+            "blocked_total_seconds": round(cls._blocked_total_seconds, 3),
+            "max_lag_seconds": round(cls._max_lag_seconds, 3),
+            "last_block_at": cls._last_block_at,
+        }
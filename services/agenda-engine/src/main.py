@@ -1,9 +1,11 @@
+import asyncio
 import logging
 import random
 import os
 from contextlib import asynccontextmanager
 from datetime import datetime, timezone
 from time import time
+from typing import Optional
 
 from fastapi import FastAPI, HTTPException, Request
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
@@ -11,13 +13,18 @@ import uvicorn
 
 from .config import get_settings
 from .database import Database
-from .collectors import RSSCollector
+from .llm_gateway import LLMGateway
+from .agent_cache import AgentCache
+from .trending_views import TrendingViews
+from .job_coordinator import JobCoordinator
+from .collectors import RSSCollector, TopicDeduplicator
 from .collectors.organic_collector import OrganicCollector
 from .collectors.today_in_history_collector import TodayInHistoryCollector
-from .clustering import EventClusterer
+from .clustering import EventClusterer, ClusteringExecutor
+from .loop_monitor import EventLoopMonitor
 from .scheduler import VirtualDayScheduler, TaskGenerator
 from .scheduler.debbe_selector import DebbeSelector
-from .agent_runner import SystemAgentRunner
+from .agent_runner import ALL_SYSTEM_AGENTS, SystemAgentRunner
 from .summarizer import HeadlineGrouper, NewsSummarizer, ReportGenerator
 
 # Random seed for reproducibility in development, time-based in production
@@ -67,6 +74,23 @@ news_summarizer = NewsSummarizer()
 report_generator = ReportGenerator()
 
 
+def add_singleton_job(func, *args, id: str, **kwargs):
+    """Cluster genelinde tek replikada çalışacak job (leader + job kilidi)."""
+    scheduler.add_job(JobCoordinator.singleton(id, func), *args, id=id, **kwargs)
+
+
+def add_agent_job(func, *args, id: str, **kwargs):
+    """
+    Sistem agent'larını çalıştıran job: agent sharding açıksa her replikada
+    (agent'lar JobCoordinator.owned ile bölünür), değilse singleton.
+    JobCoordinator.start'tan sonra çağrılmalı.
+    """
+    if JobCoordinator.agent_sharding():
+        scheduler.add_job(func, *args, id=id, **kwargs)
+    else:
+        add_singleton_job(func, *args, id=id, **kwargs)
+
+
 @asynccontextmanager
 async def lifespan(_app: FastAPI):
     yield
@@ -168,7 +192,6 @@ async def generate_gossip_event():
     o agent hakkında sözlük tarzı dedikodu başlığı üretilir.
     Sistem agentları hariç — SDK agentları ve sahipleri (x_username) hedef olabilir.
     """
-    import httpx
     from .models import Event, EventStatus
     from uuid import uuid4
     
@@ -211,19 +234,12 @@ async def generate_gossip_event():
     llm_model = os.getenv("LLM_MODEL_COMMENT", "claude-haiku-4-5-20251001")
     
     try:
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            response = await client.post(
-                "https://api.anthropic.com/v1/messages",
-                headers={
-                    "x-api-key": api_key,
-                    "anthropic-version": "2023-06-01",
-                    "Content-Type": "application/json",
-                },
-                json={
-                    "model": llm_model,
-                    "max_tokens": 100,
-                    "temperature": 0.95,
-                    "system": """Logsözlük'te bir agent hakkında dedikodu/gözlem başlığı üret.
+        response = await LLMGateway.messages(
+            {
+                "model": llm_model,
+                "max_tokens": 100,
+                "temperature": 0.95,
+                "system": """Logsözlük'te bir agent hakkında dedikodu/gözlem başlığı üret.
 Sözlük tarzı, küçük harf, 3-8 kelime, max 50 karakter.
 İsim tamlaması formatı. Çekimli fiille bitmez.
 Örnekler:
@@ -232,17 +248,19 @@ Sözlük tarzı, küçük harf, 3-8 kelime, max 50 karakter.
 - "random_bilgi'nin sabah sendromu"
 - "gece_filozofu ile tartışmanın sonu"
 Sadece başlığı yaz, başka bir şey yazma.""",
-                    "messages": [{"role": "user", "content": f"Agent: @{username}\nBio: {bio}\nİlgi alanları: {categories}{owner_hint}\n\nBu agent veya sahibi hakkında sözlük başlığı:"}],
-                },
-            )
-            
-            if response.status_code != 200:
-                return None
-            
-            data = response.json()
-            title = data["content"][0]["text"].strip().strip('"').lower()
-            # Temizle
-            title = title.split("\n")[0].strip()
+                "messages": [{"role": "user", "content": f"Agent: @{username}\nBio: {bio}\nİlgi alanları: {categories}{owner_hint}\n\nBu agent veya sahibi hakkında sözlük başlığı:"}],
+            },
+            api_key=api_key,
+            timeout=30.0,
+        )
+
+        if response.status_code != 200:
+            return None
+
+        data = response.json()
+        title = data["content"][0]["text"].strip().strip('"').lower()
+        # Temizle
+        title = title.split("\n")[0].strip()
     except Exception as e:
         logger.error(f"Dedikodu LLM hatası: {e}")
         return None
@@ -420,6 +438,19 @@ async def update_trending_scores():
         logger.error(f"Error updating trending scores: {e}")
 
 
+async def refresh_trending_views():
+    """Scheduled job: trending MV'lerini refresh et (DEBE + comment/vote adayları)."""
+    try:
+        durations = await TrendingViews.refresh()
+        if durations:
+            logger.info(
+                "Trending views refreshed: "
+                + ", ".join(f"{view}={ms:.0f}ms" for view, ms in durations.items())
+            )
+    except Exception as e:
+        logger.error(f"Error refreshing trending views: {e}")
+
+
 async def process_entry_tasks():
     """Entry görevlerini işle (create_topic)."""
     try:
@@ -526,6 +557,28 @@ async def collect_today_in_history():
         logger.error(f"Error collecting today in history: {e}")
 
 
+async def sync_topic_index():
+    """Scheduled job: son sync'ten beri açılan topic'leri duplicate LSH indeksine ekle."""
+    try:
+        async with Database.connection() as conn:
+            await TopicDeduplicator().sync_index(conn)
+    except Exception as e:
+        logger.warning(f"Topic index sync error: {e}")
+
+
+async def startup_debbe_check():
+    """Bugünün DEBE'si seçilmemişse seç."""
+    from datetime import date
+    if not await debbe_selector._debe_exists(date.today()):
+        entries = await debbe_selector.select_debe()
+        if entries:
+            logger.info(f"Startup DEBE: {len(entries)} entry seçildi (bugün için cron kaçırılmış olabilir)")
+        else:
+            logger.info("Startup DEBE: henüz candidate yok")
+    else:
+        logger.info("Startup DEBE: bugün zaten seçilmiş")
+
+
 @asynccontextmanager
 async def lifespan(_app: FastAPI):
     """Application lifespan handler."""
@@ -535,17 +588,43 @@ async def lifespan(_app: FastAPI):
     await Database.connect()
     logger.info("Connected to database")
 
+    # Agent cache invalidation mesajlarını dinle (Redis pub/sub)
+    AgentCache.start_listener()
+
+    # Event loop bloklanma metriği (/status)
+    EventLoopMonitor.start()
+
+    # Topic başlık LSH indeksi: hiç sync yapılmadıysa tüm geçmişi, yoksa sadece yenileri arka planda yükle
+    warm_task = asyncio.create_task(sync_topic_index())
+
+    # Replikalar arası job dağıtımı: leader seçimi + üyelik (scheduler.start'tan önce)
+    await JobCoordinator.start()
+
+    # Postgres memory backend: bu replikanın sistem agent'larının memory'lerini önceden yükle
+    try:
+        loaded = await agent_runner.load_memories(JobCoordinator.owned(ALL_SYSTEM_AGENTS))
+        if loaded:
+            logger.info(f"Loaded {loaded} agent memories from Postgres")
+    except Exception as e:
+        logger.warning(f"Agent memory preload error: {e}")
+
     # Initialize virtual day state
     state = await virtual_day_scheduler.get_current_state()
     logger.info(f"Current virtual day phase: {state.current_phase.value}")
 
     # Schedule jobs
+    # add_singleton_job: cluster'da tek replikada (leader + job kilidi) çalışır.
+    # add_agent_job: entry/comment/vote işleme; Postgres memory backend'inde her
+    # replikada agent bazında (yorumda entry bazında) shard'lanır, dosya
+    # backend'inde singleton (memory yerel diskte, agent başka replikaya taşınamaz).
+    # scheduler.add_job: her replikada — memory flush process'e özeldir ve
+    # sahipliği giden agent'ların memory'sini bırakır.
     settings = get_settings()
 
     if settings.use_daily_cache:
         # Daily cache mode: collect at specific hours with summarization
         for hour in settings.feed_collection_hours:
-            scheduler.add_job(
+            add_singleton_job(
                 collect_and_summarize_news,
                 'cron',
                 hour=hour,
@@ -555,7 +634,7 @@ async def lifespan(_app: FastAPI):
         logger.info(f"Daily cache mode enabled. Collection hours: {settings.feed_collection_hours}")
     else:
         # Legacy polling mode
-        scheduler.add_job(
+        add_singleton_job(
             collect_and_process_events,
             'interval',
             seconds=settings.rss_fetch_interval,
@@ -563,28 +642,28 @@ async def lifespan(_app: FastAPI):
         )
         logger.info(f"Polling mode enabled. Interval: {settings.rss_fetch_interval}s")
 
-    scheduler.add_job(
+    add_singleton_job(
         advance_virtual_day,
         'interval',
         minutes=5,
         id='advance_virtual_day'
     )
 
-    scheduler.add_job(
+    add_singleton_job(
         generate_periodic_tasks,
         'interval',
         minutes=10,
         id='generate_tasks'
     )
 
-    scheduler.add_job(
+    add_singleton_job(
         cleanup_tasks,
         'interval',
         minutes=30,
         id='cleanup_tasks'
     )
 
-    scheduler.add_job(
+    add_singleton_job(
         select_daily_debbe,
         'cron',
         hour=0,
@@ -593,7 +672,7 @@ async def lifespan(_app: FastAPI):
     )
 
     # Bugün tarihte - her gün sabah 09:00'da
-    scheduler.add_job(
+    add_singleton_job(
         collect_today_in_history,
         'cron',
         hour=9,
@@ -601,15 +680,42 @@ async def lifespan(_app: FastAPI):
         id='today_in_history'
     )
 
-    scheduler.add_job(
+    add_singleton_job(
         update_trending_scores,
         'interval',
         minutes=15,
         id='update_trending'
     )
 
-    # Entry üretimi - test_mode'da 2dk, prod'da 180dk
+    add_singleton_job(
+        refresh_trending_views,
+        'interval',
+        minutes=settings.trending_mv_refresh_minutes,
+        id='refresh_trending_views',
+        coalesce=True,
+        max_instances=1,
+    )
+
+    # Topic LSH indeksi: api-gateway / SDK'dan açılan topic'ler de dedup'a girsin
+    add_singleton_job(
+        sync_topic_index,
+        'interval',
+        minutes=settings.topic_index_sync_minutes,
+        id='sync_topic_index',
+        coalesce=True,
+        max_instances=1,
+    )
+
+    # Agent memory: olaylar log'a append edilir, snapshot periyodik yazılır
     scheduler.add_job(
+        agent_runner.flush_memories,
+        'interval',
+        seconds=settings.agent_memory_flush_interval_seconds,
+        id='flush_agent_memories'
+    )
+
+    # Entry üretimi - test_mode'da 2dk, prod'da 180dk
+    add_agent_job(
         process_entry_tasks,
         'interval',
         minutes=settings.effective_entry_interval,
@@ -619,7 +725,7 @@ async def lifespan(_app: FastAPI):
     )
     
     # Comment üretimi - test_mode'da 1dk, prod'da 180dk
-    scheduler.add_job(
+    add_agent_job(
         process_comment_tasks,
         'interval',
         minutes=settings.effective_comment_interval,
@@ -629,7 +735,7 @@ async def lifespan(_app: FastAPI):
     )
     
     # Vote işleme
-    scheduler.add_job(
+    add_agent_job(
         process_vote_tasks,
         'interval',
         minutes=settings.agent_vote_interval_minutes,
@@ -637,7 +743,7 @@ async def lifespan(_app: FastAPI):
     )
     
     # Community playground postları - TR 00:00 (UTC 21:00) günde 1 batch, 6 kategori
-    scheduler.add_job(
+    add_singleton_job(
         process_community_posts_batch,
         'cron',
         hour=21,
@@ -646,7 +752,7 @@ async def lifespan(_app: FastAPI):
     )
     
     # Agentlar poll'lara oy verir (system + dış) - her 15 dakikada bir
-    scheduler.add_job(
+    add_singleton_job(
         process_poll_votes,
         'interval',
         minutes=15,
@@ -654,7 +760,7 @@ async def lifespan(_app: FastAPI):
     )
     
     # Agentlar community post'lara +1 verir (system + dış) - her 20 dakikada bir
-    scheduler.add_job(
+    add_singleton_job(
         process_plus_one_votes,
         'interval',
         minutes=20,
@@ -662,7 +768,7 @@ async def lifespan(_app: FastAPI):
     )
     
     # Dış agentlar (SDK) için görev üret - 5dk'da bir
-    scheduler.add_job(
+    add_singleton_job(
         generate_external_tasks,
         'interval',
         minutes=5,
@@ -679,16 +785,9 @@ async def lifespan(_app: FastAPI):
     logger.info("Scheduler started")
 
     # Startup DEBE kontrolü — container restart'ı cron penceresini kaçırabilir
+    # (sadece leader; cron job'ıyla aynı kilit)
     try:
-        from datetime import date
-        if not await debbe_selector._debe_exists(date.today()):
-            entries = await debbe_selector.select_debe()
-            if entries:
-                logger.info(f"Startup DEBE: {len(entries)} entry seçildi (bugün için cron kaçırılmış olabilir)")
-            else:
-                logger.info("Startup DEBE: henüz candidate yok")
-        else:
-            logger.info("Startup DEBE: bugün zaten seçilmiş")
+        await JobCoordinator.singleton('select_debbe', startup_debbe_check)()
     except Exception as e:
         logger.warning(f"Startup DEBE check error: {e}")
 
@@ -696,6 +795,26 @@ async def lifespan(_app: FastAPI):
 
     # Shutdown
     scheduler.shutdown()
+    await JobCoordinator.stop()
+    warm_task.cancel()
+    try:
+        # Paralel comment modunda yayın sırası bekleyen taslaklar kaybolmasın
+        await agent_runner.drain_comment_publishing()
+    except Exception as e:
+        logger.warning(f"Comment publish drain error: {e}")
+    try:
+        await agent_runner.flush_memories()
+    except Exception as e:
+        logger.warning(f"Agent memory flush error: {e}")
+    try:
+        # Daemon embedding worker'ı kuyruktaki long-term anıları bitirsin
+        await agent_runner.drain_embedding_queue()
+    except Exception as e:
+        logger.warning(f"Embedding queue drain error: {e}")
+    await AgentCache.stop_listener()
+    await EventLoopMonitor.stop()
+    ClusteringExecutor.shutdown()
+    await LLMGateway.close()
     await Database.disconnect()
     logger.info("Agenda Engine stopped")
 
@@ -725,7 +844,15 @@ async def status():
         phase_progress = await virtual_day_scheduler.get_phase_progress()
         return {
             "virtual_day": phase_progress,
-            "scheduler_running": scheduler.running
+            "scheduler_running": scheduler.running,
+            "event_loop": EventLoopMonitor.stats(),
+            "clustering_executor": get_settings().clustering_executor,
+            "worker": {
+                "id": JobCoordinator.worker_id(),
+                "leader": JobCoordinator.is_leader(),
+                "replicas": JobCoordinator.replica_count(),
+                "agent_sharding": JobCoordinator.agent_sharding(),
+            },
         }
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -766,6 +893,13 @@ async def trigger_trending():
     return {"message": f"Updated {count} trending scores"}
 
 
+@app.post("/trigger/trending-views")
+async def trigger_trending_views():
+    """Manually refresh trending materialized views."""
+    durations = await TrendingViews.refresh()
+    return {"message": f"Refreshed {len(durations)} trending views", "durations_ms": durations}
+
+
 @app.post("/trigger/external-tasks")
 async def trigger_external_tasks():
     """Manually trigger external agent task generation."""
@@ -780,6 +914,13 @@ async def trigger_entries():
     return {"message": f"Processed {count} entry tasks"}
 
 
+@app.post("/trigger/agent-cache/invalidate")
+async def trigger_agent_cache_invalidate(username: Optional[str] = None):
+    """Agent cache'ini düşür (username verilmezse tümü), diğer instance'lara da yayınla."""
+    await AgentCache.publish_invalidation(username)
+    return {"message": f"Agent cache invalidated: {username or '*'}"}
+
+
 @app.post("/trigger/today-in-history")
 async def trigger_today_in_history():
     """Manually trigger today in history collection."""
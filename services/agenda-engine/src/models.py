@@ -49,6 +49,9 @@ class Task(BaseModel):
     task_type: TaskType
     assigned_to: Optional[UUID] = None
     claimed_at: Optional[datetime] = None
+    claimed_by: Optional[str] = None
+    lease_expires_at: Optional[datetime] = None
+    attempts: int = 0
     topic_id: Optional[UUID] = None
     entry_id: Optional[UUID] = None
     prompt_context: dict = {}
@@ -4,6 +4,7 @@ from typing import List
 from uuid import uuid4
 
 from ..database import Database
+from ..trending_views import TrendingViews
 
 logger = logging.getLogger(__name__)
 
@@ -41,34 +42,40 @@ class DebbeSelector:
         return selected
 
     async def _get_candidates(self) -> List[dict]:
-        """Get DEBE candidate entries sorted by score."""
+        """
+        Get DEBE candidate entries sorted by score.
+
+        Aday kümesi ve metadata trending_entries_mv'den (bayatsa canlı view);
+        oylar ve skor entries'ten canlı okunur: MV refresh aralığındaki oylar
+        DEBE sıralamasına dahil olsun.
+        """
         async with Database.connection() as conn:
+            source = await TrendingViews.entries_source(conn)
             rows = await conn.fetch(
-                """
+                f"""
                 SELECT
-                    e.id as entry_id,
+                    m.entry_id,
                     e.content,
                     e.upvotes,
                     e.downvotes,
                     e.vote_score,
-                    e.created_at as entry_created_at,
-                    t.id as topic_id,
-                    t.slug as topic_slug,
-                    t.title as topic_title,
-                    a.id as agent_id,
-                    a.username as agent_username,
-                    a.display_name as agent_display_name,
+                    m.created_at as entry_created_at,
+                    m.topic_id,
+                    m.topic_slug,
+                    m.topic_title,
+                    m.agent_id,
+                    m.agent_username,
+                    m.agent_display_name,
                     (e.upvotes * 2 - e.downvotes + LOG(GREATEST(e.upvotes + e.downvotes, 1)) * 0.5) as calculated_score
-                FROM entries e
-                JOIN topics t ON e.topic_id = t.id
-                JOIN agents a ON e.agent_id = a.id
+                FROM {source} m
+                JOIN entries e ON e.id = m.entry_id
                 WHERE
                     e.debe_eligible = TRUE
                     AND e.is_hidden = FALSE
-                    AND e.created_at > NOW() - INTERVAL '24 hours'
+                    AND m.created_at > NOW() - INTERVAL '24 hours'
                     AND NOT EXISTS (
                         SELECT 1 FROM debbe d
-                        WHERE d.entry_id = e.id
+                        WHERE d.entry_id = m.entry_id
                         AND d.debe_date = CURRENT_DATE
                     )
                 ORDER BY calculated_score DESC
@@ -138,31 +145,50 @@ class DebbeSelector:
                     )
 
     async def recalculate_trending_scores(self) -> int:
-        """Recalculate trending scores for all topics."""
+        """
+        Trending skorlarını artımlı güncelle; skoru değişen topic sayısını döndürür.
+
+        Sayaçları entries trigger'ı tutar (037_incremental_trending.sql). Burada:
+        süresi dolan bucket'lar silinir (24 saat kayan pencere), yalnızca dirty
+        veya bucket'ı düşen topic'lerin skoru hesaplanır ve farklıysa yazılır.
+        Süre toplam topic sayısıyla değil son aktiviteyle orantılı.
+        """
         async with Database.connection() as conn:
-            result = await conn.execute(
-                """
-                UPDATE topics t SET trending_score = subquery.score
-                FROM (
-                    SELECT
-                        t.id,
-                        COALESCE(
-                            (
-                                SELECT
-                                    COUNT(*) * 10 +
-                                    COALESCE(SUM(e.upvotes), 0) * 2 -
-                                    COALESCE(SUM(e.downvotes), 0)
-                                FROM entries e
-                                WHERE e.topic_id = t.id
-                                AND e.created_at > NOW() - INTERVAL '24 hours'
-                            ),
-                            0
-                        ) as score
-                    FROM topics t
-                ) AS subquery
-                WHERE t.id = subquery.id
-                """
-            )
+            async with conn.transaction():
+                # Tek statement: CTE'ler aynı snapshot'ı görür, bu yüzden skor
+                # join'i de süresi dolan bucket'ları ayrıca dışlar
+                result = await conn.execute(
+                    """
+                    WITH expired AS (
+                        DELETE FROM topic_trending_buckets
+                        WHERE bucket_start <= NOW() - INTERVAL '24 hours'
+                        RETURNING topic_id
+                    ),
+                    dirty AS (
+                        DELETE FROM topic_trending_dirty
+                        RETURNING topic_id
+                    ),
+                    affected AS (
+                        SELECT topic_id FROM expired
+                        UNION
+                        SELECT topic_id FROM dirty
+                    ),
+                    scores AS (
+                        SELECT
+                            a.topic_id,
+                            COALESCE(SUM(b.entries * 10 + b.upvotes * 2 - b.downvotes), 0)::float AS score
+                        FROM affected a
+                        LEFT JOIN topic_trending_buckets b
+                            ON b.topic_id = a.topic_id
+                            AND b.bucket_start > NOW() - INTERVAL '24 hours'
+                        GROUP BY a.topic_id
+                    )
+                    UPDATE topics t SET trending_score = s.score
+                    FROM scores s
+                    WHERE t.id = s.topic_id
+                    AND t.trending_score IS DISTINCT FROM s.score
+                    """
+                )
             count = int(result.split()[-1]) if result else 0
             logger.info(f"Recalculated trending scores for {count} topics")
             return count
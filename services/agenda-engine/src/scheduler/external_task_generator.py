@@ -19,10 +19,11 @@ from datetime import datetime, timedelta, timezone
 from typing import List, Optional
 from uuid import uuid4, UUID
 
-import httpx
-
 from ..database import Database
+from ..trending_views import TrendingViews
+from ..llm_gateway import LLMGateway
 from ..config import get_settings
+from ..topic_similarity import TopicSimilarity
 
 logger = logging.getLogger(__name__)
 
@@ -51,90 +52,100 @@ COMMUNITY_POST_TYPES = [
 
 async def generate_external_agent_tasks() -> int:
     """
-    Tüm aktif dış agentlar için görev üret.
-    
+    Tüm aktif dış agentlar için görev üret (set-based).
+
+    Agent başına sorgu atmak yerine:
+    - Tek grouped sorgu: tüm aktif agentların bekleyen görev sayısı ve
+      görev tipi başına son görev zamanı (cooldown)
+    - Görev tipi seçimi Python'da
+    - Aday event'ler ve entry'ler bir kez çekilir (_CandidatePool), agentlara
+      bellekte dağıtılır — agent başına ORDER BY RANDOM() yok
+    - Pool bağlantısı tur boyunca tutulmaz: her DB adımı kendi bağlantısını
+      alır, başlık dönüşümündeki LLM çağrıları bağlantı tutmadan yapılır
+
     Returns:
         Oluşturulan toplam görev sayısı
     """
     total_created = 0
 
     async with Database.connection() as conn:
-        # X-verified aktif agentları bul (system agentlar hariç)
+        # X-verified aktif agentlar (system agentlar hariç) + görev istatistikleri.
+        # Cooldown'lar en fazla COMMUNITY_POST_COOLDOWN_MINUTES; daha eski görevler
+        # (pending olanlar hariç) karara etki etmez, taranmaz.
         external_agents = await conn.fetch(
             """
-            SELECT a.id, a.username, a.racon_config
-            FROM agents a
-            WHERE a.is_active = TRUE
-              AND a.is_banned = FALSE
-              AND a.x_verified = TRUE
-              AND a.x_username IS NOT NULL
-              AND a.last_heartbeat_at > NOW() - INTERVAL '30 minutes'
-            ORDER BY a.last_heartbeat_at DESC
-            LIMIT 20
-            """
+            WITH active AS (
+                SELECT a.id, a.username, a.last_heartbeat_at
+                FROM agents a
+                WHERE a.is_active = TRUE
+                  AND a.is_banned = FALSE
+                  AND a.x_verified = TRUE
+                  AND a.x_username IS NOT NULL
+                  AND a.last_heartbeat_at > NOW() - INTERVAL '30 minutes'
+            )
+            SELECT ac.id, ac.username,
+                   COUNT(tk.id) FILTER (WHERE tk.status = 'pending') AS pending_count,
+                   MAX(tk.created_at) FILTER (WHERE tk.task_type = 'create_topic') AS last_topic_at,
+                   MAX(tk.created_at) FILTER (WHERE tk.task_type = 'write_comment') AS last_comment_at,
+                   MAX(tk.created_at) FILTER (WHERE tk.task_type = 'community_post') AS last_community_at
+            FROM active ac
+            LEFT JOIN tasks tk ON tk.assigned_to = ac.id
+                AND (tk.status = 'pending' OR tk.created_at > NOW() - make_interval(mins => $1))
+            GROUP BY ac.id, ac.username, ac.last_heartbeat_at
+            ORDER BY ac.last_heartbeat_at DESC
+            """,
+            max(EXTERNAL_TOPIC_COOLDOWN_MINUTES, EXTERNAL_COMMENT_COOLDOWN_MINUTES,
+                COMMUNITY_POST_COOLDOWN_MINUTES)
         )
 
-        if not external_agents:
-            return 0
-
-        logger.info(f"Found {len(external_agents)} active external agents")
-
-        # Dış agentlar için kendi cooldown süreleri (system agentlardan bağımsız)
-        entry_cooldown = EXTERNAL_TOPIC_COOLDOWN_MINUTES   # 20dk
-        comment_cooldown = EXTERNAL_COMMENT_COOLDOWN_MINUTES  # 10dk
-
-        for agent in external_agents:
-            agent_id = agent["id"]
+    if not external_agents:
+        return 0
+
+    logger.info(f"Found {len(external_agents)} active external agents")
+
+    # agent_id -> görev tipi
+    plan = {}
+    for agent in external_agents:
+        if agent["pending_count"] >= MAX_PENDING_PER_AGENT:
+            continue
+
+        # Cooldown kontrolü — dış agentlar için ayrı süreler
+        candidates = []
+        if _cooldown_passed(agent["last_topic_at"], EXTERNAL_TOPIC_COOLDOWN_MINUTES):
+            candidates.append('create_topic')
+        if _cooldown_passed(agent["last_comment_at"], EXTERNAL_COMMENT_COOLDOWN_MINUTES):
+            candidates.append('write_comment')
+        if _cooldown_passed(agent["last_community_at"], COMMUNITY_POST_COOLDOWN_MINUTES):
+            candidates.append('community_post')
+
+        if not candidates:
+            continue
+
+        # Community post daha nadir: sadece %15 olasılıkla seç
+        if 'community_post' in candidates and len(candidates) > 1:
+            if random.random() < 0.15:
+                plan[agent["id"]] = 'community_post'
+            else:
+                plan[agent["id"]] = random.choice([c for c in candidates if c != 'community_post'])
+        else:
+            plan[agent["id"]] = random.choice(candidates)
 
-            # Bu agent'ın bekleyen görev sayısını kontrol et
-            pending_count = await conn.fetchval(
-                """
-                SELECT COUNT(*) FROM tasks
-                WHERE assigned_to = $1 AND status = 'pending'
-                """,
-                agent_id
-            )
+    if not plan:
+        return 0
 
-            if pending_count >= MAX_PENDING_PER_AGENT:
-                continue
-
-            # Cooldown kontrolü — dış agentlar için ayrı süreler
-            can_topic = await _check_cooldown(conn, agent_id, 'create_topic', entry_cooldown)
-            can_comment = await _check_cooldown(conn, agent_id, 'write_comment', comment_cooldown)
-            can_community = await _check_cooldown(conn, agent_id, 'community_post', COMMUNITY_POST_COOLDOWN_MINUTES)
-
-            # Community post %15 şansla, diğerleri eşit
-            candidates = []
-            if can_topic:
-                candidates.append('create_topic')
-            if can_comment:
-                candidates.append('write_comment')
-            if can_community:
-                candidates.append('community_post')
-
-            if not candidates:
-                continue
-
-            # Community post daha nadir: sadece %15 olasılıkla seç
-            if 'community_post' in candidates and len(candidates) > 1:
-                if random.random() < 0.15:
-                    task_type = 'community_post'
-                else:
-                    task_type = random.choice([c for c in candidates if c != 'community_post'])
+    pool = _CandidatePool(list(plan))
+    for agent_id, task_type in plan.items():
+        try:
+            if task_type == 'create_topic':
+                success = await _create_topic_task(agent_id, pool)
+            elif task_type == 'community_post':
+                success = await _create_community_post_task(agent_id, pool)
             else:
-                task_type = random.choice(candidates)
-
-            try:
-                if task_type == 'create_topic':
-                    success = await _create_topic_task(conn, agent_id)
-                elif task_type == 'community_post':
-                    success = await _create_community_post_task(conn, agent_id)
-                else:
-                    success = await _create_comment_task(conn, agent_id)
-                if success:
-                    total_created += 1
-            except Exception as e:
-                logger.error(f"Error creating {task_type} task for agent {agent_id}: {e}")
+                success = await _create_comment_task(agent_id, pool)
+            if success:
+                total_created += 1
+        except Exception as e:
+            logger.error(f"Error creating {task_type} task for agent {agent_id}: {e}")
 
     if total_created > 0:
         logger.info(f"Created {total_created} tasks for external agents")
@@ -142,20 +153,178 @@ async def generate_external_agent_tasks() -> int:
     return total_created
 
 
-async def _check_cooldown(conn, agent_id: UUID, task_type: str, interval_minutes: int) -> bool:
+def _cooldown_passed(last_task_at: Optional[datetime], interval_minutes: int) -> bool:
     """Agent'ın bu görev tipi için cooldown'u geçip geçmediğini kontrol et."""
-    last_task_at = await conn.fetchval(
-        """
-        SELECT MAX(created_at) FROM tasks
-        WHERE assigned_to = $1 AND task_type = $2
-        """,
-        agent_id, task_type
-    )
     if last_task_at is None:
         return True
     return datetime.now(timezone.utc) - last_task_at > timedelta(minutes=interval_minutes)
 
 
+class _CandidatePool:
+    """
+    Bir generate_external_agent_tasks turu için aday event/entry havuzu.
+
+    Her kaynak ilk ihtiyaçta bir kez, turdaki tüm agentlar için yüklenir
+    (event'ler + agent'ın daha önce aldığı event'ler, son create_topic
+    kategorileri, entry'ler + agent'ın yorumladığı/görev aldığı entry'ler,
+    günlük community post sayısı). Her yükleme kendi bağlantısını alır.
+    """
+
+    EVENT_LIMIT = 200  # 48 saatteki en yeni topic'siz event'ler
+    ENTRY_LIMIT = 200  # trending_entries_mv'deki en yeni entry'ler
+
+    def __init__(self, agent_ids: List[UUID]):
+        self.agent_ids = agent_ids
+        self._events: Optional[List[dict]] = None
+        self._used_events: dict = {}  # agent_id -> {external_id}
+        self._last_category: dict = {}  # agent_id -> category
+        self._taken_events: set = set()  # bu turda verilen event id'leri
+        self._entries: Optional[List[dict]] = None
+        self._excluded_entries: dict = {}  # agent_id -> {entry_id}
+        self._community_today: Optional[int] = None
+
+    async def _load_events(self):
+        async with Database.connection() as conn:
+            await self._fetch_events(conn)
+
+    async def _fetch_events(self, conn):
+        rows = await conn.fetch(
+            """
+            SELECT e.id, e.title, e.description, e.source, e.source_url,
+                   e.external_id, e.cluster_keywords
+            FROM events e
+            WHERE e.topic_id IS NULL
+              AND e.created_at > NOW() - INTERVAL '48 hours'
+            ORDER BY e.created_at DESC
+            LIMIT $1
+            """,
+            self.EVENT_LIMIT
+        )
+        self._events = [dict(r) for r in rows]
+        external_ids = [e["external_id"] for e in self._events if e["external_id"]]
+        if external_ids:
+            # idx_tasks_event_external_id (040)
+            used = await conn.fetch(
+                """
+                SELECT tk.assigned_to, tk.prompt_context->>'event_external_id' AS external_id
+                FROM tasks tk
+                WHERE tk.prompt_context ? 'event_external_id'
+                  AND tk.prompt_context->>'event_external_id' = ANY($1::text[])
+                  AND tk.assigned_to = ANY($2::uuid[])
+                """,
+                external_ids, self.agent_ids
+            )
+            for r in used:
+                self._used_events.setdefault(r["assigned_to"], set()).add(r["external_id"])
+
+        last = await conn.fetch(
+            """
+            SELECT DISTINCT ON (assigned_to) assigned_to, prompt_context->>'category' AS category
+            FROM tasks
+            WHERE assigned_to = ANY($1::uuid[]) AND task_type = 'create_topic'
+            ORDER BY assigned_to, created_at DESC
+            """,
+            self.agent_ids
+        )
+        self._last_category = {r["assigned_to"]: r["category"] for r in last}
+
+    def discard_event(self, event_id: UUID):
+        """Turda topic'e bağlanan event'i havuzdan çıkar (başka agent'a verilmesin)."""
+        if self._events is not None:
+            self._events = [e for e in self._events if e["id"] != event_id]
+
+    async def pick_event(self, agent_id: UUID) -> Optional[dict]:
+        """Agent'ın kullanmadığı bir event (kategori çeşitliliği ile); yoksa None."""
+        if self._events is None:
+            await self._load_events()
+
+        used = self._used_events.get(agent_id, set())
+        available = [e for e in self._events if e["external_id"] not in used]
+        # Bu turda başka agent'a verilmemiş event'ler öncelikli
+        available = [e for e in available if e["id"] not in self._taken_events] or available
+        if not available:
+            return None
+
+        # Rastgele kategori seç (son topic'lerle aynı olmasın)
+        by_category = {}
+        for e in available:
+            keywords = e["cluster_keywords"] or []
+            by_category.setdefault(keywords[0] if keywords else None, []).append(e)
+        cats = [c for c in by_category if c] or [None]
+        last_category = self._last_category.get(agent_id)
+        # Son kategoriyi atla (varsa ve alternatif varsa)
+        if last_category and len(cats) > 1:
+            cats = [c for c in cats if c != last_category] or cats
+        selected_cat = random.choice(cats)
+        events = by_category[selected_cat] if selected_cat is not None else available
+
+        event = random.choice(events)
+        self._taken_events.add(event["id"])
+        if event["external_id"]:
+            self._used_events.setdefault(agent_id, set()).add(event["external_id"])
+        return event
+
+    async def _load_entries(self):
+        async with Database.connection() as conn:
+            await self._fetch_entries(conn)
+
+    async def _fetch_entries(self, conn):
+        # trending_entries_mv; bayatsa canlı view
+        source = await TrendingViews.entries_source(conn)
+        rows = await conn.fetch(
+            f"""
+            SELECT e.id, e.content, m.topic_id, m.topic_title, m.topic_slug,
+                   m.agent_id, m.agent_username as author_username
+            FROM {source} m
+            JOIN entries e ON e.id = m.entry_id
+            WHERE e.is_hidden = FALSE
+              AND m.created_at > NOW() - INTERVAL '48 hours'
+            ORDER BY m.created_at DESC
+            LIMIT $1
+            """,
+            self.ENTRY_LIMIT
+        )
+        self._entries = [dict(r) for r in rows]
+        if not self._entries:
+            return
+        # Agent'ın yorum yazdığı veya açık yorum görevi olan entry'ler
+        excluded = await conn.fetch(
+            """
+            SELECT c.agent_id, c.entry_id FROM comments c
+            WHERE c.entry_id = ANY($1::uuid[]) AND c.agent_id = ANY($2::uuid[])
+            UNION
+            SELECT tk.assigned_to, tk.entry_id FROM tasks tk
+            WHERE tk.entry_id = ANY($1::uuid[]) AND tk.assigned_to = ANY($2::uuid[])
+              AND tk.task_type = 'write_comment'
+              AND tk.status IN ('pending', 'claimed')
+            """,
+            [e["id"] for e in self._entries], self.agent_ids
+        )
+        for r in excluded:
+            self._excluded_entries.setdefault(r["agent_id"], set()).add(r["entry_id"])
+
+    async def pick_entry(self, agent_id: UUID) -> Optional[dict]:
+        """Agent'ın henüz yorum yazmadığı en yeni entry; yoksa None."""
+        if self._entries is None:
+            await self._load_entries()
+
+        excluded = self._excluded_entries.setdefault(agent_id, set())
+        for entry in self._entries:
+            if entry["agent_id"] != agent_id and entry["id"] not in excluded:
+                excluded.add(entry["id"])
+                return entry
+        return None
+
+    async def community_today(self) -> int:
+        """Son 24 saatteki community post sayısı (tüm agentlar)."""
+        if self._community_today is None:
+            async with Database.connection() as conn:
+                self._community_today = await conn.fetchval(
+                    "SELECT COUNT(*) FROM community_posts WHERE created_at > NOW() - INTERVAL '24 hours'"
+                )
+        return self._community_today
+
+
 async def _transform_title_for_external(news_title: str, category: str, description: str = "") -> str:
     """
     RSS başlığını sözlük tarzına dönüştür — system agent ile AYNI prompt.
@@ -203,41 +372,36 @@ YANLIŞ (çekimli fiil, YASAK):
         if attempt > 0:
             user_prompt += "\n\n⚠️ ÖNCEKİ DENEME YARIM KALDI! Daha KISA yaz (max 40 karakter)."
         try:
-            async with httpx.AsyncClient(timeout=15.0) as client:
-                response = await client.post(
-                    "https://api.anthropic.com/v1/messages",
-                    headers={
-                        "x-api-key": api_key,
-                        "anthropic-version": "2023-06-01",
-                        "Content-Type": "application/json",
-                    },
-                    json={
-                        "model": "claude-haiku-4-5-20251001",
-                        "max_tokens": 60,
-                        "temperature": 0.7 + (attempt * 0.15),
-                        "system": system_prompt,
-                        "messages": [{"role": "user", "content": user_prompt}],
-                    },
-                )
-                if response.status_code == 200:
-                    data = response.json()
-                    title = data["content"][0]["text"].strip()
-                    title = re.sub(r'\*+', '', title)
-                    title = re.sub(r'#+\s*', '', title)
-                    title = re.sub(r'\(.*$', '', title)
-                    title = title.strip('"\'').strip().lower()
-                    title = re.sub(r'\s+', ' ', title).strip()
-                    # Completeness check
-                    if len(title) < 5 or len(title) > 55:
-                        continue
-                    if "..." in title or title.endswith(":"):
-                        continue
-                    if any(title.endswith(e) for e in incomplete_endings):
-                        continue
-                    if ": " in title and len(title.split(": ")[-1].split()) <= 1:
-                        continue
-                    logger.info(f"External title transformed: '{news_title[:40]}' → '{title}'")
-                    return title
+            response = await LLMGateway.messages(
+                {
+                    "model": "claude-haiku-4-5-20251001",
+                    "max_tokens": 60,
+                    "temperature": 0.7 + (attempt * 0.15),
+                    "system": system_prompt,
+                    "messages": [{"role": "user", "content": user_prompt}],
+                },
+                api_key=api_key,
+                timeout=15.0,
+            )
+            if response.status_code == 200:
+                data = response.json()
+                title = data["content"][0]["text"].strip()
+                title = re.sub(r'\*+', '', title)
+                title = re.sub(r'#+\s*', '', title)
+                title = re.sub(r'\(.*$', '', title)
+                title = title.strip('"\'').strip().lower()
+                title = re.sub(r'\s+', ' ', title).strip()
+                # Completeness check
+                if len(title) < 5 or len(title) > 55:
+                    continue
+                if "..." in title or title.endswith(":"):
+                    continue
+                if any(title.endswith(e) for e in incomplete_endings):
+                    continue
+                if ": " in title and len(title.split(": ")[-1].split()) <= 1:
+                    continue
+                logger.info(f"External title transformed: '{news_title[:40]}' → '{title}'")
+                return title
         except Exception as e:
             logger.warning(f"External title transform failed (attempt {attempt + 1}): {e}")
 
@@ -247,7 +411,7 @@ YANLIŞ (çekimli fiil, YASAK):
     return fallback
 
 
-async def _create_topic_task(conn, agent_id: UUID) -> bool:
+async def _create_topic_task(agent_id: UUID, pool: _CandidatePool) -> bool:
     """
     Yeni başlık oluşturma görevi — system agentlar gibi create_topic.
     
@@ -256,79 +420,40 @@ async def _create_topic_task(conn, agent_id: UUID) -> bool:
     
     Kullanılabilir event yoksa write_comment task'ına fallback yapar.
     """
-    # Henüz topic'e dönüştürülmemiş event'leri bul — kategori çeşitliliği ile
-    # Önce mevcut kategorileri bul, rastgele bir kategori seç, o kategoriden event al
-    available_categories = await conn.fetch(
-        """
-        SELECT DISTINCT e.cluster_keywords[1] as category
-        FROM events e
-        WHERE e.topic_id IS NULL
-          AND e.created_at > NOW() - INTERVAL '48 hours'
-          AND NOT EXISTS (
-              SELECT 1 FROM tasks tk
-              WHERE tk.assigned_to = $1
-              AND tk.prompt_context->>'event_external_id' = e.external_id
-          )
-        """,
-        agent_id
-    )
-
-    if not available_categories:
-        logger.debug(f"No unused events for agent {agent_id}, falling back to comment task")
-        return await _create_comment_task(conn, agent_id)
-
-    # Rastgele kategori seç (son topic'lerle aynı olmasın)
-    last_category = await conn.fetchval(
-        """
-        SELECT prompt_context->>'category' FROM tasks
-        WHERE assigned_to = $1 AND task_type = 'create_topic'
-        ORDER BY created_at DESC LIMIT 1
-        """,
-        agent_id
-    )
-    cats = [r["category"] for r in available_categories if r["category"]]
-    if not cats:
-        cats = [None]
-    # Son kategoriyi atla (varsa ve alternatif varsa)
-    if last_category and len(cats) > 1:
-        cats = [c for c in cats if c != last_category] or cats
-    selected_cat = random.choice(cats)
-
-    # Seçilen kategoriden rastgele event
-    event = await conn.fetchrow(
-        """
-        SELECT e.id, e.title, e.description, e.source, e.source_url,
-               e.external_id, e.cluster_keywords
-        FROM events e
-        WHERE e.topic_id IS NULL
-          AND e.created_at > NOW() - INTERVAL '48 hours'
-          AND ($2::text IS NULL OR e.cluster_keywords[1] = $2)
-          AND NOT EXISTS (
-              SELECT 1 FROM tasks tk
-              WHERE tk.assigned_to = $1
-              AND tk.prompt_context->>'event_external_id' = e.external_id
-          )
-        ORDER BY RANDOM()
-        LIMIT 1
-        """,
-        agent_id, selected_cat
-    )
+    # Henüz topic'e dönüştürülmemiş event'lerden biri — kategori çeşitliliği ile
+    event = await pool.pick_event(agent_id)
 
     if not event:
         # Kullanılabilir event yok — comment task'ına fallback
         logger.debug(f"No unused events for agent {agent_id}, falling back to comment task")
-        return await _create_comment_task(conn, agent_id)
+        return await _create_comment_task(agent_id, pool)
 
     # Event'in kategorisini belirle
     keywords = event["cluster_keywords"] or []
     category = keywords[0] if keywords else "dertlesme"
 
-    # Başlığı sözlük tarzına dönüştür (system agent ile aynı — SERVER-SIDE)
+    # Başlığı sözlük tarzına dönüştür (system agent ile aynı — SERVER-SIDE).
+    # LLM çağrısı sırasında pool bağlantısı tutulmaz.
     raw_title = event["title"]
     sozluk_title = await _transform_title_for_external(
         raw_title, category, event["description"] or ""
     )
 
+    # Benzer başlık zaten açılmışsa (pg_trgm, tüm geçmiş) event'i o topic'e bağla —
+    # her döngüde aynı event tekrar seçilip dönüştürülmesin
+    similar_topic = await TopicSimilarity.find_duplicate(sozluk_title)
+    if similar_topic:
+        async with Database.connection() as conn:
+            await conn.execute(
+                "UPDATE events SET topic_id = $1 WHERE id = $2 AND topic_id IS NULL",
+                similar_topic["id"], event["id"],
+            )
+        pool.discard_event(event["id"])
+        logger.debug(
+            f"Similar topic exists for '{sozluk_title}' ~ '{similar_topic['title']}', falling back to comment task"
+        )
+        return await _create_comment_task(agent_id, pool)
+
     task_id = uuid4()
     prompt_context = {
         "event_title": raw_title,
@@ -342,50 +467,26 @@ async def _create_topic_task(conn, agent_id: UUID) -> bool:
         "instructions": f"Bu haber hakkında yeni bir başlık oluştur ve ilk entry'yi yaz: {event['title']}",
     }
 
-    await conn.execute(
-        """
-        INSERT INTO tasks (id, task_type, assigned_to, prompt_context, priority, status, expires_at, created_at)
-        VALUES ($1, 'create_topic', $2, $3, $4, 'pending', $5, NOW())
-        """,
-        task_id,
-        agent_id,
-        json.dumps(prompt_context, ensure_ascii=False),
-        random.randint(3, 7),
-        datetime.now(timezone.utc) + timedelta(hours=TASK_EXPIRY_HOURS),
-    )
+    async with Database.connection() as conn:
+        await conn.execute(
+            """
+            INSERT INTO tasks (id, task_type, assigned_to, prompt_context, priority, status, expires_at, created_at)
+            VALUES ($1, 'create_topic', $2, $3, $4, 'pending', $5, NOW())
+            """,
+            task_id,
+            agent_id,
+            json.dumps(prompt_context, ensure_ascii=False),
+            random.randint(3, 7),
+            datetime.now(timezone.utc) + timedelta(hours=TASK_EXPIRY_HOURS),
+        )
 
     logger.debug(f"Created create_topic task for agent {agent_id}: {event['title'][:40]}")
     return True
 
 
-async def _create_comment_task(conn, agent_id: UUID) -> bool:
+async def _create_comment_task(agent_id: UUID, pool: _CandidatePool) -> bool:
     """Popüler entry'ye yorum yazma görevi oluştur."""
-    # Agent'ın henüz yorum yazmadığı popüler entry'leri bul
-    entry = await conn.fetchrow(
-        """
-        SELECT e.id, e.content, e.topic_id, t.title as topic_title, t.slug as topic_slug,
-               a.username as author_username
-        FROM entries e
-        JOIN topics t ON e.topic_id = t.id
-        JOIN agents a ON e.agent_id = a.id
-        WHERE e.is_hidden = FALSE
-          AND e.agent_id != $1
-          AND e.created_at > NOW() - INTERVAL '48 hours'
-          AND NOT EXISTS (
-              SELECT 1 FROM comments c
-              WHERE c.entry_id = e.id AND c.agent_id = $1
-          )
-          AND NOT EXISTS (
-              SELECT 1 FROM tasks tk
-              WHERE tk.entry_id = e.id AND tk.assigned_to = $1
-              AND tk.task_type = 'write_comment'
-              AND tk.status IN ('pending', 'claimed')
-          )
-        ORDER BY e.created_at DESC, RANDOM()
-        LIMIT 1
-        """,
-        agent_id
-    )
+    entry = await pool.pick_entry(agent_id)
 
     if not entry:
         return False
@@ -399,31 +500,29 @@ async def _create_comment_task(conn, agent_id: UUID) -> bool:
         "instructions": f"Bu entry'ye yorum yaz",
     }
 
-    await conn.execute(
-        """
-        INSERT INTO tasks (id, task_type, assigned_to, topic_id, entry_id, prompt_context, priority, status, expires_at, created_at)
-        VALUES ($1, 'write_comment', $2, $3, $4, $5, $6, 'pending', $7, NOW())
-        """,
-        task_id,
-        agent_id,
-        entry["topic_id"],
-        entry["id"],
-        json.dumps(prompt_context, ensure_ascii=False),
-        random.randint(2, 5),
-        datetime.now(timezone.utc) + timedelta(hours=TASK_EXPIRY_HOURS),
-    )
+    async with Database.connection() as conn:
+        await conn.execute(
+            """
+            INSERT INTO tasks (id, task_type, assigned_to, topic_id, entry_id, prompt_context, priority, status, expires_at, created_at)
+            VALUES ($1, 'write_comment', $2, $3, $4, $5, $6, 'pending', $7, NOW())
+            """,
+            task_id,
+            agent_id,
+            entry["topic_id"],
+            entry["id"],
+            json.dumps(prompt_context, ensure_ascii=False),
+            random.randint(2, 5),
+            datetime.now(timezone.utc) + timedelta(hours=TASK_EXPIRY_HOURS),
+        )
 
     logger.debug(f"Created write_comment task for agent {agent_id}: {entry['topic_title'][:40]}")
     return True
 
 
-async def _create_community_post_task(conn, agent_id: UUID) -> bool:
+async def _create_community_post_task(agent_id: UUID, pool: _CandidatePool) -> bool:
     """Topluluk post'u yazma görevi oluştur (günde max 1 per agent)."""
     # Günlük toplam community post limiti (tüm agentlar için)
-    today_count = await conn.fetchval(
-        "SELECT COUNT(*) FROM community_posts WHERE created_at > NOW() - INTERVAL '24 hours'"
-    )
-    if today_count >= 10:
+    if await pool.community_today() >= 10:
         logger.debug("Community post daily global limit reached (10)")
         return False
 
@@ -441,17 +540,18 @@ async def _create_community_post_task(conn, agent_id: UUID) -> bool:
     if post_type == "poll":
         prompt_context["instructions"] += " poll_options alanına en az 2, en fazla 5 seçenek ekle."
 
-    await conn.execute(
-        """
-        INSERT INTO tasks (id, task_type, assigned_to, prompt_context, priority, status, expires_at, created_at)
-        VALUES ($1, 'community_post', $2, $3, $4, 'pending', $5, NOW())
-        """,
-        task_id,
-        agent_id,
-        json.dumps(prompt_context, ensure_ascii=False),
-        random.randint(1, 3),
-        datetime.now(timezone.utc) + timedelta(hours=TASK_EXPIRY_HOURS),
-    )
+    async with Database.connection() as conn:
+        await conn.execute(
+            """
+            INSERT INTO tasks (id, task_type, assigned_to, prompt_context, priority, status, expires_at, created_at)
+            VALUES ($1, 'community_post', $2, $3, $4, 'pending', $5, NOW())
+            """,
+            task_id,
+            agent_id,
+            json.dumps(prompt_context, ensure_ascii=False),
+            random.randint(1, 3),
+            datetime.now(timezone.utc) + timedelta(hours=TASK_EXPIRY_HOURS),
+        )
 
     logger.debug(f"Created community_post task ({post_type}) for agent {agent_id}")
     return True
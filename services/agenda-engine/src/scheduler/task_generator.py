@@ -8,6 +8,7 @@ from uuid import uuid4, UUID
 from ..models import Task, TaskType, TaskStatus, VirtualDayPhase, Event
 from ..database import Database
 from .virtual_day import VirtualDayScheduler, PHASE_CONFIG
+from .task_queue import TaskQueue
 
 logger = logging.getLogger(__name__)
 
@@ -200,7 +201,9 @@ class TaskGenerator:
             )
 
     async def cleanup_expired_tasks(self) -> int:
-        """Clean up expired tasks."""
+        """Clean up expired tasks (önce lease'i dolan claim'ler geri alınır)."""
+        await TaskQueue.reclaim_expired_leases()
+
         async with Database.connection() as conn:
             result = await conn.execute(
                 """
@@ -0,0 +1,136 @@
+"""
+Task Queue - tasks tablosundan görev claim etme (çok worker'lı güvenli).
+
+process_pending_tasks pending görevleri düz SELECT ile alıyordu; iki engine
+replikası aynı görevleri işliyordu. Burada:
+
+- claim(): FOR UPDATE SKIP LOCKED ile seçilen satırlar tek UPDATE'te
+  status='claimed', claimed_by=worker, lease_expires_at=NOW()+lease olur;
+  başka worker'ın kilitlediği/claim ettiği satırlar atlanır
+- complete()/fail()/release(): yalnızca bu worker'ın claim'i üzerinde çalışır
+- reclaim_expired_leases(): lease'i dolan claim'ler (worker çöktü/takıldı)
+  pending'e döner; attempts limiti aşıldıysa failed
+
+Dış agent claim'leri (API gateway) lease yazmaz, reclaim onlara dokunmaz.
+"""
+
+import logging
+from typing import List, Optional
+from uuid import UUID
+
+from ..config import get_settings
+from ..database import Database
+
+logger = logging.getLogger(__name__)
+
+
+class TaskQueue:
+    """Lease'li görev claim'i (classmethod'lar; tüm state tasks tablosunda)."""
+
+    @staticmethod
+    def _worker_id() -> str:
+        return get_settings().effective_worker_id
+
+    @classmethod
+    async def claim(cls, task_types: List[str], limit: int) -> List[dict]:
+        """En fazla limit pending görevi bu worker adına claim et (priority DESC, created_at ASC)."""
+        if limit <= 0:
+            return []
+        settings = get_settings()
+        async with Database.connection() as conn:
+            rows = await conn.fetch(
+                """
+                UPDATE tasks t SET
+                    status = 'claimed',
+                    claimed_at = NOW(),
+                    claimed_by = $3,
+                    lease_expires_at = NOW() + make_interval(secs => $4),
+                    attempts = t.attempts + 1
+                FROM (
+                    SELECT id FROM tasks
+                    WHERE status = 'pending' AND task_type = ANY($1)
+                    ORDER BY priority DESC, created_at ASC
+                    LIMIT $2
+                    FOR UPDATE SKIP LOCKED
+                ) picked
+                WHERE t.id = picked.id
+                RETURNING t.id, t.task_type, t.topic_id, t.entry_id, t.prompt_context,
+                          t.priority, t.created_at
+                """,
+                task_types, limit, cls._worker_id(), float(settings.task_lease_seconds)
+            )
+        # RETURNING sırası garanti değil
+        return sorted((dict(r) for r in rows), key=lambda r: (-(r["priority"] or 0), r["created_at"]))
+
+    @classmethod
+    async def complete(cls, task_id: UUID, assigned_to: Optional[UUID] = None) -> bool:
+        """Claim'i tamamla. Lease dolup görev başka worker'a geçtiyse False."""
+        async with Database.connection() as conn:
+            result = await conn.execute(
+                """
+                UPDATE tasks SET
+                    status = 'completed',
+                    assigned_to = COALESCE($2, assigned_to),
+                    completed_at = NOW(),
+                    lease_expires_at = NULL
+                WHERE id = $1 AND status = 'claimed' AND claimed_by = $3
+                """,
+                task_id, assigned_to, cls._worker_id()
+            )
+        done = result.endswith(" 1")
+        if not done:
+            logger.warning(f"Task {task_id} lease lost before completion")
+        return done
+
+    @classmethod
+    async def fail(cls, task_id: UUID) -> None:
+        async with Database.connection() as conn:
+            await conn.execute(
+                """
+                UPDATE tasks SET status = 'failed', lease_expires_at = NULL
+                WHERE id = $1 AND status = 'claimed' AND claimed_by = $2
+                """,
+                task_id, cls._worker_id()
+            )
+
+    @classmethod
+    async def release(cls, task_ids: List[UUID]) -> None:
+        """İşlenmeyen claim'leri pending'e geri bırak (deneme sayılmaz)."""
+        if not task_ids:
+            return
+        async with Database.connection() as conn:
+            await conn.execute(
+                """
+                UPDATE tasks SET
+                    status = 'pending',
+                    claimed_at = NULL,
+                    claimed_by = NULL,
+                    lease_expires_at = NULL,
+                    attempts = GREATEST(attempts - 1, 0)
+                WHERE id = ANY($1::uuid[]) AND status = 'claimed' AND claimed_by = $2
+                """,
+                task_ids, cls._worker_id()
+            )
+
+    @classmethod
+    async def reclaim_expired_leases(cls) -> int:
+        """Lease'i dolan claim'leri pending'e al (attempts limiti aşıldıysa failed)."""
+        async with Database.connection() as conn:
+            rows = await conn.fetch(
+                """
+                UPDATE tasks SET
+                    status = CASE WHEN attempts >= $1 THEN 'failed' ELSE 'pending' END,
+                    claimed_at = NULL,
+                    claimed_by = NULL,
+                    lease_expires_at = NULL
+                WHERE status = 'claimed'
+                AND lease_expires_at IS NOT NULL
+                AND lease_expires_at < NOW()
+                RETURNING status
+                """,
+                get_settings().task_max_attempts
+            )
+        if rows:
+            failed = sum(1 for r in rows if r["status"] == "failed")
+            logger.info(f"Reclaimed {len(rows) - failed} expired task leases ({failed} failed after max attempts)")
+        return len(rows)
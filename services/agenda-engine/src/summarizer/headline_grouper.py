@@ -6,12 +6,8 @@ from dataclasses import dataclass, field
 from typing import List, Dict
 from collections import defaultdict
 
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.cluster import AgglomerativeClustering
-from sklearn.metrics.pairwise import cosine_similarity
-import numpy as np
-
 from ..models import Event
+from ..clustering.executor import ClusteringExecutor
 from ..categories import GUNDEM_CATEGORIES, CATEGORY_EN_TO_TR
 
 logger = logging.getLogger(__name__)
@@ -32,11 +28,7 @@ class HeadlineGrouper:
 
     def __init__(self, similarity_threshold: float = 0.4):
         self.similarity_threshold = similarity_threshold
-        self.vectorizer = TfidfVectorizer(
-            max_features=500,
-            stop_words=self._get_turkish_stopwords(),
-            ngram_range=(1, 2)
-        )
+        self.max_features = 500
 
     def _get_turkish_stopwords(self) -> List[str]:
         """Türkçe stop words listesi."""
@@ -122,7 +114,7 @@ class HeadlineGrouper:
                 continue
 
             # Kategori içi clustering
-            clustered = self._cluster_headlines(group.headlines)
+            clustered = await self._cluster_headlines(group.headlines)
 
             # En büyük cluster'ı al (ana haber grubu)
             if clustered:
@@ -153,8 +145,8 @@ class HeadlineGrouper:
         logger.info(f"Benzerlik gruplaması: {len(category_groups)} kategori -> {len(final_groups)} grup")
         return final_groups
 
-    def _cluster_headlines(self, headlines: List[Dict]) -> List[List[Dict]]:
-        """Başlıkları semantic similarity ile grupla."""
+    async def _cluster_headlines(self, headlines: List[Dict]) -> List[List[Dict]]:
+        """Başlıkları semantic similarity ile grupla (hesaplama ClusteringExecutor'da)."""
         if len(headlines) < 2:
             return [headlines]
 
@@ -162,21 +154,15 @@ class HeadlineGrouper:
             # Text'leri çıkar
             texts = [f"{h['title']} {h['description']}" for h in headlines]
 
-            # TF-IDF vektörize
-            tfidf_matrix = self.vectorizer.fit_transform(texts)
-
-            # Cosine similarity
-            similarity_matrix = cosine_similarity(tfidf_matrix)
-            distance_matrix = 1 - similarity_matrix
-
-            # Hierarchical clustering
-            clustering = AgglomerativeClustering(
-                n_clusters=None,
-                distance_threshold=1 - self.similarity_threshold,
-                metric="precomputed",
-                linkage="average"
+            # TF-IDF + hierarchical clustering — event loop dışında
+            labels = await ClusteringExecutor.cluster_labels(
+                texts,
+                self.similarity_threshold,
+                self.max_features,
+                self._get_turkish_stopwords(),
             )
-            labels = clustering.fit_predict(distance_matrix)
+            if labels is None:
+                return [headlines]
 
             # Cluster'lara ayır
             clusters: Dict[int, List[Dict]] = defaultdict(list)
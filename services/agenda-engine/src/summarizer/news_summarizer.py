@@ -7,9 +7,9 @@ import logging
 import os
 from typing import List, Optional, Any
 
-import httpx
-
 from ..config import get_settings
+from ..llm_gateway import LLMGateway
+from ..llm_batch import current_batch, run_batched
 from .headline_grouper import HeadlineGroup
 
 logger = logging.getLogger(__name__)
@@ -66,45 +66,54 @@ class NewsSummarizer:
         if not self.anthropic_key:
             return self._fallback_summary(group)
 
-        async with httpx.AsyncClient(timeout=60.0) as client:
-            response = await client.post(
-                "https://api.anthropic.com/v1/messages",
-                headers={
-                    "x-api-key": self.anthropic_key,
-                    "anthropic-version": "2023-06-01",
-                    "Content-Type": "application/json",
-                },
-                json={
-                    "model": self.settings.summarization_model,
-                    "max_tokens": self.settings.summary_max_tokens,
-                    "temperature": self.settings.summary_temperature,
-                    "system": SUMMARIZE_SYSTEM_PROMPT,
-                    "messages": [
-                        {"role": "user", "content": SUMMARIZE_USER_PROMPT.format(headlines=headlines_text)}
-                    ],
-                },
-            )
+        payload = {
+            "model": self.settings.summarization_model,
+            "max_tokens": self.settings.summary_max_tokens,
+            "temperature": self.settings.summary_temperature,
+            "system": SUMMARIZE_SYSTEM_PROMPT,
+            "messages": [
+                {"role": "user", "content": SUMMARIZE_USER_PROMPT.format(headlines=headlines_text)}
+            ],
+        }
+
+        batch = current_batch()
+        if batch is not None:
+            data = await batch.request(payload)
+            if not data:
+                logger.error("Anthropic batch özet hatası, fallback kullanılıyor")
+                return self._fallback_summary(group)
+        else:
+            response = await LLMGateway.messages(payload, api_key=self.anthropic_key, timeout=60.0)
 
             if response.status_code != 200:
                 logger.error(f"Anthropic hatası: {response.status_code} - {response.text}")
                 return self._fallback_summary(group)
 
             data = response.json()
-            summary = data["content"][0]["text"].strip()
-            logger.debug(f"Anthropic özet [{group.category}]: {summary[:50]}...")
-            return summary
+        summary = data["content"][0]["text"].strip()
+        logger.debug(f"Anthropic özet [{group.category}]: {summary[:50]}...")
+        return summary
 
     async def summarize_all_groups(self, groups: dict) -> dict:
-        """Tüm grupları özetle."""
+        """Tüm grupları özetle (llm_use_message_batches açıksa tek Message Batch ile)."""
         summarized = {}
+        items = [(key, group) for key, group in groups.items() if len(group.headlines) > 0]
 
-        for key, group in groups.items():
-            if len(group.headlines) == 0:
-                continue
-
-            summary = await self.summarize_group(group)
-            group.summary = summary
-            summarized[key] = group
+        if self.settings.llm_use_message_batches and self.anthropic_key and len(items) > 1:
+            summaries = await run_batched(
+                [self.summarize_group(group) for _, group in items], api_key=self.anthropic_key
+            )
+            for (key, group), summary in zip(items, summaries):
+                if isinstance(summary, Exception):
+                    logger.error(f"LLM özetleme hatası: {summary}")
+                    summary = self._fallback_summary(group)
+                group.summary = summary
+                summarized[key] = group
+        else:
+            for key, group in items:
+                summary = await self.summarize_group(group)
+                group.summary = summary
+                summarized[key] = group
 
         logger.info(f"Toplam {len(summarized)} grup özetlendi (anthropic)")
         return summarized
@@ -0,0 +1,85 @@
+"""
+Topic Similarity - Başlık benzerliği için paylaşımlı DB tarafı servis.
+
+Agent runner, dış agent task üretici ve TopicDeduplicator benzer başlık
+kontrolü için ya son N topic'i Python'a çekiyordu ya da indexsiz
+`similarity(title, $1) > 0.85` taraması yapıyordu. Bu servis tüm topic
+geçmişinde tek sorgu atar:
+
+    WHERE title % $1          -- pg_trgm GIN index (035_topic_title_trgm_index.sql)
+    ORDER BY title <-> $1     -- en benzer N başlık
+    LIMIT N
+
+`%` operatörünün eşiği transaction'a özel `pg_trgm.similarity_threshold`
+ile ayarlanır; böylece index eşik altındaki satırları hiç döndürmez.
+"""
+
+import logging
+from typing import List, Optional
+
+from .config import get_settings
+from .database import Database
+
+logger = logging.getLogger(__name__)
+
+
+class TopicSimilarity:
+    """pg_trgm KNN ile benzer topic araması (class-level, state'siz)."""
+
+    @staticmethod
+    async def _query(conn, title: str, limit: int, min_similarity: float) -> List[dict]:
+        async with conn.transaction():
+            await conn.execute(
+                "SELECT set_config('pg_trgm.similarity_threshold', $1, true)",
+                str(min_similarity),
+            )
+            rows = await conn.fetch(
+                """
+                SELECT id, title, slug, category, similarity(title, $1) AS score
+                FROM topics
+                WHERE title % $1
+                ORDER BY title <-> $1
+                LIMIT $2
+                """,
+                title, limit,
+            )
+        return [dict(row) for row in rows]
+
+    @classmethod
+    async def similar_titles(
+        cls,
+        title: str,
+        limit: Optional[int] = None,
+        min_similarity: Optional[float] = None,
+        conn=None,
+    ) -> List[dict]:
+        """
+        En benzer topic'ler (çoktan aza): [{id, title, slug, category, score}].
+        conn verilmezse pool'dan bağlantı alınır.
+        """
+        if not title or not title.strip():
+            return []
+        settings = get_settings()
+        limit = limit or settings.topic_similarity_candidates
+        if min_similarity is None:
+            min_similarity = settings.topic_similarity_threshold
+
+        if conn is not None:
+            return await cls._query(conn, title, limit, min_similarity)
+        async with Database.connection() as pooled:
+            return await cls._query(pooled, title, limit, min_similarity)
+
+    @classmethod
+    async def find_duplicate(
+        cls,
+        title: str,
+        threshold: Optional[float] = None,
+        conn=None,
+    ) -> Optional[dict]:
+        """Eşiği geçen en benzer topic veya None. DB hatasında None (kontrol atlanır)."""
+        try:
+            matches = await cls.similar_titles(title, limit=1, min_similarity=threshold, conn=conn)
+        except Exception as e:
+            logger.warning(f"Topic similarity check failed: {e}")
+            return None
+        return matches[0] if matches else None
@@ -0,0 +1,90 @@
+"""
+Trending Views - trending_topics_mv / trending_entries_mv refresh ve okuma.
+
+016_trending_system.sql MV'leri tanımlıyordu ama refresh eden yoktu; DEBE ve
+comment/vote aday sorguları her seferinde entries/topics/agents join'ini
+yeniden hesaplıyordu. Bu modül:
+
+- refresh(): view başına REFRESH MATERIALIZED VIEW CONCURRENTLY; süre loglanır
+  ve trending_mv_refresh tablosuna yazılır (tüm engine replikaları görür)
+- entries_source(): aday sorgularının FROM kaynağı. MV tazeyse
+  trending_entries_mv; son refresh trending_mv_max_staleness_minutes'tan
+  eskiyse aynı kolonları canlı hesaplayan trending_entries_live view'i
+
+Aday sorguları mutable alanları (içerik, gizlilik, oy sayıları) yine
+entries join'inden canlı okur; MV aday kümesini ve join'lenmiş metadata'yı verir.
+"""
+
+import logging
+import time
+from typing import Dict, Optional
+
+from .config import get_settings
+from .database import Database
+
+logger = logging.getLogger(__name__)
+
+ENTRIES_MV = "trending_entries_mv"
+ENTRIES_LIVE = "trending_entries_live"
+
+
+class TrendingViews:
+    """Trending MV refresh + bayatlık kontrolü (Database gibi class-level state)."""
+
+    VIEWS = ("trending_topics_mv", ENTRIES_MV)
+    FRESHNESS_CHECK_SECONDS = 30  # trending_mv_refresh bu aralıkla okunur
+
+    _entries_fresh: Optional[tuple] = None  # (checked_at, is_fresh)
+
+    @classmethod
+    async def refresh(cls) -> Dict[str, float]:
+        """MV'leri refresh et; view -> süre (ms). Başarısız view'ler dönmez."""
+        durations = {}
+        for view in cls.VIEWS:
+            started = time.perf_counter()
+            try:
+                async with Database.connection() as conn:
+                    await conn.execute(f"REFRESH MATERIALIZED VIEW CONCURRENTLY {view}")
+                    duration_ms = (time.perf_counter() - started) * 1000
+                    await conn.execute(
+                        """
+                        INSERT INTO trending_mv_refresh (view_name, refreshed_at, duration_ms)
+                        VALUES ($1, NOW(), $2)
+                        ON CONFLICT (view_name) DO UPDATE SET
+                            refreshed_at = EXCLUDED.refreshed_at,
+                            duration_ms = EXCLUDED.duration_ms
+                        """,
+                        view, duration_ms
+                    )
+            except Exception as e:
+                logger.error(f"Failed to refresh {view}: {e}")
+                continue
+            durations[view] = duration_ms
+            logger.info(f"Refreshed {view} in {duration_ms:.0f} ms")
+
+        if ENTRIES_MV in durations:
+            cls._entries_fresh = (time.monotonic(), True)
+        return durations
+
+    @classmethod
+    async def entries_source(cls, conn) -> str:
+        """Entry aday sorguları için FROM kaynağı: taze MV veya canlı view."""
+        now = time.monotonic()
+        if cls._entries_fresh is None or now - cls._entries_fresh[0] > cls.FRESHNESS_CHECK_SECONDS:
+            max_age = get_settings().trending_mv_max_staleness_minutes * 60
+            try:
+                age = await conn.fetchval(
+                    """
+                    SELECT EXTRACT(EPOCH FROM (NOW() - refreshed_at))
+                    FROM trending_mv_refresh WHERE view_name = $1
+                    """,
+                    ENTRIES_MV
+                )
+            except Exception as e:
+                logger.warning(f"Trending MV freshness check failed: {e}")
+                age = None
+            fresh = age is not None and age <= max_age
+            if not fresh:
+                logger.warning(f"{ENTRIES_MV} is stale (age: {age}s), reading {ENTRIES_LIVE}")
+            cls._entries_fresh = (now, fresh)
+        return ENTRIES_MV if cls._entries_fresh[1] else ENTRIES_LIVE
@@ -0,0 +1,86 @@
+"""
+Tests for clustering engines: sparse (component + average-linkage) must give
+the same partition as the dense n×n average-linkage path.
+"""
+
+import random
+from collections import Counter
+
+import pytest
+
+pytest.importorskip("sklearn")
+pytest.importorskip("scipy")
+
+from src.clustering.executor import compute_cluster_labels
+
+SIMILARITY_THRESHOLD = 0.5
+MAX_FEATURES = 1000
+
+
+def _partition(labels):
+    """Label isimlerinden bağımsız partition: frozenset of frozenset(index)."""
+    groups = {}
+    for index, label in enumerate(labels):
+        groups.setdefault(label, set()).add(index)
+    return {frozenset(group) for group in groups.values()}
+
+
+def _grouped_headlines(n_topics: int, per_topic: int, seed: int) -> list:
+    """Konu başına sabit sıralı 6 kelimeden biri gürültüyle değişir: konu içi benzerlik yüksek."""
+    rng = random.Random(seed)
+    vocab = [f"kelime{i}" for i in range(2000)]
+    topics = [rng.sample(vocab, 6) for _ in range(n_topics)]
+    headlines = []
+    for topic in topics:
+        for _ in range(per_topic):
+            words = list(topic)
+            words[rng.randrange(len(words))] = rng.choice(vocab)
+            headlines.append(" ".join(words))
+    # Tekil başlıklar (hiçbir gruba ait değil)
+    for _ in range(n_topics):
+        headlines.append(" ".join(rng.sample(vocab, 6)))
+    rng.shuffle(headlines)
+    return headlines
+
+
+def _both(texts):
+    dense = compute_cluster_labels(texts, SIMILARITY_THRESHOLD, MAX_FEATURES, [], engine="dense")
+    sparse = compute_cluster_labels(texts, SIMILARITY_THRESHOLD, MAX_FEATURES, [], engine="sparse")
+    return dense, sparse
+
+
+@pytest.mark.parametrize("seed", [1, 2, 3])
+def test_sparse_matches_dense_on_multi_member_groups(seed):
+    texts = _grouped_headlines(n_topics=8, per_topic=5, seed=seed)
+
+    dense, sparse = _both(texts)
+
+    # Anlamlı bir karşılaştırma: çok üyeli cluster'lar var, her şey tekil değil
+    sizes = Counter(dense).values()
+    assert sum(1 for size in sizes if size >= 2) >= 4
+    assert _partition(sparse) == _partition(dense)
+
+
+def test_sparse_matches_dense_on_chained_titles():
+    # a~b ve b~c benzer, a ile c doğrudan benzer değil: tek component, linkage kararı önemli
+    texts = [
+        "merkez bankası faiz kararı açıklandı",
+        "merkez bankası faiz kararı piyasa tepkisi",
+        "faiz kararı piyasa tepkisi borsa düştü",
+        "piyasa tepkisi borsa düştü dolar yükseldi",
+        "galatasaray fenerbahçe derbi sonucu",
+        "galatasaray fenerbahçe derbi hakem kararı",
+        "yeni telefon modeli tanıtıldı",
+    ]
+
+    dense, sparse = _both(texts)
+
+    assert _partition(sparse) == _partition(dense)
+    assert dense[4] == dense[5]
+    assert dense[6] not in (dense[0], dense[4])
+
+
+def test_tiny_inputs():
+    assert compute_cluster_labels(["tek başlık"], SIMILARITY_THRESHOLD, MAX_FEATURES, [], engine="sparse") == [0]
+    dense, sparse = _both(["aynı başlık burada", "aynı başlık burada"])
+    assert dense == sparse == [0, 0]
@@ -0,0 +1,52 @@
+"""
+Tests for ClusteringExecutor: a timed-out job must not keep a pool worker busy.
+"""
+
+import asyncio
+
+import pytest
+
+pytest.importorskip("sklearn")
+pytest.importorskip("scipy")
+
+from src.clustering.executor import ClusteringExecutor
+from src.config import get_settings
+
+TEXTS = ["merkez bankası faiz kararı", "merkez bankası faiz indirimi", "derbi sonucu"]
+
+
+@pytest.fixture
+def process_mode(monkeypatch):
+    settings = get_settings()
+    monkeypatch.setattr(settings, "clustering_executor", "process")
+    monkeypatch.setattr(settings, "clustering_max_workers", 1)
+    yield settings
+    ClusteringExecutor.shutdown()
+
+
+async def _timed_out_workers(settings):
+    """Spawn başlangıcından kısa timeout'la çağır; o sırada çalışan worker'ları döndür."""
+    pool = ClusteringExecutor._get_pool()
+    call = asyncio.create_task(ClusteringExecutor.cluster_labels(TEXTS, 0.5, 1000, []))
+    while not pool._processes:
+        await asyncio.sleep(0.001)
+    workers = list(pool._processes.values())
+    return await call, workers
+
+
+def test_timeout_terminates_workers_and_recreates_pool(process_mode, monkeypatch):
+    monkeypatch.setattr(process_mode, "clustering_timeout_seconds", 0.05)
+
+    labels, workers = asyncio.run(_timed_out_workers(process_mode))
+
+    assert labels is None
+    assert ClusteringExecutor._pool is None
+    for worker in workers:
+        worker.join(timeout=5)
+        assert not worker.is_alive()
+
+    # Sonraki çağrı yeni pool'da normal çalışır
+    process_mode.clustering_timeout_seconds = 60
+    labels = asyncio.run(ClusteringExecutor.cluster_labels(TEXTS, 0.5, 1000, []))
+    assert labels is not None
+    assert labels[0] == labels[1] != labels[2]
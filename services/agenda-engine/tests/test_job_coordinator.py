@@ -0,0 +1,42 @@
+"""
+Tests for agent sharding in src/job_coordinator.py (membership set directly, no Redis).
+"""
+
+import pytest
+
+from src.job_coordinator import JobCoordinator
+
+MEMBERS = ["worker-a", "worker-b", "worker-c"]
+
+
+@pytest.fixture
+def cluster(monkeypatch):
+    def configure(worker: str, agent_sharding: bool):
+        monkeypatch.setattr(JobCoordinator, "_coordinated", True)
+        monkeypatch.setattr(JobCoordinator, "_members", MEMBERS)
+        monkeypatch.setattr(JobCoordinator, "_agent_sharding", agent_sharding)
+        monkeypatch.setattr(JobCoordinator, "worker_id", staticmethod(lambda: worker))
+    return configure
+
+
+def test_sharding_splits_keys_and_budget(cluster):
+    keys = [f"agent_{i}" for i in range(30)]
+    owned, shares = [], []
+    for worker in MEMBERS:
+        cluster(worker, agent_sharding=True)
+        owned.append(JobCoordinator.owned(keys))
+        shares.append(JobCoordinator.share(10))
+
+    assert sorted(k for part in owned for k in part) == sorted(keys)
+    assert shares == [4, 3, 3]
+    assert JobCoordinator.shard_count() == 3
+
+
+def test_without_agent_sharding_every_replica_owns_everything(cluster):
+    # Dosya memory backend'i: agent job'ları singleton, replika kendi payına bölmez
+    cluster("worker-b", agent_sharding=False)
+
+    assert JobCoordinator.owned(["x", "y", "z"]) == ["x", "y", "z"]
+    assert JobCoordinator.share(10) == 10
+    assert JobCoordinator.shard_count() == 1
+    assert JobCoordinator.replica_count() == 3
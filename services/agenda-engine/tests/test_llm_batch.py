@@ -0,0 +1,155 @@
+"""
+Tests for Message Batches mode (src/llm_batch.py) against a stub batches endpoint.
+"""
+
+import asyncio
+import json
+
+import httpx
+import pytest
+
+from src.config import get_settings
+from src.llm_batch import current_batch, run_batched
+from src.llm_gateway import LLMGateway
+
+
+class StubBatchesServer:
+    """In-process stand-in for the Anthropic Messages / Message Batches API."""
+
+    def __init__(self, fail_create: bool = False, errored: tuple = ()):
+        self.fail_create = fail_create
+        self.errored = set(errored)  # prompt'lar: sonucu "errored" döner
+        self.batches = {}  # batch_id -> requests
+        self.polls = {}  # batch_id -> poll sayısı
+        self.direct_calls = []
+
+    @staticmethod
+    def _message(prompt: str) -> dict:
+        return {"content": [{"type": "text", "text": f"echo:{prompt}"}]}
+
+    def handler(self, request: httpx.Request) -> httpx.Response:
+        path = request.url.path
+        if request.method == "POST" and path == "/v1/messages/batches":
+            if self.fail_create:
+                return httpx.Response(500, text="batches unavailable")
+            batch_id = f"batch-{len(self.batches) + 1}"
+            self.batches[batch_id] = json.loads(request.content)["requests"]
+            return httpx.Response(200, json={"id": batch_id, "processing_status": "in_progress"})
+        if request.method == "GET" and path.startswith("/v1/messages/batches/"):
+            batch_id = path.rsplit("/", 1)[-1]
+            self.polls[batch_id] = self.polls.get(batch_id, 0) + 1
+            if self.polls[batch_id] < 2:
+                return httpx.Response(200, json={"id": batch_id, "processing_status": "in_progress"})
+            return httpx.Response(200, json={
+                "id": batch_id,
+                "processing_status": "ended",
+                "results_url": f"http://stub/results/{batch_id}",
+            })
+        if request.method == "GET" and path.startswith("/results/"):
+            batch_id = path.rsplit("/", 1)[-1]
+            lines = []
+            for item in self.batches[batch_id]:
+                prompt = item["params"]["messages"][0]["content"]
+                if prompt in self.errored:
+                    result = {"type": "errored", "error": {"type": "overloaded_error"}}
+                else:
+                    result = {"type": "succeeded", "message": self._message(prompt)}
+                lines.append(json.dumps({"custom_id": item["custom_id"], "result": result}))
+            return httpx.Response(200, text="\n".join(lines))
+        if request.method == "POST" and path == "/v1/messages":
+            payload = json.loads(request.content)
+            self.direct_calls.append(payload)
+            return httpx.Response(200, json=self._message(payload["messages"][0]["content"]))
+        return httpx.Response(404)
+
+
+@pytest.fixture
+def stub_server(monkeypatch):
+    settings = get_settings()
+    monkeypatch.setattr(settings, "llm_batch_poll_interval_seconds", 0.0)
+    monkeypatch.setattr(settings, "llm_batch_max_wait_seconds", 5.0)
+
+    def install(**kwargs):
+        server = StubBatchesServer(**kwargs)
+        LLMGateway._client = httpx.AsyncClient(
+            base_url="http://stub", transport=httpx.MockTransport(server.handler)
+        )
+        LLMGateway._semaphore = None
+        return server
+
+    yield install
+    LLMGateway._client = None
+    LLMGateway._semaphore = None
+
+
+def _payload(prompt: str) -> dict:
+    return {"model": "test-model", "max_tokens": 10, "messages": [{"role": "user", "content": prompt}]}
+
+
+async def _ask(prompt: str):
+    message = await current_batch().request(_payload(prompt))
+    return message["content"][0]["text"] if message else None
+
+
+async def _ask_twice(prompt: str):
+    first = await _ask(f"{prompt}-1")
+    second = await _ask(f"{prompt}-2")
+    return first, second
+
+
+def test_current_batch_outside_run_batched_is_none():
+    assert current_batch() is None
+
+
+def test_requests_are_sent_as_one_batch(stub_server):
+    server = stub_server()
+
+    results = asyncio.run(run_batched([_ask("a"), _ask("b"), _ask("c")]))
+
+    assert results == ["echo:a", "echo:b", "echo:c"]
+    assert len(server.batches) == 1
+    prompts = [r["params"]["messages"][0]["content"] for r in server.batches["batch-1"]]
+    assert sorted(prompts) == ["a", "b", "c"]
+    assert server.polls["batch-1"] == 2
+    assert server.direct_calls == []
+
+
+def test_multiple_calls_per_task_run_in_rounds(stub_server):
+    server = stub_server()
+
+    results = asyncio.run(run_batched([_ask_twice("x"), _ask("y")]))
+
+    assert results == [("echo:x-1", "echo:x-2"), "echo:y"]
+    assert len(server.batches) == 2
+    assert len(server.batches["batch-1"]) == 2
+    assert len(server.batches["batch-2"]) == 1
+
+
+def test_errored_result_returns_none(stub_server):
+    stub_server(errored=("b",))
+
+    results = asyncio.run(run_batched([_ask("a"), _ask("b")]))
+
+    assert results == ["echo:a", None]
+
+
+def test_batch_create_failure_falls_back_to_direct_calls(stub_server):
+    server = stub_server(fail_create=True)
+
+    results = asyncio.run(run_batched([_ask("a"), _ask("b")]))
+
+    assert results == ["echo:a", "echo:b"]
+    assert server.batches == {}
+    assert len(server.direct_calls) == 2
+
+
+def test_task_exception_is_returned_in_order(stub_server):
+    stub_server()
+
+    async def broken():
+        raise ValueError("boom")
+
+    results = asyncio.run(run_batched([_ask("a"), broken()]))
+
+    assert results[0] == "echo:a"
+    assert isinstance(results[1], ValueError)
@@ -0,0 +1,88 @@
+"""
+Tests for the topic dedup LSH index sync (src/collectors/dedup.py, local fallback).
+"""
+
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from src.collectors.dedup import INDEX_SYNC_OVERLAP, TopicDeduplicator
+from src.collectors.topic_index import TopicTitleIndex
+
+NOW = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+
+class FakeConn:
+    """topics tablosu yerine: created_at filtresini uygular, sorguları kaydeder."""
+
+    def __init__(self, rows):
+        self.rows = rows
+        self.calls = []
+
+    async def fetch(self, query, *args):
+        self.calls.append((query, args))
+        if not args:
+            return list(self.rows)
+        return [row for row in self.rows if row["created_at"] > args[0]]
+
+
+def _row(title, minutes):
+    return {"title": title, "category": "ekonomi", "created_at": NOW + timedelta(minutes=minutes)}
+
+
+@pytest.fixture(autouse=True)
+def local_index(monkeypatch):
+    monkeypatch.setattr(TopicTitleIndex, "_local_buckets", {})
+    monkeypatch.setattr(TopicTitleIndex, "_local_titles", {})
+    monkeypatch.setattr(TopicTitleIndex, "_local_synced_at", None)
+
+
+def test_first_sync_loads_history_then_only_new_topics():
+    dedup = TopicDeduplicator()
+    conn = FakeConn([
+        _row("deprem bölgesinde konut projesi", -60),
+        _row("merkez bankası faiz kararı açıklandı", 0),
+    ])
+
+    assert asyncio.run(dedup.sync_index(conn)) == 2
+    assert asyncio.run(TopicTitleIndex.synced_at()) == NOW
+
+    # api-gateway'den açılmış gibi: mark_as_used'dan geçmeden tabloya eklenen topic
+    conn.rows.append(_row("istanbul metro hattı ulaşıma açıldı", 30))
+    # Overlap penceresi son indekslenen topic'i tekrar okur, daha eskileri okumaz
+    assert asyncio.run(dedup.sync_index(conn)) == 2
+    assert conn.calls[-1][1] == (NOW - INDEX_SYNC_OVERLAP,)
+    assert asyncio.run(TopicTitleIndex.synced_at()) == NOW + timedelta(minutes=30)
+
+    candidates = asyncio.run(
+        TopicTitleIndex.candidates("ekonomi", dedup.get_keywords("istanbul metro hattı ulaşıma açıldı"))
+    )
+    assert candidates == ["istanbul metro hattı ulaşıma açıldı"]
+
+
+def test_empty_sync_keeps_high_water_mark():
+    dedup = TopicDeduplicator()
+    conn = FakeConn([_row("merkez bankası faiz kararı açıklandı", 0)])
+    asyncio.run(dedup.sync_index(conn))
+
+    assert asyncio.run(dedup.sync_index(FakeConn([]))) == 0
+    assert asyncio.run(TopicTitleIndex.synced_at()) == NOW
+
+
+def test_filter_duplicates_falls_back_to_pg_trgm_on_lsh_miss(monkeypatch):
+    from unittest.mock import AsyncMock
+
+    from src.collectors import dedup as dedup_module
+
+    find_duplicate = AsyncMock(
+        side_effect=lambda title, conn=None: {"title": "faiz kararı"} if "faiz" in title else None
+    )
+    monkeypatch.setattr(dedup_module.TopicSimilarity, "find_duplicate", find_duplicate)
+
+    events = [{"title": "merkez bankası faiz kararı"}, {"title": "istanbul metro hattı açıldı"}]
+    filtered = asyncio.run(TopicDeduplicator().filter_duplicates(events, "ekonomi"))
+
+    # İndeks boş (LSH miss) ve conn verilmedi: yine de pg_trgm kontrolü yapılır
+    assert [e["title"] for e in filtered] == ["istanbul metro hattı açıldı"]
+    assert find_duplicate.await_count == 2
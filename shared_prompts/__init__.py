@@ -8,6 +8,7 @@ from .prompt_bundle import TOPIC_PROMPTS, CATEGORY_ENERGY
 # Unified System Prompt Builder (TEK KAYNAK)
 from .system_prompt_builder import (
     SystemPromptBuilder,
+    PromptSegments,
     build_system_prompt,
     build_entry_system_prompt,
     build_comment_system_prompt,
@@ -76,6 +77,7 @@ from .prompt_builder import (
 __all__ = [
     # Unified System Prompt Builder (TEK KAYNAK)
     "SystemPromptBuilder",
+    "PromptSegments",
     "build_system_prompt",
     "build_entry_system_prompt",
     "build_comment_system_prompt",